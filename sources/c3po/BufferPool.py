@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2020, CEA
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following disclaimer in the documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products derived from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+""" Contain the class :class:`.BufferPool`. """
+from __future__ import print_function, division
+from collections import OrderedDict
+import threading
+import numpy
+
+
+class BufferPool(object):
+    """ :class:`.BufferPool` recycles the numpy buffers used by :class:`.LocalDataManager` (and its
+    MPI subclasses) in packed storage mode (see :meth:`.LocalDataManager.setPackedStorage`).
+
+    Buffers given back with :meth:`release` are kept in a free list, and are reused by
+    :meth:`acquire` when a buffer of the same size is asked for, instead of allocating a new one.
+    The free list is bounded: when it is full, the least recently released buffer is dropped.
+
+    A :class:`.BufferPool` is attached to a :class:`.LocalDataManager` with
+    :meth:`.LocalDataManager.setBufferPool`. It is then shared with all the objects built from it
+    (by :meth:`.LocalDataManager.clone`, :meth:`.LocalDataManager.cloneEmpty` and the operators).
+    Temporary objects give their buffer back to the pool when :meth:`.DataManager.release` is
+    called on them.
+
+    The methods of a :class:`.BufferPool` can be called concurrently (for instance by the threads of
+    a :class:`.CollaborativeDataManager`, see :meth:`.CollaborativeDataManager.setNumberOfThreads`).
+    """
+
+    def __init__(self, maxFreeBuffers=16):
+        """ Build a :class:`.BufferPool` object.
+
+        Parameters
+        ----------
+        maxFreeBuffers : int
+            The maximum number of buffers kept in the free list. Default: 16.
+        """
+        self._maxFreeBuffers = maxFreeBuffers
+        self._freeBuffers = OrderedDict()
+        self._releaseCounter = 0
+        self._nbAllocations = 0
+        self._nbHits = 0
+        self._nbEvictions = 0
+        self._lock = threading.Lock()
+
+    def setMaxFreeBuffers(self, maxFreeBuffers):
+        """ Set the maximum number of buffers kept in the free list.
+
+        Parameters
+        ----------
+        maxFreeBuffers : int
+            The maximum number of buffers kept in the free list.
+        """
+        with self._lock:
+            self._maxFreeBuffers = maxFreeBuffers
+            self._evict()
+
+    def acquire(self, size, dtype=numpy.float64):
+        """ Return a buffer of ``size`` values of type ``dtype``, taken from the free list if possible.
+
+        The content of the returned buffer is undefined.
+
+        Parameters
+        ----------
+        size : int
+            The number of values of the buffer.
+        dtype : numpy.dtype
+            The type of the values of the buffer. Default: ``numpy.float64``.
+
+        Returns
+        -------
+        numpy.ndarray
+            A 1D numpy array of ``size`` values of type ``dtype``.
+        """
+        with self._lock:
+            for key in reversed(self._freeBuffers):
+                if self._freeBuffers[key].size == size and self._freeBuffers[key].dtype == dtype:
+                    self._nbHits += 1
+                    return self._freeBuffers.pop(key)
+            self._nbAllocations += 1
+        return numpy.empty(size, dtype=dtype)
+
+    def release(self, buffer):
+        """ Give ``buffer`` back to the pool: it will be reused by a future call to :meth:`acquire`.
+
+        ``buffer`` must not be used anymore by the caller.
+
+        Parameters
+        ----------
+        buffer : numpy.ndarray
+            A 1D numpy array.
+        """
+        with self._lock:
+            for freeBuffer in self._freeBuffers.values():
+                if freeBuffer is buffer:
+                    return
+            self._freeBuffers[self._releaseCounter] = buffer
+            self._releaseCounter += 1
+            self._evict()
+
+    def _evict(self):
+        """ INTERNAL Drop the least recently released buffers while the free list is too long (the lock must be held). """
+        while len(self._freeBuffers) > max(self._maxFreeBuffers, 0):
+            self._freeBuffers.popitem(last=False)
+            self._nbEvictions += 1
+
+    def clear(self):
+        """ Drop all the buffers of the free list. """
+        with self._lock:
+            self._freeBuffers.clear()
+
+    def getNbAllocations(self):
+        """ Return the number of buffers allocated by :meth:`acquire` (not found in the free list).
+
+        Returns
+        -------
+        int
+            The number of allocations.
+        """
+        return self._nbAllocations
+
+    def getNbHits(self):
+        """ Return the number of buffers returned by :meth:`acquire` from the free list.
+
+        Returns
+        -------
+        int
+            The number of pool hits.
+        """
+        return self._nbHits
+
+    def getNbEvictions(self):
+        """ Return the number of buffers dropped because the free list was full.
+
+        Returns
+        -------
+        int
+            The number of evictions.
+        """
+        return self._nbEvictions
+
+    def getNbFreeBuffers(self):
+        """ Return the number of buffers currently in the free list.
+
+        Returns
+        -------
+        int
+            The number of free buffers.
+        """
+        return len(self._freeBuffers)
+
+    def getFreeMemory(self):
+        """ Return the memory (in bytes) held by the buffers of the free list.
+
+        Returns
+        -------
+        int
+            The memory held by the free list.
+        """
+        return sum(buffer.nbytes for buffer in self._freeBuffers.values())
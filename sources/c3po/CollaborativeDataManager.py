@@ -11,14 +11,49 @@
 """ Contain the class :class:`.CollaborativeDataManager`. """
 from __future__ import print_function, division
 import math
+import threading
+from multiprocessing.pool import ThreadPool
+import numpy
 
-from c3po.DataManager import DataManager
+from c3po.DataManager import DataManager, mergeNorms
 from c3po.CollaborativeObject import CollaborativeObject
 
+_threadPools = {}
+_threadPoolsLock = threading.Lock()
+_workerState = threading.local()
+
+
+def getThreadPool(nbThreads):
+    """ INTERNAL Return the thread pool of ``nbThreads`` threads shared by all :class:`.CollaborativeDataManager`. """
+    with _threadPoolsLock:
+        if nbThreads not in _threadPools:
+            _threadPools[nbThreads] = ThreadPool(nbThreads, initializer=_initWorker)
+        return _threadPools[nbThreads]
+
+
+def _initWorker():
+    """ INTERNAL Mark the current thread as a worker of a thread pool. """
+    _workerState.inPool = True
+
+
+def mapInThreadPool(function, items, nbThreads):
+    """ INTERNAL Return the list of ``function(item)`` for the ``items``, in their order.
+
+    The calls are made by the thread pool of ``nbThreads`` threads if there are more than one thread
+    and one item, and if the current thread is not already a worker of a pool: nested calls are
+    sequential (waiting for a pool from one of its workers could deadlock).
+    """
+    if nbThreads > 1 and len(items) > 1 and not getattr(_workerState, "inPool", False):
+        return getThreadPool(nbThreads).map(function, items, chunksize=1)
+    return [function(item) for item in items]
+
 
 class CollaborativeDataManager(DataManager, CollaborativeObject):
     """ :class:`.CollaborativeDataManager` is a :class:`.DataManager` that handles a set of
     :class:`.DataManager` as a single one.
+
+    The operations are applied to each :class:`.DataManager` of the set, one after the other by
+    default, or concurrently by a pool of threads (see :meth:`setNumberOfThreads`).
     """
 
     def __init__(self, dataManagers):
@@ -31,12 +66,66 @@ class CollaborativeDataManager(DataManager, CollaborativeObject):
         """
         self.dataManagers = dataManagers
         self._indexToIgnore = []
+        self._nbThreads = 1
         CollaborativeObject.__init__(self, self.dataManagers)
 
     def ignoreForConstOperators(self, indexToIgnore):
         """ INTERNAL """
         self._indexToIgnore[:] = indexToIgnore[:]
 
+    def setNumberOfThreads(self, nbThreads):
+        """ Set the number of threads used to apply the operations to the :class:`.DataManager` of ``self``.
+
+        With more than one thread, the operations (operators, copies, linear combinations, norms and
+        scalar products) are applied concurrently to the :class:`.DataManager` of ``self``. Only the
+        numpy kernels release the GIL: the gain is limited to the operations made with numpy, that is
+        all the operations on a :class:`.LocalDataManager` in packed storage (see
+        :meth:`.LocalDataManager.setPackedStorage`), and the linear combinations and scalar products
+        otherwise. The MEDCoupling kernels used by the other operations (operators, copies and norms of
+        the MED fields in the default storage) hold the GIL and may gain nothing. The script
+        ``tests/unitests/dataManager/benchmarkThreads.py`` measures both.
+
+        The partial norms and scalar products are always summed in the order of the
+        :class:`.DataManager`: the results do not depend on the number of threads.
+
+        The threads are shared between all the :class:`.CollaborativeDataManager` using the same
+        number of threads. The number of threads is inherited by the objects built by :meth:`clone`,
+        :meth:`cloneEmpty` and by the operators.
+
+        .. warning::
+
+            The :class:`.DataManager` of ``self`` must not use MPI communications in their
+            operations (for instance :class:`.MPIDomainDecompositionDataManager`) with more than one
+            thread.
+
+        Parameters
+        ----------
+        nbThreads : int
+            The number of threads. Default: 1 (sequential execution).
+        """
+        if nbThreads < 1:
+            raise Exception("CollaborativeDataManager.setNumberOfThreads nbThreads must be >= 1.")
+        self._nbThreads = nbThreads
+
+    def getNumberOfThreads(self):
+        """ Return the number of threads set by :meth:`setNumberOfThreads`.
+
+        Returns
+        -------
+        int
+            The number of threads.
+        """
+        return self._nbThreads
+
+    def _forEach(self, function, skipIgnored=False):
+        """ INTERNAL Return the list of ``function(i)`` for the indices ``i`` of the :class:`.DataManager` of ``self`` (except the ignored ones if ``skipIgnored``).
+
+        The calls are made by the thread pool if there is more than one thread (see
+        :func:`mapInThreadPool`). The results are always in the order of the indices.
+        """
+        indices = [i for i in range(len(self.dataManagers)) if not skipIgnored or i not in self._indexToIgnore]
+        return mapInThreadPool(function, indices, self._nbThreads)
+
     def clone(self):
         """ Return a clone of ``self``.
 
@@ -58,8 +147,92 @@ class CollaborativeDataManager(DataManager, CollaborativeObject):
         dataClone = [data.cloneEmpty() for data in self.dataManagers]
         output = CollaborativeDataManager(dataClone)
         output.ignoreForConstOperators(self._indexToIgnore)
+        output.setNumberOfThreads(self._nbThreads)
         return output
 
+    def release(self):
+        """ Indicate that ``self`` is not used anymore: :meth:`release` is called on each
+        :class:`.DataManager` of ``self``. See :meth:`.DataManager.release`.
+        """
+        for data in self.dataManagers:
+            data.release()
+
+    def setStorageType(self, dtype):
+        """ Call :meth:`.DataManager.setStorageType` on each :class:`.DataManager` of ``self``.
+
+        Parameters
+        ----------
+        dtype : numpy.dtype
+            The storage type: ``numpy.float64`` or ``numpy.float32``.
+        """
+        for data in self.dataManagers:
+            data.setStorageType(dtype)
+
+    def getDoubleDataNames(self):
+        """ Return the names of the data of the :class:`.DataManager` of ``self`` (each name appears once).
+
+        Returns
+        -------
+        list[str]
+            The names of the data.
+        """
+        names = []
+        for data in self.dataManagers:
+            names += [name for name in data.getDoubleDataNames() if name not in names]
+        return names
+
+    def asNumpy(self, name):
+        """ Return the views of the data ``name`` of the :class:`.DataManager` of ``self`` (see :meth:`.DataManager.asNumpy`).
+
+        Parameters
+        ----------
+        name : str
+            The name of the data to view.
+
+        Returns
+        -------
+        dict
+            The views, indexed by the position of the :class:`.DataManager` in ``self.dataManagers``
+            (only the :class:`.DataManager` holding ``name`` appear).
+        """
+        return {i: data.asNumpy(name) for i, data in enumerate(self.dataManagers) if name in data.getDoubleDataNames()}
+
+    def flatView(self):
+        """ Return the flat views of the :class:`.DataManager` of ``self`` (see :meth:`.DataManager.flatView`).
+
+        Returns
+        -------
+        dict
+            The flat views, indexed by the position of the :class:`.DataManager` in ``self.dataManagers``.
+        """
+        return {i: data.flatView() for i, data in enumerate(self.dataManagers)}
+
+    def mapToFile(self, directory=None):
+        """ Call :meth:`.DataManager.mapToFile` on each :class:`.DataManager` of ``self``.
+
+        Parameters
+        ----------
+        directory : str
+            The directory of the files. Default: the system temporary directory.
+
+        Returns
+        -------
+        bool
+            True if the data of all the :class:`.DataManager` of ``self`` are memory-mapped.
+        """
+        mapped = [data.mapToFile(directory) for data in self.dataManagers]
+        return all(mapped)
+
+    def getMemorySize(self):
+        """ Return the sum of the memory used by the :class:`.DataManager` of ``self`` (see :meth:`.DataManager.getMemorySize`).
+
+        Returns
+        -------
+        int
+            The memory used by ``self``, in bytes.
+        """
+        return sum(data.getMemorySize() for data in self.dataManagers)
+
     def copy(self, other):
         """ Copy data of other in ``self``.
 
@@ -74,8 +247,7 @@ class CollaborativeDataManager(DataManager, CollaborativeObject):
             If ``self`` and ``other`` are not consistent.
         """
         self.checkBeforeOperator(other)
-        for i, data in enumerate(self.dataManagers):
-            data.copy(other.dataManagers[i])
+        self._forEach(lambda i: self.dataManagers[i].copy(other.dataManagers[i]))
 
     def normMax(self):
         """ Return the infinite norm.
@@ -85,11 +257,9 @@ class CollaborativeDataManager(DataManager, CollaborativeObject):
             The max of the absolute values of the scalars and of the infinite norms of the MED fields.
         """
         norm = 0.
-        for idata, data in enumerate(self.dataManagers):
-            if idata not in self._indexToIgnore:
-                localNorm = data.normMax()
-                if localNorm > norm:
-                    norm = localNorm
+        for localNorm in self._forEach(lambda i: self.dataManagers[i].normMax(), skipIgnored=True):
+            if localNorm > norm:
+                norm = localNorm
         return norm
 
     def norm2(self):
@@ -101,10 +271,8 @@ class CollaborativeDataManager(DataManager, CollaborativeObject):
             component of the MED fields.
         """
         norm = 0.
-        for idata, data in enumerate(self.dataManagers):
-            if idata not in self._indexToIgnore:
-                localNorm = data.norm2()
-                norm += localNorm * localNorm
+        for localNorm in self._forEach(lambda i: self.dataManagers[i].norm2(), skipIgnored=True):
+            norm += localNorm * localNorm
         return math.sqrt(norm)
 
     def checkBeforeOperator(self, other):
@@ -134,8 +302,7 @@ class CollaborativeDataManager(DataManager, CollaborativeObject):
         """
         self.checkBeforeOperator(other)
         newData = self.cloneEmpty()
-        for i in range(len(self.dataManagers)):
-            newData.dataManagers[i] = self.dataManagers[i] + other.dataManagers[i]
+        newData.dataManagers[:] = self._forEach(lambda i: self.dataManagers[i] + other.dataManagers[i])
         return newData
 
     def __iadd__(self, other):
@@ -159,8 +326,7 @@ class CollaborativeDataManager(DataManager, CollaborativeObject):
             If ``self`` and ``other`` are not consistent.
         """
         self.checkBeforeOperator(other)
-        for i in range(len(self.dataManagers)):
-            self.dataManagers[i] += other.dataManagers[i]
+        self.dataManagers[:] = self._forEach(lambda i: self.dataManagers[i].__iadd__(other.dataManagers[i]))
         return self
 
     def __sub__(self, other):
@@ -185,8 +351,7 @@ class CollaborativeDataManager(DataManager, CollaborativeObject):
         """
         self.checkBeforeOperator(other)
         newData = self.cloneEmpty()
-        for i in range(len(self.dataManagers)):
-            newData.dataManagers[i] = self.dataManagers[i] - other.dataManagers[i]
+        newData.dataManagers[:] = self._forEach(lambda i: self.dataManagers[i] - other.dataManagers[i])
         return newData
 
     def __isub__(self, other):
@@ -210,8 +375,7 @@ class CollaborativeDataManager(DataManager, CollaborativeObject):
             If ``self`` and ``other`` are not consistent.
         """
         self.checkBeforeOperator(other)
-        for i in range(len(self.dataManagers)):
-            self.dataManagers[i] -= other.dataManagers[i]
+        self.dataManagers[:] = self._forEach(lambda i: self.dataManagers[i].__isub__(other.dataManagers[i]))
         return self
 
     def __mul__(self, scalar):
@@ -231,8 +395,7 @@ class CollaborativeDataManager(DataManager, CollaborativeObject):
             multiplied by ``scalar``.
         """
         newData = self.cloneEmpty()
-        for i in range(len(self.dataManagers)):
-            newData.dataManagers[i] = self.dataManagers[i] * scalar
+        newData.dataManagers[:] = self._forEach(lambda i: self.dataManagers[i] * scalar)
         return newData
 
     def __imul__(self, scalar):
@@ -250,16 +413,13 @@ class CollaborativeDataManager(DataManager, CollaborativeObject):
         CollaborativeDataManager
             ``self``.
         """
-        for i in range(len(self.dataManagers)):
-            self.dataManagers[i] *= scalar
+        self.dataManagers[:] = self._forEach(lambda i: self.dataManagers[i].__imul__(scalar))
         return self
 
     def imuladd(self, scalar, other):
         """ Add in ``self`` ``scalar * other`` (in place operation).
 
-        In order to do so, ``other *= scalar`` and ``other *= 1./scalar`` are done.
-
-        For example ``a.imuladd(b, c)``.
+        For example ``a.imuladd(b, c)``. Same as :meth:`axpy`.
 
         Parameters
         ----------
@@ -280,10 +440,36 @@ class CollaborativeDataManager(DataManager, CollaborativeObject):
         """
         if scalar == 0:
             return self
-        self.checkBeforeOperator(other)
-        other *= scalar
-        self += other
-        other *= 1. / scalar
+        return self.axpy(scalar, other)
+
+    def linearCombination(self, coeffs, managers):
+        """ Set ``self`` to ``sum_i(coeffs[i] * managers[i])`` (in place operation).
+
+        :meth:`linearCombination` is called on each :class:`.DataManager` of ``self``.
+
+        Parameters
+        ----------
+        coeffs : list
+            The scalar coefficients.
+        managers : list[CollaborativeDataManager]
+            :class:`CollaborativeDataManager` with the same list of data than ``self`` (as many as
+            ``coeffs``).
+
+        Returns
+        -------
+        CollaborativeDataManager
+            ``self``.
+
+        Raises
+        ------
+        Exception
+            If ``self`` and ``managers`` are not consistent.
+        """
+        if len(coeffs) != len(managers):
+            raise Exception("CollaborativeDataManager.linearCombination : coeffs and managers must have the same length.")
+        for other in managers:
+            self.checkBeforeOperator(other)
+        self._forEach(lambda i: self.dataManagers[i].linearCombination(coeffs, [other.dataManagers[i] for other in managers]))
         return self
 
     def dot(self, other):
@@ -305,7 +491,85 @@ class CollaborativeDataManager(DataManager, CollaborativeObject):
         """
         self.checkBeforeOperator(other)
         result = 0.
-        for i in range(len(self.dataManagers)):
-            if i not in self._indexToIgnore:
-                result += self.dataManagers[i].dot(other.dataManagers[i])
+        for localResult in self._forEach(lambda i: self.dataManagers[i].dot(other.dataManagers[i]), skipIgnored=True):
+            result += localResult
+        return result
+
+    def dotMany(self, others):
+        """ Return the scalar products of ``self`` with each element of ``others``.
+
+        Parameters
+        ----------
+        others : list[CollaborativeDataManager]
+            :class:`CollaborativeDataManager` with the same list of data than ``self``.
+
+        Returns
+        -------
+        numpy.ndarray
+            The vector of the scalar products of ``self`` with each element of ``others``.
+
+        Raises
+        ------
+        Exception
+            If ``self`` and ``others`` are not consistent.
+        """
+        result = numpy.zeros(len(others))
+        for other in others:
+            self.checkBeforeOperator(other)
+        for localResult in self._forEach(lambda i: self.dataManagers[i].dotMany([other.dataManagers[i] for other in others]), skipIgnored=True):
+            result += localResult
+        return result
+
+    def gram(self, vectors):
+        """ Return the Gram matrix of ``vectors``: the matrix of their scalar products two by two.
+
+        Parameters
+        ----------
+        vectors : list[CollaborativeDataManager]
+            :class:`CollaborativeDataManager` with the same list of data than ``self``.
+
+        Returns
+        -------
+        numpy.ndarray
+            The (symmetric) matrix ``G`` with ``G[i, j] = vectors[i].dot(vectors[j])``.
+
+        Raises
+        ------
+        Exception
+            If ``self`` and ``vectors`` are not consistent.
+        """
+        result = numpy.zeros((len(vectors), len(vectors)))
+        for vector in vectors:
+            self.checkBeforeOperator(vector)
+        for localResult in self._forEach(lambda i: self.dataManagers[i].gram([vector.dataManagers[i] for vector in vectors]), skipIgnored=True):
+            result += localResult
         return result
+
+    def reduceNorms(self, others=(), dotPairs=()):
+        """ Return, in a single call, the norms 2 and the infinite norms of ``self`` and of each
+        element of ``others``, as well as the requested scalar products between them.
+
+        Parameters
+        ----------
+        others : list[CollaborativeDataManager]
+            :class:`CollaborativeDataManager` with the same list of data than ``self``.
+        dotPairs : list[tuple[int, int]]
+            The scalar products to compute, as pairs of indices in ``[self] + others``.
+
+        Returns
+        -------
+        tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]
+            The norms 2 of ``[self] + others``, their infinite norms, and the scalar products
+            asked in ``dotPairs``.
+
+        Raises
+        ------
+        Exception
+            If ``self`` and ``others`` are not consistent.
+        """
+        for other in others:
+            self.checkBeforeOperator(other)
+        result = (numpy.zeros(len(others) + 1), numpy.zeros(len(others) + 1), numpy.zeros(len(dotPairs)))
+        for norms2, normsMax, dots in self._forEach(lambda i: self.dataManagers[i].reduceNorms([other.dataManagers[i] for other in others], dotPairs), skipIgnored=True):
+            result = mergeNorms(result, (norms2 * norms2, normsMax, dots))
+        return numpy.sqrt(result[0]), result[1], result[2]
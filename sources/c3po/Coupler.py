@@ -12,6 +12,8 @@
 from __future__ import print_function, division
 
 from c3po.PhysicsDriver import PhysicsDriver
+from c3po.DataManager import DataManager
+from c3po.CollaborativeDataManager import CollaborativeDataManager
 
 
 class NormChoice(object):
@@ -57,6 +59,9 @@ class Coupler(PhysicsDriver):
         self._norm = NormChoice.normMax
         self._dt = 1.e30
         self._stationaryMode = False
+        self._predictor = None
+        self._accuracyScheduler = None
+        self._innerAccuracy = None
 
     def getMEDCouplingMajorVersion(self):
         """ See :meth:`.PhysicsDriver.getMEDCouplingMajorVersion`. """
@@ -107,6 +112,8 @@ class Coupler(PhysicsDriver):
         """ See :meth:`.PhysicsDriver.terminate`. """
         for physics in self._physicsDriversList:
             physics.term()
+        if self._predictor is not None:
+            self._predictor.clear()
 
     def presentTime(self):
         """ See :meth:`.PhysicsDriver.presentTime`. """
@@ -143,11 +150,15 @@ class Coupler(PhysicsDriver):
         """ See :meth:`.PhysicsDriver.validateTimeStep`. """
         for physics in self._physicsDriversList:
             physics.validateTimeStep()
+        if self._predictor is not None and not self._stationaryMode:
+            self._predictor.record(CollaborativeDataManager(self._dataManagers), self.presentTime())
 
     def setStationaryMode(self, stationaryMode):
         """ See :meth:`.PhysicsDriver.setStationaryMode`. """
         for physics in self._physicsDriversList:
             physics.setStationaryMode(stationaryMode)
+        if self._predictor is not None and stationaryMode != self._stationaryMode:
+            self._predictor.clear()
         self._stationaryMode = stationaryMode
 
     def getStationaryMode(self):
@@ -173,6 +184,8 @@ class Coupler(PhysicsDriver):
         """ See :meth:`.PhysicsDriver.resetTime`. """
         for physics in self._physicsDriversList:
             physics.resetTime(time_)
+        if self._predictor is not None:
+            self._predictor.clear()
 
     def getIterateStatus(self):
         """ See :meth:`.PhysicsDriver.getSolveStatus`. """
@@ -184,6 +197,99 @@ class Coupler(PhysicsDriver):
             converged = converged and physicsConverged
         return (succeed, converged)
 
+    def setPredictor(self, predictor):
+        """ Set a :class:`.Predictor` computing the initial guess of each time step.
+
+        The :class:`.DataManager` of ``self`` are stored by the predictor at each
+        :meth:`validateTimeStep() <.PhysicsDriver.validateTimeStep>` (outside of the stationary
+        mode), and the stored time steps are forgotten by :meth:`resetTime() <.PhysicsDriver.resetTime>`
+        and when the stationary mode changes.
+
+        Only the couplers working with a data-to-physics :class:`.Exchanger` use the predictor:
+        :class:`.FixedPointCoupler`, :class:`.AndersonCoupler`, :class:`.JFNKCoupler`,
+        :class:`.CrossedSecantCoupler` and :class:`.JacobiCoupler`. They push the extrapolation through this exchanger before
+        the first solve of each time step.
+
+        Parameters
+        ----------
+        predictor : Predictor
+            The :class:`.Predictor` to use, or None (default) to start each time step from the state
+            of the physics.
+        """
+        if self._predictor is not None:
+            self._predictor.clear()
+        self._predictor = predictor
+
+    def getPredictor(self):
+        """ Return the :class:`.Predictor` set by :meth:`setPredictor` (or None).
+
+        Returns
+        -------
+        Predictor
+            The :class:`.Predictor` in use, or None.
+        """
+        return self._predictor
+
+    def applyPredictor(self, data2physics):
+        """ INTERNAL Push through ``data2physics`` the prediction at the end of the time step, if a :class:`.Predictor` is set and has stored time steps. """
+        if self._predictor is None or self._stationaryMode:
+            return
+        if self._predictor.predict(CollaborativeDataManager(self._dataManagers), self.presentTime() + self._dt):
+            data2physics.exchange()
+
+    def setAccuracyScheduler(self, accuracyScheduler):
+        """ Set an :class:`.AccuracyScheduler` computing the accuracy asked to the
+        :class:`.PhysicsDriver` at each coupling iteration (inexact fixed point).
+
+        Only :class:`.FixedPointCoupler`, :class:`.AndersonCoupler` and :class:`.CrossedSecantCoupler`
+        use it: they set the accuracy to their :class:`.PhysicsDriver` before each solve, and add the
+        accuracy and the number of inner iterations to the iteration prints.
+
+        Parameters
+        ----------
+        accuracyScheduler : AccuracyScheduler
+            The :class:`.AccuracyScheduler` to use, or None (default) to let the :class:`.PhysicsDriver`
+            use their own accuracy.
+        """
+        self._accuracyScheduler = accuracyScheduler
+        self._innerAccuracy = None
+
+    def getAccuracyScheduler(self):
+        """ Return the :class:`.AccuracyScheduler` set by :meth:`setAccuracyScheduler` (or None).
+
+        Returns
+        -------
+        AccuracyScheduler
+            The :class:`.AccuracyScheduler` in use, or None.
+        """
+        return self._accuracyScheduler
+
+    def applyAccuracy(self, error, newTimeStep=False):
+        """ INTERNAL Set to the PhysicsDriver the accuracy computed by the AccuracyScheduler (if any) from the coupling error ``error`` of the previous iteration (None if unknown). ``newTimeStep`` resets the count of inner iterations. """
+        if self._accuracyScheduler is None:
+            return
+        if newTimeStep:
+            self._accuracyScheduler.resetInnerIterations()
+        self._innerAccuracy = self._accuracyScheduler.computeAccuracy(error)
+        for physics in self._physicsDriversList:
+            physics.setInputDoubleValue(self._accuracyScheduler.getInputName(), self._innerAccuracy)
+
+    def readInnerIterations(self):
+        """ INTERNAL Add to the AccuracyScheduler (if any) the number of inner iterations of the last solve of the PhysicsDriver. """
+        if self._accuracyScheduler is None or self._accuracyScheduler.getInnerIterationsName() is None:
+            return
+        name = self._accuracyScheduler.getInnerIterationsName()
+        self._accuracyScheduler.addInnerIterations(int(sum(physics.getOutputDoubleValue(name) for physics in self._physicsDriversList)))
+
+    def getAccuracyReport(self):
+        """ INTERNAL Return the string (starting with a space) added to the iteration prints by the AccuracyScheduler (empty if none). """
+        if self._accuracyScheduler is None or self._innerAccuracy is None:
+            return ""
+        report = " (inner accuracy : {:.2e}".format(self._innerAccuracy)
+        if self._accuracyScheduler.getInnerIterationsName() is not None:
+            report += ", inner iterations : {}".format(self._accuracyScheduler.getInnerIterations())
+        return report + ")"
+
     def setNormChoice(self, choice):
         """ Choose a norm for future use.
 
@@ -215,6 +321,41 @@ class Coupler(PhysicsDriver):
             return data.norm2()
         raise Exception("Coupler.getNorm The required norm is unknown.")
 
+    def getNorms(self, dataManagers):
+        """ Return the norms choosen by :meth:`setNormChoice` of several consistent
+        :class:`.DataManager`.
+
+        The norms are computed together, with a single call to
+        :meth:`DataManager.reduceNorms() <.DataManager.reduceNorms>`.
+
+        Parameters
+        ----------
+        dataManagers : list[DataManager]
+            A list of consistent :class:`.DataManager` objects.
+
+        Returns
+        -------
+        list
+            The asked norms of ``dataManagers``.
+        """
+        norms2, normsMax, _ = dataManagers[0].reduceNorms(dataManagers[1:])
+        return self.chooseNorms(norms2, normsMax)
+
+    def chooseNorms(self, norms2, normsMax):
+        """ INTERNAL Return, among the results of :meth:`DataManager.reduceNorms() <.DataManager.reduceNorms>`, the norms choosen by :meth:`setNormChoice`. """
+        if self._norm == NormChoice.normMax:
+            return list(normsMax)
+        if self._norm == NormChoice.norm2:
+            return list(norms2)
+        raise Exception("Coupler.getNorms The required norm is unknown.")
+
+    @staticmethod
+    def releaseTemporaries(temporaries):
+        """ INTERNAL Call :meth:`.DataManager.release` on the :class:`.DataManager` of ``temporaries`` (other items are ignored). """
+        for temporary in temporaries:
+            if isinstance(temporary, DataManager):
+                temporary.release()
+
     def readNormData(self):
         """ Return a list of the norms of the :class:`.DataManager` objects hold by ``self``.
 
@@ -10,6 +10,60 @@
 
 """ Contain the class :class:`.DataManager`. """
 from __future__ import print_function, division
+import numpy
+
+from c3po.LinearExpression import LinearExpression
+
+
+def orthogonalize(vector, basis):
+    """ INTERNAL
+
+    Orthogonalize ``vector`` against the orthonormal ``basis`` (list of :class:`.DataManager`).
+
+    A classical Gram-Schmidt process is applied twice: this is as accurate as the modified
+    Gram-Schmidt process, but requires only two calls to :meth:`DataManager.dotMany` (and therefore
+    two global reductions in parallel) whatever the size of ``basis``.
+
+    Returns
+    -------
+    numpy.ndarray
+        The components of the initial ``vector`` on ``basis``.
+    """
+    components = numpy.zeros(len(basis))
+    if len(basis) > 0:
+        for _ in range(2):
+            projection = vector.dotMany(basis)
+            vector.linearCombination([1.] + list(-projection), [vector] + list(basis))
+            components += projection
+    return components
+
+
+def orthogonalizeModified(vector, basis):
+    """ INTERNAL
+
+    Orthogonalize ``vector`` against the orthonormal ``basis`` (list of :class:`.DataManager`) with
+    the modified Gram-Schmidt process: one scalar product (and therefore one global reduction in
+    parallel) per element of ``basis``.
+
+    Returns
+    -------
+    numpy.ndarray
+        The components of the initial ``vector`` on ``basis``.
+    """
+    components = numpy.zeros(len(basis))
+    for i, basisVector in enumerate(basis):
+        components[i] = vector.dot(basisVector)
+        vector.axpy(-components[i], basisVector)
+    return components
+
+
+def mergeNorms(partial1, partial2):
+    """ INTERNAL
+
+    Merge two partial results of :meth:`DataManager.reduceNorms`, given as tuples (squares of the
+    norms 2, infinite norms, scalar products) of numpy arrays.
+    """
+    return (partial1[0] + partial2[0], numpy.maximum(partial1[1], partial2[1]), partial1[2] + partial2[2])
 
 
 class DataManager(object):
@@ -196,9 +250,7 @@ class DataManager(object):
     def imuladd(self, scalar, other):
         """ Add in ``self`` ``scalar * other`` (in place operation).
 
-        In order to do so, ``other *= scalar`` and ``other *= 1./scalar`` are done.
-
-        For example ``a.imuladd(b, c)``.
+        For example ``a.imuladd(b, c)``. See also :meth:`axpy`.
 
         Parameters
         ----------
@@ -237,3 +289,287 @@ class DataManager(object):
             If ``self`` and ``other`` are not consistent.
         """
         raise NotImplementedError
+
+    def axpy(self, alpha, other):
+        """ Add in ``self`` ``alpha * other`` (in place operation).
+
+        The default implementation calls :meth:`linearCombination`.
+
+        Parameters
+        ----------
+        alpha
+            A scalar value.
+        other : DataManager
+            A :class:`.DataManager` with the same list of data then ``self``.
+
+        Returns
+        -------
+        DataManager
+            ``self``.
+
+        Raises
+        ------
+        Exception
+            If ``self`` and ``other`` are not consistent.
+        """
+        return self.linearCombination([1., alpha], [self, other])
+
+    def axpby(self, alpha, other, beta):
+        """ Set ``self`` to ``alpha * other + beta * self`` (in place operation).
+
+        If ``beta`` is 0, the values of ``self`` are not read. The default implementation calls
+        :meth:`linearCombination`.
+
+        Parameters
+        ----------
+        alpha
+            A scalar value.
+        other : DataManager
+            A :class:`.DataManager` with the same list of data then ``self``.
+        beta
+            A scalar value.
+
+        Returns
+        -------
+        DataManager
+            ``self``.
+
+        Raises
+        ------
+        Exception
+            If ``self`` and ``other`` are not consistent.
+        """
+        return self.linearCombination([beta, alpha], [self, other])
+
+    def linearCombination(self, coeffs, managers):
+        """ Set ``self`` to ``sum_i(coeffs[i] * managers[i])`` (in place operation).
+
+        ``self`` can be one of ``managers``. Terms with a zero coefficient are ignored (their
+        values are not read).
+
+        Implementations should compute the result in a single pass, without allocating temporary
+        data. The default implementation, provided for compatibility, uses :meth:`copy`,
+        :meth:`__imul__` and :meth:`imuladd`.
+
+        Parameters
+        ----------
+        coeffs : list
+            The scalar coefficients.
+        managers : list[DataManager]
+            :class:`.DataManager` with the same list of data then ``self`` (as many as ``coeffs``).
+
+        Returns
+        -------
+        DataManager
+            ``self``.
+
+        Raises
+        ------
+        Exception
+            If ``self`` and ``managers`` are not consistent.
+        """
+        if len(coeffs) != len(managers):
+            raise Exception("DataManager.linearCombination : coeffs and managers must have the same length.")
+        selfCoeff = 0.
+        terms = []
+        for coeff, manager in zip(coeffs, managers):
+            if manager is self:
+                selfCoeff += coeff
+            elif coeff != 0.:
+                terms.append((coeff, manager))
+        if selfCoeff != 0. or len(terms) == 0:
+            self *= selfCoeff
+        else:
+            self.copy(terms[0][1])
+            self *= terms[0][0]
+            terms = terms[1:]
+        for coeff, manager in terms:
+            self.imuladd(coeff, manager)
+        return self
+
+    def lazy(self):
+        """ Return a :class:`.LinearExpression` holding only ``self``.
+
+        Operators applied to the returned object build a lazy expression, evaluated in a single pass
+        when it is assigned to a :class:`.DataManager` (see :class:`.LinearExpression`).
+
+        Returns
+        -------
+        LinearExpression
+            The expression ``1. * self``.
+        """
+        return LinearExpression([(1., self)])
+
+    def release(self):
+        """ Indicate that ``self`` is not used anymore: the memory it holds can be recycled.
+
+        This is only an optimization, for implementations using a pool of memory (see
+        :class:`.BufferPool`): ``self`` must not be used after this call. The default
+        implementation does nothing.
+        """
+
+    def setStorageType(self, dtype):
+        """ Set the type used to store the data of ``self``, for instance ``numpy.float32`` to halve
+        the memory used by history vectors (see :meth:`.AndersonCoupler.setHistoryStorageType`).
+
+        Computations are still made in double precision. This is only an optimization: the default
+        implementation does nothing (data stay in double precision).
+
+        Parameters
+        ----------
+        dtype : numpy.dtype
+            The storage type: ``numpy.float64`` or ``numpy.float32``.
+        """
+
+    def getDoubleDataNames(self):
+        """ Return the names of the data handled by ``self`` (the data affected by the methods of :class:`.DataManager`).
+
+        Returns
+        -------
+        list[str]
+            The names of the data.
+        """
+        raise NotImplementedError
+
+    def asNumpy(self, name):
+        """ Return writable numpy views (without copy) of the data ``name``, for vectorized user code.
+
+        Implementations holding local data return a numpy array. Implementations handling several
+        :class:`.DataManager` return a mapping of the views of their local :class:`.DataManager`.
+
+        Parameters
+        ----------
+        name : str
+            The name of the data to view.
+
+        Returns
+        -------
+        numpy.ndarray or dict
+            The view(s) of the data ``name``.
+        """
+        raise NotImplementedError
+
+    def flatView(self):
+        """ Return writable numpy views (without copy) of all the data of ``self``, as a flat array.
+
+        See :meth:`asNumpy` for the type of the returned object.
+
+        Returns
+        -------
+        numpy.ndarray or dict
+            The flat view(s) of the data.
+        """
+        raise NotImplementedError
+
+    def mapToFile(self, directory=None):
+        """ Move the data of ``self`` in memory-mapped files of ``directory``, in order to free the
+        RAM they hold (see :class:`.HistoryStore`).
+
+        This is only an optimization: the default implementation does nothing.
+
+        Parameters
+        ----------
+        directory : str
+            The directory of the files. Default: the system temporary directory.
+
+        Returns
+        -------
+        bool
+            True if the data of ``self`` are memory-mapped.
+        """
+        return False
+
+    def getMemorySize(self):
+        """ Return the memory (in bytes) used to store the data of ``self``.
+
+        Returns
+        -------
+        int
+            The memory used by ``self``, in bytes.
+        """
+        raise NotImplementedError
+
+    def dotMany(self, others):
+        """ Return the scalar products of ``self`` with each element of ``others``.
+
+        Implementations should read the data of ``self`` only once and, in parallel, use a single
+        global reduction for all the scalar products. The default implementation calls :meth:`dot`.
+
+        Parameters
+        ----------
+        others : list[DataManager]
+            :class:`.DataManager` with the same list of data then ``self``.
+
+        Returns
+        -------
+        numpy.ndarray
+            The vector of the scalar products of ``self`` with each element of ``others``.
+
+        Raises
+        ------
+        Exception
+            If ``self`` and ``others`` are not consistent.
+        """
+        return numpy.array([self.dot(other) for other in others], dtype=float)
+
+    def gram(self, vectors):
+        """ Return the Gram matrix of ``vectors``: the matrix of their scalar products two by two.
+
+        ``self`` is only used to select the implementation (and the communicator in parallel), it
+        does not need to be part of ``vectors``. Implementations should read each data only once
+        and, in parallel, use a single global reduction for the whole matrix. The default
+        implementation calls :meth:`dot`.
+
+        Parameters
+        ----------
+        vectors : list[DataManager]
+            :class:`.DataManager` with the same list of data then ``self``.
+
+        Returns
+        -------
+        numpy.ndarray
+            The (symmetric) matrix ``G`` with ``G[i, j] = vectors[i].dot(vectors[j])``.
+
+        Raises
+        ------
+        Exception
+            If ``self`` and ``vectors`` are not consistent.
+        """
+        matrix = numpy.zeros((len(vectors), len(vectors)))
+        for i, vector in enumerate(vectors):
+            for j in range(i + 1):
+                matrix[i, j] = vector.dot(vectors[j])
+                matrix[j, i] = matrix[i, j]
+        return matrix
+
+    def reduceNorms(self, others=(), dotPairs=()):
+        """ Return, in a single call, the norms 2 and the infinite norms of ``self`` and of each
+        element of ``others``, as well as the requested scalar products between them.
+
+        Implementations should read each data only once and, in parallel, gather all the results
+        with a single collective communication. The default implementation calls :meth:`norm2`,
+        :meth:`normMax` and :meth:`dot`.
+
+        Parameters
+        ----------
+        others : list[DataManager]
+            :class:`.DataManager` with the same list of data then ``self``.
+        dotPairs : list[tuple[int, int]]
+            The scalar products to compute, as pairs of indices in ``[self] + others``.
+
+        Returns
+        -------
+        tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]
+            The norms 2 of ``[self] + others``, their infinite norms, and the scalar products
+            asked in ``dotPairs``.
+
+        Raises
+        ------
+        Exception
+            If ``self`` and ``others`` are not consistent.
+        """
+        managers = [self] + list(others)
+        norms2 = numpy.array([manager.norm2() for manager in managers], dtype=float)
+        normsMax = numpy.array([manager.normMax() for manager in managers], dtype=float)
+        dots = numpy.array([managers[i].dot(managers[j]) for i, j in dotPairs], dtype=float)
+        return norms2, normsMax, dots
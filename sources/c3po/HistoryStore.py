@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2020, CEA
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following disclaimer in the documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products derived from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+""" Contain the class :class:`.HistoryStore`. """
+from __future__ import print_function, division
+from collections import OrderedDict
+
+
+class HistoryStore(object):
+    """ :class:`.HistoryStore` bounds the RAM used by the history vectors of acceleration methods
+    (the Anderson history of :class:`.AndersonCoupler`, the Krylov basis of :class:`.JFNKCoupler`).
+
+    The vectors are added to the store with :meth:`add`. When the memory they hold exceeds the RAM
+    budget, the least recently added ones are moved in memory-mapped files (see
+    :meth:`.DataManager.mapToFile`), until the budget is respected. Memory-mapped vectors are then
+    streamed back from the files, block by block, by the operations using them.
+
+    Only :class:`.LocalDataManager` in packed storage mode (possibly in a
+    :class:`.CollaborativeDataManager`) can be memory-mapped. The files are removed when the vectors
+    are released (see :meth:`.DataManager.release`).
+    """
+
+    def __init__(self, ramBudget, directory=None):
+        """ Build a :class:`.HistoryStore` object.
+
+        Parameters
+        ----------
+        ramBudget : int
+            The maximum memory (in bytes) held in RAM by the vectors of the store.
+        directory : str
+            The directory of the memory-mapped files, preferably on a local scratch disk. Default:
+            the system temporary directory.
+        """
+        self._ramBudget = ramBudget
+        self._directory = directory
+        self._vectors = OrderedDict()
+        self._nbMappings = 0
+
+    def setRAMBudget(self, ramBudget):
+        """ Set the maximum memory (in bytes) held in RAM by the vectors of the store.
+
+        Parameters
+        ----------
+        ramBudget : int
+            The RAM budget, in bytes.
+        """
+        self._ramBudget = ramBudget
+        self._enforceBudget()
+
+    def getRAMBudget(self):
+        """ Return the RAM budget set by :meth:`setRAMBudget`.
+
+        Returns
+        -------
+        int
+            The RAM budget, in bytes.
+        """
+        return self._ramBudget
+
+    def add(self, vector):
+        """ Add ``vector`` to the store as the most recently used vector, and move the least recently
+        used ones in memory-mapped files if the RAM budget is exceeded.
+
+        A vector already in the store is only marked as the most recently used one.
+
+        Parameters
+        ----------
+        vector : DataManager
+            The vector to add.
+        """
+        key = id(vector)
+        if key in self._vectors:
+            self._vectors[key] = self._vectors.pop(key)
+        else:
+            self._vectors[key] = [vector, vector.getMemorySize(), False]
+        self._enforceBudget()
+
+    def _enforceBudget(self):
+        """ INTERNAL Move the least recently used vectors in memory-mapped files while the RAM budget is exceeded. """
+        ramSize = self.getRAMSize()
+        for entry in self._vectors.values():
+            if ramSize <= self._ramBudget:
+                break
+            vector, size, mapped = entry
+            if not mapped and vector.mapToFile(self._directory):
+                entry[2] = True
+                ramSize -= size
+                self._nbMappings += 1
+
+    def clear(self):
+        """ Remove all the vectors from the store (the vectors themselves are not modified). """
+        self._vectors.clear()
+
+    def getRAMSize(self):
+        """ Return the memory held in RAM by the vectors of the store.
+
+        Returns
+        -------
+        int
+            The memory held in RAM, in bytes.
+        """
+        return sum(size for _, size, mapped in self._vectors.values() if not mapped)
+
+    def getMappedSize(self):
+        """ Return the memory of the vectors of the store moved in memory-mapped files.
+
+        Returns
+        -------
+        int
+            The memory-mapped size, in bytes.
+        """
+        return sum(size for _, size, mapped in self._vectors.values() if mapped)
+
+    def getNbMappings(self):
+        """ Return the number of vectors moved in memory-mapped files since the creation of the store.
+
+        Returns
+        -------
+        int
+            The number of memory mappings.
+        """
+        return self._nbMappings
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2020, CEA
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following disclaimer in the documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products derived from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+""" Contain the class :class:`.LinearExpression`. """
+from __future__ import print_function, division
+import numpy
+
+
+class LinearExpression(object):
+    """ :class:`.LinearExpression` is a lazy linear combination of :class:`.DataManager`:
+    ``sum_i(coeff[i] * manager[i])``.
+
+    It is built with :meth:`.DataManager.lazy` and the usual operators (``+``, ``-``, ``*`` by a
+    scalar), which only record the terms: no data is read or allocated. For example
+    ``expression = data.lazy() - previousData + 0.5 * residual``. The :class:`.LinearExpression`
+    must be on the left of the operators involving a :class:`.DataManager`.
+
+    The expression is evaluated in a single pass, with :meth:`.DataManager.linearCombination`, when
+    it is assigned to a :class:`.DataManager` (:meth:`assignTo`, :meth:`addTo`) or evaluated in a
+    new one (:meth:`evaluate`). Scalar products (:meth:`dot`) are computed without evaluating the
+    expression, with a single :meth:`.DataManager.gram` call.
+    """
+
+    def __init__(self, terms):
+        """ Build a :class:`.LinearExpression` object.
+
+        Parameters
+        ----------
+        terms : list[tuple]
+            List of ``(coeff, manager)`` pairs, with ``coeff`` a scalar and ``manager`` a
+            :class:`.DataManager`. All the :class:`.DataManager` must be consistent.
+        """
+        self._terms = []
+        for coeff, manager in terms:
+            self._addTerm(coeff, manager)
+        if len(self._terms) == 0:
+            raise Exception("LinearExpression.__init__ at least one term is required.")
+
+    def _addTerm(self, coeff, manager):
+        """ INTERNAL Add ``coeff * manager`` to the terms, merging it with an existing term on the same object. """
+        for i, (existingCoeff, existingManager) in enumerate(self._terms):
+            if existingManager is manager:
+                self._terms[i] = (existingCoeff + coeff, manager)
+                return
+        self._terms.append((coeff, manager))
+
+    def getTerms(self):
+        """ Return the terms of the expression.
+
+        Returns
+        -------
+        list[tuple]
+            List of ``(coeff, manager)`` pairs.
+        """
+        return list(self._terms)
+
+    def _combine(self, other, factor):
+        """ INTERNAL Return ``self + factor * other``. """
+        otherTerms = other.getTerms() if isinstance(other, LinearExpression) else [(1., other)]
+        return LinearExpression(self._terms + [(factor * coeff, manager) for coeff, manager in otherTerms])
+
+    def __add__(self, other):
+        """ Return the expression ``self + other`` (``other`` is a :class:`.LinearExpression` or a :class:`.DataManager`). """
+        return self._combine(other, 1.)
+
+    def __sub__(self, other):
+        """ Return the expression ``self - other`` (``other`` is a :class:`.LinearExpression` or a :class:`.DataManager`). """
+        return self._combine(other, -1.)
+
+    def __mul__(self, scalar):
+        """ Return the expression ``scalar * self``. """
+        return LinearExpression([(scalar * coeff, manager) for coeff, manager in self._terms])
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, scalar):
+        """ Return the expression ``self / scalar``. """
+        return self * (1. / scalar)
+
+    __div__ = __truediv__
+
+    def __neg__(self):
+        """ Return the expression ``-self``. """
+        return self * -1.
+
+    def assignTo(self, target):
+        """ Evaluate the expression in ``target`` (``target`` may be part of the expression).
+
+        Parameters
+        ----------
+        target : DataManager
+            A :class:`.DataManager` consistent with the ones of the expression.
+
+        Returns
+        -------
+        DataManager
+            ``target``.
+        """
+        return target.linearCombination([coeff for coeff, _ in self._terms], [manager for _, manager in self._terms])
+
+    def addTo(self, target):
+        """ Add the expression to ``target`` (``target`` may be part of the expression).
+
+        Parameters
+        ----------
+        target : DataManager
+            A :class:`.DataManager` consistent with the ones of the expression.
+
+        Returns
+        -------
+        DataManager
+            ``target``.
+        """
+        return (self + target).assignTo(target)
+
+    def evaluate(self):
+        """ Return a new :class:`.DataManager` holding the value of the expression.
+
+        Returns
+        -------
+        DataManager
+            A new :class:`.DataManager`, consistent with the ones of the expression.
+        """
+        return self.assignTo(self._terms[0][1].cloneEmpty())
+
+    def dot(self, other):
+        """ Return the scalar product of the expression with ``other``, without evaluating it.
+
+        Parameters
+        ----------
+        other : LinearExpression or DataManager
+            A :class:`.LinearExpression` or a :class:`.DataManager`, consistent with the ones of the
+            expression.
+
+        Returns
+        -------
+            The scalar product.
+        """
+        otherTerms = other.getTerms() if isinstance(other, LinearExpression) else [(1., other)]
+        managers = [manager for _, manager in self._terms] + [manager for _, manager in otherTerms]
+        gram = managers[0].gram(managers)
+        coeffs = numpy.array([coeff for coeff, _ in self._terms], dtype=float)
+        otherCoeffs = numpy.array([coeff for coeff, _ in otherTerms], dtype=float)
+        return float(numpy.dot(coeffs, numpy.dot(gram[:len(coeffs), len(coeffs):], otherCoeffs)))
+
+    def _reduce(self, reduction):
+        """ INTERNAL Evaluate the expression in a temporary :class:`.DataManager` and return ``reduction(temporary)``. """
+        temporary = self.evaluate()
+        result = reduction(temporary)
+        temporary.release()
+        return result
+
+    def norm2(self):
+        """ Return the norm 2 of the expression.
+
+        The expression is evaluated in a temporary :class:`.DataManager` (given back with
+        :meth:`.DataManager.release`): the norm is not computed from the scalar products of the terms,
+        which would be inaccurate for differences of close data.
+
+        Returns
+        -------
+            The norm 2 of the expression.
+        """
+        return self._reduce(lambda data: data.norm2())
+
+    def normMax(self):
+        """ Return the infinite norm of the expression (see :meth:`norm2`).
+
+        Returns
+        -------
+            The infinite norm of the expression.
+        """
+        return self._reduce(lambda data: data.normMax())
@@ -13,8 +13,9 @@ from __future__ import print_function, division
 import math
 import numpy
 
-from c3po.DataManager import DataManager
+from c3po.DataManager import DataManager, mergeNorms
 from c3po.DataAccessor import DataAccessor
+from c3po.PackedStorage import PackedStorage, combineArrays, dotArrays, gramArrays, reduceArrays
 
 
 class LocalDataManager(DataManager, DataAccessor):
@@ -25,6 +26,10 @@ class LocalDataManager(DataManager, DataAccessor):
     Data can be double, int, string, fields of double of fields of int.
     Only double and fields of double are affected by the methods herited from :class:`.DataManager`.
     Other data are just (shallow) copied in new objects created by these methods.
+
+    An optional packed storage mode can be activated with :meth:`setPackedStorage`: all double
+    values and double fields are then copied in a single contiguous numpy buffer, and the
+    methods herited from :class:`.DataManager` are applied at once on this buffer.
     """
 
     def __init__(self):
@@ -35,6 +40,293 @@ class LocalDataManager(DataManager, DataAccessor):
         self.fieldsDouble = {}
         self.fieldsInt = {}
         self.fieldsDoubleTemplates = {}
+        self._packing = PackedStorage()
+
+    def setPackedStorage(self, packed):
+        """ Activate (or deactivate) the packed storage mode.
+
+        In packed storage mode, all double values and all double fields are copied in a single
+        contiguous numpy buffer (double values first, then fields in their order of insertion).
+        All the methods herited from :class:`.DataManager` are then made with a single vectorized
+        operation on the whole buffer, instead of one call per stored data, as long as both operands
+        share the same layout (same names, same sizes, same order of insertion). Otherwise, the
+        usual (per data) implementation is used.
+
+        The buffer is the reference storage: the stored MED fields are only updated from it when
+        they are accessed (with :meth:`getOutputMEDDoubleField`) or when the per data implementation
+        is used. The buffer is (re)built when needed, for instance after the addition of a new data
+        or a change of size of a field. Data set with :meth:`setInputDoubleValue` or
+        :meth:`setInputMEDDoubleField` with an existing name and a compatible size are directly
+        copied in the buffer.
+
+        .. warning::
+
+            A field returned by :meth:`getOutputMEDDoubleField` is not updated by the next
+            operations: :meth:`getOutputMEDDoubleField` has to be called again. Conversely, a
+            modification of its array is not seen by ``self`` until the field is given back with
+            :meth:`setInputMEDDoubleField`.
+
+        The packed storage mode is inherited by the objects built by :meth:`clone`,
+        :meth:`cloneEmpty` and by the operators.
+
+        Parameters
+        ----------
+        packed : bool
+            Set True to activate the packed storage mode. Default: False.
+        """
+        if packed and not self._packing.enabled:
+            self._packing.enabled = True
+            self._packing.layout = None
+        elif not packed and self._packing.enabled:
+            self._packing.invalidate(self.valuesDouble, self.fieldsDouble)
+            self._packing.enabled = False
+            self._packing.releaseBuffer()
+
+    def setBufferPool(self, pool):
+        """ Set the :class:`.BufferPool` used to get the buffers of the packed storage mode (see
+        :meth:`setPackedStorage`).
+
+        The pool is inherited by the objects built by :meth:`clone`, :meth:`cloneEmpty` and by the
+        operators: their buffers are taken from the pool, and given back to it by :meth:`release`.
+        It has no effect if the packed storage mode is not active.
+
+        Parameters
+        ----------
+        pool : BufferPool
+            The :class:`.BufferPool` to use, or None (default) to allocate each buffer.
+        """
+        self._packing.pool = pool
+
+    def getBufferPool(self):
+        """ Return the :class:`.BufferPool` set by :meth:`setBufferPool`, or None.
+
+        Returns
+        -------
+        BufferPool
+            The :class:`.BufferPool` used by ``self``.
+        """
+        return self._packing.pool
+
+    def release(self):
+        """ Give the memory of ``self`` back to its :class:`.BufferPool` (see :meth:`setBufferPool`).
+
+        All double values and double fields are removed from ``self``, that must not be used
+        anymore (except to be given new data).
+        """
+        self._packing.releaseBuffer()
+        self.valuesDouble = {}
+        self.fieldsDouble = {}
+
+    def setStorageType(self, dtype):
+        """ Set the type used to store the values of the packed storage mode (see :meth:`setPackedStorage`).
+
+        A reduced precision type (``numpy.float32``) halves the memory used by ``self``, for instance
+        for the history vectors of acceleration methods (see
+        :meth:`.AndersonCoupler.setHistoryStorageType`). Stored values are then rounded to this
+        precision, but all computations are still made in double precision.
+
+        The storage type is inherited by the objects built by :meth:`clone`, :meth:`cloneEmpty` and
+        by the operators. It has no effect if the packed storage mode is not active.
+
+        Parameters
+        ----------
+        dtype : numpy.dtype
+            ``numpy.float64`` (default) or ``numpy.float32``.
+        """
+        dtype = numpy.dtype(dtype)
+        if dtype not in (numpy.dtype(numpy.float64), numpy.dtype(numpy.float32)):
+            raise Exception("LocalDataManager.setStorageType : only numpy.float64 and numpy.float32 are supported.")
+        packing = self._packing
+        if dtype != packing.dtype:
+            packing.dtype = dtype
+            if packing.layout is not None:
+                buffer = packing.acquire(packing.buffer.size)
+                buffer[:] = packing.buffer
+                packing.dropBuffer()
+                packing.buffer = buffer
+
+    def getStorageType(self):
+        """ Return the type set by :meth:`setStorageType`.
+
+        Returns
+        -------
+        numpy.dtype
+            The type used to store the values in packed storage mode.
+        """
+        return self._packing.dtype
+
+    def getMemorySize(self):
+        """ Return the memory (in bytes) used to store the double values and double fields of ``self``.
+
+        In packed storage mode, it is the size of the packed buffer (the stored fields share their
+        memory with other objects until they are accessed).
+
+        Returns
+        -------
+        int
+            The memory used by ``self``, in bytes.
+        """
+        if self._packing.enabled:
+            self._packing.ensurePacked(self.valuesDouble, self.fieldsDouble)
+            return self._packing.buffer.nbytes
+        size = 8 * len(self.valuesDouble)
+        for field in self.fieldsDouble.values():
+            array = field.getArray()
+            size += 8 * array.getNumberOfTuples() * array.getNumberOfComponents()
+        return size
+
+    def mapToFile(self, directory=None):
+        """ Move the packed buffer of ``self`` (see :meth:`setPackedStorage`) in a memory-mapped file.
+
+        The data of ``self`` are then read from the file, block by block, when they are used: the
+        RAM they held is freed. The file is created in ``directory`` and removed when the buffer is
+        dropped (by :meth:`release`, or when ``self`` is deleted). It has no effect if the packed
+        storage mode is not active. Objects built from ``self`` (by :meth:`clone` or the operators)
+        are not memory-mapped.
+
+        Parameters
+        ----------
+        directory : str
+            The directory of the file (preferably on a local disk). Default: the system temporary
+            directory.
+
+        Returns
+        -------
+        bool
+            True if the data of ``self`` are memory-mapped.
+        """
+        packing = self._packing
+        if not packing.enabled:
+            return False
+        self._packing.ensurePacked(self.valuesDouble, self.fieldsDouble)
+        if packing.mappedFile is None and packing.buffer.size > 0:
+            packing.mapToFile(directory)
+        return packing.mappedFile is not None
+
+    def getDoubleDataNames(self):
+        """ Return the names of the double values and double fields of ``self`` (the data affected by the methods herited from :class:`.DataManager`).
+
+        Returns
+        -------
+        list[str]
+            The names of the double values, then the names of the double fields.
+        """
+        return list(self.valuesDouble.keys()) + list(self.fieldsDouble.keys())
+
+    def asNumpy(self, name):
+        """ Return a writable numpy view (without copy) of the double field (or double value) ``name``.
+
+        Without packed storage mode, the view shares the memory of the stored MED field: it has the
+        shape of ``toNumPyArray()``. Double values can only be viewed in packed storage mode.
+
+        In packed storage mode (see :meth:`setPackedStorage`), the view is a part of the packed
+        buffer: ``(nbTuples, nbComponents)`` (or ``(nbTuples,)`` for one component) for a field,
+        ``(1,)`` for a double value. Its type is the storage type (see :meth:`setStorageType`). The
+        view remains valid until the buffer is rebuilt, for instance after the addition of a new
+        data.
+
+        Parameters
+        ----------
+        name : str
+            The name of a double field or of a double value.
+
+        Returns
+        -------
+        numpy.ndarray
+            A view of the data ``name``.
+
+        Raises
+        ------
+        Exception
+            If there is no stored ``name`` double data, or if ``name`` is a double value and the
+            packed storage mode is not active.
+        """
+        packing = self._packing
+        if packing.enabled:
+            self._packing.ensurePacked(self.valuesDouble, self.fieldsDouble)
+            if name in packing.layout.scalarIndex:
+                index = packing.layout.scalarIndex[name]
+                return packing.buffer[index:index + 1]
+            if name in packing.layout.fieldSlices:
+                start, stop, nbComponents = packing.layout.fieldSlices[name]
+                packing.staleFields.add(name)
+                if nbComponents == 1:
+                    return packing.buffer[start:stop]
+                return packing.buffer[start:stop].reshape(-1, nbComponents)
+        elif name in self.fieldsDouble:
+            return self.fieldsDouble[name].getArray().toNumPyArray()
+        elif name in self.valuesDouble:
+            raise Exception("LocalDataManager.asNumpy double values can only be viewed in packed storage mode: " + name)
+        raise Exception("LocalDataManager.asNumpy unknown double data " + name)
+
+    def flatView(self):
+        """ Return a writable numpy view (without copy) of all the double values and double fields of
+        ``self``: the packed buffer of the packed storage mode (see :meth:`setPackedStorage`).
+
+        The double values come first, then the fields in the order of :meth:`getDoubleDataNames`. The
+        view remains valid until the buffer is rebuilt (see :meth:`asNumpy`).
+
+        Returns
+        -------
+        numpy.ndarray
+            A 1D view of the packed buffer.
+
+        Raises
+        ------
+        Exception
+            If the packed storage mode is not active.
+        """
+        packing = self._packing
+        if not packing.enabled:
+            raise Exception("LocalDataManager.flatView requires the packed storage mode (see setPackedStorage).")
+        self._packing.ensurePacked(self.valuesDouble, self.fieldsDouble)
+        packing.staleFields = set(packing.layout.fieldNames)
+        return packing.buffer
+
+    def isPackedStorage(self):
+        """ Return True if the packed storage mode is active (see :meth:`setPackedStorage`).
+
+        Returns
+        -------
+        bool
+            True if the packed storage mode is active.
+        """
+        return self._packing.enabled
+
+    def _packedBuffers(self, *others):
+        """ INTERNAL Return the packed buffers of ``self`` and ``others`` if they all use the packed storage mode with the same layout.
+
+        Otherwise, return None after having made all the stored data of ``self`` and ``others`` up to date (they are then used directly).
+        """
+        managers = (self,) + others
+        buffers = []
+        for manager in managers:
+            packing = getattr(manager, "_packing", None)
+            if packing is None or not packing.enabled:
+                break
+            manager._packing.ensurePacked(manager.valuesDouble, manager.fieldsDouble)  # pylint: disable=protected-access
+            if packing.layout != self._packing.layout:
+                break
+            buffers.append(packing.buffer)
+        if len(buffers) == len(managers):
+            return buffers
+        for manager in managers:
+            if getattr(manager, "_packing", None) is not None:
+                manager._packing.invalidate(manager.valuesDouble, manager.fieldsDouble)  # pylint: disable=protected-access
+        return None
+
+    def _newFromBuffer(self, buffer):
+        """ INTERNAL Return a new packed :class:`.LocalDataManager`, consistent with ``self``, which takes ownership of ``buffer``. """
+        newData = self.cloneEmpty()
+        layout = self._packing.layout
+        packing = newData._packing                  # pylint: disable=protected-access
+        packing.enabled = True
+        packing.buffer = buffer
+        packing.layout = layout
+        for name, field in self.fieldsDouble.items():
+            newData.fieldsDouble[name] = field.clone(False)
+        packing.refreshValues(newData.valuesDouble)
+        return newData
 
     def clone(self):
         """ Return a clone of ``self``.
@@ -59,6 +351,7 @@ class LocalDataManager(DataManager, DataAccessor):
         output.valuesString = self.valuesString
         output.fieldsInt = self.fieldsInt
         output.fieldsDoubleTemplates = self.fieldsDoubleTemplates
+        output._packing = self._packing.cloneEmpty()   # pylint: disable=protected-access
         return output
 
     def copy(self, other):
@@ -75,6 +368,11 @@ class LocalDataManager(DataManager, DataAccessor):
             If ``self`` and ``other`` are not consistent.
         """
         self.checkBeforeOperator(other)
+        buffers = self._packedBuffers(other)
+        if buffers is not None:
+            numpy.copyto(buffers[0], buffers[1])
+            self._packing.refreshValues(self.valuesDouble)
+            return
         for name in self.valuesDouble:
             self.valuesDouble[name] = other.valuesDouble[name]
         for name, field in self.fieldsDouble.items():
@@ -88,6 +386,11 @@ class LocalDataManager(DataManager, DataAccessor):
         -------
             The max of the absolute values of the scalars and of the infinite norms of the MED fields.
         """
+        buffers = self._packedBuffers()
+        if buffers is not None:
+            if buffers[0].size == 0:
+                return 0.
+            return float(max(buffers[0].max(), -buffers[0].min()))
         norm = 0.
         for scalar in self.valuesDouble.values():
             if abs(scalar) > norm:
@@ -109,6 +412,11 @@ class LocalDataManager(DataManager, DataAccessor):
         -------
             ``sqrt(sum_i(val[i] * val[i]))`` where ``val[i]`` stands for each scalar and each component of the MED fields.
         """
+        buffers = self._packedBuffers()
+        if buffers is not None:
+            if buffers[0].dtype != numpy.float64:
+                return math.sqrt(reduceArrays(buffers, ())[0][0])
+            return math.sqrt(numpy.dot(buffers[0], buffers[0]))
         norm = 0.
         for scalar in self.valuesDouble.values():
             norm += scalar * scalar
@@ -117,6 +425,46 @@ class LocalDataManager(DataManager, DataAccessor):
             norm += localNorm * localNorm
         return math.sqrt(norm)
 
+    def reduceNorms(self, others=(), dotPairs=()):
+        """ Return, in a single call, the norms 2 and the infinite norms of ``self`` and of each
+        element of ``others``, as well as the requested scalar products between them.
+
+        Each data is read only once (see :func:`reduceArrays`).
+
+        Parameters
+        ----------
+        others : list[LocalDataManager]
+            :class:`.LocalDataManager` with the same list of data then ``self``.
+        dotPairs : list[tuple[int, int]]
+            The scalar products to compute, as pairs of indices in ``[self] + others``.
+
+        Returns
+        -------
+        tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]
+            The norms 2 of ``[self] + others``, their infinite norms, and the scalar products
+            asked in ``dotPairs``.
+
+        Raises
+        ------
+        Exception
+            If ``self`` and ``others`` are not consistent.
+        """
+        for other in others:
+            self.checkBeforeOperator(other)
+        managers = [self] + list(others)
+        buffers = self._packedBuffers(*others)
+        if buffers is not None:
+            squares, maxima, dots = reduceArrays(buffers, dotPairs)
+            return numpy.sqrt(squares), maxima, dots
+        values = numpy.array([[manager.valuesDouble[name] for name in self.valuesDouble] for manager in managers], dtype=float).reshape(len(managers), -1)
+        result = ((values * values).sum(axis=1),
+                  numpy.abs(values).max(axis=1) if values.shape[1] > 0 else numpy.zeros(len(managers)),
+                  numpy.array([numpy.dot(values[i], values[j]) for i, j in dotPairs], dtype=float))
+        for name in self.fieldsDouble:
+            arrays = [manager.fieldsDouble[name].getArray().toNumPyArray().reshape(-1) for manager in managers]
+            result = mergeNorms(result, reduceArrays(arrays, dotPairs))
+        return numpy.sqrt(result[0]), result[1], result[2]
+
     def checkBeforeOperator(self, other):
         """ INTERNAL Make basic checks before the call of an operator: same data names between ``self`` and ``other``. """
         if len(self.valuesDouble) != len(other.valuesDouble) or len(self.fieldsDouble) != len(other.fieldsDouble):
@@ -149,6 +497,9 @@ class LocalDataManager(DataManager, DataAccessor):
             If ``self`` and ``other`` are not consistent.
         """
         self.checkBeforeOperator(other)
+        buffers = self._packedBuffers(other)
+        if buffers is not None:
+            return self._newFromBuffer(numpy.add(buffers[0], buffers[1], out=self._packing.acquire(buffers[0].size), dtype=float))
         newData = self.cloneEmpty()
         for name, value in self.valuesDouble.items():
             newData.valuesDouble[name] = value + other.valuesDouble[name]
@@ -178,6 +529,11 @@ class LocalDataManager(DataManager, DataAccessor):
             If ``self`` and ``other`` are not consistent.
         """
         self.checkBeforeOperator(other)
+        buffers = self._packedBuffers(other)
+        if buffers is not None:
+            numpy.add(buffers[0], buffers[1], out=buffers[0], dtype=float, casting="same_kind")
+            self._packing.refreshValues(self.valuesDouble)
+            return self
         for name in self.valuesDouble:
             self.valuesDouble[name] += other.valuesDouble[name]
         for name, field in self.fieldsDouble.items():
@@ -205,6 +561,9 @@ class LocalDataManager(DataManager, DataAccessor):
             If ``self`` and ``other`` are not consistent.
         """
         self.checkBeforeOperator(other)
+        buffers = self._packedBuffers(other)
+        if buffers is not None:
+            return self._newFromBuffer(numpy.subtract(buffers[0], buffers[1], out=self._packing.acquire(buffers[0].size), dtype=float))
         newData = self.cloneEmpty()
         for name, value in self.valuesDouble.items():
             newData.valuesDouble[name] = value - other.valuesDouble[name]
@@ -234,6 +593,11 @@ class LocalDataManager(DataManager, DataAccessor):
             If ``self`` and ``other`` are not consistent.
         """
         self.checkBeforeOperator(other)
+        buffers = self._packedBuffers(other)
+        if buffers is not None:
+            numpy.subtract(buffers[0], buffers[1], out=buffers[0], dtype=float, casting="same_kind")
+            self._packing.refreshValues(self.valuesDouble)
+            return self
         for name in self.valuesDouble:
             self.valuesDouble[name] -= other.valuesDouble[name]
         for name, field in self.fieldsDouble.items():
@@ -255,6 +619,9 @@ class LocalDataManager(DataManager, DataAccessor):
         LocalDataManager
             A new (consistent with ``self``) :class:`.LocalDataManager` where the data are multiplied by ``scalar``.
         """
+        buffers = self._packedBuffers()
+        if buffers is not None:
+            return self._newFromBuffer(numpy.multiply(buffers[0], scalar, out=self._packing.acquire(buffers[0].size), dtype=float))
         newData = self.cloneEmpty()
         for name, value in self.valuesDouble.items():
             newData.valuesDouble[name] = scalar * value
@@ -277,6 +644,11 @@ class LocalDataManager(DataManager, DataAccessor):
         LocalDataManager
             ``self``.
         """
+        buffers = self._packedBuffers()
+        if buffers is not None:
+            numpy.multiply(buffers[0], scalar, out=buffers[0], dtype=float, casting="same_kind")
+            self._packing.refreshValues(self.valuesDouble)
+            return self
         for name in self.valuesDouble:
             self.valuesDouble[name] *= scalar
         for name in self.fieldsDouble:
@@ -286,9 +658,7 @@ class LocalDataManager(DataManager, DataAccessor):
     def imuladd(self, scalar, other):
         """ Add in ``self`` ``scalar * other`` (in place operation).
 
-        In order to do so, ``other *= scalar`` and ``other *= 1./scalar`` are done.
-
-        For example ``a.imuladd(b, c)``.
+        For example ``a.imuladd(b, c)``. Same as :meth:`axpy`.
 
         Parameters
         ----------
@@ -309,10 +679,52 @@ class LocalDataManager(DataManager, DataAccessor):
         """
         if scalar == 0:
             return self
-        self.checkBeforeOperator(other)
-        other *= scalar
-        self += other
-        other *= 1. / scalar
+        return self.axpy(scalar, other)
+
+    def linearCombination(self, coeffs, managers):
+        """ Set ``self`` to ``sum_i(coeffs[i] * managers[i])`` (in place operation).
+
+        The result is computed in a single pass over the data (see :func:`combineArrays`), without
+        allocating temporary data. ``self`` can be one of ``managers``, or an empty clone (see
+        :meth:`cloneEmpty`) whose data are then allocated. Terms with a zero coefficient are ignored.
+
+        Parameters
+        ----------
+        coeffs : list
+            The scalar coefficients.
+        managers : list[LocalDataManager]
+            :class:`.LocalDataManager` with the same list of data then ``self`` (as many as ``coeffs``).
+
+        Returns
+        -------
+        LocalDataManager
+            ``self``.
+
+        Raises
+        ------
+        Exception
+            If ``self`` and ``managers`` are not consistent.
+        """
+        if len(coeffs) != len(managers):
+            raise Exception("LocalDataManager.linearCombination : coeffs and managers must have the same length.")
+        if len(self.valuesDouble) == 0 and len(self.fieldsDouble) == 0 and len(managers) > 0:
+            self._packing.allocateLike(self.valuesDouble, self.fieldsDouble, managers[0].valuesDouble, managers[0].fieldsDouble)
+        for other in managers:
+            self.checkBeforeOperator(other)
+        buffers = self._packedBuffers(*managers)
+        if buffers is not None:
+            combineArrays(buffers[0], coeffs, buffers[1:])
+            self._packing.refreshValues(self.valuesDouble)
+            return self
+        for name in self.valuesDouble:
+            value = 0.
+            for coeff, other in zip(coeffs, managers):
+                if coeff != 0.:
+                    value += coeff * other.valuesDouble[name]
+            self.valuesDouble[name] = value
+        for name, field in self.fieldsDouble.items():
+            arrays = [other.fieldsDouble[name].getArray().toNumPyArray().reshape(-1) for other in managers]
+            combineArrays(field.getArray().toNumPyArray().reshape(-1), coeffs, arrays)
         return self
 
     def dot(self, other):
@@ -333,6 +745,11 @@ class LocalDataManager(DataManager, DataAccessor):
             If ``self`` and ``other`` are not consistent.
         """
         self.checkBeforeOperator(other)
+        buffers = self._packedBuffers(other)
+        if buffers is not None:
+            if buffers[0].dtype != numpy.float64 or buffers[1].dtype != numpy.float64:
+                return float(dotArrays(buffers[0], buffers[1:])[0])
+            return float(numpy.dot(buffers[0], buffers[1]))
         result = 0.
         for name, value in self.valuesDouble.items():
             result += value * other.valuesDouble[name]
@@ -345,6 +762,72 @@ class LocalDataManager(DataManager, DataAccessor):
             result += numpy.tensordot(nparr1, nparr2, dim)
         return result
 
+    def dotMany(self, others):
+        """ Return the scalar products of ``self`` with each element of ``others``.
+
+        The data of ``self`` and ``others`` are read only once (see :func:`dotArrays`).
+
+        Parameters
+        ----------
+        others : list[LocalDataManager]
+            :class:`.LocalDataManager` with the same list of data then ``self``.
+
+        Returns
+        -------
+        numpy.ndarray
+            The vector of the scalar products of ``self`` with each element of ``others``.
+
+        Raises
+        ------
+        Exception
+            If ``self`` and ``others`` are not consistent.
+        """
+        for other in others:
+            self.checkBeforeOperator(other)
+        buffers = self._packedBuffers(*others)
+        if buffers is not None:
+            return dotArrays(buffers[0], buffers[1:])
+        result = numpy.zeros(len(others))
+        for name, value in self.valuesDouble.items():
+            result += value * numpy.array([other.valuesDouble[name] for other in others], dtype=float)
+        for name, field in self.fieldsDouble.items():
+            arrays = [other.fieldsDouble[name].getArray().toNumPyArray().reshape(-1) for other in others]
+            result += dotArrays(field.getArray().toNumPyArray().reshape(-1), arrays)
+        return result
+
+    def gram(self, vectors):
+        """ Return the Gram matrix of ``vectors``: the matrix of their scalar products two by two.
+
+        The data of ``vectors`` are read only once (see :func:`gramArrays`).
+
+        Parameters
+        ----------
+        vectors : list[LocalDataManager]
+            :class:`.LocalDataManager` with the same list of data then ``self``.
+
+        Returns
+        -------
+        numpy.ndarray
+            The (symmetric) matrix ``G`` with ``G[i, j] = vectors[i].dot(vectors[j])``.
+
+        Raises
+        ------
+        Exception
+            If ``self`` and ``vectors`` are not consistent.
+        """
+        for vector in vectors:
+            self.checkBeforeOperator(vector)
+        buffers = self._packedBuffers(*vectors)
+        if buffers is not None:
+            return gramArrays(buffers[1:])
+        result = numpy.zeros((len(vectors), len(vectors)))
+        for name in self.valuesDouble:
+            values = numpy.array([vector.valuesDouble[name] for vector in vectors], dtype=float)
+            result += numpy.outer(values, values)
+        for name in self.fieldsDouble:
+            result += gramArrays([vector.fieldsDouble[name].getArray().toNumPyArray().reshape(-1) for vector in vectors])
+        return result
+
     def setInputMEDDoubleField(self, name, field):
         """ Store the MED field ``field`` under the name ``name``.
 
@@ -355,11 +838,26 @@ class LocalDataManager(DataManager, DataAccessor):
         field
             A field to store.
         """
+        packing = self._packing
+        if packing.layout is not None:
+            array = field.getArray()
+            fieldSlice = packing.layout.fieldSlices.get(name)
+            if fieldSlice is not None and array.getNumberOfComponents() == fieldSlice[2] and array.getNumberOfTuples() * fieldSlice[2] == fieldSlice[1] - fieldSlice[0]:
+                start, stop, _ = fieldSlice
+                if stop > start:
+                    packing.buffer[start:stop] = array.toNumPyArray().reshape(-1)
+                packing.staleFields.discard(name)
+            else:
+                # New name or new size: the buffer is rebuilt.
+                self._packing.invalidate(self.valuesDouble, self.fieldsDouble)
         self.fieldsDouble[name] = field
 
     def getOutputMEDDoubleField(self, name):
         """ Return the MED field of name ``name`` previously stored.
 
+        In packed storage mode, the fields are updated from the buffer, which is kept (see the
+        warning of :meth:`setPackedStorage`).
+
         Parameters
         ----------
         name
@@ -376,6 +874,7 @@ class LocalDataManager(DataManager, DataAccessor):
         """
         if name not in self.fieldsDouble:
             raise Exception("LocalDataManager.getOutputMEDDoubleField unknown field " + name)
+        self._packing.syncFields(self.fieldsDouble, [name])
         return self.fieldsDouble[name]
 
     def setInputMEDIntField(self, name, field):
@@ -406,6 +905,11 @@ class LocalDataManager(DataManager, DataAccessor):
         value
             A scalar value to store.
         """
+        if self._packing.layout is not None:
+            if name in self._packing.layout.scalarIndex:
+                self._packing.buffer[self._packing.layout.scalarIndex[name]] = value
+            else:
+                self._packing.invalidate(self.valuesDouble, self.fieldsDouble)
         self.valuesDouble[name] = value
 
     def getOutputDoubleValue(self, name):
@@ -427,6 +931,9 @@ class LocalDataManager(DataManager, DataAccessor):
         """
         if name not in self.valuesDouble:
             raise Exception("LocalDataManager.getOutputDoubleValue unknown value " + name)
+        layout = self._packing.layout
+        if layout is not None and name in layout.scalarIndex:
+            return float(self._packing.buffer[layout.scalarIndex[name]])
         return self.valuesDouble[name]
 
     def setInputIntValue(self, name, value):
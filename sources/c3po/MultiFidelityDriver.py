@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2020, CEA
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following disclaimer in the documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products derived from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+""" Contain the class :class:`.MultiFidelityDriver`. """
+from __future__ import print_function, division
+
+from c3po.services.PhysicsDriverWrapper import PhysicsDriverWrapper
+
+
+class MultiFidelityDriver(PhysicsDriverWrapper):
+    """ :class:`.MultiFidelityDriver` wraps a :class:`.PhysicsDriver` together with a cheaper
+    stand-in (the surrogate: coarse mesh model, reduced order model, linearized response, etc.)
+    used for the first solves of each time step.
+
+    It is given to a coupler (:class:`.FixedPointCoupler`, :class:`.AndersonCoupler`, etc.) in place
+    of the full-fidelity :class:`.PhysicsDriver`: the first solves of each time step (see
+    :meth:`setSwitchIterations`) are made with the surrogate, the following ones with the
+    full-fidelity :class:`.PhysicsDriver`. The switch can also be triggered by the accuracy asked by
+    the coupler (see :meth:`setSwitchAccuracy`). Once the full-fidelity :class:`.PhysicsDriver` is
+    used, it is used until the end of the time step.
+
+    The two :class:`.PhysicsDriver` must accept the same inputs and provide the same outputs, so that
+    the same :class:`.Exchanger` and :class:`.DataManager` can be used whatever the one in use:
+
+    - The inputs are given to both of them.
+    - The outputs are read from the one which made the last solve.
+    - The time step methods (:meth:`initTimeStep`, :meth:`abortTimeStep`, :meth:`validateTimeStep`,
+      :meth:`resetTime`, etc.) and the :meth:`save` / :meth:`restore` / :meth:`forget` methods are
+      called on both of them. :meth:`presentTime` and :meth:`computeTimeStep` come from the
+      full-fidelity :class:`.PhysicsDriver`.
+
+    The coupling must converge with the full-fidelity :class:`.PhysicsDriver`: while the surrogate is
+    in use, :meth:`getSolveStatus` returns False and :meth:`getIterateStatus` reports a non-converged
+    iteration, so that a coupler cannot end a time step successfully with the surrogate only. A
+    coupler calling :meth:`iterate() <.PhysicsDriver.iterate>` (for example a
+    :class:`.FixedPointCoupler` with ``setUseIterate(True)``) goes on iterating until a full-fidelity
+    solve converges. Other couplers stop on their own convergence criteria: if it is met with the
+    surrogate, their solve status is False and the time step should be aborted (or the number of
+    surrogate solves reduced). :meth:`validateTimeStep` raises an exception if the last solve of the
+    time step was made with the surrogate.
+    """
+
+    def __init__(self, physics, surrogate, nbSurrogateSolves=1):
+        """ Build a :class:`.MultiFidelityDriver` object.
+
+        Parameters
+        ----------
+        physics : PhysicsDriver
+            The full-fidelity :class:`.PhysicsDriver`.
+        surrogate : PhysicsDriver
+            The cheaper :class:`.PhysicsDriver` used for the first solves of each time step.
+        nbSurrogateSolves : int
+            The number of solves made with the surrogate at the beginning of each time step (see
+            :meth:`setSwitchIterations`). Default: 1.
+        """
+        PhysicsDriverWrapper.__init__(self, physics)
+        self._surrogate = surrogate
+        self._nbSurrogateSolves = nbSurrogateSolves
+        self._switchAccuracy = None
+        self._accuracyName = "Accuracy"
+        self._accuracy = None
+        self._nbSolves = 0
+        self._switched = False
+        self._surrogateInUse = False
+        self._dt = None
+
+    def getSurrogate(self):
+        """ Return the surrogate :class:`.PhysicsDriver`.
+
+        Returns
+        -------
+        PhysicsDriver
+            The surrogate :class:`.PhysicsDriver`.
+        """
+        return self._surrogate
+
+    def setSwitchIterations(self, nbSurrogateSolves):
+        """ Set the number of solves made with the surrogate at the beginning of each time step.
+
+        Parameters
+        ----------
+        nbSurrogateSolves : int
+            The number of solves (calls to :meth:`solveTimeStep` or :meth:`iterateTimeStep`) made
+            with the surrogate at the beginning of each time step. 0 disables the surrogate.
+            Default: 1.
+        """
+        if nbSurrogateSolves < 0:
+            raise Exception("MultiFidelityDriver.setSwitchIterations Set a nbSurrogateSolves >= 0 !")
+        self._nbSurrogateSolves = nbSurrogateSolves
+
+    def setSwitchAccuracy(self, switchAccuracy, inputName="Accuracy"):
+        """ Switch to the full-fidelity :class:`.PhysicsDriver` as soon as the accuracy given by the
+        coupler is lower than ``switchAccuracy`` (even if the number of solves set by
+        :meth:`setSwitchIterations` is not reached).
+
+        The accuracy is the value set by the coupler with ``setInputDoubleValue(inputName, value)``,
+        for example by an :class:`.AccuracyScheduler` from the coupling error. It is also given to
+        both :class:`.PhysicsDriver`.
+
+        Parameters
+        ----------
+        switchAccuracy : float
+            The accuracy below which the full-fidelity :class:`.PhysicsDriver` is used, or None
+            (default) to only use the number of solves.
+        inputName : str
+            The name of the input value giving the accuracy. Default: ``"Accuracy"``.
+        """
+        self._switchAccuracy = switchAccuracy
+        self._accuracyName = inputName
+
+    def isSurrogateInUse(self):
+        """ Return True if the last solve was made with the surrogate.
+
+        Returns
+        -------
+        bool
+            True if the last solve was made with the surrogate.
+        """
+        return self._surrogateInUse
+
+    def _activePhysics(self):
+        """ INTERNAL Return the PhysicsDriver providing the outputs. """
+        return self._surrogate if self._surrogateInUse else self._physics
+
+    def _selectPhysics(self):
+        """ INTERNAL Choose the PhysicsDriver for the next solve and return it. """
+        if not self._switched:
+            self._switched = self._nbSolves >= self._nbSurrogateSolves
+            if self._switchAccuracy is not None and self._accuracy is not None:
+                self._switched = self._switched or self._accuracy <= self._switchAccuracy
+        self._surrogateInUse = not self._switched
+        self._nbSolves += 1
+        return self._activePhysics()
+
+    def _newTimeStep(self):
+        """ INTERNAL Start again with the surrogate. """
+        self._nbSolves = 0
+        self._switched = False
+        self._surrogateInUse = False
+        self._accuracy = None
+
+    def initialize(self):
+        """ See :meth:`.PhysicsDriver.initialize`. """
+        self._newTimeStep()
+        self._dt = None
+        self._physics.init()
+        self._surrogate.init()
+        return self._physics.getInitStatus() and self._surrogate.getInitStatus()
+
+    def terminate(self):
+        """ See :meth:`.PhysicsDriver.terminate`. """
+        self._physics.term()
+        self._surrogate.term()
+
+    def initTimeStep(self, dt):
+        """ See :meth:`.PhysicsDriver.initTimeStep`. """
+        if dt != self._dt:
+            self._newTimeStep()
+        self._dt = dt
+        return self._physics.initTimeStep(dt) and self._surrogate.initTimeStep(dt)
+
+    def solveTimeStep(self):
+        """ See :meth:`.PhysicsDriver.solveTimeStep`. """
+        physics = self._selectPhysics()
+        physics.solve()
+        return physics.getSolveStatus()
+
+    def iterateTimeStep(self):
+        """ See :meth:`.PhysicsDriver.iterateTimeStep`. """
+        physics = self._selectPhysics()
+        physics.iterate()
+        return physics.getIterateStatus()
+
+    def getSolveStatus(self):
+        """ Return False if the last solve was made with the surrogate (see :meth:`isSurrogateInUse`).
+
+        See also :meth:`.PhysicsDriver.getSolveStatus`.
+        """
+        return PhysicsDriverWrapper.getSolveStatus(self) and not self._surrogateInUse
+
+    def getIterateStatus(self):
+        """ Report the iteration as not converged if it was made with the surrogate (see :meth:`isSurrogateInUse`).
+
+        See also :meth:`.PhysicsDriver.getIterateStatus`.
+        """
+        succeed, converged = PhysicsDriverWrapper.getIterateStatus(self)
+        return succeed, converged and not self._surrogateInUse
+
+    def validateTimeStep(self):
+        """ See :meth:`.PhysicsDriver.validateTimeStep`. """
+        if self._surrogateInUse:
+            raise Exception("MultiFidelityDriver.validateTimeStep The last solve was made with the surrogate: the coupling must converge with the full-fidelity PhysicsDriver.")
+        self._physics.validateTimeStep()
+        self._surrogate.validateTimeStep()
+        self._newTimeStep()
+        self._dt = None
+
+    def setStationaryMode(self, stationaryMode):
+        """ See :meth:`.PhysicsDriver.setStationaryMode`. """
+        self._physics.setStationaryMode(stationaryMode)
+        self._surrogate.setStationaryMode(stationaryMode)
+        self._newTimeStep()
+        self._dt = None
+
+    def abortTimeStep(self):
+        """ See :meth:`.PhysicsDriver.abortTimeStep`. """
+        self._physics.abortTimeStep()
+        self._surrogate.abortTimeStep()
+
+    def resetTime(self, time_):
+        """ See :meth:`.PhysicsDriver.resetTime`. """
+        self._physics.resetTime(time_)
+        self._surrogate.resetTime(time_)
+        self._newTimeStep()
+        self._dt = None
+
+    def save(self, label, method):
+        """ See :meth:`.PhysicsDriver.save`. """
+        self._physics.save(label, method)
+        self._surrogate.save(label, method)
+
+    def restore(self, label, method):
+        """ See :meth:`.PhysicsDriver.restore`. """
+        self._physics.restore(label, method)
+        self._surrogate.restore(label, method)
+
+    def forget(self, label, method):
+        """ See :meth:`.PhysicsDriver.forget`. """
+        self._physics.forget(label, method)
+        self._surrogate.forget(label, method)
+
+    def setInputMEDDoubleField(self, name, field):
+        """ See :meth:`c3po.DataAccessor.DataAccessor.setInputMEDDoubleField`. """
+        self._physics.setInputMEDDoubleField(name, field)
+        self._surrogate.setInputMEDDoubleField(name, field)
+
+    def getOutputMEDDoubleField(self, name):
+        """ See :meth:`c3po.DataAccessor.DataAccessor.getOutputMEDDoubleField`. """
+        return self._activePhysics().getOutputMEDDoubleField(name)
+
+    def updateOutputMEDDoubleField(self, name, field):
+        """ See :meth:`c3po.DataAccessor.DataAccessor.updateOutputMEDDoubleField`. """
+        return self._activePhysics().updateOutputMEDDoubleField(name, field)
+
+    def setInputMEDIntField(self, name, field):
+        """ See :meth:`c3po.DataAccessor.DataAccessor.setInputMEDIntField`. """
+        self._physics.setInputMEDIntField(name, field)
+        self._surrogate.setInputMEDIntField(name, field)
+
+    def getOutputMEDIntField(self, name):
+        """ See :meth:`c3po.DataAccessor.DataAccessor.getOutputMEDIntField`. """
+        return self._activePhysics().getOutputMEDIntField(name)
+
+    def updateOutputMEDIntField(self, name, field):
+        """ See :meth:`c3po.DataAccessor.DataAccessor.updateOutputMEDIntField`. """
+        return self._activePhysics().updateOutputMEDIntField(name, field)
+
+    def setInputMEDStringField(self, name, field):
+        """ See :meth:`c3po.DataAccessor.DataAccessor.setInputMEDStringField`. """
+        self._physics.setInputMEDStringField(name, field)
+        self._surrogate.setInputMEDStringField(name, field)
+
+    def getOutputMEDStringField(self, name):
+        """ See :meth:`c3po.DataAccessor.DataAccessor.getOutputMEDStringField`. """
+        return self._activePhysics().getOutputMEDStringField(name)
+
+    def updateOutputMEDStringField(self, name, field):
+        """ See :meth:`c3po.DataAccessor.DataAccessor.updateOutputMEDStringField`. """
+        return self._activePhysics().updateOutputMEDStringField(name, field)
+
+    def setInputDoubleValue(self, name, value):
+        """ See :meth:`c3po.DataAccessor.DataAccessor.setInputDoubleValue`. """
+        if name == self._accuracyName:
+            self._accuracy = value
+        self._physics.setInputDoubleValue(name, value)
+        self._surrogate.setInputDoubleValue(name, value)
+
+    def getOutputDoubleValue(self, name):
+        """ See :meth:`c3po.DataAccessor.DataAccessor.getOutputDoubleValue`. """
+        return self._activePhysics().getOutputDoubleValue(name)
+
+    def setInputIntValue(self, name, value):
+        """ See :meth:`c3po.DataAccessor.DataAccessor.setInputIntValue`. """
+        self._physics.setInputIntValue(name, value)
+        self._surrogate.setInputIntValue(name, value)
+
+    def getOutputIntValue(self, name):
+        """ See :meth:`c3po.DataAccessor.DataAccessor.getOutputIntValue`. """
+        return self._activePhysics().getOutputIntValue(name)
+
+    def setInputStringValue(self, name, value):
+        """ See :meth:`c3po.DataAccessor.DataAccessor.setInputStringValue`. """
+        self._physics.setInputStringValue(name, value)
+        self._surrogate.setInputStringValue(name, value)
+
+    def getOutputStringValue(self, name):
+        """ See :meth:`c3po.DataAccessor.DataAccessor.getOutputStringValue`. """
+        return self._activePhysics().getOutputStringValue(name)
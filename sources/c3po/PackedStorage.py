@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2020, CEA
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following disclaimer in the documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products derived from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+""" Contain the classes :class:`.PackedStorage` and :class:`.PackedLayout`, and the blockwise kernels used by :class:`.LocalDataManager`. """
+from __future__ import print_function, division
+import os
+import tempfile
+import numpy
+
+import c3po.medcouplingCompat as mc
+
+BLOCK_SIZE = 8192
+""" INTERNAL Number of values processed at once by :func:`combineArrays` (small enough to stay in cache). """
+
+
+def combineArrays(output, coeffs, arrays):
+    """ INTERNAL
+
+    Compute ``output = sum_i(coeffs[i] * arrays[i])`` on 1D numpy arrays of the same size.
+
+    The computation is made block by block: each array is read only once, and no array of the size
+    of ``output`` is allocated. ``output`` can be (or share memory with) one of ``arrays``. Terms with
+    a zero coefficient are ignored. The arrays may be stored in reduced precision (float32): the
+    computation is always made in double precision.
+    """
+    terms = [(coeff, array) for coeff, array in zip(coeffs, arrays) if coeff != 0.]
+    size = output.size
+    if len(terms) == 0:
+        output.fill(0.)
+        return
+    if size == 0:
+        return
+    blockSize = min(size, BLOCK_SIZE)
+    accumulator = numpy.empty(blockSize)
+    temporary = numpy.empty(blockSize)
+    for start in range(0, size, blockSize):
+        stop = min(start + blockSize, size)
+        blockAccumulator = accumulator[:stop - start]
+        blockTemporary = temporary[:stop - start]
+        numpy.multiply(terms[0][1][start:stop], terms[0][0], out=blockAccumulator, dtype=float)
+        for coeff, array in terms[1:]:
+            if coeff == 1.:
+                blockAccumulator += array[start:stop]
+            else:
+                numpy.multiply(array[start:stop], coeff, out=blockTemporary, dtype=float)
+                blockAccumulator += blockTemporary
+        output[start:stop] = blockAccumulator
+
+
+def dotArrays(array, arrays):
+    """ INTERNAL
+
+    Return the vector of the scalar products of ``array`` with each element of ``arrays`` (1D numpy
+    arrays of the same size).
+
+    The computation is made block by block, each block of ``arrays`` being gathered in a small
+    matrix: each array is read only once.
+    """
+    result = numpy.zeros(len(arrays))
+    size = array.size
+    if size == 0 or len(arrays) == 0:
+        return result
+    blockSize = min(size, BLOCK_SIZE)
+    blocks = numpy.empty((len(arrays), blockSize))
+    for start in range(0, size, blockSize):
+        stop = min(start + blockSize, size)
+        for i, other in enumerate(arrays):
+            blocks[i, :stop - start] = other[start:stop]
+        result += numpy.dot(blocks[:, :stop - start], array[start:stop])
+    return result
+
+
+def gramArrays(arrays):
+    """ INTERNAL
+
+    Return the matrix of the scalar products two by two of ``arrays`` (1D numpy arrays of the same
+    size).
+
+    The computation is made block by block, each block of ``arrays`` being gathered in a small
+    matrix: each array is read only once.
+    """
+    result = numpy.zeros((len(arrays), len(arrays)))
+    if len(arrays) == 0 or arrays[0].size == 0:
+        return result
+    size = arrays[0].size
+    blockSize = min(size, BLOCK_SIZE)
+    blocks = numpy.empty((len(arrays), blockSize))
+    for start in range(0, size, blockSize):
+        stop = min(start + blockSize, size)
+        for i, other in enumerate(arrays):
+            blocks[i, :stop - start] = other[start:stop]
+        result += numpy.dot(blocks[:, :stop - start], blocks[:, :stop - start].T)
+    return result
+
+
+def reduceArrays(arrays, dotPairs):
+    """ INTERNAL
+
+    Return the sums of squares and the maxima of the absolute values of ``arrays`` (1D numpy arrays
+    of the same size), as well as the scalar products between the pairs of arrays of index
+    ``dotPairs``.
+
+    The computation is made block by block: each array is read only once from memory.
+    """
+    squares = numpy.zeros(len(arrays))
+    maxima = numpy.zeros(len(arrays))
+    dots = numpy.zeros(len(dotPairs))
+    if len(arrays) == 0 or arrays[0].size == 0:
+        return squares, maxima, dots
+    size = arrays[0].size
+    blockSize = min(size, BLOCK_SIZE)
+    for start in range(0, size, blockSize):
+        stop = min(start + blockSize, size)
+        blocks = [numpy.asarray(array[start:stop], dtype=float) for array in arrays]
+        for i, block in enumerate(blocks):
+            squares[i] += numpy.dot(block, block)
+            maxima[i] = max(maxima[i], block.max(), -block.min())
+        for k, (i, j) in enumerate(dotPairs):
+            dots[k] += numpy.dot(blocks[i], blocks[j])
+    return squares, maxima, dots
+
+
+class PackedLayout(object):
+    """ INTERNAL
+
+    Describe how double values and double fields are stored in the buffer of a
+    :class:`.PackedStorage`: the double values first, then the fields, one after the other.
+    """
+
+    def __init__(self, valuesDouble, fieldsDouble):
+        """ Build the layout corresponding to the provided data.
+
+        Parameters
+        ----------
+        valuesDouble : dict
+            The double values to store.
+        fieldsDouble : dict
+            The double fields to store.
+        """
+        self.scalarNames = tuple(valuesDouble.keys())
+        self.scalarIndex = {name: index for index, name in enumerate(self.scalarNames)}
+        self.fieldNames = tuple(fieldsDouble.keys())
+        self.fieldSlices = {}
+        offset = len(self.scalarNames)
+        for name, field in fieldsDouble.items():
+            array = field.getArray()
+            size = array.getNumberOfTuples() * array.getNumberOfComponents()
+            self.fieldSlices[name] = (offset, offset + size, array.getNumberOfComponents())
+            offset += size
+        self.size = offset
+        self._key = (self.scalarNames, tuple(self.fieldSlices[name] for name in self.fieldNames), self.fieldNames)
+
+    def __eq__(self, other):
+        return self is other or (isinstance(other, PackedLayout) and self._key == other._key)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self._key)
+
+
+class PackedStorage(object):
+    """ INTERNAL
+
+    Hold the contiguous buffer used by a :class:`.LocalDataManager` in packed storage mode (see
+    :meth:`.LocalDataManager.setPackedStorage`).
+
+    It is shared between a :class:`.LocalDataManager` and its views (see
+    :meth:`c3po.mpi.MPIDomainDecompositionDataManager.MPIDomainDecompositionDataManager.getLocalView`).
+    """
+
+    def __init__(self, enabled=False, pool=None, dtype=numpy.float64):
+        """ Build an empty :class:`.PackedStorage`.
+
+        Parameters
+        ----------
+        enabled : bool
+            Set True to activate the packed storage mode.
+        pool : BufferPool
+            The :class:`.BufferPool` used to get buffers, or None.
+        dtype : numpy.dtype
+            The type of the values of the buffer.
+        """
+        self.enabled = enabled
+        self.pool = pool
+        self.dtype = numpy.dtype(dtype)
+        self.buffer = None
+        self.layout = None
+        self.staleFields = set()
+        self.mappedFile = None
+
+    def __del__(self):
+        if self.mappedFile is not None:
+            self.dropBuffer()
+
+    def cloneEmpty(self):
+        """ Return a new :class:`.PackedStorage` with the same configuration but without data. """
+        return PackedStorage(self.enabled, self.pool, self.dtype)
+
+    def acquire(self, size):
+        """ Return a new buffer of ``size`` values of type ``dtype``, from the pool if there is one. """
+        if self.pool is not None:
+            return self.pool.acquire(size, self.dtype)
+        return numpy.empty(size, dtype=self.dtype)
+
+    def dropBuffer(self):
+        """ Drop the buffer: give it back to the pool if there is one, or remove its file if it is memory-mapped. """
+        if self.mappedFile is not None:
+            self.buffer = None
+            if os.path.exists(self.mappedFile):
+                os.remove(self.mappedFile)
+            self.mappedFile = None
+        elif self.pool is not None and self.buffer is not None:
+            self.pool.release(self.buffer)
+        self.buffer = None
+
+    def mapToFile(self, directory):
+        """ Move the buffer in a new memory-mapped file of ``directory``. """
+        fileDescriptor, path = tempfile.mkstemp(suffix=".c3po", dir=directory)
+        os.close(fileDescriptor)
+        mapped = numpy.memmap(path, dtype=self.buffer.dtype, mode="w+", shape=self.buffer.shape)
+        mapped[:] = self.buffer
+        self.dropBuffer()
+        self.buffer = mapped
+        self.mappedFile = path
+
+    def releaseBuffer(self):
+        """ Drop the buffer (see :meth:`dropBuffer`) and the layout. """
+        self.dropBuffer()
+        self.layout = None
+        self.staleFields = set()
+
+    def allocateLike(self, valuesDouble, fieldsDouble, modelValues, modelFields):
+        """ Give to the empty ``valuesDouble`` and ``fieldsDouble`` the structure of ``modelValues`` and ``modelFields``, with undefined values. """
+        valuesDouble.update((name, 0.) for name in modelValues)
+        for name, field in modelFields.items():
+            fieldsDouble[name] = field.clone(False)
+            if not self.enabled:
+                array = field.getArray()
+                newArray = mc.DataArrayDouble(array.getNumberOfTuples(), array.getNumberOfComponents())
+                newArray.copyStringInfoFrom(array)
+                fieldsDouble[name].setArray(newArray)
+        if self.enabled:
+            # The fields share the arrays of the model until the buffer is copied in new ones (see syncFields).
+            self.releaseBuffer()
+            self.layout = PackedLayout(valuesDouble, fieldsDouble)
+            self.buffer = self.acquire(self.layout.size)
+            self.staleFields = set(fieldsDouble)
+
+    def ensurePacked(self, valuesDouble, fieldsDouble):
+        """ Build the buffer from ``valuesDouble`` and ``fieldsDouble`` if it is not up to date. """
+        layout = self.layout
+        if layout is None or len(layout.scalarNames) != len(valuesDouble) or len(layout.fieldNames) != len(fieldsDouble):
+            self.invalidate(valuesDouble, fieldsDouble)
+            self.pack(valuesDouble, fieldsDouble)
+
+    def pack(self, valuesDouble, fieldsDouble):
+        """ Copy all the double values and double fields in the contiguous buffer. """
+        layout = PackedLayout(valuesDouble, fieldsDouble)
+        buffer = self.buffer
+        if buffer is None or buffer.size != layout.size or buffer.dtype != self.dtype:
+            self.releaseBuffer()
+            buffer = self.acquire(layout.size)
+        buffer[:len(layout.scalarNames)] = [valuesDouble[name] for name in layout.scalarNames]
+        for name, field in fieldsDouble.items():
+            start, stop, _ = layout.fieldSlices[name]
+            if stop > start:
+                buffer[start:stop] = field.getArray().toNumPyArray().reshape(-1)
+        self.buffer = buffer
+        self.layout = layout
+        self.staleFields = set()
+
+    def syncFields(self, fieldsDouble, names=None):
+        """ Copy the content of the buffer in the fields of ``fieldsDouble`` which are not up to date (only those of ``names`` if provided). """
+        staleNames = self.staleFields if names is None else self.staleFields.intersection(names)
+        for name in list(staleNames):
+            start, stop, nbComponents = self.layout.fieldSlices[name]
+            field = fieldsDouble[name]
+            if stop > start:
+                # A new array is always built (and not updated in place): it may be shared with other fields.
+                array = mc.DataArrayDouble(self.buffer[start:stop].reshape(-1, nbComponents).astype(numpy.float64))
+                array.copyStringInfoFrom(field.getArray())
+                field.setArray(array)
+            self.staleFields.discard(name)
+
+    def invalidate(self, valuesDouble, fieldsDouble):
+        """ Make ``valuesDouble`` and ``fieldsDouble`` up to date and force the buffer to be rebuilt before next use. """
+        layout = self.layout
+        if layout is not None:
+            if len(layout.scalarNames) > 0:
+                valuesDouble.update(zip(layout.scalarNames, self.buffer[:len(layout.scalarNames)].tolist()))
+            self.syncFields(fieldsDouble)
+            self.layout = None
+
+    def refreshValues(self, valuesDouble):
+        """ Update ``valuesDouble`` from the buffer and mark the fields as not up to date. """
+        layout = self.layout
+        if len(layout.scalarNames) > 0:
+            valuesDouble.update(zip(layout.scalarNames, self.buffer[:len(layout.scalarNames)].tolist()))
+        self.staleFields = set(layout.fieldNames)
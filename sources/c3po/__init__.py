@@ -23,21 +23,36 @@ from .CollaborativeExchanger import CollaborativeExchanger
 from .DataManager import DataManager
 from .LocalDataManager import LocalDataManager
 from .CollaborativeDataManager import CollaborativeDataManager
+from .BufferPool import BufferPool
+from .LinearExpression import LinearExpression
+from .HistoryStore import HistoryStore
 from .Coupler import Coupler, NormChoice
 from .CollaborativePhysicsDriver import CollaborativePhysicsDriver
 from .TimeAccumulator import TimeAccumulator, SaveAtInitTimeStep
+from .MultiFidelityDriver import MultiFidelityDriver
 from .services.tracer import tracer
 from .services.PhysicsDriverWrapper import PhysicsDriverWrapper
 from .services.wrapper import buildWrappingClass, wrapper
 from .services.NameChanger import nameChanger, NameChanger
 from .services.ListingWriter import ListingWriter, mergeListing, getTotalTimePhysicsDriver, getTimesExchanger
 from .services.TransientLogger import TransientLogger, Timekeeper, FortuneTeller
+from .services.Predictor import Predictor
+from .services.AccuracyScheduler import AccuracyScheduler
+from .services.IterateAccelerator import JacobiAcceleration
+from .services.Preconditioner import Preconditioner, DiagonalPreconditioner, FixedPointPreconditioner, JacobianPreconditioner, SecantPreconditioner, SecantUpdate
 from .couplers.FixedPointCoupler import FixedPointCoupler
+from .couplers.AitkenCoupler import AitkenCoupler
+from .couplers.JacobiCoupler import JacobiCoupler
+from .couplers.WaveformRelaxationCoupler import WaveformRelaxationCoupler
 from .couplers.AndersonCoupler import AndersonCoupler
-from .couplers.JFNKCoupler import JFNKCoupler
+from .couplers.IQNCoupler import IQNCoupler, IQNMethod
+from .couplers.JFNKCoupler import JFNKCoupler, ForcingTerm
+from .couplers.BlockJFNKCoupler import BlockJFNKCoupler
+from .services.GMRES import GramSchmidt
 from .couplers.CrossedSecantCoupler import CrossedSecantCoupler
 from .couplers.AdaptiveResidualBalanceCoupler import AdaptiveResidualBalanceCoupler
 from .couplers.DynamicResidualBalanceCoupler import DynamicResidualBalanceCoupler
+from .couplers.MultiResidualBalanceCoupler import MultiResidualBalanceCoupler
 from .exchangeMethods.ExchangeMethod import ExchangeMethod
 from .exchangeMethods.DirectMatching import DirectMatching
 from .exchangeMethods.SharedRemapping import SharedRemapping, Remapper
@@ -10,44 +10,15 @@
 
 """ Contain the class :class:`.AndersonCoupler`. """
 from __future__ import print_function, division
-import math
 import numpy as np
 
 from c3po.PhysicsDriver import PhysicsDriver
 from c3po.Coupler import Coupler
 from c3po.CollaborativeDataManager import CollaborativeDataManager
+from c3po.services.AndersonHistory import AndersonHistory
 from c3po.services.Printer import Printer
 
 
-def deleteQRColumn(matrixQ, matrixR, dataTemp):
-    """ INTERNAL
-
-    Returns
-    -------
-
-        A new QR decomposition after deletion of one column.
-    """
-    dim = matrixR.shape[0]
-    for i in range(dim - 1):
-        temp = math.sqrt(matrixR[i, i + 1] * matrixR[i, i + 1] + matrixR[i + 1, i + 1] * matrixR[i + 1, i + 1])
-        cval = matrixR[i, i + 1] / temp
-        sval = matrixR[i + 1, i + 1] / temp
-        matrixR[i, i + 1] = temp
-        matrixR[i + 1, i + 1] = 0.
-        for j in range(i + 2, dim):
-            temp = cval * matrixR[i, j] + sval * matrixR[i + 1, j]
-            matrixR[i + 1, j] = -sval * matrixR[i, j] + cval * matrixR[i + 1, j]
-            matrixR[i, j] = temp
-        dataTemp.copy(matrixQ[i])
-        dataTemp *= cval
-        dataTemp.imuladd(sval, matrixQ[i + 1])
-        matrixQ[i + 1] *= cval
-        matrixQ[i + 1].imuladd(-sval, matrixQ[i])
-        matrixQ[i].copy(dataTemp)
-    matrixR = matrixR[:dim - 1, 1:].copy()
-    return matrixQ, matrixR
-
-
 class AndersonCoupler(Coupler):
     """ :class:`.AndersonCoupler` inherits from :class:`.Coupler` and proposes a fixed point
     algorithm with Anderson acceleration.
@@ -79,6 +50,11 @@ class AndersonCoupler(Coupler):
     :meth:`setAndersonDampingFactor`. Default value is 1 (only :math:`F(X^{n-i})`).
 
     The default order (number of previous states considered) is 2. Call :meth:`setOrder` to change it.
+    The history is stored in a ring buffer, with a QR decomposition updated in place (see
+    :class:`.AndersonHistory`): high orders (10 to 20) remain cheap.
+
+    The history can be carried from one time step to the next (see :meth:`setWarmStart`): the
+    acceleration then starts from the first iteration of the time step.
 
     The convergence criteria is : :math:`||F(X^{n}) - X^{n}|| / ||F(X^{n})|| < \\rm{tolerance}`. The default
     norm used is the infinite norm. :meth:`.Coupler.setNormChoice` allows to choose another one.
@@ -108,8 +84,14 @@ class AndersonCoupler(Coupler):
         self._maxiter = 100
         self._order = 2
         self._andersonDampingFactor = 1.
+        self._historyStorageType = np.float64
+        self._historyStore = None
+        self._warmStartColumns = 0
         self._iterationPrinter = Printer(2)
         self._leaveIfFailed = False
+        self._history = None
+        self._historyDt = None
+        self._normData = None
 
         if not isinstance(physics, list) or not isinstance(exchangers, list) or not isinstance(dataManagers, list):
             raise Exception("AndersonCoupler.__init__ physics, exchangers and dataManagers must be lists!")
@@ -157,6 +139,66 @@ class AndersonCoupler(Coupler):
         if order <= 0:
             raise Exception("AndersonCoupler.setOrder Set an order > 0 !")
         self._order = order
+        self.clearHistory()
+
+    def setHistoryStorageType(self, dtype):
+        """ Set the type used to store the history of the method (the ``order`` previous states and
+        the columns of the QR decomposition), see :meth:`.DataManager.setStorageType`.
+
+        With ``numpy.float32``, the memory used by the history is halved (for
+        :class:`.LocalDataManager` in packed storage mode), while all computations are still made in
+        double precision. The rounding of the history to single precision limits the accuracy of
+        the acceleration: a few more iterations may be needed for tolerances below 1.E-6.
+
+        Parameters
+        ----------
+        dtype : numpy.dtype
+            ``numpy.float64`` (default) or ``numpy.float32``.
+        """
+        self._historyStorageType = dtype
+        self.clearHistory()
+
+    def setHistoryStore(self, historyStore):
+        """ Set a :class:`.HistoryStore` to bound the RAM used by the history of the method: the
+        oldest vectors are moved in memory-mapped files when the RAM budget of the store is exceeded.
+
+        Parameters
+        ----------
+        historyStore : HistoryStore
+            The :class:`.HistoryStore` to use, or None (default) to keep the whole history in RAM.
+        """
+        self.clearHistory()
+        self._historyStore = historyStore
+
+    def setWarmStart(self, nbColumns):
+        """ Set the number of columns of the history carried from one time step to the next (the newest ones).
+
+        The first iteration of a time step is then accelerated with this history. The data are then
+        normalized with the norms of the first time step of the history. The history is discarded
+        when it becomes stale: when the time step changes, and by :meth:`setStationaryMode` (if the
+        mode changes) and :meth:`resetTime`. It can also be discarded with :meth:`clearHistory`.
+
+        Parameters
+        ----------
+        nbColumns : int
+            The number of columns carried over (at most the order, see :meth:`setOrder`). 0 (default)
+            means that the history is rebuilt at each time step.
+        """
+        if nbColumns < 0:
+            raise Exception("AndersonCoupler.setWarmStart Set a number of columns >= 0 !")
+        self._warmStartColumns = nbColumns
+        if nbColumns == 0:
+            self.clearHistory()
+
+    def clearHistory(self):
+        """ Discard the history carried from one time step to the next (see :meth:`setWarmStart`). """
+        if self._history is not None:
+            self._history.release()
+        self._history = None
+        self._historyDt = None
+        self._normData = None
+        if self._historyStore is not None:
+            self._historyStore.clear()
 
     def setPrintLevel(self, level):
         """ Set the print level during iterations (0=None, 1 keeps last iteration, 2 prints every iteration).
@@ -192,29 +234,33 @@ class AndersonCoupler(Coupler):
         physics2Data = self._exchangers[0]
         data2physics = self._exchangers[1]
         iiter = 0
-        # Compteur de la mémoire d'Anderson : nombre de résidus sauvegardés
-        mAA = 0
-        # Historique des dF
-        memory = [0] * self._order
-        iFirstMemory = 0  # permet de ne pas considerer les premiers elements de memory lorsque le conditionnement est mauvais.
-        matrixR = np.zeros(shape=(1, 1))
-        matrixQ = [0.] * self._order
-        datatmp = 0.  # pour manipulation dans deleteQRColumn
-        # Tolérance sur le conditionnement de matrixR ; valeur par défaut proposée par Ansar, reprise telle quelle
-        dropErr = 1.e10
+        # Historique : decomposition QR des dF et memoire des dG, de capacite self._order
+        if self._history is not None and self._historyDt != self._dt:
+            self.clearHistory()
+        if self._history is None:
+            self._history = AndersonHistory(self._order)
+            self._history.setStorage(self._historyStorageType, self._historyStore)
+            if self._historyStore is not None:
+                self._historyStore.clear()
+        history = self._history
 
         # Init On calcul ici l'etat "0"
         if self._iterationPrinter.getPrintLevel() > 0:
             self._iterationPrinter.print("Anderson iteration {} ".format(iiter))
 
+        self.applyPredictor(data2physics)
+        self.applyAccuracy(None, newTimeStep=True)
         physics.solve()
+        self.readInnerIterations()
         if self._leaveIfFailed and not physics.getSolveStatus():
             return False
 
         physics2Data.exchange()
 
         data = CollaborativeDataManager(self._dataManagers)
-        normData = self.readNormData()
+        if self._normData is None or history.getSize() == 0:
+            self._normData = self.readNormData()
+        normData = self._normData
         self.normalizeData(normData)
 
         previousData = data.clone()
@@ -225,7 +271,9 @@ class AndersonCoupler(Coupler):
         self.initTimeStep(self._dt)
         self.denormalizeData(normData)
         data2physics.exchange()
+        self.applyAccuracy(None)
         physics.solve()
+        self.readInnerIterations()
         if self._leaveIfFailed and not physics.getSolveStatus():
             return False
         physics2Data.exchange()
@@ -236,122 +284,84 @@ class AndersonCoupler(Coupler):
         deltaF = diffData * -1.
         delta = previousData * -1.
 
-        error = self.getNorm(diffData) / self.getNorm(data)
+        normDiff, normNewData = self.getNorms([diffData, data])
+        error = normDiff / normNewData
+
+        if error > self._tolerance and history.getSize() > 0:
+            # History carried from the previous time step: the acceleration starts now.
+            history.extrapolate(data, diffData, self._andersonDampingFactor)
+            previousData.copy(data)
 
         iiter += 1
         if self._iterationPrinter.getPrintLevel() > 0:
-            self._iterationPrinter.print("Anderson iteration {} error : {:.5e} ".format(iiter - 1, error))
+            self._iterationPrinter.print("Anderson iteration {} error : {:.5e}{}".format(iiter - 1, error, self.getAccuracyReport()))
 
         while error > self._tolerance and iiter < self._maxiter:
             self.abortTimeStep()
             self.initTimeStep(self._dt)
             self.denormalizeData(normData)
             data2physics.exchange()
+            self.applyAccuracy(error)
             physics.solve()
+            self.readInnerIterations()
             if self._leaveIfFailed and not physics.getSolveStatus():
                 return False
             physics2Data.exchange()     # data contient g(u_k), previousData contient u_k
             self.normalizeData(normData)
 
-            diffData.copy(data)
-            diffData -= previousData
-            error = self.getNorm(diffData) / self.getNorm(data)
+            diffData.linearCombination([1., -1.], [data, previousData])
+            normDiff, normNewData = self.getNorms([diffData, data])
+            error = normDiff / normNewData
 
             if error > self._tolerance:
 
                 deltaF += diffData  # F_i - F_{i-1}
                 delta += data   # f(x_i) - f(x_{i-1})
 
-                # Selon si on a atteint l'ordre m ou non, on ajoute le nouveau résidu ou bien on enlève la première colonne
-                # et on rajoute le nouveau à la fin
-                if iFirstMemory + mAA < len(memory):
-                    memory[iFirstMemory + mAA] = delta.clone()
-                else:
-                    firstMemory = memory[0]
-                    for i in range(len(memory) - 1):
-                        memory[i] = memory[i + 1]
-                    memory[-1] = firstMemory
-                    memory[-1].copy(delta)
-                    if iFirstMemory > 0:
-                        iFirstMemory -= 1
-                mAA += 1
-
-                if mAA > self._order:
-                    # Si la dimension est deja self._order, on a atteint la taille max : on retire la première colonne
-                    # et on met à jour la décomposition en conséquence
-                    if datatmp == 0.:
-                        datatmp = data.clone()
-                    matrixQ, matrixR = deleteQRColumn(matrixQ, matrixR, datatmp)
-                    # La taille de la matrice matrixQ a diminué : on met à jour mAA
-                    mAA -= 1
-
-                # Ajout de la nouvelle colonne à matrixQ et matrixR,
-                if matrixR.shape[0] != mAA:
-                    tmpR = np.zeros(shape=(mAA, mAA))
-                    tmpR[0:matrixR.shape[0], 0:matrixR.shape[1]] += matrixR
-                    matrixR = tmpR
-
-                for j in range(mAA - 1):
-                    val = matrixQ[j].dot(deltaF)
-                    matrixR[j, mAA - 1] = val
-                    deltaF.imuladd(-val, matrixQ[j])
-                matrixR[mAA - 1, mAA - 1] = deltaF.norm2()
-                facteurmult = 1.
-                if matrixR[mAA - 1, mAA - 1] != 0:
-                    facteurmult = 1. / matrixR[mAA - 1, mAA - 1]
-                if matrixQ[mAA - 1] == 0.:
-                    matrixQ[mAA - 1] = deltaF * facteurmult
-                else:
-                    matrixQ[mAA - 1].copy(deltaF)
-                    matrixQ[mAA - 1] *= facteurmult
+                # Ajout de la nouvelle colonne (la plus ancienne est supprimee si l'ordre est atteint, ou en cas de mauvais conditionnement)
+                history.add(deltaF, delta)
 
                 # On prepare l'iteration suivante.
-                delta.copy(data)
-                delta *= -1.
-                deltaF.copy(diffData)
-                deltaF *= -1.
-
-                # Condition Control : en cas de mauvais conditionnement de memory : on peut contrôler ça avec le conditionnement de matrixR
-                # En cas de mauvais conditionnement, on met à jour matrixQ et matrixR c'est à dire qu'on supprime la première colonne de memory (avec iFirstMemory)
-                if dropErr > 0.:
-                    condDF = np.linalg.cond(matrixR)
-                    while condDF > dropErr and mAA > 1:
-                        # print("cond(D) = %1.8e, reducing mAA to %d" % (condDF, mAA - 1))
-                        if datatmp == 0.:
-                            datatmp = data.clone()
-                        matrixQ, matrixR = deleteQRColumn(matrixQ, matrixR, datatmp)
-                        iFirstMemory += 1
-                        mAA -= 1
-                        condDF = np.linalg.cond(matrixR)
-                # On résout le problème de minimisation : on calcule dans un premier temps matrixQ^T F
-                matrixQF = np.zeros(mAA)
-                for i in range(mAA):
-                    matrixQF[i] = matrixQ[i].dot(diffData)
-                # Puis on résoud le système triangulaire : matrixR gamma = matrixQF pour obtenir les coefficients d'Anderson
-                gamma = np.linalg.lstsq(matrixR, matrixQF, rcond=-1)[0]
-
-                # On calcule memory * gamma pour ensuite calculer le nouveau data
-                for i in range(mAA):
-                    data.imuladd(-gamma[i], memory[iFirstMemory + i])
-
-                if self._andersonDampingFactor != 1.:
-                    matrixRgamma = np.dot(matrixR, gamma)
-                    data.imuladd(-(1. - self._andersonDampingFactor), diffData)
-                    for i in range(mAA):
-                        data.imuladd((1. - self._andersonDampingFactor) * matrixRgamma[i], matrixQ[i])
+                delta.axpby(-1., data, 0.)
+                deltaF.axpby(-1., diffData, 0.)
+
+                history.extrapolate(data, diffData, self._andersonDampingFactor)
 
                 previousData.copy(data)
 
             iiter += 1
             if self._iterationPrinter.getPrintLevel() > 0:
-                self._iterationPrinter.print("Anderson iteration {} error : {:.5e} ".format(iiter - 1, error))
+                self._iterationPrinter.print("Anderson iteration {} error : {:.5e}{}".format(iiter - 1, error, self.getAccuracyReport()))
 
         if self._iterationPrinter.getPrintLevel() == 1:
             self._iterationPrinter.reprint(tmplevel=2)
 
+        if self._warmStartColumns > 0:
+            while history.getSize() > self._warmStartColumns:
+                history.deleteOldest()
+            self._historyDt = self._dt
+        else:
+            self.clearHistory()
+        self.releaseTemporaries([diffData, previousData, deltaF, delta])
         self.denormalizeData(normData)
         return physics.getSolveStatus() and error <= self._tolerance
 
+    def setStationaryMode(self, stationaryMode):
+        """ Discard the history (see :meth:`clearHistory`) if the mode changes, and see :meth:`.PhysicsDriver.setStationaryMode`. """
+        if stationaryMode != self._stationaryMode:
+            self.clearHistory()
+        Coupler.setStationaryMode(self, stationaryMode)
+
+    def resetTime(self, time_):
+        """ Discard the history (see :meth:`clearHistory`), and see :meth:`.PhysicsDriver.resetTime`. """
+        self.clearHistory()
+        Coupler.resetTime(self, time_)
+
+    def terminate(self):
+        """ Release the history, and see :meth:`.PhysicsDriver.terminate`. """
+        self.clearHistory()
+        Coupler.terminate(self)
+
     def getSolveStatus(self):
         """ See :meth:`.PhysicsDriver.getSolveStatus`. """
         return PhysicsDriver.getSolveStatus(self)
@@ -0,0 +1,451 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2020, CEA
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following disclaimer in the documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products derived from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+""" Contain the class :class:`.BlockJFNKCoupler`. """
+from __future__ import print_function, division
+import math
+import numpy as np
+
+from c3po.PhysicsDriver import PhysicsDriver
+from c3po.Coupler import Coupler
+from c3po.CollaborativeDataManager import CollaborativeDataManager, mapInThreadPool
+from c3po.DataManager import orthogonalize
+from c3po.services.AndersonHistory import solveUpperTriangular
+from c3po.services.Printer import Printer
+
+
+class BlockJFNKCoupler(Coupler):
+    """ :class:`.BlockJFNKCoupler` inherits from :class:`.Coupler` and proposes a Jacobian-Free Newton
+    Krylov coupling algorithm computing several jacobian-vector products at the same time, with
+    several instances of the same :class:`.PhysicsDriver`.
+
+    As in :class:`.JFNKCoupler`, the Newton algorithm solves :math:`F(X) = f(X) - X = 0`, and the
+    product of the jacobian with a vector :math:`v` is approximated by
+    :math:`(F(X + \\varepsilon v) - F(X))/\\varepsilon`: each product costs a physics solve. Here, the
+    linear system of each Newton iteration is solved by a block Krylov method (minimal residual on a
+    block Krylov space): the directions are taken by blocks of (at most) K vectors, K being the
+    number of instances of the :class:`.PhysicsDriver`, and the K products of a block are computed
+    concurrently, each instance solving one perturbed state. The next block is made of the new
+    products, orthonormalized.
+
+    The first block is made of :math:`-F(X)`, completed by its parts on each :class:`.DataManager`
+    (if there are several of them). The directions of the previous linear system are kept (recycled
+    from one Newton iteration, or time step, to the next): they complete the blocks which would
+    otherwise have less than K vectors. The first linear system, without recycled directions, is
+    then solved with blocks of one vector if there is only one :class:`.DataManager`. With one
+    instance, the method is equivalent to :class:`.JFNKCoupler` (without restart nor
+    preconditioning), and no direction is kept.
+
+    :class:`.BlockJFNKCoupler` is a :class:`.Coupler` working with :
+
+    - A list of K instances of the same :class:`.PhysicsDriver` (possibly :class:`.Coupler`),
+      initialized in the same way. The first one computes :math:`f(X)`, all of them compute the
+      perturbed states. The :meth:`solve() <.PhysicsDriver.solve>` method of the instances of a block
+      is called before any call to :meth:`getSolveStatus() <.PhysicsDriver.getSolveStatus>`: they run
+      concurrently when they are remote (for example :class:`.MPIMasterPhysicsDriver`, each one
+      driving a copy of the code on its own processes). Local instances can also be run by a pool of
+      threads (see :meth:`setNumberOfThreads`).
+    - A list of K lists of :class:`.DataManager`, one list per instance (with the same structure).
+    - A list of K lists of two :class:`.Exchanger`, allowing to go from each instance to its
+      :class:`.DataManager` and vice versa.
+
+    The time step methods are called on all the instances. At the end of each time step, the other
+    instances than the first one are solved again (concurrently) with the converged data, so that
+    all the instances stay in the same state and can be validated.
+
+    The convergence criteria is : :math:`||f(X^{n}) - X^{n}|| / ||f(X^{n})|| < \\rm{tolerance}`. The
+    default norm used is the infinite norm. :meth:`.Coupler.setNormChoice` allows to choose another
+    one.
+
+    The default Newton tolerance is 1.E-6 and the default maximum Newton number of iterations is 10.
+    Call :meth:`setConvergenceParameters` to change them. The default Krylov tolerance is 1.E-4 and
+    the default maximum number of Krylov directions is 100. Call :meth:`setKrylovConvergenceParameters`
+    to change them.
+
+    Statistics about the last time step (Krylov directions, blocks, physics solves...) are given by
+    :meth:`getStatistics`.
+    """
+
+    def __init__(self, physics, exchangers, dataManagers):
+        """ Build a :class:`.BlockJFNKCoupler` object.
+
+        Parameters
+        ----------
+        physics : list[PhysicsDriver]
+            List of the K instances of the :class:`.PhysicsDriver` (possibly :class:`.Coupler`).
+        exchangers : list[list[Exchanger]]
+            List of K lists of exactly two :class:`.Exchanger`, allowing to go from each instance to
+            its :class:`.DataManager` and vice versa.
+        dataManagers : list[list[DataManager]]
+            List of K lists of :class:`.DataManager`, one per instance.
+        """
+        if not isinstance(physics, list) or not isinstance(exchangers, list) or not isinstance(dataManagers, list):
+            raise Exception("BlockJFNKCoupler.__init__ physics, exchangers and dataManagers must be lists!")
+        if len(physics) < 1:
+            raise Exception("BlockJFNKCoupler.__init__ There must be at least one PhysicsDriver")
+        if len(exchangers) != len(physics) or len(dataManagers) != len(physics):
+            raise Exception("BlockJFNKCoupler.__init__ There must be one list of Exchanger and one list of DataManager per PhysicsDriver")
+        for instanceExchangers, instanceData in zip(exchangers, dataManagers):
+            if not isinstance(instanceExchangers, list) or len(instanceExchangers) != 2:
+                raise Exception("BlockJFNKCoupler.__init__ There must be exactly two Exchanger per PhysicsDriver")
+            if not isinstance(instanceData, list) or len(instanceData) != len(dataManagers[0]):
+                raise Exception("BlockJFNKCoupler.__init__ All the PhysicsDriver must have the same number of DataManager")
+        Coupler.__init__(self, physics, exchangers, dataManagers[0])
+        self._instancesData = [CollaborativeDataManager(instanceData) for instanceData in dataManagers]
+        self._newtonTolerance = 1.E-6
+        self._newtonMaxIter = 10
+        self._krylovTolerance = 1.E-4
+        self._krylovMaxIter = 100
+        self._epsilon = 1.E-4
+        self._adaptiveEpsilon = False
+        self._nbThreads = 1
+        self._statistics = []
+        self._recycled = []
+        self._instancesFilled = False
+        self._iterationPrinter = Printer(2)
+        self._leaveIfFailed = False
+
+    def setConvergenceParameters(self, tolerance, maxiter):
+        """ Set the convergence parameters (tolerance and maximum number of iterations).
+
+        Parameters
+        ----------
+        tolerance
+            The convergence threshold in
+            :math:`||f(X^{n}) - X^{n}|| / ||f(X^{n})|| < \\rm{tolerance}`.
+        maxiter
+            The maximal number of iterations.
+        """
+        self._newtonTolerance = tolerance
+        self._newtonMaxIter = maxiter
+
+    def setKrylovConvergenceParameters(self, tolerance, maxiter):
+        """ Set the convergence parameters (tolerance and maximum number of directions) of the
+        Krylov method.
+
+        Parameters
+        ----------
+        tolerance
+            The convergence threshold of the Krylov method.
+        maxiter
+            The maximal number of Krylov directions (and then of jacobian-vector products) per Newton
+            iteration.
+        """
+        self._krylovTolerance = tolerance
+        self._krylovMaxIter = maxiter
+
+    def setEpsilon(self, epsilon):
+        """ Set the ``epsilon`` value of the method (see :meth:`.JFNKCoupler.setEpsilon`).
+
+        Parameters
+        ----------
+        epsilon
+            The ``epsilon`` value in the formula :math:`J_u v \\approx (F(u + \\varepsilon v) -
+            F(u))/\\varepsilon`. Default: 1.E-4.
+        """
+        self._epsilon = epsilon
+
+    def setAdaptiveEpsilon(self, adaptive):
+        """ Compute (or not) the ``epsilon`` value at each Newton iteration from the norm of the
+        current state (see :meth:`.JFNKCoupler.setAdaptiveEpsilon`).
+
+        Parameters
+        ----------
+        adaptive : bool
+            True to activate. Default: False.
+        """
+        self._adaptiveEpsilon = adaptive
+
+    def setNumberOfThreads(self, nbThreads):
+        """ Set the number of threads used to run the instances of a block concurrently (see
+        :meth:`.JacobiCoupler.setNumberOfThreads`).
+
+        Parameters
+        ----------
+        nbThreads : int
+            The number of threads (>= 1). 1 (default) means that the :meth:`solve()
+            <.PhysicsDriver.solve>` methods are called one after the other by the current thread.
+        """
+        if nbThreads < 1:
+            raise Exception("BlockJFNKCoupler.setNumberOfThreads The number of threads must be >= 1.")
+        self._nbThreads = nbThreads
+
+    def getNumberOfThreads(self):
+        """ Return the number of threads used to run the instances of a block concurrently.
+
+        Returns
+        -------
+        int
+            The number of threads.
+        """
+        return self._nbThreads
+
+    def getStatistics(self):
+        """ Return statistics about the Newton iterations of the last time step.
+
+        Returns
+        -------
+        list[dict]
+            One dictionary per Newton iteration, with the keys:
+
+            - ``"error"``: the Newton error at the beginning of the iteration;
+            - ``"krylovIterations"``: the number of Krylov directions (jacobian-vector products);
+            - ``"krylovError"``: the final (relative) Krylov error (None if no Krylov iteration);
+            - ``"blocks"``: the number of blocks of concurrent products;
+            - ``"epsilon"``: the ``epsilon`` value of the finite differences;
+            - ``"physicsSolves"``: the number of physics solves;
+            - ``"sequentialSolves"``: the number of physics solves made one after the other (the
+              base solve and one per block).
+        """
+        return self._statistics
+
+    def setPrintLevel(self, level):
+        """ Set the print level during iterations (0=None, 1 keeps last iteration, 2 prints every iteration).
+
+        Parameters
+        ----------
+        level : int
+            Integer in range [0;2]. Default: 2.
+        """
+        if not level in [0, 1, 2]:
+            raise Exception("BlockJFNKCoupler.setPrintLevel level should be one of [0, 1, 2]!")
+        self._iterationPrinter.setPrintLevel(level)
+
+    def setFailureManagement(self, leaveIfSolvingFailed):
+        """ Set if iterations should continue or not in case of solver failure
+        (:meth:`solveTimeStep` returns False).
+
+        Parameters
+        ----------
+        leaveIfSolvingFailed : bool
+            Set False to continue the iterations, True to stop. Default: False.
+        """
+        self._leaveIfFailed = leaveIfSolvingFailed
+
+    def clearRecycledDirections(self):
+        """ Forget the directions recycled from the previous linear system (and release their memory). """
+        self.releaseTemporaries(self._recycled)
+        self._recycled = []
+
+    def solveInstances(self, indices):
+        """ INTERNAL Call :meth:`solve() <.PhysicsDriver.solve>` on the instances ``indices`` before collecting their status. """
+        instances = [self._physicsDriversList[index] for index in indices]
+        mapInThreadPool(lambda physics: physics.solve(), instances, self._nbThreads)
+        succeed = True
+        for physics in instances:
+            succeed = physics.getSolveStatus() and succeed
+        return succeed
+
+    def _perturbed(self, index, values, direction, epsilon):
+        """ INTERNAL Write ``values + epsilon direction`` in the DataManager of the instance ``index`` and return it. """
+        instanceData = self._instancesData[index]
+        instanceData.linearCombination([1., epsilon], [values, direction])
+        return instanceData
+
+    def _pushData(self, index, values, normData):
+        """ INTERNAL Set the (normalized) ``values`` in the DataManager of the instance ``index`` and give them to it, at the beginning of the time step. """
+        instanceData = self._instancesData[index]
+        if any(mine is not other for mine, other in zip(instanceData.dataManagers, values.dataManagers)):
+            instanceData.copy(values)
+        for dataManager, norm in zip(instanceData.dataManagers, normData):
+            if norm > 0.:
+                dataManager *= norm
+        physics = self._physicsDriversList[index]
+        physics.abortTimeStep()
+        physics.initTimeStep(self._dt)
+        self._exchangers[index][1].exchange()
+
+    def _pullData(self, index, normData):
+        """ INTERNAL Get the output of the instance ``index`` in its DataManager, normalized. """
+        self._exchangers[index][0].exchange()
+        instanceData = self._instancesData[index]
+        for dataManager, norm in zip(instanceData.dataManagers, normData):
+            if norm > 0.:
+                dataManager *= 1. / norm
+        return instanceData
+
+    @staticmethod
+    def _orthonormalBlock(candidates, pending, basis, size):
+        """ INTERNAL Return (at most ``size``) new orthonormal vectors orthogonal to ``basis``, built from the ``candidates`` then from the ``pending`` ones (consumed). """
+        block = []
+        candidates = list(candidates)
+        while len(block) < size and (len(candidates) > 0 or len(pending) > 0):
+            candidate = candidates.pop(0) if len(candidates) > 0 else pending.pop(0)
+            vector = candidate.clone()
+            norm = vector.norm2()
+            orthogonalize(vector, basis + block)
+            newNorm = vector.norm2()
+            if newNorm <= 1.E-10 * norm:
+                vector.release()
+                continue
+            vector *= 1. / newNorm
+            block.append(vector)
+        return block
+
+    def solveTimeStep(self):
+        """ Solve a time step using the block Jacobian-Free Newton Krylov algorithm.
+
+        See also :meth:`c3po.PhysicsDriver.PhysicsDriver.solveTimeStep`.
+        """
+        physics = self._physicsDriversList[0]
+        nbInstances = len(self._physicsDriversList)
+        iterNewton = 0
+        residual = 0
+        previousData = 0
+        self._statistics = []
+
+        # On calcul ici l'etat "0"
+        # At the first call, the other instances are also solved, in order to fill their DataManager.
+        self.applyPredictor(self._exchangers[0][1])
+        indices = [0] if self._instancesFilled else range(nbInstances)
+        succeed = self.solveInstances(indices)
+        if self._leaveIfFailed and not succeed:
+            return False
+        for index in indices:
+            self._exchangers[index][0].exchange()
+        self._instancesFilled = True
+
+        data = CollaborativeDataManager(self._dataManagers)
+        normData = self.readNormData()
+        self.normalizeData(normData)
+
+        errorNewton = self._newtonTolerance + 1
+        epsilon = self._epsilon
+
+        while errorNewton > self._newtonTolerance and iterNewton < self._newtonMaxIter:
+            if iterNewton == 0:
+                residual = data.clone()
+                previousData = data.clone()
+            else:
+                residual.copy(data)
+                previousData.copy(data)
+
+            self._pushData(0, data, normData)
+            physics.solve()
+            nbSolves = 1
+            if self._leaveIfFailed and not physics.getSolveStatus():
+                self.releaseTemporaries([residual, previousData])
+                return False
+            self._pullData(0, normData)
+
+            residual -= data  # residual is the second member of the linear system: -F(x) = -(f(x)-x)
+            norms2, normsMax, _ = residual.reduceNorms([data, previousData])
+            norm2Residual = norms2[0]
+            normResidual, normNewData = self.chooseNorms(norms2[:2], normsMax[:2])
+            errorNewton = normResidual / normNewData
+            if self._adaptiveEpsilon:
+                epsilon = math.sqrt((1. + norms2[2]) * np.finfo(float).eps)
+            statistics = {"error": float(errorNewton), "krylovIterations": 0, "krylovError": None, "blocks": 0,
+                          "epsilon": epsilon, "physicsSolves": 1, "sequentialSolves": 1}
+            self._statistics.append(statistics)
+
+            if self._iterationPrinter.getPrintLevel() > 0:
+                self._iterationPrinter.print("Block JFNK Newton iteration {} initial error : {:.5e}".format(iterNewton, errorNewton))
+
+            if errorNewton > self._newtonTolerance:
+                # First block: -F(x), its parts on each DataManager and the recycled directions.
+                parts = []
+                if nbInstances > 1 and len(residual.dataManagers) > 1:
+                    for i in range(len(residual.dataManagers)):
+                        parts.append(residual.clone())
+                        for j, dataManager in enumerate(parts[-1].dataManagers):
+                            if j != i:
+                                dataManager *= 0.
+                pending = list(self._recycled)
+                block = self._orthonormalBlock([residual] + parts, pending, [], nbInstances)
+                self.releaseTemporaries(parts)
+
+                directions = []
+                basis = []  # Orthonormal basis of the products J directions.
+                matrixR = np.zeros((self._krylovMaxIter, self._krylovMaxIter))
+                projections = []
+                errorKrylov = 1.
+                nbBlocks = 0
+
+                while len(block) > 0 and errorKrylov > self._krylovTolerance and len(directions) < self._krylovMaxIter:
+                    self.releaseTemporaries(block[self._krylovMaxIter - len(directions):])
+                    block = block[:self._krylovMaxIter - len(directions)]
+                    for index, direction in enumerate(block):
+                        self._pushData(index, self._perturbed(index, previousData, direction, epsilon), normData)
+                    succeed = self.solveInstances(range(len(block)))
+                    if self._leaveIfFailed and not succeed:
+                        self.releaseTemporaries([residual, previousData] + directions + basis + block)
+                        return False
+                    nbBlocks += 1
+                    nbSolves += len(block)
+
+                    newBasis = []
+                    for index, direction in enumerate(block):
+                        product = self._pullData(index, normData).clone()
+                        # product = J direction = (f(x + epsilon direction) - x - epsilon direction + residual) / epsilon
+                        product.linearCombination([1. / epsilon, -1. / epsilon, -1., 1. / epsilon],
+                                                  [product, previousData, direction, residual])
+                        column = len(directions)
+                        matrixR[:column, column] = orthogonalize(product, basis)
+                        matrixR[column, column] = product.norm2()
+                        if matrixR[column, column] <= 0.:
+                            raise Exception("BlockJFNKCoupler.solveTimeStep The jacobian-vector products are linearly dependent.")
+                        product *= 1. / matrixR[column, column]
+                        directions.append(direction)
+                        basis.append(product)
+                        newBasis.append(product)
+                        projections.append(residual.dot(product))
+                    errorKrylov = math.sqrt(max(norm2Residual * norm2Residual - sum(projection * projection for projection in projections), 0.)) / norm2Residual
+
+                    if self._iterationPrinter.getPrintLevel() > 0:
+                        self._iterationPrinter.print("    Block JFNK block {} ({} directions) error : {:.5e}".format(nbBlocks - 1, len(block), errorKrylov))
+
+                    block = []
+                    if errorKrylov > self._krylovTolerance and len(directions) < self._krylovMaxIter:
+                        block = self._orthonormalBlock(newBasis, pending, directions, nbInstances)
+
+                self.releaseTemporaries(block)
+                size = len(directions)
+                if size > 0:
+                    coeffs = solveUpperTriangular(matrixR[:size, :size], np.array(projections))
+                    data.linearCombination([1.] + [float(coeff) for coeff in coeffs], [previousData] + directions)
+                else:
+                    data.copy(previousData)
+
+                self.clearRecycledDirections()
+                if nbInstances > 1:
+                    self._recycled = directions
+                    self.releaseTemporaries(basis)
+                else:
+                    self.releaseTemporaries(directions + basis)
+
+                statistics.update({"krylovIterations": size, "krylovError": float(errorKrylov) if size > 0 else None,
+                                   "blocks": nbBlocks, "physicsSolves": nbSolves, "sequentialSolves": 1 + nbBlocks})
+
+            iterNewton += 1
+
+        if self._iterationPrinter.getPrintLevel() == 1:
+            self._iterationPrinter.reprint(tmplevel=2)
+
+        # The other instances are solved with the converged data, in order to be validated.
+        succeed = physics.getSolveStatus()
+        if nbInstances > 1:
+            for index in range(1, nbInstances):
+                self._pushData(index, previousData, normData)
+            succeed = self.solveInstances(range(1, nbInstances)) and succeed
+
+        self.releaseTemporaries([residual, previousData])
+        self.denormalizeData(normData)
+        return succeed and errorNewton <= self._newtonTolerance
+
+    def terminate(self):
+        """ Forget the recycled directions (see :meth:`clearRecycledDirections`), and see :meth:`.PhysicsDriver.terminate`. """
+        self.clearRecycledDirections()
+        Coupler.terminate(self)
+
+    def getSolveStatus(self):
+        """ See :meth:`.PhysicsDriver.getSolveStatus`. """
+        return PhysicsDriver.getSolveStatus(self)
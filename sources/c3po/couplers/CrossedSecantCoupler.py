@@ -41,6 +41,9 @@ class CrossedSecantCoupler(Coupler):
 
         (F(X^{n-1}) - X^{n-1}))]/(||F(X^{n}) - X^{n} - (F(X^{n-1}) - X^{n-1})||^2)
 
+    The last secant factor can be carried from one time step to the next (see :meth:`setWarmStart`): the
+    first iteration of the time step is then accelerated with it.
+
     The convergence criteria is : :math:`||F(X^{n}) - X^{n}|| / ||F(X^{n})|| < \\rm{tolerance}`. The default
     norm used is the infinite norm. :meth:`setNormChoice() <.Coupler.setNormChoice>` allows to choose another one.
 
@@ -66,6 +69,10 @@ class CrossedSecantCoupler(Coupler):
         self._tolerance = 1.E-6
         self._maxiter = 100
         self._iterationPrinter = Printer(2)
+        self._warmStart = False
+        self._factor = None
+        self._factorDt = None
+        self._normData = None
 
         if not isinstance(physics, list) or not isinstance(exchangers, list) or not isinstance(dataManagers, list):
             raise Exception("CrossedSecantCoupler.__init__ physics, exchangers and dataManagers must be lists!")
@@ -99,6 +106,30 @@ class CrossedSecantCoupler(Coupler):
             raise Exception("FixedPointCoupler.setPrintLevel level should be one of [0, 1, 2]!")
         self._iterationPrinter.setPrintLevel(level)
 
+    def setWarmStart(self, warmStart):
+        """ Set whether the last secant factor is carried from one time step to the next.
+
+        The first iteration of a time step is then accelerated with the last factor of the previous
+        time step, and the data are normalized with the norms of the time step that initiated the
+        history. The history is discarded when it becomes stale: when the time step changes, and by
+        :meth:`setStationaryMode` (if the mode changes) and :meth:`resetTime`. It can also be
+        discarded with :meth:`clearHistory`.
+
+        Parameters
+        ----------
+        warmStart : bool
+            True to carry the history from one time step to the next. Default: False.
+        """
+        self._warmStart = warmStart
+        if not warmStart:
+            self.clearHistory()
+
+    def clearHistory(self):
+        """ Discard the history carried from one time step to the next (see :meth:`setWarmStart`). """
+        self._factor = None
+        self._factorDt = None
+        self._normData = None
+
     def solveTimeStep(self):
         """ Solve a time step using the damped fixed-point algorithm.
 
@@ -114,11 +145,18 @@ class CrossedSecantCoupler(Coupler):
         if self._iterationPrinter.getPrintLevel() > 0:
             self._iterationPrinter.print("crossed secant iteration {} ".format(iiter))
 
+        self.applyPredictor(data2physics)
+        self.applyAccuracy(None, newTimeStep=True)
         physics.solve()
+        self.readInnerIterations()
         physics2Data.exchange()
 
+        if self._factor is not None and self._factorDt != self._dt:
+            self.clearHistory()
         data = CollaborativeDataManager(self._dataManagers)
-        normData = self.readNormData()
+        if self._normData is None:
+            self._normData = self.readNormData()
+        normData = self._normData
         self.normalizeData(normData)
         diffData = data.clone()
         iiter += 1
@@ -129,18 +167,25 @@ class CrossedSecantCoupler(Coupler):
         self.denormalizeData(normData)
         data2physics.exchange()
 
+        self.applyAccuracy(None)
         physics.solve()
+        self.readInnerIterations()
         physics2Data.exchange()  # data = G(X0) , previousData = X0
         self.normalizeData(normData)
         diffData -= data
         diffDataOld = diffData.clone()  # G(x0) - x0
 
-        error = self.getNorm(diffData) / self.getNorm(data)
+        normDiff, normNewData = self.getNorms([diffData, data])
+        error = normDiff / normNewData
         iiter += 1
         if self._iterationPrinter.getPrintLevel() > 0:
-            self._iterationPrinter.print("crossed secant iteration {} error : {:.5e} ".format(iiter - 1, error))
+            self._iterationPrinter.print("crossed secant iteration {} error : {:.5e}{}".format(iiter - 1, error, self.getAccuracyReport()))
         dataOld = data.clone()  # dataOld = X1 = G(x0)
+        if error > self._tolerance and self._factor is not None:
+            # Factor carried from the previous time step: the acceleration starts now.
+            data.axpy(self._factor, diffData)
         diffData.copy(data)
+        factor = self._factor
 
         while error > self._tolerance and iiter < self._maxiter:
             self.abortTimeStep()
@@ -148,34 +193,58 @@ class CrossedSecantCoupler(Coupler):
             self.denormalizeData(normData)
             data2physics.exchange()
 
+            self.applyAccuracy(error)
             physics.solve()
+            self.readInnerIterations()
             physics2Data.exchange()
             self.normalizeData(normData)
 
             diffData -= data
 
-            error = self.getNorm(diffData) / self.getNorm(data)
+            normDiff, normNewData = self.getNorms([diffData, data])
+            error = normDiff / normNewData
             iiter += 1
             if self._iterationPrinter.getPrintLevel() > 0:
-                self._iterationPrinter.print("crossed secant iteration {} error : {:.5e} ".format(iiter - 1, error))
+                self._iterationPrinter.print("crossed secant iteration {} error : {:.5e}{}".format(iiter - 1, error, self.getAccuracyReport()))
 
             if error > self._tolerance:
                 dataOld -= data
                 diffDataOld -= diffData
-                normDenominator = diffDataOld.norm2()
-                factor = - dataOld.dot(diffDataOld) / (normDenominator * normDenominator)
+                norms2, _, dots = diffDataOld.reduceNorms([dataOld], [(0, 1)])
+                factor = - dots[0] / (norms2[0] * norms2[0])
                 dataOld.copy(data)
                 diffDataOld.copy(diffData)
-                diffData *= factor
-                data += diffData
+                data.axpy(factor, diffData)
                 diffData.copy(data)
 
         if self._iterationPrinter.getPrintLevel() == 1:
             self._iterationPrinter.reprint(tmplevel=2)
 
+        self.releaseTemporaries([diffData, diffDataOld, dataOld])
         self.denormalizeData(normData)
+        if self._warmStart and factor is not None:
+            self._factor = factor
+            self._factorDt = self._dt
+        else:
+            self.clearHistory()
         return physics.getSolveStatus() and error <= self._tolerance
 
+    def setStationaryMode(self, stationaryMode):
+        """ Discard the history (see :meth:`clearHistory`) if the mode changes, and see :meth:`.PhysicsDriver.setStationaryMode`. """
+        if stationaryMode != self._stationaryMode:
+            self.clearHistory()
+        Coupler.setStationaryMode(self, stationaryMode)
+
+    def resetTime(self, time_):
+        """ Discard the history (see :meth:`clearHistory`), and see :meth:`.PhysicsDriver.resetTime`. """
+        self.clearHistory()
+        Coupler.resetTime(self, time_)
+
+    def terminate(self):
+        """ Discard the history (see :meth:`clearHistory`), and see :meth:`.PhysicsDriver.terminate`. """
+        self.clearHistory()
+        Coupler.terminate(self)
+
     def getSolveStatus(self):
         """ See :meth:`.PhysicsDriver.getSolveStatus`. """
         return PhysicsDriver.getSolveStatus(self)
\ No newline at end of file
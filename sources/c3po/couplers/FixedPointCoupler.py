@@ -84,6 +84,7 @@ class FixedPointCoupler(Coupler):
         self._data = CollaborativeDataManager(self._dataManagers)
         self._previousData = None
         self._normData = 0.
+        self._error = None
 
     def setConvergenceParameters(self, tolerance, maxiter):
         """ Set the convergence parameters (tolerance and maximum number of iterations).
@@ -161,11 +162,16 @@ class FixedPointCoupler(Coupler):
                 physics.abortTimeStep()
                 physics.initTimeStep(self._dt)
             data2physics.exchange()
+            self.applyAccuracy(self._error)
+        else:
+            self.applyPredictor(data2physics)
+            self.applyAccuracy(None, newTimeStep=True)
 
         if self._useIterate:
             physics.iterate()
         else:
             physics.solve()
+        self.readInnerIterations()
         physics2Data.exchange()
 
         if self._iter == 0:
@@ -173,12 +179,13 @@ class FixedPointCoupler(Coupler):
         self.normalizeData(self._normData)
 
         if self._iter > 0:
-            normNewData = self.getNorm(self._data)
-            self._data -= self._previousData
-            error = self.getNorm(self._data) / normNewData
+            # self._previousData temporarily holds the difference between two iterates.
+            self._previousData.axpby(1., self._data, -1.)
+            normDiff, normNewData = self.getNorms([self._previousData, self._data])
+            error = normDiff / normNewData
+            self._error = error
 
-            self._data *= self._dampingFactor
-            self._data += self._previousData
+            self._data.axpy(self._dampingFactor - 1., self._previousData)
 
             self._previousData.copy(self._data)
         else:
@@ -189,9 +196,9 @@ class FixedPointCoupler(Coupler):
 
         if self._iterationPrinter.getPrintLevel() > 0:
             if self._iter == 0:
-                self._iterationPrinter.print("fixed-point iteration {} ".format(self._iter))
+                self._iterationPrinter.print("fixed-point iteration {}{}".format(self._iter, self.getAccuracyReport()))
             else:
-                self._iterationPrinter.print("fixed-point iteration {} error : {:.5e}".format(self._iter, error))
+                self._iterationPrinter.print("fixed-point iteration {} error : {:.5e}{}".format(self._iter, error, self.getAccuracyReport()))
 
         self._iter += 1
 
@@ -228,5 +235,7 @@ class FixedPointCoupler(Coupler):
     def initTimeStep(self, dt):
         """ See :meth:`c3po.PhysicsDriver.PhysicsDriver.initTimeStep`.  """
         self._iter = 0
+        self._error = None
+        self.releaseTemporaries([self._previousData])
         self._previousData = 0
         return Coupler.initTimeStep(self, dt)
@@ -0,0 +1,467 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2020, CEA
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following disclaimer in the documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products derived from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+""" Contain the class :class:`.IQNCoupler`. """
+from __future__ import print_function, division
+import numpy as np
+
+from c3po.PhysicsDriver import PhysicsDriver
+from c3po.Coupler import Coupler
+from c3po.CollaborativeDataManager import CollaborativeDataManager
+from c3po.services.AndersonHistory import solveUpperTriangular
+from c3po.services.SecantHistory import SecantHistory
+from c3po.services.Printer import Printer
+
+
+class IQNMethod(object):
+    """ Enum definition of the interface quasi-Newton methods of :class:`.IQNCoupler`.
+
+    Values :
+        - :attr:`ILS`: IQN-ILS (least squares), the secant information of previous time steps is
+          reused as additional columns.
+        - :attr:`IMVJ`: IQN-IMVJ (multi-vector Jacobian), the secant information of previous time
+          steps is reused through an approximation of the inverse jacobian.
+    """
+    ILS = 0
+    IMVJ = 1
+
+
+class IQNCoupler(Coupler):
+    """ :class:`.IQNCoupler` inherits from :class:`.Coupler` and proposes interface quasi-Newton
+    algorithms (IQN-ILS and IQN-IMVJ) which can reuse the secant information of previous time steps.
+
+    The class proposes an algorithm for the resolution of :math:`F(X) = X`. Thus
+    :class:`.IQNCoupler` is a :class:`.Coupler` working with :
+
+    - A single :class:`.PhysicsDriver` (possibly a :class:`.Coupler`) defining the calculations to
+      be made each time :math:`F` is called.
+    - A list of :class:`.DataManager` allowing to manipulate the data in the coupling (the :math:`X`).
+    - Two :class:`.Exchanger` allowing to go from the :class:`.PhysicsDriver` to the
+      :class:`.DataManager` and vice versa.
+
+    Each :class:`.DataManager` is normalized with its own norm got after the first iteration (of the
+    first time step, while secant information is reused). They are then used as a single
+    :class:`.DataManager` using :class:`.CollaborativeDataManager`.
+
+    With :math:`R^{n} = F(X^{n}) - X^{n}`, the columns of :math:`V` are the differences
+    :math:`R^{n} - R^{n-1}` and the columns of :math:`W` the differences :math:`F(X^{n}) - F(X^{n-1})`.
+    With :math:`\\gamma` minimizing :math:`||R^{n} - V \\gamma||`:
+
+    - IQN-ILS: :math:`X^{n+1} = F(X^{n}) - W \\gamma`. The columns of the previous time steps are kept
+      in :math:`V` and :math:`W`.
+    - IQN-IMVJ: :math:`X^{n+1} = F(X^{n}) - W \\gamma - J_{prev} (R^{n} - V \\gamma)`, where
+      :math:`J_{prev}` is the approximation of the inverse jacobian built on the previous time steps
+      (:math:`J_{prev} = 0` at the first time step). It is stored as low-rank updates (two vectors
+      per column of :math:`V`), one per time step.
+
+    Without secant information (first iterations of the first time step), a relaxation
+    :math:`X^{n+1} = X^{n} + \\omega R^{n}` is used (see :meth:`setDampingFactor`).
+
+    The secant information of a time step is kept only if the time step is validated
+    (:meth:`validateTimeStep`). The reuse depth (see :meth:`setReuseDepth`) is the number of
+    previous time steps reused. It is discarded by :meth:`resetTime` and
+    :meth:`setStationaryMode`, or explicitly by :meth:`clearHistory`.
+
+    The columns which are (almost) linearly dependent on newer ones are removed (QR filtering, see
+    :meth:`setFilterTolerance`).
+
+    The convergence criteria is : :math:`||F(X^{n}) - X^{n}|| / ||F(X^{n})|| < \\rm{tolerance}`. The default
+    norm used is the infinite norm. :meth:`.Coupler.setNormChoice` allows to choose another one.
+
+    The default value of tolerance is 1.E-6. Call :meth:`setConvergenceParameters` to change it.
+
+    The default maximum number of iterations is 100. Call :meth:`setConvergenceParameters` to
+    change it.
+    """
+
+    def __init__(self, physics, exchangers, dataManagers):
+        """ Build a :class:`.IQNCoupler` object.
+
+        Parameters
+        ----------
+        physics : list[PhysicsDriver], list[Coupler]
+            List of only one :class:`.PhysicsDriver` (possibly a :class:`.Coupler`).
+        exchangers : list[Exchanger]
+            List of exactly two :class:`.Exchanger` allowing to go from the :class:`.PhysicsDriver`
+            to the :class:`.DataManager` and vice versa.
+        dataManagers : list[DataManager]
+            List of :class:`.DataManager`.
+        """
+        Coupler.__init__(self, physics, exchangers, dataManagers)
+        self._tolerance = 1.E-6
+        self._maxiter = 100
+        self._method = IQNMethod.ILS
+        self._maxColumns = 50
+        self._reuseDepth = 0
+        self._filterTolerance = 1.E-3
+        self._dampingFactor = 1.
+        self._historyStorageType = np.float64
+        self._historyStore = None
+        self._iterationPrinter = Printer(2)
+        self._leaveIfFailed = False
+
+        if not isinstance(physics, list) or not isinstance(exchangers, list) or not isinstance(dataManagers, list):
+            raise Exception("IQNCoupler.__init__ physics, exchangers and dataManagers must be lists!")
+        if len(physics) != 1:
+            raise Exception("IQNCoupler.__init__ There must be only one PhysicsDriver")
+        if len(exchangers) != 2:
+            raise Exception("IQNCoupler.__init__ There must be exactly two Exchanger")
+
+        self._history = None
+        self._jacobianTerms = []
+        self._pendingTerm = None
+        self._pending = False
+        self._normData = None
+
+    def setConvergenceParameters(self, tolerance, maxiter):
+        """ Set the convergence parameters (``tolerance`` and maximum number of iterations).
+
+        Parameters
+        ----------
+        tolerance
+            The convergence threshold in
+            :math:`||F(X^{n}) - X^{n}|| / ||F(X^{n})|| < \\rm{tolerance}`.
+        maxiter
+            The maximal number of iterations.
+        """
+        self._tolerance = tolerance
+        self._maxiter = maxiter
+
+    def setMethod(self, method):
+        """ Set the quasi-Newton method.
+
+        Parameters
+        ----------
+        method : int
+            A value of :class:`.IQNMethod`. Default: ``IQNMethod.ILS``.
+        """
+        if method not in [IQNMethod.ILS, IQNMethod.IMVJ]:
+            raise Exception("IQNCoupler.setMethod method should be a value of IQNMethod!")
+        self._method = method
+        self.clearHistory()
+
+    def setMaximumColumns(self, maxColumns):
+        """ Set the maximum number of columns of :math:`V` and :math:`W` (the oldest are deleted first).
+
+        Parameters
+        ----------
+        maxColumns : int
+            The maximum number of columns. Default: 50.
+        """
+        if maxColumns <= 0:
+            raise Exception("IQNCoupler.setMaximumColumns Set a number of columns > 0 !")
+        self._maxColumns = maxColumns
+        self.clearHistory()
+
+    def setReuseDepth(self, reuseDepth):
+        """ Set the number of previous (validated) time steps whose secant information is reused.
+
+        Only the time steps which brought secant information are counted: a time step converged
+        without any new column does not push the older information out.
+
+        Parameters
+        ----------
+        reuseDepth : int
+            The number of time steps. 0 (default) means no reuse.
+        """
+        if reuseDepth < 0:
+            raise Exception("IQNCoupler.setReuseDepth Set a depth >= 0 !")
+        self._reuseDepth = reuseDepth
+
+    def setFilterTolerance(self, filterTolerance):
+        """ Set the tolerance of the QR filtering: a column is removed if the norm of its part
+        orthogonal to the newer columns is lower than ``filterTolerance`` times its norm.
+
+        Parameters
+        ----------
+        filterTolerance : float
+            The tolerance. Default: 1.E-3. 0 removes only the exactly dependent columns.
+        """
+        self._filterTolerance = filterTolerance
+        self.clearHistory()
+
+    def setDampingFactor(self, dampingFactor):
+        """ Set the relaxation factor used without secant information.
+
+        Parameters
+        ----------
+        dampingFactor
+            The factor :math:`\\omega` in :math:`X^{n+1} = X^{n} + \\omega (F(X^{n}) - X^{n})`. Default: 1.
+        """
+        self._dampingFactor = dampingFactor
+
+    def setHistoryStorageType(self, dtype):
+        """ Set the type used to store the secant information, see :meth:`.DataManager.setStorageType`
+        and :meth:`.AndersonCoupler.setHistoryStorageType`.
+
+        Parameters
+        ----------
+        dtype : numpy.dtype
+            ``numpy.float64`` (default) or ``numpy.float32``.
+        """
+        self._historyStorageType = dtype
+        self.clearHistory()
+
+    def setHistoryStore(self, historyStore):
+        """ Set a :class:`.HistoryStore` to bound the RAM used by the secant information.
+
+        Parameters
+        ----------
+        historyStore : HistoryStore
+            The :class:`.HistoryStore` to use, or None (default) to keep the whole history in RAM.
+        """
+        self._historyStore = historyStore
+        self.clearHistory()
+
+    def setPrintLevel(self, level):
+        """ Set the print level during iterations (0=None, 1 keeps last iteration, 2 prints every iteration).
+
+        Parameters
+        ----------
+        level : int
+            Integer in range ``[0;2]``. Default: 2.
+        """
+        if not level in [0, 1, 2]:
+            raise Exception("IQNCoupler.setPrintLevel level should be one of [0, 1, 2]!")
+        self._iterationPrinter.setPrintLevel(level)
+
+    def setFailureManagement(self, leaveIfSolvingFailed):
+        """ Set if iterations should continue or not in case of solver failure
+        (:meth:`solveTimeStep` returns False).
+
+        Parameters
+        ----------
+        leaveIfSolvingFailed : bool
+            Set False to continue the iterations, True to stop. Default: False.
+        """
+        self._leaveIfFailed = leaveIfSolvingFailed
+
+    def clearHistory(self):
+        """ Discard the secant information of the previous time steps. """
+        if self._history is not None:
+            self._history.release()
+        self._history = None
+        for term in self._jacobianTerms + ([self._pendingTerm] if self._pendingTerm is not None else []):
+            self.releaseTemporaries(term[0] + term[1])
+        self._jacobianTerms = []
+        self._pendingTerm = None
+        self._pending = False
+        self._normData = None
+        if self._historyStore is not None:
+            self._historyStore.clear()
+
+    def getNbReusedColumns(self):
+        """ Return the number of columns of :math:`V` of the previous time steps available for the next time step (IQN-ILS).
+
+        Returns
+        -------
+        int
+            The number of columns.
+        """
+        if self._history is None:
+            return 0
+        groups = self._history.getGroups()
+        if self._pending:
+            groups = groups[1:]
+        return sum(groups[:self._reuseDepth])
+
+    def _startTimeStep(self):
+        """ INTERNAL Discard the secant information of a not validated time step, and the one beyond the reuse depth. """
+        if self._pending:
+            if self._history is not None:
+                self._history.dropNewestGroup()
+            if self._pendingTerm is not None:
+                self.releaseTemporaries(self._pendingTerm[0] + self._pendingTerm[1])
+                self._pendingTerm = None
+            self._pending = False
+        if self._history is None:
+            self._history = SecantHistory(self._maxColumns, self._filterTolerance)
+            self._history.setStorage(self._historyStorageType, self._historyStore)
+        self._history.keepGroups(self._reuseDepth if self._method == IQNMethod.ILS else 0)
+        while len(self._jacobianTerms) > self._reuseDepth:
+            term = self._jacobianTerms.pop()
+            self.releaseTemporaries(term[0] + term[1])
+        if self._reuseDepth == 0:
+            self._normData = None
+        self._history.startGroup()
+        self._pending = True
+
+    def _applyInverseJacobian(self, vector):
+        """ INTERNAL Return the coefficients and vectors of the product of the inverse jacobian of the previous time steps with ``vector``. """
+        coeffs = []
+        managers = []
+        for vectorsA, vectorsQ in self._jacobianTerms:
+            coeffs += list(vector.dotMany(vectorsQ))
+            managers += vectorsA
+        return coeffs, managers
+
+    def _buildJacobianTerm(self):
+        """ INTERNAL Build the low-rank update of the inverse jacobian with the columns of the current time step: ``(W R^-1 - J_prev Q) Q^T``. """
+        history = self._history
+        size = history.getSize()
+        if size == 0:
+            return [], []
+        matrixR = history.getMatrixR()
+        basis = history.getBasis()
+        deltaW = history.getDeltaW()
+        inverseR = np.zeros((size, size))
+        for j in range(size):
+            unit = np.zeros(size)
+            unit[j] = 1.
+            inverseR[:, j] = solveUpperTriangular(matrixR, unit)
+        vectorsA = []
+        vectorsQ = []
+        for j in range(size):
+            coeffs, managers = self._applyInverseJacobian(basis[j])
+            vectorA = basis[j].clone()
+            vectorA.setStorageType(self._historyStorageType)
+            vectorA.linearCombination(list(inverseR[:, j]) + [-coeff for coeff in coeffs], deltaW + managers)
+            vectorQ = basis[j].clone()
+            vectorQ.setStorageType(self._historyStorageType)
+            for vector in [vectorA, vectorQ]:
+                if self._historyStore is not None:
+                    self._historyStore.add(vector)
+            vectorsA.append(vectorA)
+            vectorsQ.append(vectorQ)
+        return vectorsA, vectorsQ
+
+    def solveTimeStep(self):
+        """ Solve a time step using the interface quasi-Newton algorithm.
+
+        See also :meth:`c3po.PhysicsDriver.PhysicsDriver.solveTimeStep`.
+        """
+        physics = self._physicsDrivers[0]
+        physics2Data = self._exchangers[0]
+        data2physics = self._exchangers[1]
+        iiter = 0
+        self._startTimeStep()
+        history = self._history
+
+        # Iteration 0: initial state
+        if self._iterationPrinter.getPrintLevel() > 0:
+            self._iterationPrinter.print("IQN iteration {} ".format(iiter))
+
+        physics.solve()
+        if self._leaveIfFailed and not physics.getSolveStatus():
+            return False
+        physics2Data.exchange()
+
+        data = CollaborativeDataManager(self._dataManagers)
+        if self._normData is None:
+            self._normData = self.readNormData()
+        normData = self._normData
+        self.normalizeData(normData)
+
+        previousData = data.clone()
+        residual = 0
+        deltaR = 0
+        deltaW = 0
+        projected = 0
+        error = self._tolerance + 1.
+        iiter += 1
+
+        while error > self._tolerance and iiter < self._maxiter:
+            self.abortTimeStep()
+            self.initTimeStep(self._dt)
+            self.denormalizeData(normData)
+            data2physics.exchange()
+            physics.solve()
+            if self._leaveIfFailed and not physics.getSolveStatus():
+                return False
+            physics2Data.exchange()     # data contains F(X^n), previousData contains X^n
+            self.normalizeData(normData)
+
+            if residual == 0:
+                residual = data - previousData
+            else:
+                residual.linearCombination([1., -1.], [data, previousData])
+            normDiff, normNewData = self.getNorms([residual, data])
+            error = normDiff / normNewData
+
+            if error > self._tolerance:
+                if deltaR == 0:
+                    deltaR = residual * -1.
+                    deltaW = data * -1.
+                else:
+                    deltaR += residual
+                    deltaW += data
+                    history.add(deltaR, deltaW)
+                    deltaR.axpby(-1., residual, 0.)
+                    deltaW.axpby(-1., data, 0.)
+
+                coeffs = [1.]
+                managers = [data]
+                if history.getSize() > 0:
+                    gamma = history.solve(residual)
+                    coeffs += list(-gamma)
+                    managers += history.getDeltaW()
+                if self._method == IQNMethod.IMVJ and self._jacobianTerms:
+                    # projected = R^n - V gamma = R^n - Q (R gamma)
+                    if projected == 0:
+                        projected = residual.clone()
+                    if history.getSize() > 0:
+                        projected.linearCombination([1.] + list(-np.dot(history.getMatrixR(), gamma)), [residual] + history.getBasis())
+                    else:
+                        projected.copy(residual)
+                    jacobianCoeffs, jacobianManagers = self._applyInverseJacobian(projected)
+                    coeffs += [-coeff for coeff in jacobianCoeffs]
+                    managers += jacobianManagers
+                if len(coeffs) == 1:
+                    coeffs.append(self._dampingFactor - 1.)
+                    managers.append(residual)
+                data.linearCombination(coeffs, managers)
+
+                previousData.copy(data)
+
+            iiter += 1
+            if self._iterationPrinter.getPrintLevel() > 0:
+                self._iterationPrinter.print("IQN iteration {} error : {:.5e} ".format(iiter - 1, error))
+
+        if self._iterationPrinter.getPrintLevel() == 1:
+            self._iterationPrinter.reprint(tmplevel=2)
+
+        if self._method == IQNMethod.IMVJ and self._reuseDepth > 0:
+            self._pendingTerm = self._buildJacobianTerm()
+
+        self.releaseTemporaries([residual, previousData, deltaR, deltaW, projected])
+        self.denormalizeData(normData)
+        return physics.getSolveStatus() and error <= self._tolerance
+
+    def validateTimeStep(self):
+        """ Keep the secant information of the time step for the next ones, and see
+        :meth:`.PhysicsDriver.validateTimeStep`. """
+        if self._pending:
+            if self._pendingTerm is not None and self._pendingTerm[0]:
+                self._jacobianTerms.insert(0, self._pendingTerm)
+            self._pendingTerm = None
+            self._pending = False
+        Coupler.validateTimeStep(self)
+
+    def setStationaryMode(self, stationaryMode):
+        """ Discard the secant information (see :meth:`clearHistory`) if the mode changes, and see
+        :meth:`.PhysicsDriver.setStationaryMode`. """
+        if stationaryMode != self._stationaryMode:
+            self.clearHistory()
+        Coupler.setStationaryMode(self, stationaryMode)
+
+    def resetTime(self, time_):
+        """ Discard the secant information (see :meth:`clearHistory`), and see :meth:`.PhysicsDriver.resetTime`. """
+        self.clearHistory()
+        Coupler.resetTime(self, time_)
+
+    def terminate(self):
+        """ Release the secant information, and see :meth:`.PhysicsDriver.terminate`. """
+        self.clearHistory()
+        Coupler.terminate(self)
+
+    def getSolveStatus(self):
+        """ See :meth:`.PhysicsDriver.getSolveStatus`. """
+        return PhysicsDriver.getSolveStatus(self)
@@ -16,22 +16,24 @@ import numpy as np
 from c3po.PhysicsDriver import PhysicsDriver
 from c3po.Coupler import Coupler
 from c3po.CollaborativeDataManager import CollaborativeDataManager
+from c3po.services.GMRES import GMRES, GramSchmidt
+from c3po.services.Preconditioner import Preconditioner, FunctionPreconditioner
 from c3po.services.Printer import Printer
 
 
-def solveTriang(matrixA, vectorB):
-    """ INTERNAL.
+class ForcingTerm(object):
+    """ Enum definition of the choice of the Krylov tolerance (forcing term) of :class:`.JFNKCoupler`.
 
-    Solves a triangular linear system.
+    Values :
+        - :attr:`constant`: the Krylov tolerance set with :meth:`.JFNKCoupler.setKrylovConvergenceParameters`.
+        - :attr:`choice1`: Eisenstat-Walker choice 1, based on the agreement between the nonlinear
+          residual and its linear model at the previous Newton iteration.
+        - :attr:`choice2`: Eisenstat-Walker choice 2, based on the decrease rate of the nonlinear
+          residual.
     """
-    dim = vectorB.shape[0]
-    resu = np.zeros(shape=(dim))
-    for i in range(dim - 1, -1, -1):
-        resu[i] = vectorB[i]
-        for j in range(dim - 1, i, -1):
-            resu[i] -= matrixA[i, j] * resu[j]
-        resu[i] /= matrixA[i, i]
-    return resu
+    constant = 0
+    choice1 = 1
+    choice2 = 2
 
 
 class JFNKCoupler(Coupler):
@@ -49,7 +51,8 @@ class JFNKCoupler(Coupler):
         J_u v \\approx (F(u + \\varepsilon v) - F(u))/\\varepsilon
 
     :math:`\\varepsilon` is a parameter of the algorithm. Its default value is 1E-4. Call
-    :meth:`setEpsilon` to change it
+    :meth:`setEpsilon` to change it, or :meth:`setAdaptiveEpsilon` to compute it from the norm of the
+    current state.
 
     JFNKCoupler is a Coupler working with :
 
@@ -80,6 +83,19 @@ class JFNKCoupler(Coupler):
     The default maximum Krylov iteration is 100. Call :meth:`setKrylovConvergenceParameters` to
     change it.
 
+    The Krylov tolerance can be adapted at each Newton iteration (Eisenstat-Walker forcing terms),
+    in order not to over-solve the first linear systems. Call :meth:`setForcingTerm` to activate it.
+    Statistics about the last time step (Krylov iterations, physics solves...) are given by
+    :meth:`getStatistics`.
+
+    The Krylov method is a restarted GMRES(m): the basis is limited to m + 1 vectors. By default,
+    m is the maximum Krylov iteration (no restart). Call :meth:`setKrylovRestart` to change it. The
+    Gram-Schmidt process used to orthogonalize the basis can be chosen with :meth:`setGramSchmidt`.
+
+    A right preconditioner can be set with :meth:`setPreconditioner` to reduce the number of Krylov
+    iterations (each one costs a physics solve). :class:`.SecantPreconditioner` reuses the Krylov
+    products of the previous Newton iterations and time steps.
+
     """
 
     def __init__(self, physics, exchangers, dataManagers):
@@ -101,6 +117,17 @@ class JFNKCoupler(Coupler):
         self._krylovTolerance = 1.E-4
         self._krylovMaxIter = 100
         self._epsilon = 1.E-4
+        self._adaptiveEpsilon = False
+        self._forcingTerm = ForcingTerm.constant
+        self._etaMax = 0.9
+        self._gamma = 0.9
+        self._alpha = 2.
+        self._statistics = []
+        self._krylovRestart = None
+        self._gramSchmidt = GramSchmidt.iterated
+        self._preconditioner = None
+        self._basisStorageType = np.float64
+        self._basisStore = None
         self._iterationPrinter = Printer(2)
         self._leaveIfFailed = False
 
@@ -139,6 +166,93 @@ class JFNKCoupler(Coupler):
         self._krylovTolerance = tolerance
         self._krylovMaxIter = maxiter
 
+    def setForcingTerm(self, forcingTerm, etaMax=0.9, gamma=0.9, alpha=2.):
+        """ Set the choice of the Krylov tolerance :math:`\\eta_k` (forcing term) of each Newton
+        iteration.
+
+        With Eisenstat-Walker choices, the first Newton iteration uses ``etaMax``. Then:
+
+        - choice 1: :math:`\\eta_k = |\\,||F_k|| - ||F_{k-1} + J_{k-1} s_{k-1}||\\,| / ||F_{k-1}||`, with
+          the safeguard :math:`\\eta_k = \\max(\\eta_k, \\eta_{k-1}^{(1+\\sqrt{5})/2})` if
+          :math:`\\eta_{k-1}^{(1+\\sqrt{5})/2} > 0.1`;
+        - choice 2: :math:`\\eta_k = \\gamma (||F_k|| / ||F_{k-1}||)^\\alpha`, with the safeguard
+          :math:`\\eta_k = \\max(\\eta_k, \\gamma \\eta_{k-1}^\\alpha)` if :math:`\\gamma \\eta_{k-1}^\\alpha > 0.1`.
+
+        :math:`\\eta_k` is then limited to ``etaMax``, and bounded from below by the Krylov tolerance
+        (see :meth:`setKrylovConvergenceParameters`) and by half the ratio between the Newton
+        tolerance and the current Newton error (to avoid over-solving the last Newton iteration).
+        The norms are norms 2.
+
+        Parameters
+        ----------
+        forcingTerm : int
+            A value of :class:`.ForcingTerm`. Default: ``ForcingTerm.constant``.
+        etaMax : float
+            The maximum forcing term, in ]0, 1[. Default: 0.9.
+        gamma : float
+            The :math:`\\gamma` parameter of choice 2, in ]0, 1]. Default: 0.9.
+        alpha : float
+            The :math:`\\alpha` parameter of choice 2, in ]1, 2]. Default: 2.
+        """
+        if forcingTerm not in [ForcingTerm.constant, ForcingTerm.choice1, ForcingTerm.choice2]:
+            raise Exception("JFNKCoupler.setForcingTerm forcingTerm should be a value of ForcingTerm!")
+        if not 0. < etaMax < 1. or not 0. < gamma <= 1. or not 1. < alpha <= 2.:
+            raise Exception("JFNKCoupler.setForcingTerm requires 0 < etaMax < 1, 0 < gamma <= 1 and 1 < alpha <= 2!")
+        self._forcingTerm = forcingTerm
+        self._etaMax = etaMax
+        self._gamma = gamma
+        self._alpha = alpha
+
+    def setKrylovRestart(self, restart):
+        """ Set the number of Krylov iterations after which GMRES is restarted (the m of GMRES(m)).
+
+        The Krylov basis is limited to ``restart + 1`` vectors.
+
+        Parameters
+        ----------
+        restart : int
+            The restart value, or None (default) to use the maximum Krylov iteration (no restart).
+        """
+        if restart is not None and restart < 1:
+            raise Exception("JFNKCoupler.setKrylovRestart restart must be >= 1 (or None)!")
+        self._krylovRestart = restart
+
+    def setGramSchmidt(self, gramSchmidt):
+        """ Set the Gram-Schmidt process used to orthogonalize the Krylov basis.
+
+        Parameters
+        ----------
+        gramSchmidt : int
+            A value of :class:`.GramSchmidt`. Default: ``GramSchmidt.iterated``.
+        """
+        if gramSchmidt not in [GramSchmidt.iterated, GramSchmidt.modified]:
+            raise Exception("JFNKCoupler.setGramSchmidt gramSchmidt should be a value of GramSchmidt!")
+        self._gramSchmidt = gramSchmidt
+
+    def setPreconditioner(self, preconditioner):
+        """ Set a right preconditioner :math:`M^{-1}`: the Krylov method solves
+        :math:`J M^{-1} y = -F(X)` and the Newton correction is :math:`M^{-1} y`.
+
+        The preconditioner may change from one Krylov iteration to another (flexible GMRES is used):
+        the preconditioned directions are stored in addition to the Krylov basis. The finite
+        difference products are computed with the preconditioned directions normalized: the
+        perturbation of the data is always of size ``epsilon`` (see :meth:`setEpsilon`).
+
+        Parameters
+        ----------
+        preconditioner : Preconditioner or callable
+            A :class:`.Preconditioner` (for instance :class:`.DiagonalPreconditioner`,
+            :class:`.FixedPointPreconditioner`, :class:`.JacobianPreconditioner` or
+            :class:`.SecantPreconditioner`), a function
+            ``preconditioner(vector, result)`` writing :math:`M^{-1}` ``vector`` in ``result`` (see
+            :meth:`.Preconditioner.apply`), or None (default) for no preconditioning.
+        """
+        if preconditioner is not None and not isinstance(preconditioner, Preconditioner):
+            if not callable(preconditioner):
+                raise Exception("JFNKCoupler.setPreconditioner preconditioner must be a Preconditioner, a callable or None!")
+            preconditioner = FunctionPreconditioner(preconditioner)
+        self._preconditioner = preconditioner
+
     def setEpsilon(self, epsilon):
         """ Set the ``epsilon`` value of the method.
 
@@ -150,6 +264,83 @@ class JFNKCoupler(Coupler):
         """
         self._epsilon = epsilon
 
+    def setAdaptiveEpsilon(self, adaptive):
+        """ Compute (or not) the ``epsilon`` value at each Newton iteration from the norm of the current state.
+
+        The perturbation is then :math:`\\varepsilon = \\sqrt{(1 + ||u||) \\epsilon_{mach}}` (for a
+        normalized direction), with :math:`||u||` the norm 2 of the current (normalized) state and
+        :math:`\\epsilon_{mach}` the machine precision. The value set with :meth:`setEpsilon` is then
+        ignored.
+
+        Parameters
+        ----------
+        adaptive : bool
+            True to activate. Default: False.
+        """
+        self._adaptiveEpsilon = adaptive
+
+    def getStatistics(self):
+        """ Return statistics about the Newton iterations of the last time step.
+
+        Returns
+        -------
+        list[dict]
+            One dictionary per Newton iteration, with the keys:
+
+            - ``"error"``: the Newton error at the beginning of the iteration;
+            - ``"forcingTerm"``: the Krylov tolerance used (None if the Newton algorithm has converged);
+            - ``"krylovIterations"``: the number of Krylov iterations;
+            - ``"krylovError"``: the final (relative) Krylov error (None if no Krylov iteration);
+            - ``"epsilon"``: the ``epsilon`` value of the finite differences;
+            - ``"physicsSolves"``: the number of physics solves (including the ones of the preconditioner).
+        """
+        return self._statistics
+
+    def _computeForcingTerm(self, norm2Residual, errorNewton, previous):
+        """ INTERNAL Return the Krylov tolerance of the Newton iteration. ``previous`` is None or (norm of F, norm of the linear residual, forcing term) of the previous Newton iteration. """
+        if self._forcingTerm == ForcingTerm.constant:
+            return self._krylovTolerance
+        if previous is None:
+            eta = self._etaMax
+        else:
+            previousNorm, linearResidual, previousEta = previous
+            if self._forcingTerm == ForcingTerm.choice1:
+                eta = abs(norm2Residual - linearResidual) / previousNorm
+                safeguard = previousEta ** ((1. + math.sqrt(5.)) / 2.)
+            else:
+                eta = self._gamma * (norm2Residual / previousNorm) ** self._alpha
+                safeguard = self._gamma * previousEta ** self._alpha
+            if safeguard > 0.1:
+                eta = max(eta, safeguard)
+            eta = min(eta, self._etaMax)
+        return max(eta, self._krylovTolerance, 0.5 * self._newtonTolerance / errorNewton)
+
+    def setBasisStorageType(self, dtype):
+        """ Set the type used to store the vectors of the Krylov basis, see :meth:`.DataManager.setStorageType`.
+
+        With ``numpy.float32``, the memory used by the basis is halved (for :class:`.LocalDataManager`
+        in packed storage mode), while all computations are still made in double precision. The
+        rounding of the basis to single precision limits the accuracy of the Krylov solution to
+        about 1.E-7: it is suitable for the usual (loose) Krylov tolerances.
+
+        Parameters
+        ----------
+        dtype : numpy.dtype
+            ``numpy.float64`` (default) or ``numpy.float32``.
+        """
+        self._basisStorageType = dtype
+
+    def setBasisStore(self, basisStore):
+        """ Set a :class:`.HistoryStore` to bound the RAM used by the Krylov basis: the least recently
+        updated vectors are moved in memory-mapped files when the RAM budget of the store is exceeded.
+
+        Parameters
+        ----------
+        basisStore : HistoryStore
+            The :class:`.HistoryStore` to use, or None (default) to keep the whole basis in RAM.
+        """
+        self._basisStore = basisStore
+
     def setPrintLevel(self, level):
         """ Set the print level during iterations (0=None, 1 keeps last iteration, 2 prints every iteration).
 
@@ -185,9 +376,19 @@ class JFNKCoupler(Coupler):
         iterKrylov = 0
         residual = 0
         previousData = 0
-        matrixQ = []
+        correction = 0
+        previousStep = None
+        nbSolves = [0]
+        self._statistics = []
+        preconditioner = self._preconditioner
+        gmres = GMRES(self._krylovRestart if self._krylovRestart is not None else max(self._krylovMaxIter, 1), self._gramSchmidt,
+                      flexible=preconditioner is not None)
+        gmres.setStorage(self._basisStorageType, self._basisStore)
+        if self._basisStore is not None:
+            self._basisStore.clear()
 
         # On calcul ici l'etat "0"
+        self.applyPredictor(data2physics)
         physics.solve()
         if self._leaveIfFailed and not physics.getSolveStatus():
             return False
@@ -197,7 +398,33 @@ class JFNKCoupler(Coupler):
         normData = self.readNormData()
         self.normalizeData(normData)
 
+        def jacobianProduct(vector, product, normalized=False):
+            """ Compute in product the finite difference approximation of J vector. Return False if the physics failed. """
+            epsilon = perturbation[0]
+            if not normalized:
+                normVector = vector.norm2()
+                if normVector > 0.:
+                    epsilon /= normVector
+            data.linearCombination([1., epsilon], [previousData, vector])
+
+            self.abortTimeStep()
+            self.initTimeStep(self._dt)
+            self.denormalizeData(normData)
+            data2physics.exchange()
+            physics.solve()
+            nbSolves[0] += 1
+            if self._leaveIfFailed and not physics.getSolveStatus():
+                return False
+            physics2Data.exchange()
+            self.normalizeData(normData)
+
+            # product = J vector = (data - previousData - epsilon * vector + residual) / epsilon
+            product.linearCombination([1. / epsilon, -1. / epsilon, -1., 1. / epsilon],
+                                      [data, previousData, vector, residual])
+            return True
+
         errorNewton = self._newtonTolerance + 1
+        perturbation = [self._epsilon]
 
         while errorNewton > self._newtonTolerance and iterNewton < self._newtonMaxIter:
             if iterNewton == 0:
@@ -212,117 +439,82 @@ class JFNKCoupler(Coupler):
             self.denormalizeData(normData)
             data2physics.exchange()
             physics.solve()
+            nbSolves[0] = 1
             if self._leaveIfFailed and not physics.getSolveStatus():
                 return False
             physics2Data.exchange()
             self.normalizeData(normData)
 
             residual -= data  # residual is the second member of the linear system: -F(x) = -(f(x)-x)
-            norm2Residual = residual.norm2()
-
-            errorNewton = self.getNorm(residual) / self.getNorm(data)
+            norms2, normsMax, _ = residual.reduceNorms([data, previousData])
+            norm2Residual = norms2[0]
+            normResidual, normNewData = self.chooseNorms(norms2[:2], normsMax[:2])
+            errorNewton = normResidual / normNewData
+            if self._adaptiveEpsilon:
+                perturbation[0] = math.sqrt((1. + norms2[2]) * np.finfo(float).eps)
+            statistics = {"error": float(errorNewton), "forcingTerm": None, "krylovIterations": 0, "krylovError": None,
+                          "epsilon": perturbation[0], "physicsSolves": 1}
+            self._statistics.append(statistics)
 
             if self._iterationPrinter.getPrintLevel() > 0:
                 self._iterationPrinter.print("JFNK Newton iteration {} initial error : {:.5e}".format(iterNewton, errorNewton))
 
             if errorNewton > self._newtonTolerance:
 
-                if len(matrixQ) < 1:
-                    matrixQ.append(residual * (1. / norm2Residual))
-                else:
-                    matrixQ[0].copy(residual)
-                    matrixQ[0] *= (1. / norm2Residual)
-
-                vectorH = np.zeros(shape=(1))
-                transposeO = np.zeros(shape=(1, 1))
-                transposeO[0, 0] = 1.
-                matrixR = np.zeros(shape=(1, 0))
-                krylovResidual = np.zeros(shape=(1))
-                krylovResidual[0] = norm2Residual
+                gmres.start(residual, norm2Residual)
+                if preconditioner is not None:
+                    preconditioner.setup(self, normData, previousData, residual, jacobianProduct)
 
-                errorKrylov = self._krylovTolerance + 1
+                krylovTolerance = self._computeForcingTerm(norm2Residual, errorNewton, previousStep)
+                errorKrylov = krylovTolerance + 1
                 iterKrylov = 0
 
-                while errorKrylov > self._krylovTolerance and iterKrylov < self._krylovMaxIter:
+                while errorKrylov > krylovTolerance and iterKrylov < self._krylovMaxIter:
                     iterKrylov += 1
-
-                    data.copy(previousData)
-                    data.imuladd(self._epsilon, matrixQ[iterKrylov - 1])
-
-                    self.abortTimeStep()
-                    self.initTimeStep(self._dt)
-                    self.denormalizeData(normData)
-                    data2physics.exchange()
-                    physics.solve()
-                    if self._leaveIfFailed and not physics.getSolveStatus():
+                    if gmres.isCycleFull():
+                        if correction == 0:
+                            correction = data.clone()
+                        gmres.restart(correction, accumulate=gmres.getNbCycles() > 0)
+
+                    direction = gmres.getDirection()
+                    if preconditioner is not None:
+                        preconditioned = gmres.getPreconditionedVector(direction)
+                        preconditioner.apply(direction, preconditioned)
+                        if self._leaveIfFailed and not physics.getSolveStatus():
+                            return False
+                        direction = preconditioned
+
+                    product = gmres.getProductVector(data)
+                    if not jacobianProduct(direction, product, normalized=preconditioner is None):
                         return False
-                    physics2Data.exchange()
-                    self.normalizeData(normData)
-
-                    data -= previousData
-                    data.imuladd(-self._epsilon, matrixQ[iterKrylov - 1])
-
-                    if len(matrixQ) < iterKrylov + 1:
-                        matrixQ.append(data + residual)
-                    else:
-                        matrixQ[iterKrylov].copy(data)
-                        matrixQ[iterKrylov] += residual
-                    matrixQ[iterKrylov] *= 1. / self._epsilon
-
-                    for i in range(iterKrylov):
-                        vectorH[i] = matrixQ[i].dot(matrixQ[iterKrylov])
-                        matrixQ[iterKrylov].imuladd(-vectorH[i], matrixQ[i])
-                    vectorH = np.append(vectorH, matrixQ[iterKrylov].norm2())
-                    matrixQ[iterKrylov] *= 1. / vectorH[-1]
-
-                    # Ajout des nouvelles ligne/colonne a O
-                    tmpO = np.zeros(shape=(transposeO.shape[0] + 1, transposeO.shape[1] + 1))
-                    tmpO[0:transposeO.shape[0], 0:transposeO.shape[1]] += transposeO
-                    transposeO = tmpO
-                    transposeO[transposeO.shape[0] - 1, transposeO.shape[1] - 1] = 1.
-
-                    vectorH = np.dot(transposeO, vectorH)
-
-                    rot = np.zeros(shape=(iterKrylov + 1, iterKrylov + 1))
-                    for i in range(iterKrylov - 1):
-                        rot[i, i] = 1.
-                    normtmp = math.sqrt(vectorH[-2] * vectorH[-2] + vectorH[-1] * vectorH[-1])
-                    rot[iterKrylov - 1, iterKrylov - 1] = vectorH[-2] / normtmp
-                    rot[iterKrylov, iterKrylov] = vectorH[-2] / normtmp
-                    rot[iterKrylov - 1, iterKrylov] = vectorH[-1] / normtmp
-                    rot[iterKrylov, iterKrylov - 1] = -vectorH[-1] / normtmp
-
-                    transposeO = np.dot(rot, transposeO)
-
-                    # Ajout des nouvelles ligne/colonne a matrixR
-                    tmpR = np.zeros(shape=(matrixR.shape[0] + 1, matrixR.shape[1] + 1))
-                    tmpR[0:matrixR.shape[0], 0:matrixR.shape[1]] += matrixR
-                    matrixR = tmpR
-                    for i in range(iterKrylov + 1):
-                        matrixR[i, matrixR.shape[1] - 1] = vectorH[i]
-                    matrixR = np.dot(rot, matrixR)
-
-                    krylovResidual = np.append(krylovResidual, 0.)
-                    krylovResidual = np.dot(rot, krylovResidual)
-
-                    errorKrylov = abs(krylovResidual[-1]) / norm2Residual
+                    if preconditioner is not None:
+                        preconditioner.update(direction, product)
+                    errorKrylov = gmres.addProduct() / norm2Residual
 
                     if self._iterationPrinter.getPrintLevel() > 0:
                         self._iterationPrinter.print("    JFNK Krylov iteration {} error : {:.5e}".format(iterKrylov - 1, errorKrylov))
 
-                squareR = matrixR[0:iterKrylov, 0:iterKrylov]
-                reduceKrylovResidual = krylovResidual[0:iterKrylov]
-                krylovResu = solveTriang(squareR, reduceKrylovResidual)
+                krylovResu, basis = gmres.getSolution()
+                if gmres.getNbCycles() > 0:
+                    data.linearCombination([1., 1.] + krylovResu, [previousData, correction] + basis)
+                else:
+                    data.linearCombination([1.] + krylovResu, [previousData] + basis)
 
-                data.copy(previousData)
-                for i in range(iterKrylov):
-                    data.imuladd(krylovResu[i], matrixQ[i])
+                previousStep = (norm2Residual, errorKrylov * norm2Residual, krylovTolerance)
+                statistics.update({"forcingTerm": float(krylovTolerance), "krylovIterations": iterKrylov,
+                                   "krylovError": float(errorKrylov) if iterKrylov > 0 else None, "physicsSolves": nbSolves[0]})
 
             iterNewton += 1
 
         if self._iterationPrinter.getPrintLevel() == 1:
             self._iterationPrinter.reprint(tmplevel=2)
 
+        if self._basisStore is not None:
+            self._basisStore.clear()
+        gmres.release()
+        if preconditioner is not None:
+            preconditioner.release()
+        self.releaseTemporaries([residual, previousData, correction])
         self.denormalizeData(normData)
         return physics.getSolveStatus() and errorNewton <= self._newtonTolerance
 
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2020, CEA
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following disclaimer in the documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products derived from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+""" Contain the class :class:`.JacobiCoupler`. """
+from __future__ import print_function, division
+
+from c3po.PhysicsDriver import PhysicsDriver
+from c3po.Coupler import Coupler
+from c3po.CollaborativeDataManager import CollaborativeDataManager, mapInThreadPool
+from c3po.services.IterateAccelerator import JacobiAcceleration, IterateAccelerator
+from c3po.services.Printer import Printer
+
+
+class JacobiCoupler(Coupler):
+    """ :class:`.JacobiCoupler` inherits from :class:`.Coupler` and proposes a block-Jacobi fixed
+    point algorithm: all the :class:`.PhysicsDriver` are solved at the same time.
+
+    The class proposes an algorithm for the resolution of :math:`F(X) = X`, where :math:`F` is the
+    concatenation of the outputs of all the :class:`.PhysicsDriver`, each computed with the inputs
+    of :math:`X`. Thus :class:`.JacobiCoupler` is a :class:`.Coupler` working with :
+
+    - A list of :class:`.PhysicsDriver` (possibly :class:`.Coupler`), which do not exchange data
+      during an iteration.
+    - A list of :class:`.DataManager` holding the coupled data of all the :class:`.PhysicsDriver`
+      (the :math:`X`).
+    - Two :class:`.Exchanger` allowing to go from the :class:`.PhysicsDriver` to the
+      :class:`.DataManager` and vice versa.
+
+    At each iteration, the :meth:`solve() <.PhysicsDriver.solve>` method of all the
+    :class:`.PhysicsDriver` is called before any call to :meth:`getSolveStatus()
+    <.PhysicsDriver.getSolveStatus>`. The :class:`.PhysicsDriver` then run concurrently when they
+    are remote (:class:`.MPIMasterPhysicsDriver`, or :class:`.MPIRemote` with
+    :class:`.MPIJacobiCoupler`). Local :class:`.PhysicsDriver` can also be run by a pool of threads
+    (see :meth:`setNumberOfThreads`).
+
+    Each :class:`.DataManager` is normalized with its own norm got after the first iteration.
+    They are then used as a single :class:`.DataManager` using :class:`.CollaborativeDataManager`.
+
+    At each iteration we do (with :math:`n` the iteration number, :math:`R^{n} = F(X^{n}) - X^{n}`
+    and :math:`\\alpha` the damping factor), without acceleration:
+
+    .. math::
+
+        X^{n+1} = X^{n} + \\alpha . R^{n}
+
+    The Aitken or Anderson acceleration can be applied to the stacked :math:`X` (see
+    :meth:`setAcceleration`).
+
+    The convergence criteria is : :math:`||F(X^{n}) - X^{n}|| / ||F(X^{n})|| < \\rm{tolerance}`.
+    The default norm used is the infinite norm. :meth:`setNormChoice() <.Coupler.setNormChoice>`
+    allows to choose another one.
+
+    The default value of tolerance is 1.E-6. Call :meth:`setConvergenceParameters` to change it.
+
+    The default maximum number of iterations is 100. Call :meth:`setConvergenceParameters` to
+    change it.
+    """
+
+    def __init__(self, physics, exchangers, dataManagers):
+        """ Build a :class:`.JacobiCoupler` object.
+
+        Parameters
+        ----------
+        physics : list[PhysicsDriver], list[Coupler]
+            List of the :class:`.PhysicsDriver` (possibly :class:`.Coupler`) to be solved at the same
+            time.
+        exchangers : list[Exchanger]
+            List of exactly two :class:`.Exchanger` allowing to go from the :class:`.PhysicsDriver`
+            to the :class:`.DataManager` and vice versa.
+        dataManagers : list[DataManager]
+            List of :class:`.DataManager`.
+        """
+        Coupler.__init__(self, physics, exchangers, dataManagers)
+        self._tolerance = 1.E-6
+        self._maxiter = 100
+        self._dampingFactor = 1.
+        self._acceleration = JacobiAcceleration.none
+        self._dampingFactorBounds = (None, None)
+        self._order = 2
+        self._nbThreads = 1
+        self._iterationPrinter = Printer(2)
+        self._leaveIfFailed = False
+
+        if not isinstance(physics, list) or not isinstance(exchangers, list) or not isinstance(dataManagers, list):
+            raise Exception("JacobiCoupler.__init__ physics, exchangers and dataManagers must be lists!")
+        if len(physics) < 1:
+            raise Exception("JacobiCoupler.__init__ There must be at least one PhysicsDriver")
+        if len(exchangers) != 2:
+            raise Exception("JacobiCoupler.__init__ There must be exactly two Exchanger")
+
+    def setConvergenceParameters(self, tolerance, maxiter):
+        """ Set the convergence parameters (``tolerance`` and maximum number of iterations).
+
+        Parameters
+        ----------
+        tolerance : float
+            The convergence threshold in :math:`||F(X^{n}) - X^{n}|| / ||F(X^{n})|| < \\rm{tolerance}`.
+        maxiter : int
+            The maximal number of iterations.
+        """
+        self._tolerance = tolerance
+        self._maxiter = maxiter
+
+    def setDampingFactor(self, dampingFactor):
+        """ Set the damping factor of the method.
+
+        It is the damping factor of all the iterations without acceleration, the initial damping
+        factor with the Aitken acceleration and the Anderson damping factor (see
+        :meth:`.AndersonCoupler.setAndersonDampingFactor`) with the Anderson acceleration.
+
+        Parameters
+        ----------
+        dampingFactor : float
+            The damping factor :math:`\\alpha`. Default: 1.
+        """
+        if dampingFactor <= 0 or dampingFactor > 1:
+            raise Exception("JacobiCoupler.setDampingFactor Set a damping factor > 0 and <=1 !")
+        self._dampingFactor = dampingFactor
+
+    def setDampingFactorBounds(self, minimum, maximum):
+        """ Bound the damping factors computed by the Aitken acceleration (see
+        :meth:`.AitkenCoupler.setDampingFactorBounds`).
+
+        Parameters
+        ----------
+        minimum
+            The minimum damping factor, or None (default) for no lower bound.
+        maximum
+            The maximum damping factor, or None (default) for no upper bound.
+        """
+        if minimum is not None and maximum is not None and minimum > maximum:
+            raise Exception("JacobiCoupler.setDampingFactorBounds minimum must be lower than maximum!")
+        self._dampingFactorBounds = (minimum, maximum)
+
+    def setAcceleration(self, acceleration, order=2):
+        """ Choose the acceleration applied to the stacked coupled data.
+
+        Parameters
+        ----------
+        acceleration : :attr:`.JacobiAcceleration.none`, :attr:`.JacobiAcceleration.aitken`, :attr:`.JacobiAcceleration.anderson`
+            The acceleration. Default: :attr:`.JacobiAcceleration.none`.
+        order : int
+            The order of the Anderson acceleration (see :meth:`.AndersonCoupler.setOrder`), not used
+            by the other accelerations. Default: 2.
+        """
+        if acceleration not in [JacobiAcceleration.none, JacobiAcceleration.aitken, JacobiAcceleration.anderson]:
+            raise Exception("JacobiCoupler.setAcceleration Unknown acceleration.")
+        if order <= 0:
+            raise Exception("JacobiCoupler.setAcceleration Set an order > 0 !")
+        self._acceleration = acceleration
+        self._order = order
+
+    def setNumberOfThreads(self, nbThreads):
+        """ Set the number of threads used to run the :class:`.PhysicsDriver` concurrently.
+
+        The threads are those of the pool shared with :class:`.CollaborativeDataManager` (see
+        :meth:`.CollaborativeDataManager.setNumberOfThreads`). They only speed up the calculation if
+        the :class:`.PhysicsDriver` release the GIL while solving (compiled codes usually do).
+        Remote :class:`.PhysicsDriver` do not need threads to run concurrently.
+
+        Parameters
+        ----------
+        nbThreads : int
+            The number of threads (>= 1). 1 (default) means that the :meth:`solve()
+            <.PhysicsDriver.solve>` methods are called one after the other by the current thread.
+        """
+        if nbThreads < 1:
+            raise Exception("JacobiCoupler.setNumberOfThreads The number of threads must be >= 1.")
+        self._nbThreads = nbThreads
+
+    def getNumberOfThreads(self):
+        """ Return the number of threads used to run the :class:`.PhysicsDriver` concurrently.
+
+        Returns
+        -------
+        int
+            The number of threads.
+        """
+        return self._nbThreads
+
+    def setPrintLevel(self, level):
+        """ Set the print level during iterations (0=None, 1 keeps last iteration, 2 prints every
+        iteration).
+
+        Parameters
+        ----------
+        level : int
+            Integer in range [0;2]. Default: 2.
+        """
+        if not level in [0, 1, 2]:
+            raise Exception("JacobiCoupler.setPrintLevel level should be one of [0, 1, 2]!")
+        self._iterationPrinter.setPrintLevel(level)
+
+    def setFailureManagement(self, leaveIfSolvingFailed):
+        """ Set if iterations should continue or not in case of solver failure
+        (:meth:`solveTimeStep` returns False).
+
+        Parameters
+        ----------
+        leaveIfSolvingFailed : bool
+            Set False to continue the iterations, True to stop. Default: False.
+        """
+        self._leaveIfFailed = leaveIfSolvingFailed
+
+    def solvePhysics(self):
+        """ INTERNAL Call :meth:`solve() <.PhysicsDriver.solve>` on all the :class:`.PhysicsDriver` before collecting their status (see :meth:`getPhysicsSolveStatus`). """
+        mapInThreadPool(lambda physics: physics.solve(), self._physicsDriversList, self._nbThreads)
+        return self.getPhysicsSolveStatus()
+
+    def getPhysicsSolveStatus(self):
+        """ INTERNAL Return True if all the :class:`.PhysicsDriver` succeeded in their last solve. """
+        return Coupler.getSolveStatus(self)
+
+    def solveTimeStep(self):
+        """ Solve a time step using the block-Jacobi fixed-point algorithm.
+
+        See also :meth:`c3po.PhysicsDriver.PhysicsDriver.solveTimeStep`.
+        """
+        physics2Data = self._exchangers[0]
+        data2physics = self._exchangers[1]
+        iiter = 0
+        error = self._tolerance + 1.
+        accelerator = IterateAccelerator(self._acceleration, self._dampingFactor, self._order, self._dampingFactorBounds)
+
+        if self._iterationPrinter.getPrintLevel() > 0:
+            self._iterationPrinter.print("Jacobi iteration {} ".format(iiter))
+
+        self.applyPredictor(data2physics)
+        succeed = self.solvePhysics()
+        if self._leaveIfFailed and not succeed:
+            return False
+        physics2Data.exchange()
+
+        data = CollaborativeDataManager(self._dataManagers)
+        normData = self.readNormData()
+        self.normalizeData(normData)
+        previousData = data.clone()
+        residual = data.clone()
+        iiter += 1
+
+        while error > self._tolerance and iiter < self._maxiter:
+            self.abortTimeStep()
+            self.initTimeStep(self._dt)
+            self.denormalizeData(normData)
+            data2physics.exchange()
+            succeed = self.solvePhysics()
+            if self._leaveIfFailed and not succeed:
+                accelerator.release()
+                return False
+            physics2Data.exchange()     # data contient F(X^n), previousData contient X^n
+            self.normalizeData(normData)
+
+            residual.linearCombination([1., -1.], [data, previousData])
+            normDiff, normNewData = self.getNorms([residual, data])
+            error = normDiff / normNewData
+
+            if error > self._tolerance:
+                accelerator.update(data, residual)
+                previousData.copy(data)
+
+            iiter += 1
+            if self._iterationPrinter.getPrintLevel() > 0:
+                self._iterationPrinter.print("Jacobi iteration {} error : {:.5e} ".format(iiter - 1, error))
+
+        if self._iterationPrinter.getPrintLevel() == 1:
+            self._iterationPrinter.reprint(tmplevel=2)
+
+        accelerator.release()
+        self.releaseTemporaries([residual, previousData])
+        self.denormalizeData(normData)
+        return succeed and error <= self._tolerance
+
+    def getSolveStatus(self):
+        """ See :meth:`.PhysicsDriver.getSolveStatus`. """
+        return PhysicsDriver.getSolveStatus(self)
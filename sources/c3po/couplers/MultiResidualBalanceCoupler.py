@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2020, CEA
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following disclaimer in the documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products derived from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+""" Contains the class :class:`.MultiResidualBalanceCoupler`. """
+from __future__ import print_function, division
+
+from c3po.PhysicsDriver import PhysicsDriver
+from c3po.Coupler import Coupler
+from c3po.LocalDataManager import LocalDataManager
+from c3po.services.Printer import Printer
+
+
+class MultiResidualBalanceCoupler(Coupler):
+    """ :class:`.MultiResidualBalanceCoupler` inherits from :class:`.Coupler` and proposes a dynamic
+    residual balance algorithm for any number of solvers. With two solvers, it is
+    :class:`c3po.couplers.DynamicResidualBalanceCoupler.DynamicResidualBalanceCoupler`.
+
+    This algorithm couples N solvers, solved one after the other in a given sequence, using an
+    iterative procedure. It controls the accuracy required to each solver in order to limit
+    over-solving and make them converge together: the accuracy asked to a solver is the (normalized)
+    residual reached by the previous one in the sequence, multiplied by the mean convergence rate of
+    the solvers already computed in the iteration.
+
+    :class:`.MultiResidualBalanceCoupler` works with :
+
+    - N :class:`.PhysicsDriver`, one for each solver, in the order in which they are solved. They
+      must implement the :meth:`iterateTimeStep` method, together with the possibilities to get
+      residual and set target accuracy.
+    - N + 1 :class:`.Exchanger`: N for the exchanges between a :class:`.PhysicsDriver` and the next
+      one in the sequence (the last one going to the first :class:`.PhysicsDriver`), and one to get
+      the residuals of all the solvers.
+    - One :class:`.LocalDataManager` (not just a :class:`.DataManager`) which contains the
+      residuals got with the last exchanger.
+
+    .. note::
+
+        The residuals of all the solvers are got by a single :class:`.Exchanger`, called each time
+        one of them is updated. Only the residual of the solver just computed changes.
+
+    The default target accuracies are 1e-4 and the default maximum number of iterations is 100.
+    Use :meth:`setConvergenceParameters` to change these values.
+
+    As for :class:`.DynamicResidualBalanceCoupler`, it may be interesting to use a
+    :class:`.FixedPointCoupler` (with ``setUseIterate(True)``) to add a damping factor and to
+    control the coupling error.
+    """
+
+    def __init__(self, physics, exchangers, dataManagers):
+        """ Build a :class:`.MultiResidualBalanceCoupler` object.
+
+        Parameters
+        ----------
+        physics : list[PhysicsDriver]
+            List of N >= 2 :class:`.PhysicsDriver`, in the order in which they are solved. They must
+            implement the :meth:`iterateTimeStep` method (together with :meth:`solveTimeStep`) and
+            accept new accuracy (for the :meth:`solveTimeStep` method) through
+            ``setInputDoubleValue('Accuracy', value)``.
+        exchangers : list[Exchanger]
+            List of N + 1 :class:`.Exchanger`. The exchanger ``i`` (for ``i < N``) goes from the
+            :class:`.PhysicsDriver` ``i`` to the next one (the exchanger ``N - 1`` goes to the first
+            :class:`.PhysicsDriver`, and can do nothing). The last exchanger gets the residuals of all
+            the solvers.
+        dataManagers : list[LocalDataManager]
+            List of one :class:`.LocalDataManager` (not just a :class:`.DataManager`). The residuals
+            must be stored in this :class:`.DataManager` as double values under the names
+            ``'Residual1'``, ``'Residual2'``, ..., ``'ResidualN'``.
+        """
+        Coupler.__init__(self, physics, exchangers, dataManagers)
+
+        if not isinstance(physics, list) or not isinstance(exchangers, list) or not isinstance(dataManagers, list):
+            raise Exception("MultiResidualBalanceCoupler.__init__ physics, exchangers and dataManagers must be lists.")
+        if len(physics) < 2:
+            raise Exception("MultiResidualBalanceCoupler.__init__ There must be at least two PhysicsDriver, not {}.".format(len(physics)))
+        if len(exchangers) != len(physics) + 1:
+            raise Exception("MultiResidualBalanceCoupler.__init__ There must be {} Exchanger, not {}.".format(len(physics) + 1, len(exchangers)))
+        if len(dataManagers) != 1:
+            raise Exception("MultiResidualBalanceCoupler.__init__ There must be exactly one DataManager, not {}.".format(len(dataManagers)))
+        self._data = dataManagers[0]
+        if not isinstance(self._data, LocalDataManager):
+            raise Exception("MultiResidualBalanceCoupler.__init__ The provided Datamanager must be a LocalDataManager.")
+        self._solvers = physics
+        self._exchangerResiduals = exchangers[-1]
+
+        self._iterationPrinter = Printer(2)
+        self._leaveIfFailed = False
+
+        self._epsRef = [1e-4] * len(physics)
+        self._accuracies = [0.] * len(physics)
+        self._residualTotals = [0.] * len(physics)
+
+        self._iter = 0
+        self._maxiter = 100
+
+    def setConvergenceParameters(self, targetResiduals, maxiter):
+        """ Set the convergence parameters (target residuals for each solver and maximum number of
+        iterations).
+
+        Parameters
+        ----------
+        targetResiduals : list[float]
+            Target residual for each solver (in the order of the solvers). Default value: 1.E-4.
+        maxiter : int
+            The maximal number of iterations. Default value: 100.
+        """
+        if len(targetResiduals) != len(self._solvers):
+            raise Exception("MultiResidualBalanceCoupler.setConvergenceParameters There must be {} target residuals, not {}.".format(len(self._solvers), len(targetResiduals)))
+        self._epsRef = list(targetResiduals)
+        self._maxiter = maxiter
+
+    def setPrintLevel(self, level):
+        """ Set the print level during iterations (0=None, 1 keeps last iteration, 2 prints every
+        iteration).
+
+        Parameters
+        ----------
+        level : int
+            Integer in range [0;2]. Default: 2.
+        """
+        if not level in [0, 1, 2]:
+            raise Exception("MultiResidualBalanceCoupler.setPrintLevel level should be one of [0, 1, 2]!")
+        self._iterationPrinter.setPrintLevel(level)
+
+    def setFailureManagement(self, leaveIfSolvingFailed):
+        """ Set if iterations should continue or not in case of solver failure
+        (:meth:`solveTimeStep` returns False).
+
+        Parameters
+        ----------
+        leaveIfSolvingFailed : bool
+            Set False to continue the iterations, True to stop. Default: False.
+        """
+        self._leaveIfFailed = leaveIfSolvingFailed
+
+    def solveTimeStep(self):
+        """ See :meth:`c3po.PhysicsDriver.PhysicsDriver.solveTimeStep`. """
+        converged = False
+        succeed = True
+
+        while (succeed or not self._leaveIfFailed) and (not converged) and self._iter < self._maxiter:
+            self.iterate()
+            succeed, converged = self.getIterateStatus()
+
+        if self._iterationPrinter.getPrintLevel() == 1:
+            self._iterationPrinter.reprint(tmplevel=2)
+
+        return succeed and converged
+
+    def _normalizedResidual(self, index):
+        """ INTERNAL Return the last residual got for the solver ``index``, divided by its target. """
+        return self._data.getOutputDoubleValue("Residual{}".format(index + 1)) / self._epsRef[index]
+
+    def iterateTimeStep(self):
+        """ See :meth:`c3po.PhysicsDriver.PhysicsDriver.iterateTimeStep`. """
+        converged = False
+        nbSolvers = len(self._solvers)
+        convRates = []
+
+        for i, solver in enumerate(self._solvers):
+            previous = (i - 1) % nbSolvers
+            if i == 0 or self._iter == 0 or (self._accuracies[i] > self._epsRef[i] and not converged):
+                # -- Computation of the initial residual of the solver
+                solver.iterate()
+                self._exchangerResiduals.exchange()
+                lastResidual = self._residualTotals[i]
+                if i == 0 and self._iter == 0:
+                    self._residualTotals[i] = self._normalizedResidual(i)
+                else:
+                    self._residualTotals[i] = sum(self._normalizedResidual(j) for j in range(nbSolvers))
+
+                # -- New accuracy: the residual reached by the previous solver
+                accuracy = self._normalizedResidual(previous) * self._epsRef[i]
+                if self._iter > 0:
+                    convRates.append(self._residualTotals[i] / lastResidual)
+                    if i == 0:
+                        # -- We don't want a new accuracy smaller than the targeted one! And if one solver reachs its targeted accuracy, the others are also set to their targeted values
+                        if min(self._accuracies[j] - self._epsRef[j] for j in range(nbSolvers)) > 0.:
+                            accuracy = min(accuracy, self._accuracies[i])
+                            converged = accuracy <= self._epsRef[i] or min(self._accuracies[j] - self._epsRef[j] for j in range(1, nbSolvers)) <= 0.
+                        else:
+                            converged = True
+                        if converged:
+                            accuracy = self._epsRef[i]
+                    else:
+                        accuracy *= sum(convRates) / len(convRates)
+                        accuracy = min(accuracy, self._accuracies[i])
+                        accuracy = max(accuracy, self._epsRef[i])
+            else:
+                accuracy = self._epsRef[i]
+
+            self._accuracies[i] = accuracy
+            solver.setInputDoubleValue("Accuracy", accuracy)
+
+            # -- Computation of the solver with the new accuracy, and exchanges with the next one
+            solver.solve()
+            self._exchangerResiduals.exchange()
+            self._exchangers[i].exchange()
+
+        if self._iterationPrinter.getPrintLevel() > 0:
+            self._iterationPrinter.print("Multi Residual Balance iteration {} accuracies: {}".format(self._iter, " ; ".join([str(accuracy) for accuracy in self._accuracies])))
+
+        succeed = True
+        for solver in self._solvers:
+            succeed = solver.getSolveStatus() and succeed
+        self._iter += 1
+
+        return succeed, converged
+
+    def getIterateStatus(self):
+        """ See :meth:`c3po.PhysicsDriver.PhysicsDriver.getSolveStatus`. """
+        return PhysicsDriver.getIterateStatus(self)
+
+    def getSolveStatus(self):
+        """ See :meth:`c3po.PhysicsDriver.PhysicsDriver.getSolveStatus`. """
+        return PhysicsDriver.getSolveStatus(self)
+
+    def initTimeStep(self, dt):
+        """ See :meth:`c3po.PhysicsDriver.PhysicsDriver.initTimeStep`.  """
+        self._iter = 0
+        return Coupler.initTimeStep(self, dt)
@@ -0,0 +1,382 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2020, CEA
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following disclaimer in the documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products derived from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+""" Contain the class :class:`.WaveformRelaxationCoupler`. """
+from __future__ import print_function, division
+
+from c3po.PhysicsDriver import PhysicsDriver
+from c3po.Coupler import Coupler
+from c3po.CollaborativeDataManager import CollaborativeDataManager
+from c3po.services.IterateAccelerator import JacobiAcceleration, IterateAccelerator
+from c3po.services.Printer import Printer
+
+
+class WaveformRelaxationCoupler(Coupler):
+    """ :class:`.WaveformRelaxationCoupler` inherits from :class:`.Coupler` and proposes a waveform
+    relaxation algorithm: the coupling iterations are made over a whole time window of several
+    macro time steps.
+
+    The time step asked to :class:`.WaveformRelaxationCoupler` (with :meth:`initTimeStep`) is the
+    time window. It is divided into ``nbSteps`` macro time steps (see :meth:`setWindow`). The
+    coupled data are known at the end of each macro time step: the sequence of these values is the
+    waveform :math:`X`. :class:`.WaveformRelaxationCoupler` works with :
+
+    - A list of :class:`.PhysicsDriver` (possibly :class:`.Coupler`), which advance through the
+      window independently.
+    - A list of :class:`.DataManager` holding the coupled data of all the :class:`.PhysicsDriver`
+      at a given time.
+    - Two :class:`.Exchanger` allowing to go from the :class:`.PhysicsDriver` to the
+      :class:`.DataManager` and vice versa.
+
+    At each iteration, each :class:`.PhysicsDriver` goes through the window with the time steps it
+    asks for (with :meth:`computeTimeStep() <.PhysicsDriver.computeTimeStep>`, as with
+    :class:`.TimeAccumulator`), limited to the end of the current macro time step. Its inputs are
+    interpolated (linearly in time) in the waveform of the previous iteration. The outputs of the
+    :class:`.PhysicsDriver` at the end of each macro time step make the new waveform
+    :math:`F(X)`. The :class:`.PhysicsDriver` are then restored to the beginning of the window for
+    the next iteration: they must implement :meth:`save() <.PhysicsDriver.save>` and
+    :meth:`restore() <.PhysicsDriver.restore>`.
+
+    The first iteration of a window uses the constant waveform given by the coupled data at the end
+    of the previous window (the :class:`.PhysicsDriver` keep their inputs for the first window).
+
+    Each :class:`.DataManager` is normalized with its own norm (got at the beginning of the window).
+    The iterations on the waveform are the ones of :class:`.JacobiCoupler`: damped fixed point,
+    possibly accelerated with the Aitken or Anderson (quasi-Newton) method (see
+    :meth:`setAcceleration`).
+
+    The convergence criteria is : :math:`||F(X^{n}) - X^{n}|| / ||F(X^{n})|| < \\rm{tolerance}`, the
+    norm being computed on the whole waveform. The default norm used is the infinite norm.
+    :meth:`setNormChoice() <.Coupler.setNormChoice>` allows to choose another one.
+
+    The default value of tolerance is 1.E-6. Call :meth:`setConvergenceParameters` to change it.
+
+    The default maximum number of iterations is 100. Call :meth:`setConvergenceParameters` to
+    change it.
+
+    .. note:: The stationary mode is not supported.
+    """
+
+    def __init__(self, physics, exchangers, dataManagers, saveParameters):
+        """ Build a :class:`.WaveformRelaxationCoupler` object.
+
+        Parameters
+        ----------
+        physics : list[PhysicsDriver], list[Coupler]
+            List of the :class:`.PhysicsDriver` (possibly :class:`.Coupler`) to be coupled.
+        exchangers : list[Exchanger]
+            List of exactly two :class:`.Exchanger` allowing to go from the :class:`.PhysicsDriver`
+            to the :class:`.DataManager` and vice versa.
+        dataManagers : list[DataManager]
+            List of :class:`.DataManager`.
+        saveParameters : tuple
+            The tuple ``(label, method)`` used to save / restore the :class:`.PhysicsDriver` at the
+            beginning of the window.
+        """
+        Coupler.__init__(self, physics, exchangers, dataManagers)
+        self._saveParameters = saveParameters
+        self._tolerance = 1.E-6
+        self._maxiter = 100
+        self._nbSteps = 1
+        self._dampingFactor = 1.
+        self._acceleration = JacobiAcceleration.none
+        self._dampingFactorBounds = (None, None)
+        self._order = 2
+        self._iterationPrinter = Printer(2)
+        self._leaveIfFailed = False
+        self._timeDifference = 0.
+        self._startSample = None
+        self._endSample = None
+        self._savedPhysics = []
+
+        if not isinstance(physics, list) or not isinstance(exchangers, list) or not isinstance(dataManagers, list):
+            raise Exception("WaveformRelaxationCoupler.__init__ physics, exchangers and dataManagers must be lists!")
+        if len(physics) < 1:
+            raise Exception("WaveformRelaxationCoupler.__init__ There must be at least one PhysicsDriver")
+        if len(exchangers) != 2:
+            raise Exception("WaveformRelaxationCoupler.__init__ There must be exactly two Exchanger")
+
+    def setConvergenceParameters(self, tolerance, maxiter):
+        """ Set the convergence parameters (``tolerance`` and maximum number of iterations).
+
+        Parameters
+        ----------
+        tolerance : float
+            The convergence threshold in :math:`||F(X^{n}) - X^{n}|| / ||F(X^{n})|| < \\rm{tolerance}`.
+        maxiter : int
+            The maximal number of iterations (passes over the window).
+        """
+        self._tolerance = tolerance
+        self._maxiter = maxiter
+
+    def setWindow(self, nbSteps):
+        """ Set the number of macro time steps of a time window.
+
+        Parameters
+        ----------
+        nbSteps : int
+            The number of macro time steps (>= 1) in which the window (the time step asked with
+            :meth:`initTimeStep`) is divided. Default: 1.
+        """
+        if nbSteps < 1:
+            raise Exception("WaveformRelaxationCoupler.setWindow The number of steps must be >= 1.")
+        self._nbSteps = nbSteps
+
+    def setDampingFactor(self, dampingFactor):
+        """ Set the damping factor of the method (see :meth:`.JacobiCoupler.setDampingFactor`).
+
+        Parameters
+        ----------
+        dampingFactor : float
+            The damping factor. Default: 1.
+        """
+        if dampingFactor <= 0 or dampingFactor > 1:
+            raise Exception("WaveformRelaxationCoupler.setDampingFactor Set a damping factor > 0 and <=1 !")
+        self._dampingFactor = dampingFactor
+
+    def setDampingFactorBounds(self, minimum, maximum):
+        """ Bound the damping factors computed by the Aitken acceleration (see
+        :meth:`.JacobiCoupler.setDampingFactorBounds`).
+
+        Parameters
+        ----------
+        minimum
+            The minimum damping factor, or None (default) for no lower bound.
+        maximum
+            The maximum damping factor, or None (default) for no upper bound.
+        """
+        if minimum is not None and maximum is not None and minimum > maximum:
+            raise Exception("WaveformRelaxationCoupler.setDampingFactorBounds minimum must be lower than maximum!")
+        self._dampingFactorBounds = (minimum, maximum)
+
+    def setAcceleration(self, acceleration, order=2):
+        """ Choose the acceleration applied to the waveform (see :meth:`.JacobiCoupler.setAcceleration`).
+
+        Parameters
+        ----------
+        acceleration : :attr:`.JacobiAcceleration.none`, :attr:`.JacobiAcceleration.aitken`, :attr:`.JacobiAcceleration.anderson`
+            The acceleration. Default: :attr:`.JacobiAcceleration.none`.
+        order : int
+            The order of the Anderson acceleration. Default: 2.
+        """
+        if acceleration not in [JacobiAcceleration.none, JacobiAcceleration.aitken, JacobiAcceleration.anderson]:
+            raise Exception("WaveformRelaxationCoupler.setAcceleration Unknown acceleration.")
+        if order <= 0:
+            raise Exception("WaveformRelaxationCoupler.setAcceleration Set an order > 0 !")
+        self._acceleration = acceleration
+        self._order = order
+
+    def setPrintLevel(self, level):
+        """ Set the print level during iterations (0=None, 1 keeps last iteration, 2 prints every
+        iteration).
+
+        Parameters
+        ----------
+        level : int
+            Integer in range [0;2]. Default: 2.
+        """
+        if not level in [0, 1, 2]:
+            raise Exception("WaveformRelaxationCoupler.setPrintLevel level should be one of [0, 1, 2]!")
+        self._iterationPrinter.setPrintLevel(level)
+
+    def setFailureManagement(self, leaveIfSolvingFailed):
+        """ Set if iterations should continue or not in case of solver failure
+        (:meth:`solveTimeStep` returns False).
+
+        Parameters
+        ----------
+        leaveIfSolvingFailed : bool
+            Set False to continue the iterations, True to stop. Default: False.
+        """
+        self._leaveIfFailed = leaveIfSolvingFailed
+
+    def terminate(self):
+        """ See :meth:`.PhysicsDriver.terminate`. The states saved by :meth:`initTimeStep` are forgotten. """
+        for physics in self._savedPhysics:
+            physics.forget(*self._saveParameters)
+        self._savedPhysics = []
+        self.releaseTemporaries([self._startSample, self._endSample])
+        self._startSample = None
+        self._endSample = None
+        Coupler.terminate(self)
+
+    def presentTime(self):
+        """ See :meth:`.PhysicsDriver.presentTime`. """
+        return Coupler.presentTime(self) - self._timeDifference
+
+    def computeTimeStep(self):
+        """ See :meth:`.PhysicsDriver.computeTimeStep`.
+
+        Return the window made of ``nbSteps`` (see :meth:`setWindow`) of the time step recommended
+        by the :class:`.PhysicsDriver`.
+        """
+        (dt, stop) = Coupler.computeTimeStep(self)
+        return (dt * self._nbSteps, stop)
+
+    def initTimeStep(self, dt):
+        """ See :meth:`.PhysicsDriver.initTimeStep`.
+
+        ``dt`` is the length of the time window. The :class:`.PhysicsDriver` are saved.
+        """
+        if dt <= 0. or self._stationaryMode:
+            raise Exception("WaveformRelaxationCoupler.initTimeStep Only transient time windows (dt > 0) are supported.")
+        self._dt = dt
+        for physics in self._physicsDriversList:
+            physics.save(*self._saveParameters)
+            if not any(saved is physics for saved in self._savedPhysics):
+                self._savedPhysics.append(physics)
+        return True
+
+    def solveTimeStep(self):
+        """ Solve a time window using the waveform relaxation algorithm.
+
+        See also :meth:`c3po.PhysicsDriver.PhysicsDriver.solveTimeStep`.
+        """
+        physics2Data = self._exchangers[0]
+        data = CollaborativeDataManager(self._dataManagers)
+        stepSize = self._dt / self._nbSteps
+        timeStart = self.presentTime()
+        accelerator = IterateAccelerator(self._acceleration, self._dampingFactor, self._order, self._dampingFactorBounds)
+
+        normData = None
+        # waveform[k] : X^n at the end of the macro time step k (waveform[0] : beginning of the window)
+        waveform = [None] * (self._nbSteps + 1)
+        if self._startSample is not None:
+            normData = [self.getNorm(dataManager) for dataManager in self._startSample.dataManagers]
+            waveform[0] = self._startSample.clone()
+            for i, norm in enumerate(normData):
+                if norm > 0.:
+                    waveform[0].dataManagers[i] *= 1. / norm
+            for k in range(1, self._nbSteps + 1):
+                waveform[k] = waveform[0]
+        outputs = []
+        residual = 0
+        iiter = 0
+        error = self._tolerance + 1.
+
+        while True:
+            if iiter > 0:
+                for physics in self._physicsDriversList:
+                    physics.restore(*self._saveParameters)
+            succeed = True
+            for k in range(1, self._nbSteps + 1):
+                for physics in self._physicsDriversList:
+                    succeed = self._advance(physics, timeStart + k * stepSize, stepSize, (waveform[k - 1], waveform[k]), normData) and succeed
+                    if not succeed and self._leaveIfFailed:
+                        accelerator.release()
+                        self._releaseWaveforms(residual, outputs, waveform)
+                        return False
+                physics2Data.exchange()
+                if normData is None:
+                    normData = self.readNormData()
+                self.normalizeData(normData)
+                if len(outputs) < self._nbSteps:
+                    outputs.append(data.clone())
+                else:
+                    outputs[k - 1].copy(data)
+
+            newWaveform = CollaborativeDataManager(outputs)
+            if residual == 0:
+                residual = newWaveform.clone()
+            if waveform[1] is None:
+                # First iteration of the first window: the previous waveform is unknown.
+                error = self._tolerance + 1.
+            else:
+                residual.linearCombination([1., -1.], [newWaveform, CollaborativeDataManager(waveform[1:])])
+                normDiff, normNewData = self.getNorms([residual, newWaveform])
+                error = normDiff / normNewData
+                if error > self._tolerance:
+                    accelerator.update(newWaveform, residual)
+
+            iiter += 1
+            if self._iterationPrinter.getPrintLevel() > 0:
+                self._iterationPrinter.print("waveform relaxation iteration {} error : {:.5e} ".format(iiter - 1, error))
+            if error <= self._tolerance or iiter >= self._maxiter:
+                break
+            if waveform[1] is None or waveform[1] is waveform[0]:
+                for k in range(1, self._nbSteps + 1):
+                    waveform[k] = outputs[k - 1].clone()
+            else:
+                CollaborativeDataManager(waveform[1:]).copy(newWaveform)
+
+        if self._iterationPrinter.getPrintLevel() == 1:
+            self._iterationPrinter.reprint(tmplevel=2)
+
+        self.denormalizeData(normData)
+        if self._endSample is None:
+            self._endSample = data.clone()
+        else:
+            self._endSample.copy(data)
+        self._timeDifference = self._dt
+        accelerator.release()
+        self._releaseWaveforms(residual, outputs, waveform)
+        return succeed and error <= self._tolerance
+
+    def _releaseWaveforms(self, residual, outputs, waveform):
+        """ INTERNAL Release the temporary :class:`.DataManager` of :meth:`solveTimeStep` (the items of ``waveform`` may all be its first one). """
+        if len(waveform) > 1 and waveform[1] is waveform[0]:
+            waveform = waveform[:1]
+        self.releaseTemporaries([residual] + outputs + waveform)
+
+    def _advance(self, physics, timeEnd, stepSize, waveformBounds, normData):
+        """ INTERNAL Make ``physics`` reach ``timeEnd`` (the end of a macro time step), with inputs interpolated between the ``waveformBounds`` (waveform at the beginning and at the end of the macro time step). """
+        data2physics = self._exchangers[1]
+        waveformBegin, waveformEnd = waveformBounds
+        data = CollaborativeDataManager(self._dataManagers)
+        presentTime = physics.presentTime()
+        (dt, _) = physics.computeTimeStep()
+        succeed = True
+        while presentTime < timeEnd - 1.E-8 * stepSize:
+            if presentTime + 1.5 * dt >= timeEnd:
+                if presentTime + dt >= timeEnd - dt * 1.E-4:
+                    dt = timeEnd - presentTime
+                else:
+                    dt = 0.5 * (timeEnd - presentTime)
+            if waveformEnd is not None:
+                theta = (presentTime + dt - (timeEnd - stepSize)) / stepSize
+                if waveformBegin is None or theta >= 1.:
+                    data.copy(waveformEnd)
+                else:
+                    data.linearCombination([1. - theta, theta], [waveformBegin, waveformEnd])
+                self.denormalizeData(normData)
+                data2physics.exchange()
+            physics.initTimeStep(dt)
+            physics.solve()
+            succeed = physics.getSolveStatus() and succeed
+            physics.validateTimeStep()
+            presentTime = physics.presentTime()
+            (dt, _) = physics.computeTimeStep()
+        return succeed
+
+    def getSolveStatus(self):
+        """ See :meth:`.PhysicsDriver.getSolveStatus`. """
+        return PhysicsDriver.getSolveStatus(self)
+
+    def validateTimeStep(self):
+        """ See :meth:`.PhysicsDriver.validateTimeStep`.
+
+        The :class:`.PhysicsDriver` already validated their time steps during :meth:`solveTimeStep`.
+        """
+        self._timeDifference = 0.
+        self._startSample, self._endSample = self._endSample, self._startSample
+
+    def abortTimeStep(self):
+        """ See :meth:`.PhysicsDriver.abortTimeStep`. The :class:`.PhysicsDriver` are restored. """
+        for physics in self._physicsDriversList:
+            physics.restore(*self._saveParameters)
+        self._timeDifference = 0.
+
+    def resetTime(self, time_):
+        """ See :meth:`.PhysicsDriver.resetTime`. The coupled data of the previous window are forgotten. """
+        Coupler.resetTime(self, time_)
+        self.releaseTemporaries([self._startSample, self._endSample])
+        self._startSample = None
+        self._endSample = None
@@ -16,7 +16,7 @@ from mpi4py import MPI
 from c3po.CollaborativeDataManager import CollaborativeDataManager
 from c3po.CollaborativeObject import CollaborativeObject
 from c3po.mpi.MPIRemote import MPIRemote
-from c3po.mpi.MPIDomainDecompositionDataManager import MPIDomainDecompositionDataManager
+from c3po.mpi.MPIDomainDecompositionDataManager import MPIDomainDecompositionDataManager, allreduceNorms
 from c3po.mpi.MPICollectiveDataManager import MPICollectiveDataManager
 
 
@@ -29,6 +29,10 @@ class MPICollaborativeDataManager(CollaborativeDataManager):
     as a single one. Thanks to this class, data can be distributed on different MPI processes but
     still used in the same way.
 
+    :meth:`.CollaborativeDataManager.asNumpy` and :meth:`.CollaborativeDataManager.flatView` return
+    the views of the local :class:`.c3po.DataManager.DataManager` only (the :class:`.MPIRemote` are
+    ignored).
+
     When at least one :class:`.MPIRemote` is present, :class:`.MPICollaborativeDataManager` uses
     collective MPI communications: the object must be built and used in the same way for all the
     involved processes. They must all share the same communicator, and all the processes of that
@@ -97,6 +101,7 @@ class MPICollaborativeDataManager(CollaborativeDataManager):
         output = MPICollaborativeDataManager(notMPIoutput.dataManagers)
         output.mpiComm = self.mpiComm
         output.isMPI = self.isMPI
+        output.setNumberOfThreads(self.getNumberOfThreads())
         return output
 
     def normMax(self):
@@ -147,3 +152,82 @@ class MPICollaborativeDataManager(CollaborativeDataManager):
         if self.isMPI:
             result = self.mpiComm.allreduce(result, op=MPI.SUM)
         return result
+
+    def dotMany(self, others):
+        """ Return the scalar products of ``self`` with each element of ``others``.
+
+        A single global reduction is used for all the scalar products.
+
+        Parameters
+        ----------
+        others : list[MPICollaborativeDataManager]
+            :class:`.MPICollaborativeDataManager` consistent with ``self``.
+
+        Returns
+        -------
+        numpy.ndarray
+            The vector of the scalar products of ``self`` with each element of ``others``.
+
+        Raises
+        ------
+        Exception
+            If ``self`` and ``others`` are not consistent.
+        """
+        result = CollaborativeDataManager.dotMany(self, others)
+        if self.isMPI:
+            self.mpiComm.Allreduce(MPI.IN_PLACE, result, op=MPI.SUM)
+        return result
+
+    def gram(self, vectors):
+        """ Return the Gram matrix of ``vectors``: the matrix of their scalar products two by two.
+
+        A single global reduction is used for the whole matrix.
+
+        Parameters
+        ----------
+        vectors : list[MPICollaborativeDataManager]
+            :class:`.MPICollaborativeDataManager` consistent with ``self``.
+
+        Returns
+        -------
+        numpy.ndarray
+            The (symmetric) matrix ``G`` with ``G[i, j] = vectors[i].dot(vectors[j])``.
+
+        Raises
+        ------
+        Exception
+            If ``self`` and ``vectors`` are not consistent.
+        """
+        result = CollaborativeDataManager.gram(self, vectors)
+        if self.isMPI:
+            self.mpiComm.Allreduce(MPI.IN_PLACE, result, op=MPI.SUM)
+        return result
+
+    def reduceNorms(self, others=(), dotPairs=()):
+        """ Return, in a single call, the norms 2 and the infinite norms of ``self`` and of each
+        element of ``others``, as well as the requested scalar products between them.
+
+        A single collective communication is used for all the results.
+
+        Parameters
+        ----------
+        others : list[MPICollaborativeDataManager]
+            :class:`.MPICollaborativeDataManager` consistent with ``self``.
+        dotPairs : list[tuple[int, int]]
+            The scalar products to compute, as pairs of indices in ``[self] + others``.
+
+        Returns
+        -------
+        tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]
+            The norms 2 of ``[self] + others``, their infinite norms, and the scalar products
+            asked in ``dotPairs``.
+
+        Raises
+        ------
+        Exception
+            If ``self`` and ``others`` are not consistent.
+        """
+        norms2, normsMax, dots = CollaborativeDataManager.reduceNorms(self, others, dotPairs)
+        if self.isMPI:
+            norms2, normsMax, dots = allreduceNorms(self.mpiComm, norms2, normsMax, dots)
+        return norms2, normsMax, dots
@@ -49,4 +49,5 @@ class MPICollectiveDataManager(LocalDataManager, MPICollectiveProcess):
         output.valuesString = self.valuesString
         output.fieldsInt = self.fieldsInt
         output.fieldsDoubleTemplates = self.fieldsDoubleTemplates
+        output._packing = self._packing.cloneEmpty()   # pylint: disable=protected-access
         return output
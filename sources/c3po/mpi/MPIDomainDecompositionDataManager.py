@@ -11,11 +11,27 @@
 """ Contain the class :class:`.MPIDomainDecompositionDataManager`. """
 from __future__ import print_function, division
 import math
+import numpy
 from mpi4py import MPI
 
 from c3po.LocalDataManager import LocalDataManager
 
 
+def allreduceNorms(mpiComm, norms2, normsMax, dots):
+    """ INTERNAL
+
+    Return the global result of :meth:`c3po.DataManager.DataManager.reduceNorms` from the local ones,
+    using a single collective communication (an ``Allgather`` of all the local results).
+    """
+    nbNorms = len(norms2)
+    local = numpy.concatenate([norms2 * norms2, normsMax, dots])
+    gathered = numpy.empty((mpiComm.Get_size(), local.size))
+    mpiComm.Allgather(local, gathered)
+    return (numpy.sqrt(gathered[:, :nbNorms].sum(axis=0)),
+            gathered[:, nbNorms:2 * nbNorms].max(axis=0),
+            gathered[:, 2 * nbNorms:].sum(axis=0))
+
+
 class MPIDomainDecompositionDataManager(LocalDataManager):
     """ :class:`.MPIDomainDecompositionDataManager` is the MPI collaborative version of the
     :class:`c3po.DataManager.DataManager` in which all processes have locally only a part of the
@@ -69,6 +85,7 @@ class MPIDomainDecompositionDataManager(LocalDataManager):
         output.valuesString = self.valuesString
         output.fieldsInt = self.fieldsInt
         output.fieldsDoubleTemplates = self.fieldsDoubleTemplates
+        output._packing = self._packing.cloneEmpty()   # pylint: disable=protected-access
         return output
 
     def normMax(self):
@@ -113,6 +130,81 @@ class MPIDomainDecompositionDataManager(LocalDataManager):
         result = LocalDataManager.dot(self, other)
         return self.mpiComm.allreduce(result, op=MPI.SUM)
 
+    def dotMany(self, others):
+        """ Return the scalar products of ``self`` with each element of ``others``.
+
+        A single global reduction is used for all the scalar products.
+
+        Parameters
+        ----------
+        others : list[MPIDomainDecompositionDataManager]
+            :class:`.MPIDomainDecompositionDataManager` consistent with ``self``.
+
+        Returns
+        -------
+        numpy.ndarray
+            The vector of the scalar products of ``self`` with each element of ``others``.
+
+        Raises
+        ------
+        Exception
+            If ``self`` and ``others`` are not consistent.
+        """
+        result = LocalDataManager.dotMany(self, others)
+        self.mpiComm.Allreduce(MPI.IN_PLACE, result, op=MPI.SUM)
+        return result
+
+    def gram(self, vectors):
+        """ Return the Gram matrix of ``vectors``: the matrix of their scalar products two by two.
+
+        A single global reduction is used for the whole matrix.
+
+        Parameters
+        ----------
+        vectors : list[MPIDomainDecompositionDataManager]
+            :class:`.MPIDomainDecompositionDataManager` consistent with ``self``.
+
+        Returns
+        -------
+        numpy.ndarray
+            The (symmetric) matrix ``G`` with ``G[i, j] = vectors[i].dot(vectors[j])``.
+
+        Raises
+        ------
+        Exception
+            If ``self`` and ``vectors`` are not consistent.
+        """
+        result = LocalDataManager.gram(self, vectors)
+        self.mpiComm.Allreduce(MPI.IN_PLACE, result, op=MPI.SUM)
+        return result
+
+    def reduceNorms(self, others=(), dotPairs=()):
+        """ Return, in a single call, the norms 2 and the infinite norms of ``self`` and of each
+        element of ``others``, as well as the requested scalar products between them.
+
+        A single collective communication is used for all the results.
+
+        Parameters
+        ----------
+        others : list[MPIDomainDecompositionDataManager]
+            :class:`.MPIDomainDecompositionDataManager` consistent with ``self``.
+        dotPairs : list[tuple[int, int]]
+            The scalar products to compute, as pairs of indices in ``[self] + others``.
+
+        Returns
+        -------
+        tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]
+            The norms 2 of ``[self] + others``, their infinite norms, and the scalar products
+            asked in ``dotPairs``.
+
+        Raises
+        ------
+        Exception
+            If ``self`` and ``others`` are not consistent.
+        """
+        norms2, normsMax, dots = LocalDataManager.reduceNorms(self, others, dotPairs)
+        return allreduceNorms(self.mpiComm, norms2, normsMax, dots)
+
     def getLocalView(self):
         """ Return a new :class:`.LocalDataManager` that holds the same data than ``self``
 
@@ -128,4 +220,5 @@ class MPIDomainDecompositionDataManager(LocalDataManager):
         localView.fieldsDouble = self.fieldsDouble
         localView.fieldsInt = self.fieldsInt
         localView.fieldsDoubleTemplates = self.fieldsDoubleTemplates
+        localView._packing = self._packing              # pylint: disable=protected-access
         return localView
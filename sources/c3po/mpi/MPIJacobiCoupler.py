@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2020, CEA
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following disclaimer in the documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products derived from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+""" Contain the class :class:`.MPIJacobiCoupler`. """
+from __future__ import print_function, division
+from mpi4py import MPI
+
+from c3po.couplers.JacobiCoupler import JacobiCoupler
+from c3po.mpi.MPICoupler import MPICoupler
+
+
+class MPIJacobiCoupler(JacobiCoupler, MPICoupler):
+    """ :class:`.MPIJacobiCoupler` is the MPI collaborative version of
+    :class:`c3po.couplers.JacobiCoupler.JacobiCoupler`.
+
+    Each process solves its own :class:`.PhysicsDriver` (the other ones being :class:`.MPIRemote`):
+    the :class:`.PhysicsDriver` of the different processes run at the same time. The solve statuses
+    are then shared by all the processes.
+
+    The object must be built and used in the same way for all the involved processes (see
+    :class:`.MPICoupler`). The :class:`.DataManager` must handle the parallelism of the norms and
+    scalar products (for example :class:`.MPICollaborativeDataManager`).
+    """
+
+    def __init__(self, physics, exchangers, dataManagers, mpiComm=None):
+        """ Build a :class:`.MPIJacobiCoupler` object.
+
+        Has the same form than :meth:`.JacobiCoupler.__init__` but can also contain
+        :class:`.MPIRemote` (and :class:`.MPICollectiveProcess`) objects.
+
+        Parameters
+        ----------
+        physics : list[PhysicsDriver]
+            List of the :class:`c3po.PhysicsDriver.PhysicsDriver` to be solved at the same time.
+        exchangers : list[Exchanger]
+            List of exactly two :class:`c3po.Exchanger.Exchanger` allowing to go from the
+            :class:`.PhysicsDriver` to the :class:`.DataManager` and vice versa.
+        dataManagers : list[DataManager]
+            List of :class:`c3po.DataManager.DataManager`.
+        mpiComm
+            If not None, forces :class:`.MPIJacobiCoupler` to make MPI communications and to use this
+            communicator (see :class:`.MPICoupler`).
+        """
+        MPICoupler.__init__(self, physics, exchangers, dataManagers, mpiComm)
+        JacobiCoupler.__init__(self, physics, exchangers, dataManagers)
+
+    def getPhysicsSolveStatus(self):
+        """ INTERNAL Return True if all the :class:`.PhysicsDriver` of all the processes succeeded in their last solve. """
+        resu = JacobiCoupler.getPhysicsSolveStatus(self)
+        if self._isMPI:
+            resu = self.mpiComm.allreduce(resu, op=MPI.MIN)
+        return resu
@@ -11,11 +11,12 @@
 """ Contain the class :class:`.MPIMasterDataManager`. """
 from __future__ import print_function, division
 import math
+import numpy
 from mpi4py import MPI
 
 from c3po.mpi.MPITag import MPITag
 
-from c3po.DataManager import DataManager
+from c3po.DataManager import DataManager, mergeNorms
 
 
 class MPIMasterDataManager(DataManager):
@@ -166,6 +167,18 @@ class MPIMasterDataManager(DataManager):
             self.localDataManager.imuladd(scalar, other.localDataManager)
         return self
 
+    def linearCombination(self, coeffs, managers):
+        """ See :meth:`c3po.DataManager.DataManager.linearCombination`. """
+        if len(coeffs) != len(managers):
+            raise Exception("MPIMasterDataManager.linearCombination : coeffs and managers must have the same length.")
+        for other in managers:
+            self.checkCompatibility(other)
+        coeffs = [float(coeff) for coeff in coeffs]
+        self.physicsDriver.sendData(MPITag.linearCombinationData, (self.idDataWorker, coeffs, [other.idDataWorker for other in managers]))
+        if self.localDataManager is not None:
+            self.localDataManager.linearCombination(coeffs, [other.localDataManager for other in managers])
+        return self
+
     def dot(self, other):
         """ See :meth:`c3po.DataManager.DataManager.dot`. """
         self.checkCompatibility(other)
@@ -174,3 +187,36 @@ class MPIMasterDataManager(DataManager):
         if self.localDataManager is not None:
             resu = self.localDataManager.dot(other.localDataManager)
         return self.physicsDriver.recvData(resu, MPI.SUM)
+
+    def dotMany(self, others):
+        """ See :meth:`c3po.DataManager.DataManager.dotMany`. """
+        for other in others:
+            self.checkCompatibility(other)
+        self.physicsDriver.sendData(MPITag.dotManyData, (self.idDataWorker, [other.idDataWorker for other in others]))
+        resu = numpy.zeros(len(others))
+        if self.localDataManager is not None:
+            resu = self.localDataManager.dotMany([other.localDataManager for other in others])
+        return self.physicsDriver.recvData(resu, MPI.SUM)
+
+    def gram(self, vectors):
+        """ See :meth:`c3po.DataManager.DataManager.gram`. """
+        for vector in vectors:
+            self.checkCompatibility(vector)
+        self.physicsDriver.sendData(MPITag.gramData, (self.idDataWorker, [vector.idDataWorker for vector in vectors]))
+        resu = numpy.zeros((len(vectors), len(vectors)))
+        if self.localDataManager is not None:
+            resu = self.localDataManager.gram([vector.localDataManager for vector in vectors])
+        return self.physicsDriver.recvData(resu, MPI.SUM)
+
+    def reduceNorms(self, others=(), dotPairs=()):
+        """ See :meth:`c3po.DataManager.DataManager.reduceNorms`. """
+        for other in others:
+            self.checkCompatibility(other)
+        dotPairs = list(dotPairs)
+        self.physicsDriver.sendData(MPITag.reduceNormsData, (self.idDataWorker, [other.idDataWorker for other in others], dotPairs))
+        resu = (numpy.zeros(len(others) + 1), numpy.zeros(len(others) + 1), numpy.zeros(len(dotPairs)))
+        if self.localDataManager is not None:
+            norms2, normsMax, dots = self.localDataManager.reduceNorms([other.localDataManager for other in others], dotPairs)
+            resu = (norms2 * norms2, normsMax, dots)
+        resu = self.physicsDriver.recvData(resu, mergeNorms)
+        return numpy.sqrt(resu[0]), resu[1], resu[2]
@@ -66,6 +66,10 @@ class MPITag(object):
     imulData = 111
     imuladdData = 112
     dotData = 113
+    linearCombinationData = 114
+    dotManyData = 115
+    gramData = 116
+    reduceNormsData = 117
 
     exchange = 150
     clean = 151
@@ -12,6 +12,7 @@
 from __future__ import print_function, division
 from mpi4py import MPI
 
+from c3po.DataManager import mergeNorms
 from c3po.mpi.MPITag import MPITag
 from c3po.mpi.MPIRemoteProcess import MPIRemoteProcess
 
@@ -204,6 +205,19 @@ class MPIWorker(object):
                 elif tag == MPITag.dotData:
                     self.checkDataID(data)
                     self.answer(self._dataManagers[data[0]].dot(self._dataManagers[data[1]]), collectiveOperator=MPI.SUM)
+                elif tag == MPITag.linearCombinationData:
+                    self.checkDataID([data[0]] + data[2])
+                    self._dataManagers[data[0]].linearCombination(data[1], [self._dataManagers[idData] for idData in data[2]])
+                elif tag == MPITag.dotManyData:
+                    self.checkDataID([data[0]] + data[1])
+                    self.answer(self._dataManagers[data[0]].dotMany([self._dataManagers[idData] for idData in data[1]]), collectiveOperator=MPI.SUM)
+                elif tag == MPITag.gramData:
+                    self.checkDataID([data[0]] + data[1])
+                    self.answer(self._dataManagers[data[0]].gram([self._dataManagers[idData] for idData in data[1]]), collectiveOperator=MPI.SUM)
+                elif tag == MPITag.reduceNormsData:
+                    self.checkDataID([data[0]] + data[1])
+                    norms2, normsMax, dots = self._dataManagers[data[0]].reduceNorms([self._dataManagers[idData] for idData in data[1]], data[2])
+                    self.answer((norms2 * norms2, normsMax, dots), collectiveOperator=mergeNorms)
 
                 elif tag == MPITag.exchange:
                     self._exchangers[data].exchange()
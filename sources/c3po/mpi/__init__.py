@@ -20,6 +20,7 @@ from .MPIDomainDecompositionDataManager import MPIDomainDecompositionDataManager
 from .MPICollaborativePhysicsDriver import MPICollaborativePhysicsDriver
 from .MPIExchanger import MPIExchanger
 from .MPICoupler import MPICoupler
+from .MPIJacobiCoupler import MPIJacobiCoupler
 from .MPIMasterPhysicsDriver import MPIMasterPhysicsDriver
 from .MPIMasterDataManager import MPIMasterDataManager
 from .MPIMasterExchanger import MPIMasterExchanger
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2020, CEA
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following disclaimer in the documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products derived from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+""" Contain the class :class:`.AccuracyScheduler`. """
+from __future__ import print_function, division
+
+
+class AccuracyScheduler(object):
+    """ :class:`.AccuracyScheduler` computes the accuracy asked to the solvers of a coupler at each
+    coupling iteration, in order not to fully converge them while the coupling error is still large
+    (inexact fixed point).
+
+    An :class:`.AccuracyScheduler` is given to a coupler with :meth:`.Coupler.setAccuracyScheduler`.
+    Before each solve, the coupler then sets to its :class:`.PhysicsDriver` the accuracy
+
+    .. math::
+
+        \\epsilon_{k} = \\min(\\epsilon_{max}, \\max(\\epsilon_{min}, s . e_{k-1}))
+
+    with :math:`e_{k-1}` the coupling error of the previous iteration (:math:`\\epsilon_{k} = \\epsilon_{max}`
+    if it is not known yet) and :math:`s` a safety factor. The accuracy is given with
+    ``setInputDoubleValue(inputName, value)``.
+
+    If a name of output value is provided for the number of inner iterations, the coupler reads it
+    after each solve (``getOutputDoubleValue(innerIterationsName)``) and prints, at each iteration,
+    the total number of inner iterations since the beginning of the time step.
+    """
+
+    def __init__(self, inputName="Accuracy", safetyFactor=0.1, minAccuracy=0., maxAccuracy=1.E-2, innerIterationsName=None):
+        """ Build a :class:`.AccuracyScheduler` object.
+
+        Parameters
+        ----------
+        inputName : str
+            Name of the input value receiving the accuracy. Default: ``"Accuracy"``.
+        safetyFactor : float
+            The safety factor :math:`s`, ratio between the accuracy and the last coupling error.
+            Default: 0.1.
+        minAccuracy : float
+            The floor :math:`\\epsilon_{min}` of the accuracy. Default: 0.
+        maxAccuracy : float
+            The accuracy :math:`\\epsilon_{max}` used at the first iterations, and the maximum one.
+            Default: 1.E-2.
+        innerIterationsName : str
+            Name of the output value giving the number of inner iterations of the last solve, or
+            None (default) if the solvers do not provide it.
+        """
+        if safetyFactor <= 0.:
+            raise Exception("AccuracyScheduler.__init__ Set a safetyFactor > 0 !")
+        if minAccuracy > maxAccuracy:
+            raise Exception("AccuracyScheduler.__init__ minAccuracy should not be greater than maxAccuracy!")
+        self._inputName = inputName
+        self._safetyFactor = safetyFactor
+        self._minAccuracy = minAccuracy
+        self._maxAccuracy = maxAccuracy
+        self._innerIterationsName = innerIterationsName
+        self._innerIterations = 0
+
+    def getInputName(self):
+        """ Return the name of the input value receiving the accuracy.
+
+        Returns
+        -------
+        str
+            The name of the input value receiving the accuracy.
+        """
+        return self._inputName
+
+    def getInnerIterationsName(self):
+        """ Return the name of the output value giving the number of inner iterations (or None).
+
+        Returns
+        -------
+        str
+            The name of the output value giving the number of inner iterations, or None.
+        """
+        return self._innerIterationsName
+
+    def computeAccuracy(self, error):
+        """ Return the accuracy to ask to the solvers.
+
+        Parameters
+        ----------
+        error : float
+            The coupling error of the previous iteration, or None if it is not known yet.
+
+        Returns
+        -------
+        float
+            The accuracy to ask to the solvers.
+        """
+        if error is None:
+            return self._maxAccuracy
+        return min(self._maxAccuracy, max(self._minAccuracy, self._safetyFactor * error))
+
+    def addInnerIterations(self, nbIterations):
+        """ Add ``nbIterations`` to the number of inner iterations of the time step. """
+        self._innerIterations += nbIterations
+
+    def getInnerIterations(self):
+        """ Return the number of inner iterations since the beginning of the time step.
+
+        Returns
+        -------
+        int
+            The number of inner iterations since the beginning of the time step.
+        """
+        return self._innerIterations
+
+    def resetInnerIterations(self):
+        """ Set to 0 the number of inner iterations of the time step. """
+        self._innerIterations = 0
@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2020, CEA
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following disclaimer in the documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products derived from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+""" Contain the class :class:`.AndersonHistory`. """
+from __future__ import print_function, division
+import math
+import numpy as np
+
+from c3po.DataManager import DataManager, orthogonalize
+
+
+def solveUpperTriangular(matrix, rhs):
+    """ INTERNAL
+
+    Solve ``matrix x = rhs`` by back substitution, ``matrix`` being upper triangular. Unknowns
+    corresponding to a zero diagonal term are set to 0 (as a least squares solution would).
+    """
+    size = rhs.shape[0]
+    solution = np.zeros(size)
+    for i in range(size - 1, -1, -1):
+        if matrix[i, i] != 0.:
+            solution[i] = (rhs[i] - np.dot(matrix[i, i + 1:size], solution[i + 1:])) / matrix[i, i]
+    return solution
+
+
+def solveLowerTriangular(matrix, rhs):
+    """ INTERNAL
+
+    Solve ``matrix x = rhs`` by forward substitution, ``matrix`` being lower triangular. Unknowns
+    corresponding to a zero diagonal term are set to 0.
+    """
+    size = rhs.shape[0]
+    solution = np.zeros(size)
+    for i in range(size):
+        if matrix[i, i] != 0.:
+            solution[i] = (rhs[i] - np.dot(matrix[i, :i], solution[:i])) / matrix[i, i]
+    return solution
+
+
+def estimateConditionNumber(matrixR):
+    """ INTERNAL
+
+    Return an estimate of the condition number (in norm 1) of the upper triangular ``matrixR``.
+
+    The norm of the inverse is estimated with the Hager-Higham algorithm, which only requires a
+    few triangular solves: the cost is ``O(n^2)`` (instead of ``O(n^3)`` for a SVD). The estimate is
+    a lower bound of the condition number, usually within a factor 3.
+    """
+    size = matrixR.shape[0]
+    if size == 0:
+        return 1.
+    if np.any(np.diag(matrixR) == 0.):
+        return float("inf")
+    vectorX = np.full(size, 1. / size)
+    normInverse = 0.
+    previousIndex = -1
+    for _ in range(5):
+        vectorY = solveUpperTriangular(matrixR, vectorX)
+        normInverse = np.abs(vectorY).sum()
+        signs = np.where(vectorY >= 0., 1., -1.)
+        vectorZ = solveLowerTriangular(matrixR.T, signs)
+        index = int(np.argmax(np.abs(vectorZ)))
+        if abs(vectorZ[index]) <= np.dot(vectorZ, vectorX) or index == previousIndex:
+            break
+        vectorX = np.zeros(size)
+        vectorX[index] = 1.
+        previousIndex = index
+    return np.abs(matrixR).sum(axis=0).max() * normInverse
+
+
+class AndersonHistory(object):
+    """ INTERNAL
+
+    :class:`.AndersonHistory` holds the history of an Anderson acceleration: the differences of the
+    residuals ``dF`` (through the QR decomposition of the matrix of their columns) and the
+    differences of the images ``dG``, from the oldest to the newest.
+
+    It is built for a fixed capacity:
+
+    - the ``dG`` vectors are stored in a ring buffer: the deletion of the oldest one only moves an
+      index;
+    - the matrix ``R`` is preallocated, and updated in place by Givens rotations when the oldest
+      column is deleted;
+    - the vectors of ``Q`` are allocated once and recycled (the rotations swap them instead of
+      copying them);
+    - the conditioning of ``R`` is monitored with an ``O(n^2)`` estimate
+      (see :func:`estimateConditionNumber`), and the least squares problem is solved by back
+      substitution.
+
+    The cost of the management of the history, outside of the operations on the vectors, does not
+    depend on the size of the data.
+    """
+
+    def __init__(self, capacity, dropTolerance=1.e10):
+        """ Build an empty :class:`.AndersonHistory`.
+
+        Parameters
+        ----------
+        capacity : int
+            The maximum number of columns.
+        dropTolerance : float
+            The oldest columns are deleted while the condition number of ``R`` is larger than this
+            value. Set 0 to disable this control.
+        """
+        self._capacity = capacity
+        self._dropTolerance = dropTolerance
+        self._size = 0
+        self._start = 0
+        self._matrixR = np.zeros((capacity, capacity))
+        self._deltaG = [None] * capacity
+        self._basis = [None] * (capacity + 1)
+        self._storageType = np.float64
+        self._store = None
+
+    def setStorage(self, storageType, store):
+        """ Set the storage type (see :meth:`.DataManager.setStorageType`) and the :class:`.HistoryStore` (or None) used for the vectors. """
+        self._storageType = storageType
+        self._store = store
+
+    def getCapacity(self):
+        """ Return the maximum number of columns. """
+        return self._capacity
+
+    def getSize(self):
+        """ Return the current number of columns. """
+        return self._size
+
+    def getMatrixR(self):
+        """ Return (a view of) the triangular matrix ``R``. """
+        return self._matrixR[:self._size, :self._size]
+
+    def getBasis(self):
+        """ Return the orthonormal vectors ``Q``, from the oldest column to the newest. """
+        return self._basis[:self._size]
+
+    def getDeltaG(self):
+        """ Return the ``dG`` vectors, from the oldest to the newest. """
+        return [self._deltaG[(self._start + i) % self._capacity] for i in range(self._size)]
+
+    def _newVector(self, model):
+        """ INTERNAL Return a clone of ``model`` with the storage type of the history. """
+        vector = model.clone()
+        vector.setStorageType(self._storageType)
+        return vector
+
+    def _stored(self, vector):
+        """ INTERNAL Add ``vector`` to the :class:`.HistoryStore` (if any) and return it. """
+        if self._store is not None:
+            self._store.add(vector)
+        return vector
+
+    def add(self, deltaF, deltaG):
+        """ Add a new column (the newest) to the history.
+
+        The oldest column is first deleted if the history is full. Then, the oldest columns are
+        deleted while ``R`` is ill-conditioned.
+
+        Parameters
+        ----------
+        deltaF : DataManager
+            The difference of residuals. It is modified (orthogonalized against ``Q``).
+        deltaG : DataManager
+            The difference of images (copied).
+        """
+        if self._size == self._capacity:
+            self.deleteOldest()
+        slot = (self._start + self._size) % self._capacity
+        if self._deltaG[slot] is None:
+            self._deltaG[slot] = self._newVector(deltaG)
+        else:
+            self._deltaG[slot].copy(deltaG)
+        self._stored(self._deltaG[slot])
+
+        size = self._size
+        self._matrixR[:size, size] = orthogonalize(deltaF, self._basis[:size])
+        norm = deltaF.norm2()
+        self._matrixR[size, size] = norm
+        if self._basis[size] is None:
+            self._basis[size] = self._newVector(deltaF)
+        self._basis[size].axpby(1. / norm if norm != 0. else 1., deltaF, 0.)
+        self._stored(self._basis[size])
+        self._size += 1
+
+        if self._dropTolerance > 0.:
+            while self._size > 1 and estimateConditionNumber(self.getMatrixR()) > self._dropTolerance:
+                self.deleteOldest()
+
+    def deleteOldest(self):
+        """ Delete the oldest column: ``R`` is made triangular again with Givens rotations, also applied to ``Q``. """
+        size = self._size
+        matrixR = self._matrixR
+        basis = self._basis
+        if size > 1 and basis[size] is None:
+            basis[size] = self._newVector(basis[0])
+        spare = basis[size]
+        for i in range(size - 1):
+            norm = math.hypot(matrixR[i, i + 1], matrixR[i + 1, i + 1])
+            cval, sval = (matrixR[i, i + 1] / norm, matrixR[i + 1, i + 1] / norm) if norm != 0. else (1., 0.)
+            rowI = matrixR[i, i + 1:size].copy()
+            matrixR[i, i + 1:size] = cval * rowI + sval * matrixR[i + 1, i + 1:size]
+            matrixR[i + 1, i + 1:size] = -sval * rowI + cval * matrixR[i + 1, i + 1:size]
+            spare.linearCombination([cval, sval], [basis[i], basis[i + 1]])
+            basis[i + 1].axpby(-sval, basis[i], cval)
+            basis[i], spare = spare, basis[i]
+            self._stored(basis[i])
+        basis[size] = spare
+        if size > 0:
+            matrixR[:size - 1, :size - 1] = matrixR[:size - 1, 1:size]
+            matrixR[size - 1, :size] = 0.
+            matrixR[:size, size - 1] = 0.
+            self._start = (self._start + 1) % self._capacity
+            self._size -= 1
+
+    def solve(self, residual):
+        """ Return the coefficients ``gamma`` minimizing ``||residual - dF gamma||``.
+
+        Parameters
+        ----------
+        residual : DataManager
+            The current residual.
+
+        Returns
+        -------
+        numpy.ndarray
+            The coefficients ``gamma`` (one per column, from the oldest to the newest).
+        """
+        return solveUpperTriangular(self.getMatrixR(), residual.dotMany(self.getBasis()))
+
+    def extrapolate(self, data, residual, dampingFactor=1.):
+        """ Replace ``data`` (:math:`G(X)`) by the Anderson extrapolation.
+
+        Parameters
+        ----------
+        data : DataManager
+            :math:`G(X)`, replaced by the extrapolation.
+        residual : DataManager
+            The current residual :math:`G(X) - X`.
+        dampingFactor : float
+            The Anderson damping factor (1. means no damping).
+        """
+        # On résout le problème de minimisation : R gamma = Q^T F (système triangulaire)
+        gamma = self.solve(residual)
+
+        # On calcule dG * gamma pour ensuite calculer le nouveau data, en une seule combinaison lineaire
+        coeffs = [1.] + list(-gamma)
+        managers = [data] + self.getDeltaG()
+        if dampingFactor != 1.:
+            matrixRgamma = np.dot(self.getMatrixR(), gamma)
+            coeffs += [-(1. - dampingFactor)] + list((1. - dampingFactor) * matrixRgamma)
+            managers += [residual] + self.getBasis()
+        data.linearCombination(coeffs, managers)
+
+    def clear(self):
+        """ Delete all the columns (the vectors are kept, to be reused). """
+        self._size = 0
+        self._start = 0
+        self._matrixR.fill(0.)
+
+    def release(self):
+        """ Delete all the columns and release the vectors (see :meth:`.DataManager.release`). """
+        for vector in self._deltaG + self._basis:
+            if isinstance(vector, DataManager):
+                vector.release()
+        self._deltaG = [None] * self._capacity
+        self._basis = [None] * (self._capacity + 1)
+        self.clear()
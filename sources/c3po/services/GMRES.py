@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2020, CEA
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following disclaimer in the documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products derived from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+""" Contain the class :class:`.GMRES`. """
+from __future__ import print_function, division
+import math
+import numpy as np
+
+from c3po.DataManager import DataManager, orthogonalize, orthogonalizeModified
+from c3po.services.AndersonHistory import solveUpperTriangular
+
+
+class GramSchmidt(object):
+    """ Enum definition of the Gram-Schmidt process used to orthogonalize the Krylov basis.
+
+    Values :
+        - :attr:`iterated`: classical Gram-Schmidt applied twice. It requires two calls to
+          :meth:`.DataManager.dotMany` (two global reductions in parallel) per Krylov iteration.
+        - :attr:`modified`: modified Gram-Schmidt. It requires one scalar product (one global
+          reduction) per vector of the basis.
+    """
+    iterated = 0
+    modified = 1
+
+
+class GMRES(object):
+    """ INTERNAL
+
+    :class:`.GMRES` is a restarted GMRES(m) method driven from outside (reverse communication): the
+    products of the matrix with the vectors of the basis are computed by the caller (for instance
+    by a Jacobian-free finite difference in :class:`.JFNKCoupler`).
+
+    Usage:
+
+    - :meth:`start` with the right-hand side;
+    - while not converged: if :meth:`isCycleFull`, :meth:`restart`; compute the product of the matrix
+      with :meth:`getDirection` in the vector returned by :meth:`getProductVector`; call
+      :meth:`addProduct`, which returns the norm of the current residual;
+    - get the solution with :meth:`getSolution`.
+
+    The Hessenberg matrix is preallocated, the Givens rotations are stored as ``(c, s)`` pairs and
+    applied to the new column only: the cost of an iteration, outside of the operations on the
+    vectors, is ``O(m)``. At most ``m + 1`` vectors are stored.
+
+    In flexible mode (FGMRES), the matrix is applied to a preconditioned direction, written by the
+    caller in the vector returned by :meth:`getPreconditionedVector`: the solution is built from these
+    vectors, so that the (right) preconditioner may change from one iteration to another. ``m``
+    additional vectors are stored.
+    """
+
+    def __init__(self, restart, gramSchmidt=GramSchmidt.iterated, flexible=False):
+        """ Build a :class:`.GMRES` object.
+
+        Parameters
+        ----------
+        restart : int
+            The maximum number of iterations of a cycle (the ``m`` of GMRES(m)).
+        gramSchmidt : int
+            The orthogonalization process (see :class:`.GramSchmidt`).
+        flexible : bool
+            True for the flexible mode (see :class:`.GMRES`).
+        """
+        if restart < 1:
+            raise Exception("GMRES.__init__ restart must be >= 1.")
+        self._restart = restart
+        self._gramSchmidt = gramSchmidt
+        self._basis = [None] * (restart + 1)
+        self._preconditioned = [None] * restart if flexible else None
+        self._matrixH = np.zeros((restart + 1, restart))
+        self._cosines = np.zeros(restart)
+        self._sines = np.zeros(restart)
+        self._rhs = np.zeros(restart + 1)
+        self._size = 0
+        self._nbCycles = 0
+        self._storageType = np.float64
+        self._store = None
+
+    def setStorage(self, storageType, store):
+        """ Set the storage type (see :meth:`.DataManager.setStorageType`) and the :class:`.HistoryStore` (or None) used for the basis. """
+        self._storageType = storageType
+        self._store = store
+
+    def _vector(self, index, model, vectors=None):
+        """ INTERNAL Return the vector ``index`` of ``vectors`` (default: the basis), allocated from ``model`` if needed. """
+        if vectors is None:
+            vectors = self._basis
+        if vectors[index] is None:
+            vectors[index] = model.clone()
+            vectors[index].setStorageType(self._storageType)
+        return vectors[index]
+
+    def _solutionVectors(self):
+        """ INTERNAL Return the vectors on which the solution of the current cycle is built. """
+        if self._preconditioned is not None:
+            return self._preconditioned[:self._size]
+        return self._basis[:self._size]
+
+    def _stored(self, vector):
+        """ INTERNAL Add ``vector`` to the :class:`.HistoryStore` (if any). """
+        if self._store is not None:
+            self._store.add(vector)
+
+    def start(self, rhs, norm=None):
+        """ Start the resolution with a zero initial guess.
+
+        Parameters
+        ----------
+        rhs : DataManager
+            The right-hand side (not modified).
+        norm : float
+            The norm 2 of ``rhs``, if already known.
+        """
+        if norm is None:
+            norm = rhs.norm2()
+        firstVector = self._vector(0, rhs)
+        firstVector.axpby(1. / norm if norm != 0. else 1., rhs, 0.)
+        self._stored(firstVector)
+        self._reset(norm)
+        self._nbCycles = 0
+
+    def _reset(self, norm):
+        """ INTERNAL Start a new cycle, the first vector of the basis being already set. """
+        self._size = 0
+        self._matrixH.fill(0.)
+        self._rhs.fill(0.)
+        self._rhs[0] = norm
+
+    def isCycleFull(self):
+        """ Return True if the current cycle is complete: :meth:`restart` must be called before the next iteration. """
+        return self._size == self._restart
+
+    def getSize(self):
+        """ Return the number of iterations of the current cycle. """
+        return self._size
+
+    def getNbCycles(self):
+        """ Return the number of restarts done since :meth:`start`. """
+        return self._nbCycles
+
+    def getDirection(self):
+        """ Return the vector of the basis to be multiplied by the matrix at this iteration. """
+        return self._basis[self._size]
+
+    def getProductVector(self, model):
+        """ Return the vector in which the product of the matrix with :meth:`getDirection` must be written.
+
+        Parameters
+        ----------
+        model : DataManager
+            A :class:`.DataManager` used to allocate the vector the first time.
+        """
+        return self._vector(self._size + 1, model)
+
+    def getPreconditionedVector(self, model):
+        """ Return the vector in which the preconditioned :meth:`getDirection` must be written (flexible mode only).
+
+        The matrix must then be applied to this vector instead of :meth:`getDirection`.
+
+        Parameters
+        ----------
+        model : DataManager
+            A :class:`.DataManager` used to allocate the vector the first time.
+        """
+        if self._preconditioned is None:
+            raise Exception("GMRES.getPreconditionedVector is only available in flexible mode.")
+        return self._vector(self._size, model, self._preconditioned)
+
+    def addProduct(self):
+        """ Complete the iteration: orthogonalize the product (see :meth:`getProductVector`) and update the Hessenberg matrix.
+
+        Returns
+        -------
+        float
+            The norm 2 of the residual of the linear system.
+        """
+        k = self._size
+        product = self._basis[k + 1]
+        column = self._matrixH[:, k]
+        if self._gramSchmidt == GramSchmidt.modified:
+            column[:k + 1] = orthogonalizeModified(product, self._basis[:k + 1])
+        else:
+            column[:k + 1] = orthogonalize(product, self._basis[:k + 1])
+        column[k + 1] = product.norm2()
+        if column[k + 1] != 0.:
+            product *= 1. / column[k + 1]
+        self._stored(product)
+        if self._preconditioned is not None:
+            self._stored(self._preconditioned[k])
+
+        for i in range(k):
+            value = self._cosines[i] * column[i] + self._sines[i] * column[i + 1]
+            column[i + 1] = -self._sines[i] * column[i] + self._cosines[i] * column[i + 1]
+            column[i] = value
+        norm = math.hypot(column[k], column[k + 1])
+        self._cosines[k], self._sines[k] = (column[k] / norm, column[k + 1] / norm) if norm != 0. else (1., 0.)
+        column[k] = norm
+        column[k + 1] = 0.
+        self._rhs[k + 1] = -self._sines[k] * self._rhs[k]
+        self._rhs[k] = self._cosines[k] * self._rhs[k]
+        self._size += 1
+        return abs(self._rhs[k + 1])
+
+    def _coefficients(self):
+        """ INTERNAL Return the coefficients of the solution of the current cycle on the basis. """
+        return solveUpperTriangular(self._matrixH[:self._size, :self._size], self._rhs[:self._size])
+
+    def restart(self, correction, accumulate):
+        """ End the current cycle and start a new one from the current residual.
+
+        Parameters
+        ----------
+        correction : DataManager
+            The solution of the completed cycles: the solution of the current one is added to it
+            (or written in it if ``accumulate`` is False).
+        accumulate : bool
+            False for the first restart (``correction`` is then overwritten).
+        """
+        size = self._size
+        coefficients = list(self._coefficients())
+        if accumulate:
+            correction.linearCombination([1.] + coefficients, [correction] + self._solutionVectors())
+        else:
+            correction.linearCombination(coefficients, self._solutionVectors())
+        # The residual is Q (rhs - H y): only the last component of the rotated rhs is non zero.
+        residual = np.zeros(size + 1)
+        residual[size] = self._rhs[size]
+        for i in range(size - 1, -1, -1):
+            value = self._cosines[i] * residual[i] - self._sines[i] * residual[i + 1]
+            residual[i + 1] = self._sines[i] * residual[i] + self._cosines[i] * residual[i + 1]
+            residual[i] = value
+        norm = abs(self._rhs[size])
+        self._basis[0].linearCombination(list(residual / norm) if norm != 0. else [1.] + [0.] * size, self._basis[:size + 1])
+        self._stored(self._basis[0])
+        self._reset(norm)
+        self._nbCycles += 1
+
+    def getSolution(self):
+        """ Return the solution of the current cycle, as coefficients and vectors.
+
+        Returns
+        -------
+        tuple[list, list[DataManager]]
+            The solution of the current cycle is ``sum_i(coeffs[i] * vectors[i])``.
+        """
+        return list(self._coefficients()), self._solutionVectors()
+
+    def release(self):
+        """ Release the vectors of the basis (see :meth:`.DataManager.release`). """
+        for vector in self._basis + (self._preconditioned or []):
+            if isinstance(vector, DataManager):
+                vector.release()
+        self._basis = [None] * (self._restart + 1)
+        if self._preconditioned is not None:
+            self._preconditioned = [None] * self._restart
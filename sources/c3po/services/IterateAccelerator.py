@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2020, CEA
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following disclaimer in the documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products derived from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+""" Contain the classes :class:`.JacobiAcceleration` and :class:`.IterateAccelerator`. """
+from __future__ import print_function, division
+
+from c3po.DataManager import DataManager
+from c3po.services.AndersonHistory import AndersonHistory
+
+
+class JacobiAcceleration(object):
+    """ Enum definition of the accelerations of :class:`.JacobiCoupler` and :class:`.WaveformRelaxationCoupler`.
+
+    Values :
+        - :attr:`none` : damped fixed point.
+        - :attr:`aitken` : Aitken dynamic relaxation (see :class:`.AitkenCoupler`).
+        - :attr:`anderson` : Anderson acceleration (see :class:`.AndersonCoupler`).
+    """
+    none = 0
+    aitken = 1
+    anderson = 2
+
+
+class IterateAccelerator(object):
+    """ INTERNAL Compute the next iterate of a fixed-point algorithm with one of the :class:`.JacobiAcceleration`.
+
+    Used by :class:`.AitkenCoupler`, :class:`.JacobiCoupler` and :class:`.WaveformRelaxationCoupler`.
+    """
+
+    def __init__(self, acceleration, dampingFactor, order=2, dampingFactorBounds=(None, None)):
+        """ INTERNAL
+
+        ``dampingFactor`` is the initial damping factor with the Aitken acceleration, and
+        ``dampingFactorBounds`` the (minimum, maximum) bounds of the damping factors it computes
+        (None for no bound).
+        """
+        self._acceleration = acceleration
+        self._dampingFactor = dampingFactor
+        self._minDampingFactor, self._maxDampingFactor = dampingFactorBounds
+        self._history = AndersonHistory(order) if acceleration == JacobiAcceleration.anderson else None
+        self._previousResidual = 0
+        self._deltaF = 0
+        self._delta = 0
+
+    def getDampingFactor(self):
+        """ INTERNAL Return the current damping factor (updated by the Aitken acceleration). """
+        return self._dampingFactor
+
+    def _boundDampingFactor(self, dampingFactor):
+        """ INTERNAL Apply the damping factor bounds. """
+        if self._minDampingFactor is not None:
+            dampingFactor = max(dampingFactor, self._minDampingFactor)
+        if self._maxDampingFactor is not None:
+            dampingFactor = min(dampingFactor, self._maxDampingFactor)
+        return dampingFactor
+
+    def update(self, data, residual):
+        """ INTERNAL Replace ``data`` (:math:`F(X)`) by the next iterate, ``residual`` being :math:`F(X) - X`. """
+        if self._acceleration == JacobiAcceleration.none:
+            data.axpy(self._dampingFactor - 1., residual)
+        elif self._acceleration == JacobiAcceleration.aitken:
+            if self._previousResidual == 0:
+                self._previousResidual = residual.clone()
+            else:
+                # previousResidual becomes R^n - R^{n-1}, then R^{n-1}.(R^n - R^{n-1}) = R^n.(R^n - R^{n-1}) - ||R^n - R^{n-1}||^2.
+                self._previousResidual.axpby(1., residual, -1.)
+                norms2, _, dots = self._previousResidual.reduceNorms([residual], [(0, 1)])
+                squareNorm = norms2[0] * norms2[0]
+                if squareNorm > 0.:
+                    self._dampingFactor = self._boundDampingFactor(-self._dampingFactor * (dots[0] - squareNorm) / squareNorm)
+                self._previousResidual.copy(residual)
+            data.axpy(self._dampingFactor - 1., residual)
+        else:
+            if self._deltaF == 0:
+                self._deltaF = residual * -1.
+                self._delta = data * -1.
+            else:
+                self._deltaF += residual  # R^n - R^{n-1}
+                self._delta += data   # F(X^n) - F(X^{n-1})
+                self._history.add(self._deltaF, self._delta)
+                self._deltaF.axpby(-1., residual, 0.)
+                self._delta.axpby(-1., data, 0.)
+                self._history.extrapolate(data, residual, self._dampingFactor)
+
+    def release(self):
+        """ INTERNAL Release the memory held. """
+        if self._history is not None:
+            self._history.release()
+        for temporary in [self._previousResidual, self._deltaF, self._delta]:
+            if isinstance(temporary, DataManager):
+                temporary.release()
+        self._previousResidual = 0
+        self._deltaF = 0
+        self._delta = 0
@@ -0,0 +1,399 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2020, CEA
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following disclaimer in the documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products derived from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+""" Contain the right preconditioners of :class:`.JFNKCoupler`. """
+from __future__ import print_function, division
+import numpy as np
+
+from c3po.CollaborativeDataManager import CollaborativeDataManager
+
+
+class Preconditioner(object):
+    """ :class:`.Preconditioner` is the interface of the right preconditioners of :class:`.JFNKCoupler`
+    (see :meth:`.JFNKCoupler.setPreconditioner`).
+
+    A right preconditioner :math:`M^{-1}` is applied to each Krylov direction :math:`v`: the
+    Jacobian-free product is then computed with :math:`M^{-1} v`. The better :math:`M^{-1}`
+    approximates the inverse of the jacobian :math:`J` of :math:`F(X) = f(X) - X`, the fewer Krylov
+    iterations (and then physics solves) are needed.
+
+    The preconditioner works on the normalized data of :class:`.JFNKCoupler`: the
+    :class:`.DataManager` handled are :class:`.CollaborativeDataManager` built on the
+    :class:`.DataManager` of the coupler (in the same order).
+    """
+
+    def setup(self, coupler, normData, iterate, residual, jacobianProduct):
+        """ Prepare the preconditioner for a new Newton iteration. Does nothing by default.
+
+        Parameters
+        ----------
+        coupler : JFNKCoupler
+            The calling coupler. Its :class:`.DataManager` contain the (normalized) output of the
+            physics at the current Newton iterate.
+        normData : list[float]
+            The norms used to normalize the :class:`.DataManager` of the coupler (see
+            :meth:`.Coupler.normalizeData`).
+        iterate : CollaborativeDataManager
+            The current Newton iterate :math:`X` (normalized). It must not be modified.
+        residual : CollaborativeDataManager
+            :math:`-F(X)` at the current Newton iterate (normalized). It must not be modified.
+        jacobianProduct : callable
+            ``jacobianProduct(vector, result)`` writes in ``result`` the (finite difference)
+            approximation of :math:`J` ``vector``. Each call costs one physics solve.
+        """
+
+    def apply(self, vector, result):
+        """ Write :math:`M^{-1}` ``vector`` in ``result``.
+
+        Parameters
+        ----------
+        vector : CollaborativeDataManager
+            The Krylov direction. It must not be modified.
+        result : CollaborativeDataManager
+            The :class:`.DataManager` in which the preconditioned direction is written.
+        """
+        raise NotImplementedError
+
+    def update(self, vector, product):
+        """ Inform the preconditioner of a product :math:`J` ``vector`` computed by the Krylov method
+        (``vector`` is the preconditioned direction). Does nothing by default.
+
+        Parameters
+        ----------
+        vector : CollaborativeDataManager
+            The preconditioned direction. It must not be modified.
+        product : CollaborativeDataManager
+            The (finite difference) approximation of :math:`J` ``vector``. It must not be modified.
+        """
+
+    def release(self):
+        """ Release the temporary :class:`.DataManager` of the preconditioner (see :meth:`.DataManager.release`). Does nothing by default. """
+
+
+class FunctionPreconditioner(Preconditioner):
+    """ INTERNAL :class:`.Preconditioner` calling a function ``function(vector, result)``. """
+
+    def __init__(self, function):
+        """ Build a :class:`.FunctionPreconditioner` object. """
+        self._function = function
+
+    def apply(self, vector, result):
+        """ See :meth:`.Preconditioner.apply`. """
+        self._function(vector, result)
+
+
+class DiagonalPreconditioner(Preconditioner):
+    """ :class:`.DiagonalPreconditioner` is a :class:`.Preconditioner` scaling each
+    :class:`.DataManager` of the Krylov directions by a weight.
+
+    By default, the weights are the norms given by :meth:`.Coupler.readNormData` at each Newton
+    iteration (the norms of the current output of the physics). :class:`.JFNKCoupler` normalizes its
+    data with the norms of the first state of the time step: these weights re-normalize the Krylov
+    directions with the current state, which keeps balanced the perturbations of the different
+    :class:`.DataManager` in the finite difference products.
+    """
+
+    def __init__(self, weights=None):
+        """ Build a :class:`.DiagonalPreconditioner` object.
+
+        Parameters
+        ----------
+        weights : list[float]
+            The weights, one per :class:`.DataManager` of the coupler (in the normalized variables),
+            or None (default) to use the norms of :meth:`.Coupler.readNormData`.
+        """
+        self._weights = weights
+        self._currentWeights = weights
+
+    def setup(self, coupler, normData, iterate, residual, jacobianProduct):
+        """ See :meth:`.Preconditioner.setup`. """
+        if self._weights is None:
+            self._currentWeights = [norm if norm > 0. else 1. for norm in coupler.readNormData()]
+
+    def apply(self, vector, result):
+        """ See :meth:`.Preconditioner.apply`. """
+        if len(self._currentWeights) != len(vector.dataManagers):
+            raise Exception("DiagonalPreconditioner.apply the number of weights does not match the number of DataManager.")
+        for i, weight in enumerate(self._currentWeights):
+            result.dataManagers[i].axpby(weight, vector.dataManagers[i], 0.)
+
+
+class FixedPointPreconditioner(Preconditioner):
+    """ :class:`.FixedPointPreconditioner` is a :class:`.Preconditioner` made of fixed-point sweeps
+    on the linearized problem :math:`J z = v`.
+
+    As :math:`J = f' - I`, the sweeps are :math:`z_0 = -v` and :math:`z_{k+1} = f' z_k - v`: this is
+    the linearized version of the fixed-point (for instance block Gauss-Seidel) iterations made by
+    the :class:`.PhysicsDriver` of :class:`.JFNKCoupler` through its exchangers. The products by
+    :math:`f'` are computed by finite differences: each sweep costs one physics solve.
+
+    It is efficient when the fixed-point iterations converge quickly for most of the error modes,
+    the Krylov method then dealing with the slowly converging ones.
+    """
+
+    def __init__(self, nbSweeps=1):
+        """ Build a :class:`.FixedPointPreconditioner` object.
+
+        Parameters
+        ----------
+        nbSweeps : int
+            The number of sweeps (and then of physics solves) per application. Default: 1.
+        """
+        if nbSweeps < 0:
+            raise Exception("FixedPointPreconditioner.__init__ nbSweeps must be >= 0.")
+        self._nbSweeps = nbSweeps
+        self._jacobianProduct = None
+        self._product = None
+
+    def setup(self, coupler, normData, iterate, residual, jacobianProduct):
+        """ See :meth:`.Preconditioner.setup`. """
+        self._jacobianProduct = jacobianProduct
+        if self._product is None and self._nbSweeps > 0:
+            self._product = residual.clone()
+
+    def apply(self, vector, result):
+        """ See :meth:`.Preconditioner.apply`. """
+        result.axpby(-1., vector, 0.)
+        for _ in range(self._nbSweeps):
+            # f' z - v = J z + z - v
+            self._jacobianProduct(result, self._product)
+            result.linearCombination([1., 1., -1.], [result, self._product, vector])
+
+    def release(self):
+        """ See :meth:`.Preconditioner.release`. """
+        if self._product is not None:
+            self._product.release()
+            self._product = None
+
+
+class JacobianPreconditioner(Preconditioner):
+    """ :class:`.JacobianPreconditioner` is a :class:`.Preconditioner` using the inverse of an
+    approximate jacobian provided by the user.
+
+    The approximate jacobian is a dense matrix of :math:`F(X) = f(X) - X`, in the (not normalized)
+    variables of the :class:`.DataManager` of :class:`.JFNKCoupler`. The unknowns are ordered as the
+    values of :meth:`.DataManager.flatView` of these :class:`.DataManager`, taken in order: the
+    :class:`.LocalDataManager` must be in packed storage mode (see
+    :meth:`.LocalDataManager.setPackedStorage`).
+
+    The matrix is inverted once per Newton iteration (or only once if it is constant).
+    """
+
+    def __init__(self, jacobian):
+        """ Build a :class:`.JacobianPreconditioner` object.
+
+        Parameters
+        ----------
+        jacobian : numpy.ndarray or callable
+            The approximate jacobian (square matrix), or a function ``jacobian(x)`` returning it at
+            the current Newton iterate ``x`` (1D numpy array ordered as the unknowns).
+        """
+        self._jacobian = jacobian
+        self._inverse = None
+        self._normData = []
+
+    def setup(self, coupler, normData, iterate, residual, jacobianProduct):
+        """ See :meth:`.Preconditioner.setup`. """
+        self._normData = [norm if norm > 0. else 1. for norm in normData]
+        if callable(self._jacobian):
+            self._inverse = np.linalg.inv(np.asarray(self._jacobian(self._toArray(iterate)), dtype=float))
+        elif self._inverse is None:
+            self._inverse = np.linalg.inv(np.asarray(self._jacobian, dtype=float))
+
+    def _toArray(self, data):
+        """ INTERNAL Return the (not normalized) values of ``data`` as a 1D numpy array. """
+        return np.concatenate([view * norm for view, norm in self._scaledViews(data)])
+
+    def _scaledViews(self, data):
+        """ INTERNAL Return the flat views of the parts of ``data`` with their normalization norm. """
+        if len(self._normData) != len(data.dataManagers):
+            raise Exception("JacobianPreconditioner the number of norms does not match the number of DataManager.")
+        return [(view, norm) for dataManager, norm in zip(data.dataManagers, self._normData) for view in flatViews(dataManager)]
+
+    def apply(self, vector, result):
+        """ See :meth:`.Preconditioner.apply`. """
+        # In the normalized variables, the inverse is S^-1 J^-1 S (S: diagonal of the norms).
+        values = np.dot(self._inverse, self._toArray(vector))
+        if values.size != sum(view.size for view, _ in self._scaledViews(vector)):
+            raise Exception("JacobianPreconditioner.apply the size of the jacobian does not match the size of the data.")
+        start = 0
+        for view, norm in self._scaledViews(result):
+            view[:] = values[start:start + view.size] / norm
+            start += view.size
+
+
+class SecantUpdate(object):
+    """ Enum definition of the update of the approximate inverse jacobian of :class:`.SecantPreconditioner`.
+
+    Values:
+        - ``goodBroyden``: each pair :math:`(s, y = J s)` is added by a rank-one "good" Broyden update
+          of the inverse: :math:`H \\leftarrow H + (s - H y) s^T H / (s^T H y)`.
+        - ``multiSecant``: :math:`H` is the least change of :math:`-I` satisfying all the stored
+          pairs, :math:`H = -I + (S + Y) (Y^T Y)^{-1} Y^T` (generalized Broyden).
+    """
+    goodBroyden = 0
+    multiSecant = 1
+
+
+class SecantPreconditioner(Preconditioner):
+    """ :class:`.SecantPreconditioner` is a :class:`.Preconditioner` using a low-rank approximation
+    :math:`H` of the inverse of the jacobian :math:`J`, built from the products :math:`y = J s` computed
+    by the Krylov method of :class:`.JFNKCoupler`.
+
+    Without preconditioning, each Newton iteration of :class:`.JFNKCoupler` builds its Krylov space
+    from nothing, and each of its vectors costs a physics solve. :class:`.SecantPreconditioner` keeps
+    the information of these products from one Newton iteration to the next, and from one time step
+    to the next: as :math:`H` learns the dominant modes of :math:`J`, the following linear systems
+    need fewer Krylov iterations.
+
+    :math:`H` starts from :math:`-I` (:math:`J = f' - I`) and is stored as :math:`-I` plus a sum of
+    rank-one terms, updated as chosen with :class:`.SecantUpdate`. When the maximum rank is reached,
+    the oldest pair is forgotten (``multiSecant``) or the approximation is restarted
+    (``goodBroyden``). It can also be restarted every given number of Newton iterations. The stored vectors
+    are rescaled when the normalization of the data of the coupler changes.
+    """
+
+    def __init__(self, update=SecantUpdate.multiSecant, maxRank=20, refreshPeriod=None):
+        """ Build a :class:`.SecantPreconditioner` object.
+
+        Parameters
+        ----------
+        update : int
+            A value of :class:`.SecantUpdate`. Default: ``SecantUpdate.multiSecant``.
+        maxRank : int
+            The maximum rank of :math:`H + I`. Default: 20.
+        refreshPeriod : int
+            The number of Newton iterations (linear systems, over all the time steps) after which
+            the approximation is restarted, or None (default) to keep it.
+        """
+        if update not in [SecantUpdate.goodBroyden, SecantUpdate.multiSecant]:
+            raise Exception("SecantPreconditioner.__init__ update should be a value of SecantUpdate!")
+        if maxRank < 1:
+            raise Exception("SecantPreconditioner.__init__ maxRank must be >= 1.")
+        if refreshPeriod is not None and refreshPeriod < 1:
+            raise Exception("SecantPreconditioner.__init__ refreshPeriod must be >= 1 (or None).")
+        self._update = update
+        self._maxRank = maxRank
+        self._refreshPeriod = refreshPeriod
+        self._left = []
+        self._right = []
+        self._gram = np.zeros((0, 0))
+        self._normData = None
+        self._nbSetups = 0
+        self._product = None
+
+    def getRank(self):
+        """ Return the current rank of the approximation (the number of rank-one terms).
+
+        Returns
+        -------
+        int
+            The current rank.
+        """
+        return len(self._left)
+
+    def clear(self):
+        """ Restart the approximation from :math:`-I` (and release its memory). """
+        for vector in self._left + self._right:
+            vector.release()
+        self._left = []
+        self._right = []
+        self._gram = np.zeros((0, 0))
+        self._nbSetups = 0
+
+    def setup(self, coupler, normData, iterate, residual, jacobianProduct):
+        """ See :meth:`.Preconditioner.setup`. """
+        if self._refreshPeriod is not None and self._nbSetups >= self._refreshPeriod:
+            self.clear()
+        self._nbSetups += 1
+        normData = [norm if norm > 0. else 1. for norm in normData]
+        if self._normData is not None and normData != self._normData and self.getRank() > 0:
+            ratios = [old / new for old, new in zip(self._normData, normData)]
+            # In the normalized variables, H becomes S^-1 H S (S: diagonal of the norms).
+            for vector in self._left:
+                self._scale(vector, ratios)
+            for vector in self._right:
+                self._scale(vector, ratios if self._update == SecantUpdate.multiSecant else [1. / ratio for ratio in ratios])
+            if self._update == SecantUpdate.multiSecant:
+                self._gram = np.array([right.dotMany(self._right) for right in self._right])
+        self._normData = normData
+
+    @staticmethod
+    def _scale(vector, ratios):
+        """ INTERNAL Multiply each DataManager of ``vector`` by its ratio. """
+        if len(ratios) != len(vector.dataManagers):
+            raise Exception("SecantPreconditioner the number of norms does not match the number of DataManager.")
+        for dataManager, ratio in zip(vector.dataManagers, ratios):
+            dataManager *= ratio
+
+    def apply(self, vector, result):
+        """ See :meth:`.Preconditioner.apply`. """
+        if self.getRank() == 0:
+            result.axpby(-1., vector, 0.)
+            return
+        coeffs = vector.dotMany(self._right)
+        if self._update == SecantUpdate.multiSecant:
+            coeffs = np.linalg.lstsq(self._gram, np.array(coeffs), rcond=None)[0]
+        result.linearCombination([-1.] + [float(coeff) for coeff in coeffs], [vector] + self._left)
+
+    def _recycle(self, model):
+        """ INTERNAL Return a pair of vectors for a new rank-one term, reusing the oldest ones if the maximum rank is reached. """
+        if self.getRank() < self._maxRank:
+            return model.clone(), model.clone()
+        self._gram = self._gram[1:, 1:]
+        return self._left.pop(0), self._right.pop(0)
+
+    def update(self, vector, product):
+        """ See :meth:`.Preconditioner.update`. """
+        if self._update == SecantUpdate.multiSecant:
+            if product.norm2() == 0.:
+                return
+            left, right = self._recycle(vector)
+            left.linearCombination([1., 1.], [vector, product])
+            right.copy(product)
+            dots = right.dotMany(self._right + [right])
+            rank = self.getRank()
+            gram = np.zeros((rank + 1, rank + 1))
+            gram[:rank, :rank] = self._gram
+            gram[rank, :] = dots
+            gram[:, rank] = dots
+            self._gram = gram
+        else:
+            if self.getRank() >= self._maxRank:
+                self.clear()    # Restart before computing H y: the new term must satisfy the secant equation of the restarted H.
+            if self._product is None:
+                self._product = vector.clone()
+            self.apply(product, self._product)    # H y
+            denominator = vector.dot(self._product)
+            if abs(denominator) <= 1.E-12 * vector.norm2() * self._product.norm2():
+                return
+            left, right = self._recycle(vector)
+            # H^T s = -s + sum_i right_i (left_i . s)
+            coeffs = vector.dotMany(self._left)
+            right.linearCombination([-1.] + [float(coeff) for coeff in coeffs], [vector] + self._right)
+            left.linearCombination([1. / denominator, -1. / denominator], [vector, self._product])
+        self._left.append(left)
+        self._right.append(right)
+
+    def release(self):
+        """ Release the temporary :class:`.DataManager` of the preconditioner. The approximation is kept (see :meth:`clear`). """
+        if self._product is not None:
+            self._product.release()
+            self._product = None
+
+
+def flatViews(data):
+    """ INTERNAL Return the list of the flat views (see :meth:`.DataManager.flatView`) of ``data``, in order. """
+    if isinstance(data, CollaborativeDataManager):
+        views = []
+        for dataManager in data.dataManagers:
+            views += flatViews(dataManager)
+        return views
+    return [data.flatView()]
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2020, CEA
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following disclaimer in the documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products derived from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+""" Contain the class :class:`.Predictor`. """
+from __future__ import print_function, division
+
+
+class Predictor(object):
+    """ :class:`.Predictor` computes an initial guess of the coupled data of a time step by polynomial
+    extrapolation of the converged data of the last validated time steps.
+
+    A :class:`.Predictor` is given to a coupler with :meth:`.Coupler.setPredictor`. The coupler then
+    stores its data at each :meth:`validateTimeStep() <.PhysicsDriver.validateTimeStep>`, and, at
+    the beginning of each time step, pushes the extrapolation at the end of the time step through
+    its data-to-physics :class:`.Exchanger` before the first solve.
+
+    The extrapolation is the Lagrange polynomial of degree :math:`\\min(order, n - 1)` through the
+    :math:`n` stored time steps (at most :math:`order + 1`). Time steps can be of different lengths.
+    """
+
+    def __init__(self, order=1):
+        """ Build a :class:`.Predictor` object.
+
+        Parameters
+        ----------
+        order : int
+            The degree of the extrapolation polynomial: 0 uses the data of the last validated time
+            step, 1 (default) a linear extrapolation, 2 a quadratic one, etc.
+        """
+        if order < 0:
+            raise Exception("Predictor.__init__ Set an order >= 0 !")
+        self._order = order
+        self._times = []
+        self._values = []
+
+    def getOrder(self):
+        """ Return the degree of the extrapolation polynomial.
+
+        Returns
+        -------
+        int
+            The degree of the extrapolation polynomial.
+        """
+        return self._order
+
+    def getNbStored(self):
+        """ Return the number of time steps stored.
+
+        Returns
+        -------
+        int
+            The number of time steps stored (at most the order + 1).
+        """
+        return len(self._values)
+
+    def record(self, data, time_):
+        """ Store the converged data of a time step.
+
+        The oldest time step is forgotten if the order + 1 time steps are already stored. If
+        ``time_`` is the time of the last stored time step, it is replaced.
+
+        Parameters
+        ----------
+        data : DataManager
+            The converged data. They are copied.
+        time_ : float
+            The time at which ``data`` are converged.
+        """
+        if len(self._times) > 0 and self._times[-1] == time_:
+            self._values[-1].copy(data)
+            return
+        if len(self._values) > self._order:
+            value = self._values.pop(0)
+            self._times.pop(0)
+            value.copy(data)
+        else:
+            value = data.clone()
+        self._values.append(value)
+        self._times.append(time_)
+
+    def predict(self, data, time_):
+        """ Write in ``data`` the extrapolation at time ``time_``.
+
+        Parameters
+        ----------
+        data : DataManager
+            The :class:`.DataManager` in which the extrapolation is written.
+        time_ : float
+            The time of the extrapolation.
+
+        Returns
+        -------
+        bool
+            False (and ``data`` is not modified) if no time step is stored.
+        """
+        if len(self._values) == 0:
+            return False
+        coeffs = []
+        for i, timeI in enumerate(self._times):
+            coeff = 1.
+            for j, timeJ in enumerate(self._times):
+                if j != i:
+                    coeff *= (time_ - timeJ) / (timeI - timeJ)
+            coeffs.append(coeff)
+        data.linearCombination(coeffs, self._values)
+        return True
+
+    def clear(self):
+        """ Forget the stored time steps (and release their memory). """
+        for value in self._values:
+            value.release()
+        self._times = []
+        self._values = []
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2020, CEA
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following disclaimer in the documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote products derived from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+""" Contain the class :class:`.SecantHistory`. """
+from __future__ import print_function, division
+import math
+import numpy as np
+
+from c3po.DataManager import DataManager, orthogonalize
+from c3po.services.AndersonHistory import solveUpperTriangular
+
+
+class SecantHistory(object):
+    """ INTERNAL
+
+    :class:`.SecantHistory` holds the secant information of an interface quasi-Newton method: the
+    differences of the residuals ``V`` (through the QR decomposition of the matrix of their columns)
+    and the differences of the outputs ``W``.
+
+    The columns are ordered from the newest to the oldest, and are grouped by time step, so that they
+    can be kept from one time step to the next:
+
+    - a new column is inserted in front of the others: ``R`` is made triangular again with Givens
+      rotations (also applied to ``Q``);
+    - deleting the oldest columns (when the capacity is reached, or for the time steps beyond the
+      reuse depth) only truncates ``Q``, ``R`` and ``W``;
+    - after each insertion, the older columns which are (almost) linearly dependent on the newer ones
+      are deleted (QR filtering): a column ``j`` is deleted if ``|R[j, j]| < tolerance ||R[:, j]||``.
+
+    ``R`` is preallocated, and the vectors are allocated once and recycled.
+    """
+
+    def __init__(self, capacity, filterTolerance=1.E-3):
+        """ Build an empty :class:`.SecantHistory`.
+
+        Parameters
+        ----------
+        capacity : int
+            The maximum number of columns.
+        filterTolerance : float
+            The tolerance of the QR filtering.
+        """
+        self._capacity = capacity
+        self._filterTolerance = filterTolerance
+        self._size = 0
+        self._matrixR = np.zeros((capacity + 1, capacity + 1))
+        self._basis = []
+        self._deltaW = []
+        self._groups = []
+        self._spares = []
+        self._storageType = np.float64
+        self._store = None
+
+    def setStorage(self, storageType, store):
+        """ Set the storage type (see :meth:`.DataManager.setStorageType`) and the :class:`.HistoryStore` (or None) used for the vectors. """
+        self._storageType = storageType
+        self._store = store
+
+    def getSize(self):
+        """ Return the current number of columns. """
+        return self._size
+
+    def getGroups(self):
+        """ Return the number of columns of each group (time step), from the newest to the oldest. """
+        return list(self._groups)
+
+    def getMatrixR(self):
+        """ Return (a view of) the triangular matrix ``R``. """
+        return self._matrixR[:self._size, :self._size]
+
+    def getBasis(self):
+        """ Return the orthonormal vectors ``Q``, from the newest column to the oldest. """
+        return self._basis[:self._size]
+
+    def getDeltaW(self):
+        """ Return the ``W`` vectors, from the newest to the oldest. """
+        return self._deltaW[:self._size]
+
+    def _newVector(self, model):
+        """ INTERNAL Return a recycled vector (or a clone of ``model``) with the storage type of the history. """
+        if self._spares:
+            return self._spares.pop()
+        vector = model.clone()
+        vector.setStorageType(self._storageType)
+        return vector
+
+    def _stored(self, vector):
+        """ INTERNAL Add ``vector`` to the :class:`.HistoryStore` (if any) and return it. """
+        if self._store is not None:
+            self._store.add(vector)
+        return vector
+
+    def _rotate(self, index, cval, sval, size):
+        """ INTERNAL Apply a Givens rotation to the rows ``index`` and ``index + 1`` of ``R`` and to the corresponding vectors of ``Q``. """
+        matrixR = self._matrixR
+        rowI = matrixR[index, :size].copy()
+        matrixR[index, :size] = cval * rowI + sval * matrixR[index + 1, :size]
+        matrixR[index + 1, :size] = -sval * rowI + cval * matrixR[index + 1, :size]
+        basis = self._basis
+        spare = self._newVector(basis[index])
+        spare.linearCombination([cval, sval], [basis[index], basis[index + 1]])
+        basis[index + 1].axpby(-sval, basis[index], cval)
+        self._spares.append(basis[index])
+        basis[index] = self._stored(spare)
+        self._stored(basis[index + 1])
+
+    def startGroup(self):
+        """ Start a new (empty) group of columns: the next columns belong to a new time step. """
+        self._groups.insert(0, 0)
+
+    def keepGroups(self, nbGroups):
+        """ Delete the empty groups, and the columns of the oldest groups in order to keep only the ``nbGroups`` newest ones. """
+        self._groups = [count for count in self._groups if count > 0]
+        while len(self._groups) > nbGroups:
+            self._truncate(self._size - self._groups[-1])
+            self._groups.pop()
+
+    def dropNewestGroup(self):
+        """ Delete the columns of the newest group (and the group itself). """
+        if self._groups:
+            for _ in range(self._groups[0]):
+                self.deleteColumn(0)
+            self._groups.pop(0)
+
+    def _truncate(self, size):
+        """ INTERNAL Delete the oldest columns to keep only ``size`` columns. """
+        if size < self._size:
+            self._matrixR[:, size:self._size] = 0.
+            self._matrixR[size:self._size, :] = 0.
+            self._spares += self._basis[size:] + self._deltaW[size:]
+            del self._basis[size:]
+            del self._deltaW[size:]
+            self._size = size
+
+    def _removeFromGroups(self, index):
+        """ INTERNAL Update the groups after the deletion of the column ``index``. """
+        start = 0
+        for group, count in enumerate(self._groups):
+            if index < start + count:
+                self._groups[group] -= 1
+                return
+            start += count
+
+    def add(self, deltaR, deltaW):
+        """ Add a new column (the newest) to the history, in the newest group.
+
+        The oldest column is first deleted if the history is full. Then, the older columns are filtered.
+
+        Parameters
+        ----------
+        deltaR : DataManager
+            The difference of residuals. It is modified (orthogonalized against ``Q``).
+        deltaW : DataManager
+            The difference of outputs (copied).
+        """
+        if not self._groups:
+            self.startGroup()
+        if self._size == self._capacity:
+            self._truncate(self._size - 1)
+            self._removeFromGroups(self._size)
+        size = self._size
+        matrixR = self._matrixR
+        coefficients = orthogonalize(deltaR, self._basis[:size]) if size > 0 else np.zeros(0)
+        norm = deltaR.norm2()
+        newVector = self._newVector(deltaR)
+        newVector.axpby(1. / norm if norm != 0. else 1., deltaR, 0.)
+        self._basis.append(self._stored(newVector))
+
+        # [deltaR, V] = [Q, q] [[coefficients, R], [norm, 0]]: the first column is eliminated from the bottom.
+        matrixR[:size, 1:size + 1] = matrixR[:size, :size]
+        matrixR[:size, 0] = coefficients
+        matrixR[size, :size + 1] = 0.
+        matrixR[size, 0] = norm
+        for i in range(size - 1, -1, -1):
+            hypot = math.hypot(matrixR[i, 0], matrixR[i + 1, 0])
+            if hypot != 0. and matrixR[i + 1, 0] != 0.:
+                self._rotate(i, matrixR[i, 0] / hypot, matrixR[i + 1, 0] / hypot, size + 1)
+                matrixR[i + 1, 0] = 0.
+
+        vectorW = self._newVector(deltaW)
+        vectorW.copy(deltaW)
+        self._deltaW.insert(0, self._stored(vectorW))
+        self._size += 1
+        self._groups[0] += 1
+        self.filter()
+
+    def filter(self):
+        """ Delete the columns which are (almost) linearly dependent on newer ones (see :class:`.SecantHistory`). """
+        index = 1
+        while index < self._size:
+            matrixR = self._matrixR
+            normColumn = np.linalg.norm(matrixR[:index + 1, index])
+            if normColumn == 0. or abs(matrixR[index, index]) < self._filterTolerance * normColumn:
+                self.deleteColumn(index)
+            else:
+                index += 1
+
+    def deleteColumn(self, index):
+        """ Delete the column ``index`` (0 is the newest): ``R`` is made triangular again with Givens rotations, also applied to ``Q``. """
+        size = self._size
+        matrixR = self._matrixR
+        matrixR[:size, index:size - 1] = matrixR[:size, index + 1:size]
+        matrixR[:size, size - 1] = 0.
+        for i in range(index, size - 1):
+            hypot = math.hypot(matrixR[i, i], matrixR[i + 1, i])
+            if hypot != 0. and matrixR[i + 1, i] != 0.:
+                self._rotate(i, matrixR[i, i] / hypot, matrixR[i + 1, i] / hypot, size)
+                matrixR[i + 1, i] = 0.
+        matrixR[size - 1, :size] = 0.
+        self._spares.append(self._basis.pop())
+        self._spares.append(self._deltaW.pop(index))
+        self._size -= 1
+        self._removeFromGroups(index)
+
+    def solve(self, residual):
+        """ Return the coefficients ``gamma`` minimizing ``||residual - V gamma||``.
+
+        Parameters
+        ----------
+        residual : DataManager
+            The current residual.
+
+        Returns
+        -------
+        numpy.ndarray
+            The coefficients ``gamma`` (one per column, from the newest to the oldest).
+        """
+        return solveUpperTriangular(self.getMatrixR(), residual.dotMany(self.getBasis()))
+
+    def clear(self):
+        """ Delete all the columns and groups (the vectors are kept, to be reused). """
+        self._truncate(0)
+        self._groups = []
+
+    def release(self):
+        """ Delete all the columns and release the vectors (see :meth:`.DataManager.release`). """
+        self.clear()
+        for vector in self._spares:
+            if isinstance(vector, DataManager):
+                vector.release()
+        self._spares = []
@@ -27,6 +27,13 @@ def test_matrix():
     CouplerJFNK = c3po.JFNKCoupler([myPhysics], [Physics2Data, Data2Physics], [DataCoupler])
     CouplerJFNK.setKrylovConvergenceParameters(1E-4, 3)
     CouplerCrossedSecant = c3po.CrossedSecantCoupler([myPhysics], [Physics2Data, Data2Physics], [DataCoupler])
+    CouplerAitken = c3po.AitkenCoupler([myPhysics], [Physics2Data, Data2Physics], [DataCoupler])
+    CouplerAitken.setDampingFactor(0.5)
+    CouplerIQN = c3po.IQNCoupler([myPhysics], [Physics2Data, Data2Physics], [DataCoupler])
+    CouplerIMVJ = c3po.IQNCoupler([myPhysics], [Physics2Data, Data2Physics], [DataCoupler])
+    CouplerIMVJ.setMethod(c3po.IQNMethod.IMVJ)
+    CouplerJacobi = c3po.JacobiCoupler([myPhysics], [Physics2Data, Data2Physics], [DataCoupler])
+    CouplerJacobi.setAcceleration(c3po.JacobiAcceleration.anderson, 3)
 
     CouplerGS.init()
     print(myPhysics.A_)
@@ -65,11 +72,39 @@ def test_matrix():
     vpCS = myPhysics.getOutputDoubleValue("valeur_propre")
     CouplerCrossedSecant.term()
 
+    CouplerAitken.init()
+    CouplerAitken.solve()
+    print(myPhysics.result_)
+    print("valeur propre :", myPhysics.getOutputDoubleValue("valeur_propre"))
+    resu = np.dot(myPhysics.A_, myPhysics.result_) + myPhysics.b_
+    print(resu / np.linalg.norm(resu))
+    vpAitken = myPhysics.getOutputDoubleValue("valeur_propre")
+    CouplerAitken.term()
+
+    CouplerIQN.init()
+    CouplerIQN.solve()
+    vpIQN = myPhysics.getOutputDoubleValue("valeur_propre")
+    CouplerIQN.term()
+
+    CouplerIMVJ.init()
+    CouplerIMVJ.solve()
+    vpIMVJ = myPhysics.getOutputDoubleValue("valeur_propre")
+    CouplerIMVJ.term()
+
+    CouplerJacobi.init()
+    CouplerJacobi.solve()
+    vpJacobi = myPhysics.getOutputDoubleValue("valeur_propre")
+    CouplerJacobi.term()
+
     refVal = 15.2654890812
     assert pytest.approx(vpGS, abs=1.E-3) == refVal
     assert pytest.approx(vpAnderson, abs=1.E-3) == refVal
     assert pytest.approx(vpJFNK, abs=1.E-3) == refVal
     assert pytest.approx(vpCS, abs=1.E-3) == refVal
+    assert pytest.approx(vpAitken, abs=1.E-3) == refVal
+    assert pytest.approx(vpIQN, abs=1.E-3) == refVal
+    assert pytest.approx(vpIMVJ, abs=1.E-3) == refVal
+    assert pytest.approx(vpJacobi, abs=1.E-3) == refVal
 
 if __name__ == "__main__":
     test_matrix()
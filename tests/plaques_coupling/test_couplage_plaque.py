@@ -245,7 +245,7 @@ def couplage_plaque(coupler_type='FixedPoint'):
         DatatoPh1.exchange()
         CouplerJFNK.solve()
         CouplerJFNK.term()
-    elif coupler_type == 'AdaptiveResidualBalance' or coupler_type == 'DynamicResidualBalance':
+    elif coupler_type in ['AdaptiveResidualBalance', 'DynamicResidualBalance', 'MultiResidualBalance']:
         # For Residual Balance
         DataCouplerResiduals = c3po.LocalDataManager()
 
@@ -256,21 +256,32 @@ def couplage_plaque(coupler_type='FixedPoint'):
         myPhysics1RB = c3po.NameChanger(myPhysics1, nameMappingValue={"Accuracy": "PRECISION"})
         myPhysics2RB = c3po.NameChanger(myPhysics2, nameMappingValue={"Accuracy": "PRECISION"})
 
-        if coupler_type == 'AdaptiveResidualBalance':
-            couplerClass = c3po.AdaptiveResidualBalanceCoupler
-        else:
-            couplerClass = c3po.DynamicResidualBalanceCoupler
-        CouplerResidualBalance = couplerClass(
-                {"Solver1": myPhysics1RB, "Solver2": myPhysics2RB},
-                {"1to2": Ph1toPhy2,
-                 "2to1": c3po.LocalExchanger(c3po.DirectMatching(), [], []),  # Cet echangeur est inutile si on passe par un FixedPointCoupler pour faire les iterations.
-                    "Residual1": exch_Residual1,
-                    "Residual2": exch_Residual2},
+        if coupler_type == 'MultiResidualBalance':
+            # Un seul echangeur recupere les residus des deux solveurs.
+            exch_Residuals = c3po.LocalExchanger(c3po.DirectMatching(), [], [], valuesToGet=[(myPhysics1, 'PRECISION_ATTEINTE'), (myPhysics2, 'PRECISION_ATTEINTE')], valuesToSet=[(DataCouplerResiduals, 'Residual1'), (DataCouplerResiduals, 'Residual2')])
+            CouplerResidualBalance = c3po.MultiResidualBalanceCoupler(
+                [myPhysics1RB, myPhysics2RB],
+                [Ph1toPhy2, c3po.LocalExchanger(c3po.DirectMatching(), [], []), exch_Residuals],
                 [DataCouplerResiduals])
+        else:
+            if coupler_type == 'AdaptiveResidualBalance':
+                couplerClass = c3po.AdaptiveResidualBalanceCoupler
+            else:
+                couplerClass = c3po.DynamicResidualBalanceCoupler
+            CouplerResidualBalance = couplerClass(
+                    {"Solver1": myPhysics1RB, "Solver2": myPhysics2RB},
+                    {"1to2": Ph1toPhy2,
+                     "2to1": c3po.LocalExchanger(c3po.DirectMatching(), [], []),  # Cet echangeur est inutile si on passe par un FixedPointCoupler pour faire les iterations.
+                        "Residual1": exch_Residual1,
+                        "Residual2": exch_Residual2},
+                    [DataCouplerResiduals])
         CouplerResidualBalance.setNormChoice(c3po.NormChoice.norm2)
         if coupler_type == 'AdaptiveResidualBalance':
             CouplerResidualBalance.setConvRateInit(0.1, 0.1)
-        CouplerResidualBalance.setConvergenceParameters(1E-12, 1E-12, 100)
+        if coupler_type == 'MultiResidualBalance':
+            CouplerResidualBalance.setConvergenceParameters([1E-12, 1E-12], 100)
+        else:
+            CouplerResidualBalance.setConvergenceParameters(1E-12, 1E-12, 100)
         CouplerResidualBalance.setPrintLevel(1)
 
         # On utilise un FixedPointCoupler pour verifier les erreurs multi-physiques.
@@ -324,6 +335,7 @@ def test_run_all():
     couplage_plaque(coupler_type='JFNK')
     couplage_plaque(coupler_type='AdaptiveResidualBalance')
     couplage_plaque(coupler_type='DynamicResidualBalance')
+    couplage_plaque(coupler_type='MultiResidualBalance')
 
 if __name__ == "__main__":
     test_run_all()
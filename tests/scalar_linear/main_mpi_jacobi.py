@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function, division
+
+import pytest
+
+
+def main_mpi_jacobi():
+    from mpi4py import MPI
+
+    import c3po
+    import c3po.mpi
+
+    from tests.scalar_linear.PhysicsScalar import PhysicsScalar
+
+    comm = MPI.COMM_WORLD
+    rank = comm.Get_rank()
+
+    myPhysics = c3po.mpi.MPIRemoteProcess(comm, 0)
+    myPhysics2 = c3po.mpi.MPIRemoteProcess(comm, 1)
+    if rank == 0:
+        myPhysics = PhysicsScalar()
+        myPhysics.setOption(1., 0.5)
+    elif rank == 1:
+        myPhysics2 = PhysicsScalar()
+        myPhysics2.setOption(3., -1.)
+
+    Transformer = c3po.DirectMatching()
+
+    DataCoupler = c3po.mpi.MPICollectiveDataManager(comm)
+    Physics2Data = c3po.mpi.MPIExchanger(Transformer, [], [], [(myPhysics, "y"), (myPhysics2, "y")], [(DataCoupler, "y1"), (DataCoupler, "y2")])
+    Data2Physics = c3po.mpi.MPIExchanger(Transformer, [], [], [(DataCoupler, "y1"), (DataCoupler, "y2")], [(myPhysics2, "x"), (myPhysics, "x")])
+
+    for acceleration in [c3po.JacobiAcceleration.none, c3po.JacobiAcceleration.anderson]:
+        mycoupler = c3po.mpi.MPIJacobiCoupler([myPhysics, myPhysics2], [Physics2Data, Data2Physics], [DataCoupler])
+        mycoupler.setAcceleration(acceleration)
+        mycoupler.setDampingFactor(0.5)
+        mycoupler.setConvergenceParameters(1E-8, 100)
+        mycoupler.setPrintLevel(0)
+
+        mycoupler.init()
+        mycoupler.solve()
+        assert mycoupler.getSolveStatus()
+        assert pytest.approx(DataCoupler.getOutputDoubleValue("y1"), abs=1.E-6) == 5. / 3.
+        assert pytest.approx(DataCoupler.getOutputDoubleValue("y2"), abs=1.E-6) == 4. / 3.
+        mycoupler.term()
+
+
+if __name__ == "__main__":
+    main_mpi_jacobi()
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import pytest
+
+import c3po
+from tests.scalar_linear.PhysicsScalar import PhysicsScalar
+
+
+def test_jacobi():
+    for acceleration in [c3po.JacobiAcceleration.none, c3po.JacobiAcceleration.aitken, c3po.JacobiAcceleration.anderson]:
+        for nbThreads in [1, 2]:
+            myPhysics = PhysicsScalar()
+            myPhysics.setOption(1., 0.5)
+            myPhysics2 = PhysicsScalar()
+            myPhysics2.setOption(3., -1.)
+
+            Transformer = c3po.DirectMatching()
+
+            DataCoupler = c3po.LocalDataManager()
+            Physics2Data = c3po.LocalExchanger(Transformer, [], [], [(myPhysics, "y"), (myPhysics2, "y")], [(DataCoupler, "y1"), (DataCoupler, "y2")])
+            Data2Physics = c3po.LocalExchanger(Transformer, [], [], [(DataCoupler, "y1"), (DataCoupler, "y2")], [(myPhysics2, "x"), (myPhysics, "x")])
+
+            mycoupler = c3po.JacobiCoupler([myPhysics, myPhysics2], [Physics2Data, Data2Physics], [DataCoupler])
+            mycoupler.setAcceleration(acceleration)
+            mycoupler.setNumberOfThreads(nbThreads)
+            mycoupler.setDampingFactor(0.5)
+            mycoupler.setConvergenceParameters(1E-8, 100)
+            mycoupler.setPrintLevel(0)
+
+            mycoupler.init()
+            mycoupler.solve()
+            assert mycoupler.getSolveStatus()
+            assert pytest.approx(myPhysics.getOutputDoubleValue("y"), abs=1.E-6) == 5. / 3.
+            assert pytest.approx(myPhysics2.getOutputDoubleValue("y"), abs=1.E-6) == 4. / 3.
+            mycoupler.term()
+
+
+def buildInnerJacobi(coeffs):
+    physicsList = []
+    for a, b in coeffs:
+        physics = PhysicsScalar()
+        physics.setOption(a, b)
+        physicsList.append(physics)
+    transformer = c3po.DirectMatching()
+    data = c3po.LocalDataManager()
+    physics2Data = c3po.LocalExchanger(transformer, [], [], [(physicsList[0], "y"), (physicsList[1], "y")], [(data, "y1"), (data, "y2")])
+    data2Physics = c3po.LocalExchanger(transformer, [], [], [(data, "y1"), (data, "y2")], [(physicsList[1], "x"), (physicsList[0], "x")])
+    coupler = c3po.JacobiCoupler(physicsList, [physics2Data, data2Physics], [data])
+    coupler.setNumberOfThreads(2)
+    coupler.setDampingFactor(0.5)
+    coupler.setConvergenceParameters(1E-10, 200)
+    coupler.setPrintLevel(0)
+    return coupler, physicsList
+
+
+def test_nestedThreads():
+    """ Threaded JacobiCoupler whose physics are threaded JacobiCoupler: the inner solves are sequential (no deadlock). """
+    inner1, physics1 = buildInnerJacobi([(1., 0.5), (3., -1.)])
+    inner2, physics2 = buildInnerJacobi([(2., 1.), (1., 0.)])
+    data = c3po.LocalDataManager()
+    transformer = c3po.DirectMatching()
+    physics2Data = c3po.LocalExchanger(transformer, [], [], [(physics1[0], "y"), (physics2[0], "y")], [(data, "y1"), (data, "y2")])
+    data2Physics = c3po.LocalExchanger(transformer, [], [], [], [])
+    outer = c3po.JacobiCoupler([inner1, inner2], [physics2Data, data2Physics], [data])
+    outer.setNumberOfThreads(2)
+    outer.setConvergenceParameters(1E-8, 10)
+    outer.setPrintLevel(0)
+    outer.init()
+    outer.solve()
+    assert outer.getSolveStatus()
+    assert pytest.approx(physics1[0].getOutputDoubleValue("y"), abs=1.E-6) == 5. / 3.
+    assert pytest.approx(physics1[1].getOutputDoubleValue("y"), abs=1.E-6) == 4. / 3.
+    outer.term()
+
+
+if __name__ == "__main__":
+    test_jacobi()
+    test_nestedThreads()
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import pytest
+
+import c3po
+from tests.transient.PhysicsScalarTransient import PhysicsScalarTransient
+
+
+def buildCoupler(couplerClass, nbSteps=1, acceleration=c3po.JacobiAcceleration.none, physicsClass=PhysicsScalarTransient):
+    myPhysics = physicsClass()
+    myPhysics.setOption(1., 3., 0.2)
+    myPhysics2 = PhysicsScalarTransient()
+    myPhysics2.setOption(5., 2., 0.3)
+
+    Transformer = c3po.DirectMatching()
+
+    DataCoupler = c3po.LocalDataManager()
+    Physics2Data = c3po.LocalExchanger(Transformer, [], [], [(myPhysics, "y"), (myPhysics2, "y")], [(DataCoupler, "y1"), (DataCoupler, "y2")])
+    Data2Physics = c3po.LocalExchanger(Transformer, [], [], [(DataCoupler, "y1"), (DataCoupler, "y2")], [(myPhysics2, "x"), (myPhysics, "x")])
+
+    if couplerClass is c3po.JacobiCoupler:
+        mycoupler = c3po.JacobiCoupler([myPhysics, myPhysics2], [Physics2Data, Data2Physics], [DataCoupler])
+    else:
+        mycoupler = c3po.WaveformRelaxationCoupler([myPhysics, myPhysics2], [Physics2Data, Data2Physics], [DataCoupler], (1, "INTERNAL"))
+        mycoupler.setWindow(nbSteps)
+    mycoupler.setAcceleration(acceleration)
+    mycoupler.setConvergenceParameters(1E-10, 200)
+    mycoupler.setPrintLevel(0)
+    return mycoupler, myPhysics, myPhysics2
+
+
+def runTransient(mycoupler, myPhysics, myPhysics2, dt, tmax):
+    results = {}
+    mycoupler.init()
+    while mycoupler.presentTime() < tmax - 1.E-9:
+        mycoupler.initTimeStep(dt)
+        mycoupler.solve()
+        assert mycoupler.getSolveStatus()
+        mycoupler.validateTimeStep()
+        results[round(mycoupler.presentTime(), 6)] = (myPhysics.getOutputDoubleValue("y"), myPhysics2.getOutputDoubleValue("y"))
+    mycoupler.term()
+    return results
+
+
+def test_waveform():
+    reference = runTransient(*buildCoupler(c3po.JacobiCoupler, acceleration=c3po.JacobiAcceleration.anderson), 0.1, 1.6)
+    for acceleration in [c3po.JacobiAcceleration.none, c3po.JacobiAcceleration.aitken, c3po.JacobiAcceleration.anderson]:
+        results = runTransient(*buildCoupler(c3po.WaveformRelaxationCoupler, 4, acceleration), 0.4, 1.6)
+        assert sorted(results.keys()) == [0.4, 0.8, 1.2, 1.6]
+        for time_, values in results.items():
+            assert values == pytest.approx(reference[time_], abs=1.E-8)
+
+
+def test_subStepping():
+    reference = runTransient(*buildCoupler(c3po.JacobiCoupler, acceleration=c3po.JacobiAcceleration.anderson), 0.2, 1.6)
+    results = runTransient(*buildCoupler(c3po.WaveformRelaxationCoupler, 2, c3po.JacobiAcceleration.anderson), 0.8, 1.6)
+    assert results[1.6] == pytest.approx(reference[1.6], abs=1.E-2)
+
+
+def test_abort():
+    mycoupler, myPhysics, myPhysics2 = buildCoupler(c3po.WaveformRelaxationCoupler, 4, c3po.JacobiAcceleration.anderson)
+    mycoupler.init()
+    assert mycoupler.computeTimeStep() == (pytest.approx(0.8), False)
+    mycoupler.initTimeStep(0.4)
+    mycoupler.solve()
+    mycoupler.validateTimeStep()
+    first = myPhysics.getOutputDoubleValue("y")
+    mycoupler.initTimeStep(0.4)
+    mycoupler.solve()
+    assert mycoupler.presentTime() == pytest.approx(0.4)
+    mycoupler.abortTimeStep()
+    assert mycoupler.presentTime() == pytest.approx(0.4)
+    assert myPhysics.getOutputDoubleValue("y") == first
+    with pytest.raises(Exception):
+        mycoupler.initTimeStep(0.)
+    mycoupler.term()
+
+
+class PhysicsFailing(PhysicsScalarTransient):
+    def __init__(self):
+        PhysicsScalarTransient.__init__(self)
+        self.failureTime = None
+
+    def solveTimeStep(self):
+        PhysicsScalarTransient.solveTimeStep(self)
+        return self.failureTime is None or self.presentTime() < self.failureTime - 1.E-9
+
+
+def test_failure():
+    mycoupler, failing, _ = buildCoupler(c3po.WaveformRelaxationCoupler, 4, physicsClass=PhysicsFailing)
+    mycoupler.setFailureManagement(True)
+    released = []
+    mycoupler.releaseTemporaries = lambda temporaries: released.extend(temporary for temporary in temporaries if isinstance(temporary, c3po.DataManager))
+    mycoupler.init()
+    mycoupler.initTimeStep(0.4)
+    mycoupler.solve()
+    assert mycoupler.getSolveStatus()
+    mycoupler.validateTimeStep()
+    failing.failureTime = 0.4
+    del released[:]
+    mycoupler.initTimeStep(0.4)
+    mycoupler.solve()
+    assert not mycoupler.getSolveStatus()
+    assert len(released) > 0
+    mycoupler.abortTimeStep()
+    mycoupler.term()
+
+
+class PhysicsForgetting(PhysicsScalarTransient):
+    def __init__(self):
+        PhysicsScalarTransient.__init__(self)
+        self.forgotten = []
+
+    def forget(self, label, method):
+        if label not in self._savedState:
+            raise ValueError("Nothing saved with label {}".format(label))
+        PhysicsScalarTransient.forget(self, label, method)
+        self.forgotten.append(label)
+
+
+def test_forget():
+    mycoupler, forgetting, other = buildCoupler(c3po.WaveformRelaxationCoupler, 4, physicsClass=PhysicsForgetting)
+    mycoupler.init()
+    mycoupler.term()
+    assert forgetting.forgotten == []
+    runTransient(mycoupler, forgetting, other, 0.4, 0.8)
+    assert forgetting.forgotten == [1]
+    mycoupler.init()
+    mycoupler.initTimeStep(0.4)
+    forgetting.forget = lambda label, method: 1 / 0
+    with pytest.raises(ZeroDivisionError):
+        mycoupler.term()
+
+
+if __name__ == "__main__":
+    test_waveform()
+    test_subStepping()
+    test_abort()
+    test_failure()
+    test_forget()
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+# This follows the PhysicsDriver concepts and returns y = M x + (1 + sin(t)) b, where M is a random contraction and x can be set as a vector input (one scalar per index).
+from __future__ import print_function, division
+import numpy as np
+import pytest
+
+import c3po
+from c3po.PhysicsDriver import PhysicsDriver
+
+
+class PhysicsLinear(PhysicsDriver):
+    """ y = M x + (1 + sin(t)) b, with M a contraction (spectral radius 0.95). A perturbed M gives a surrogate of the same physics. """
+
+    def __init__(self, size, perturbation=0.):
+        PhysicsDriver.__init__(self)
+        random = np.random.RandomState(4)
+        matrix = random.rand(size, size) - 0.5
+        self.matrix = matrix / np.max(np.abs(np.linalg.eigvals(matrix))) * 0.95
+        self.b = random.rand(size)
+        if perturbation != 0.:
+            self.matrix *= 1. + perturbation * (random.rand(size, size) - 0.5)
+        self.x = np.zeros(size)
+        self.y = np.zeros(size)
+        self.time = 0.
+        self.dt = 0.
+        self.nbSolves = 0
+        self.accuracy = None
+
+    def initialize(self):
+        return True
+
+    def terminate(self):
+        pass
+
+    def presentTime(self):
+        return self.time
+
+    def computeTimeStep(self):
+        return (0.1, False)
+
+    def initTimeStep(self, dt):
+        self.dt = dt
+        return True
+
+    def solveTimeStep(self):
+        self.nbSolves += 1
+        self.y = np.dot(self.matrix, self.x) + self.b * (1. + np.sin(self.time + self.dt))
+        return True
+
+    def validateTimeStep(self):
+        self.time += self.dt
+
+    def abortTimeStep(self):
+        pass
+
+    def resetTime(self, time_):
+        self.time = time_
+
+    def setStationaryMode(self, stationaryMode):
+        pass
+
+    def getStationaryMode(self):
+        return False
+
+    def getOutputDoubleValue(self, name):
+        return self.y[int(name)]
+
+    def setInputDoubleValue(self, name, value):
+        if name == "Accuracy":
+            self.accuracy = value
+        else:
+            self.x[int(name)] = value
+
+    def solution(self):
+        return np.linalg.solve(np.eye(len(self.x)) - self.matrix, self.b * (1. + np.sin(self.time)))
+
+
+def buildCoupler(size, couplerClass, physics=None):
+    if physics is None:
+        physics = PhysicsLinear(size)
+    transformer = c3po.DirectMatching()
+    data = c3po.LocalDataManager()
+    data.setPackedStorage(True)
+    physics2Data = c3po.LocalExchanger(transformer, [], [], [(physics, str(i)) for i in range(size)], [(data, str(i)) for i in range(size)])
+    data2Physics = c3po.LocalExchanger(transformer, [], [], [(data, str(i)) for i in range(size)], [(physics, str(i)) for i in range(size)])
+    coupler = couplerClass([physics], [physics2Data, data2Physics], [data])
+    coupler.setConvergenceParameters(1.E-8, 1000)
+    coupler.setPrintLevel(0)
+    return coupler, physics
+
+
+def runTransient(coupler, physics, nbSteps):
+    nbSolves = []
+    coupler.init()
+    for _ in range(nbSteps):
+        before = physics.nbSolves
+        coupler.initTimeStep(0.1)
+        coupler.solve()
+        assert coupler.getSolveStatus()
+        coupler.validateTimeStep()
+        nbSolves.append(physics.nbSolves - before)
+        assert physics.y == pytest.approx(physics.solution(), abs=1.E-6)
+    coupler.term()
+    return nbSolves
+
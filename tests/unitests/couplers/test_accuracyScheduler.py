@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import numpy as np
+import pytest
+
+import c3po
+from c3po.PhysicsDriver import PhysicsDriver
+from tests.unitests.couplers.PhysicsLinear import buildCoupler
+
+
+class PhysicsInner(PhysicsDriver):
+    """ Solves A y = x + b with inner Jacobi iterations, up to the required accuracy. The coupling is y -> x. """
+
+    def __init__(self, size):
+        PhysicsDriver.__init__(self)
+        random = np.random.RandomState(2)
+        self.matrix = np.eye(size) * 4. + random.rand(size, size) - 0.5
+        self.b = random.rand(size)
+        self.x = np.zeros(size)
+        self.y = np.zeros(size)
+        self.accuracy = 1.E-12
+        self.requested = []
+        self.innerIterations = 0
+
+    def initialize(self):
+        return True
+
+    def terminate(self):
+        pass
+
+    def presentTime(self):
+        return 0.
+
+    def computeTimeStep(self):
+        return (1., False)
+
+    def initTimeStep(self, dt):
+        return True
+
+    def solveTimeStep(self):
+        diagonal = np.diag(self.matrix)
+        rhs = self.x + self.b
+        self.innerIterations = 0
+        residual = rhs - np.dot(self.matrix, self.y)
+        while np.linalg.norm(residual) > self.accuracy * np.linalg.norm(rhs):
+            self.y += residual / diagonal
+            residual = rhs - np.dot(self.matrix, self.y)
+            self.innerIterations += 1
+        return True
+
+    def validateTimeStep(self):
+        pass
+
+    def abortTimeStep(self):
+        pass
+
+    def resetTime(self, time_):
+        pass
+
+    def setStationaryMode(self, stationaryMode):
+        pass
+
+    def getStationaryMode(self):
+        return True
+
+    def getOutputDoubleValue(self, name):
+        if name == "InnerIterations":
+            return self.innerIterations
+        return self.y[int(name)]
+
+    def setInputDoubleValue(self, name, value):
+        if name == "Precision":
+            self.accuracy = value
+            self.requested.append(value)
+        else:
+            self.x[int(name)] = value
+
+    def solution(self):
+        return np.linalg.solve(self.matrix - np.eye(len(self.x)), self.b)
+
+
+def runCoupler(couplerClass, scheduler):
+    size = 10
+    coupler, physics = buildCoupler(size, couplerClass, PhysicsInner(size))
+    coupler.setConvergenceParameters(1.E-10, 100)
+    coupler.setAccuracyScheduler(scheduler)
+    coupler.init()
+    coupler.solve()
+    assert coupler.getSolveStatus()
+    assert physics.y == pytest.approx(physics.solution(), abs=1.E-8)
+    coupler.term()
+
+
+def test_computeAccuracy():
+    scheduler = c3po.AccuracyScheduler(safetyFactor=0.1, minAccuracy=1.E-8, maxAccuracy=1.E-3)
+    assert scheduler.computeAccuracy(None) == 1.E-3
+    assert scheduler.computeAccuracy(1.) == 1.E-3
+    assert scheduler.computeAccuracy(1.E-5) == pytest.approx(1.E-6)
+    assert scheduler.computeAccuracy(1.E-12) == 1.E-8
+    with pytest.raises(Exception):
+        c3po.AccuracyScheduler(minAccuracy=1., maxAccuracy=0.1)
+
+
+def test_couplers():
+    for couplerClass in [c3po.FixedPointCoupler, c3po.AndersonCoupler, c3po.CrossedSecantCoupler]:
+        exact = c3po.AccuracyScheduler("Precision", minAccuracy=1.E-14, maxAccuracy=1.E-14, innerIterationsName="InnerIterations")
+        runCoupler(couplerClass, exact)
+        inexact = c3po.AccuracyScheduler("Precision", minAccuracy=1.E-14, innerIterationsName="InnerIterations")
+        runCoupler(couplerClass, inexact)
+        assert inexact.getInnerIterations() < exact.getInnerIterations()
+
+
+def test_newTimeStep():
+    """ The error of the previous time step is not used at the beginning of a new one. """
+    size = 10
+    coupler, physics = buildCoupler(size, c3po.FixedPointCoupler, PhysicsInner(size))
+    coupler.setConvergenceParameters(1.E-10, 100)
+    coupler.setAccuracyScheduler(c3po.AccuracyScheduler("Precision", minAccuracy=1.E-14))
+    coupler.init()
+    for _ in range(2):
+        physics.requested = []
+        coupler.initTimeStep(1.)
+        coupler.solve()
+        assert coupler.getSolveStatus()
+        assert physics.requested[:2] == [1.E-2, 1.E-2]
+        coupler.validateTimeStep()
+    coupler.term()
+
+
+if __name__ == "__main__":
+    test_computeAccuracy()
+    test_couplers()
+    test_newTimeStep()
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import numpy as np
+import pytest
+
+import c3po
+from c3po.services.AndersonHistory import AndersonHistory, estimateConditionNumber, solveUpperTriangular
+
+
+def buildVector(values):
+    data = c3po.LocalDataManager()
+    data.setPackedStorage(True)
+    for i, value in enumerate(values):
+        data.setInputDoubleValue(str(i), value)
+    return data
+
+
+def getValues(data, size):
+    return np.array([data.getOutputDoubleValue(str(i)) for i in range(size)])
+
+
+def test_triangular():
+    np.random.seed(1)
+    matrix = np.triu(np.random.rand(6, 6)) + np.eye(6)
+    rhs = np.random.rand(6)
+    assert solveUpperTriangular(matrix, rhs) == pytest.approx(np.linalg.solve(matrix, rhs))
+    estimate = estimateConditionNumber(matrix)
+    assert estimate <= np.linalg.cond(matrix, 1) * (1. + 1.E-10)
+    assert estimate >= np.linalg.cond(matrix, 1) / 10.
+    assert estimateConditionNumber(np.zeros((2, 2))) == float("inf")
+
+
+def test_andersonHistory():
+    size = 8
+    np.random.seed(0)
+    columnsF = [np.random.rand(size) for _ in range(6)]
+    columnsG = [np.random.rand(size) for _ in range(6)]
+    history = AndersonHistory(3, dropTolerance=0.)
+    for i in range(6):
+        history.add(buildVector(columnsF[i]), buildVector(columnsG[i]))
+        first = max(0, i - 2)
+        assert history.getSize() == i + 1 - first
+        matrixF = np.array(columnsF[first:i + 1]).T
+        basis = np.array([getValues(vector, size) for vector in history.getBasis()]).T
+        assert np.dot(basis, history.getMatrixR()) == pytest.approx(matrixF)
+        assert np.dot(basis.T, basis) == pytest.approx(np.eye(history.getSize()))
+        assert np.allclose(np.tril(history.getMatrixR(), -1), 0.)
+        for vector, reference in zip(history.getDeltaG(), columnsG[first:i + 1]):
+            assert getValues(vector, size) == pytest.approx(reference)
+        residual = np.random.rand(size)
+        gamma = history.solve(buildVector(residual))
+        assert gamma == pytest.approx(np.linalg.lstsq(matrixF, residual, rcond=-1)[0])
+
+    history = AndersonHistory(3, dropTolerance=1.E6)
+    history.add(buildVector(columnsF[0]), buildVector(columnsG[0]))
+    history.add(buildVector(columnsF[0] * (1. + 1.E-9)), buildVector(columnsG[1]))
+    assert history.getSize() == 1
+    assert getValues(history.getDeltaG()[0], size) == pytest.approx(columnsG[1])
+    history.release()
+    assert history.getSize() == 0
+
+
+if __name__ == "__main__":
+    test_triangular()
+    test_andersonHistory()
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function, division
+import pytest
+
+import c3po
+from tests.unitests.couplers.PhysicsLinear import PhysicsLinear, buildCoupler, runTransient
+
+
+def buildBlockCoupler(size, nbInstances, nbThreads=1):
+    physicsList = []
+    exchangers = []
+    dataManagers = []
+    transformer = c3po.DirectMatching()
+    for _ in range(nbInstances):
+        physics = PhysicsLinear(size)
+        data = c3po.LocalDataManager()
+        data.setPackedStorage(True)
+        physics2Data = c3po.LocalExchanger(transformer, [], [], [(physics, str(i)) for i in range(size)], [(data, str(i)) for i in range(size)])
+        data2Physics = c3po.LocalExchanger(transformer, [], [], [(data, str(i)) for i in range(size)], [(physics, str(i)) for i in range(size)])
+        physicsList.append(physics)
+        exchangers.append([physics2Data, data2Physics])
+        dataManagers.append([data])
+    coupler = c3po.BlockJFNKCoupler(physicsList, exchangers, dataManagers)
+    coupler.setConvergenceParameters(1.E-8, 1000)
+    coupler.setKrylovConvergenceParameters(1.E-10, 100)
+    coupler.setNumberOfThreads(nbThreads)
+    coupler.setPrintLevel(0)
+    return coupler, physicsList
+
+
+def runBlockTransient(coupler, physicsList, nbSteps):
+    sequentialSolves = []
+    coupler.init()
+    for _ in range(nbSteps):
+        before = physicsList[0].nbSolves
+        coupler.initTimeStep(0.1)
+        coupler.solve()
+        assert coupler.getSolveStatus()
+        coupler.validateTimeStep()
+        sequentialSolves.append(physicsList[0].nbSolves - before)
+        assert sequentialSolves[-1] == 1 + sum(statistics["sequentialSolves"] for statistics in coupler.getStatistics())
+        for physics in physicsList:
+            assert physics.time == pytest.approx(physicsList[0].time)
+            assert physics.y == pytest.approx(physicsList[0].solution(), abs=1.E-6)
+    coupler.term()
+    return sequentialSolves
+
+
+def test_singleInstance():
+    size = 8
+    coupler, physicsList = buildBlockCoupler(size, 1)
+    sequentialSolves = runBlockTransient(coupler, physicsList, 3)
+    reference, physics = buildCoupler(size, c3po.JFNKCoupler)
+    reference.setKrylovConvergenceParameters(1.E-10, 100)
+    nbSolves = runTransient(reference, physics, 3)
+    assert physicsList[0].y == pytest.approx(physics.y, abs=1.E-6)
+    assert sequentialSolves == nbSolves
+
+
+def test_concurrentProducts():
+    size = 8
+    coupler, physicsList = buildBlockCoupler(size, 1)
+    reference = runBlockTransient(coupler, physicsList, 3)
+    for nbThreads in [1, 2]:
+        coupler, physicsList = buildBlockCoupler(size, 4, nbThreads)
+        sequentialSolves = runBlockTransient(coupler, physicsList, 3)
+        assert sequentialSolves[0] == reference[0]
+        for nbSolves, nbReference in zip(sequentialSolves[1:], reference[1:]):
+            assert nbSolves < nbReference / 2
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import math
+import numpy as np
+import pytest
+
+import c3po
+from tests.matrix.PhysicsMatrix import PhysicsMatrix
+
+
+def solveJFNK(forcingTerm, adaptiveEpsilon=False):
+    myPhysics = PhysicsMatrix()
+    myPhysics.init()
+    taille = int(myPhysics.getOutputDoubleValue("taille"))
+    myPhysics.term()
+    transformer = c3po.DirectMatching()
+    data = c3po.LocalDataManager()
+    physics2Data = c3po.LocalExchanger(transformer, [], [], [(myPhysics, str(i)) for i in range(taille)], [(data, str(i)) for i in range(taille)])
+    data2Physics = c3po.LocalExchanger(transformer, [], [], [(data, str(i)) for i in range(taille)], [(myPhysics, str(i)) for i in range(taille)])
+    coupler = c3po.JFNKCoupler([myPhysics], [physics2Data, data2Physics], [data])
+    coupler.setConvergenceParameters(1E-8, 20)
+    coupler.setForcingTerm(forcingTerm)
+    coupler.setAdaptiveEpsilon(adaptiveEpsilon)
+    coupler.setPrintLevel(0)
+    coupler.init()
+    coupler.solve()
+    assert coupler.getSolveStatus()
+    assert pytest.approx(myPhysics.getOutputDoubleValue("valeur_propre"), abs=1.E-3) == 15.2654890812
+    statistics = coupler.getStatistics()
+    coupler.term()
+    return statistics
+
+
+def test_forcingTerm():
+    reference = solveJFNK(c3po.ForcingTerm.constant)
+    assert all(step["forcingTerm"] == 1.E-4 for step in reference[:-1])
+    assert reference[-1]["forcingTerm"] is None
+    assert reference[-1]["error"] < 1.E-8
+    for step in reference[:-1]:
+        assert step["physicsSolves"] == step["krylovIterations"] + 1
+        assert step["krylovError"] <= 1.E-4
+
+    for forcingTerm in [c3po.ForcingTerm.choice1, c3po.ForcingTerm.choice2]:
+        statistics = solveJFNK(forcingTerm)
+        assert statistics[0]["forcingTerm"] == 0.9
+        assert statistics[0]["krylovIterations"] < reference[0]["krylovIterations"]
+        for step in statistics[:-1]:
+            assert 1.E-4 <= step["forcingTerm"] <= 0.9
+            assert step["krylovError"] <= step["forcingTerm"]
+
+    statistics = solveJFNK(c3po.ForcingTerm.choice2)
+    assert sum(step["physicsSolves"] for step in statistics) < sum(step["physicsSolves"] for step in reference)
+
+
+def test_adaptiveEpsilon():
+    statistics = solveJFNK(c3po.ForcingTerm.constant, adaptiveEpsilon=True)
+    for step in statistics:
+        assert step["epsilon"] > math.sqrt(np.finfo(float).eps)
+        assert step["epsilon"] < 1.E-6
+
+
+def test_forcingTermErrors():
+    coupler = c3po.JFNKCoupler([PhysicsMatrix()], [None, None], [])
+    with pytest.raises(Exception):
+        coupler.setForcingTerm(3)
+    with pytest.raises(Exception):
+        coupler.setForcingTerm(c3po.ForcingTerm.choice2, etaMax=1.5)
+
+
+if __name__ == "__main__":
+    test_forcingTerm()
+    test_adaptiveEpsilon()
+    test_forcingTermErrors()
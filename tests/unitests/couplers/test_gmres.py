@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import numpy as np
+import pytest
+
+import c3po
+from c3po.services.GMRES import GMRES
+
+
+def buildVector(values):
+    data = c3po.LocalDataManager()
+    data.setPackedStorage(True)
+    for i, value in enumerate(values):
+        data.setInputDoubleValue(str(i), value)
+    return data
+
+
+def getValues(data, size):
+    return np.array([data.getOutputDoubleValue(str(i)) for i in range(size)])
+
+
+def solve(matrix, rhs, restart, gramSchmidt, tolerance, maxIter):
+    size = rhs.shape[0]
+    gmres = GMRES(restart, gramSchmidt)
+    rhsVector = buildVector(rhs)
+    gmres.start(rhsVector)
+    correction = rhsVector.clone()
+    error = 1.
+    nbIter = 0
+    while error > tolerance and nbIter < maxIter:
+        nbIter += 1
+        if gmres.isCycleFull():
+            gmres.restart(correction, accumulate=gmres.getNbCycles() > 0)
+        product = gmres.getProductVector(rhsVector)
+        values = np.dot(matrix, getValues(gmres.getDirection(), size))
+        for i in range(size):
+            product.setInputDoubleValue(str(i), values[i])
+        error = gmres.addProduct() / np.linalg.norm(rhs)
+    coeffs, basis = gmres.getSolution()
+    solution = rhsVector.clone()
+    if gmres.getNbCycles() > 0:
+        solution.linearCombination([1.] + coeffs, [correction] + basis)
+    else:
+        solution.linearCombination(coeffs, basis)
+    gmres.release()
+    return getValues(solution, size), error, nbIter
+
+
+def test_gmres():
+    np.random.seed(2)
+    size = 12
+    matrix = np.eye(size) * 4. + np.random.rand(size, size)
+    rhs = np.random.rand(size)
+    reference = np.linalg.solve(matrix, rhs)
+    for gramSchmidt in [c3po.GramSchmidt.iterated, c3po.GramSchmidt.modified]:
+        solution, error, nbIter = solve(matrix, rhs, size, gramSchmidt, 1.E-12, size)
+        assert solution == pytest.approx(reference)
+        assert nbIter <= size
+        assert np.linalg.norm(np.dot(matrix, solution) - rhs) / np.linalg.norm(rhs) == pytest.approx(error, abs=1.E-12)
+
+        solution, error, nbIter = solve(matrix, rhs, 3, gramSchmidt, 1.E-10, 100)
+        assert error <= 1.E-10
+        assert solution == pytest.approx(reference)
+        assert np.linalg.norm(np.dot(matrix, solution) - rhs) / np.linalg.norm(rhs) == pytest.approx(error, abs=1.E-12)
+
+
+def test_jfnkRestart():
+    from tests.matrix.PhysicsMatrix import PhysicsMatrix
+    for gramSchmidt in [c3po.GramSchmidt.iterated, c3po.GramSchmidt.modified]:
+        myPhysics = PhysicsMatrix()
+        myPhysics.init()
+        taille = int(myPhysics.getOutputDoubleValue("taille"))
+        myPhysics.term()
+        transformer = c3po.DirectMatching()
+        data = c3po.LocalDataManager()
+        physics2Data = c3po.LocalExchanger(transformer, [], [], [(myPhysics, str(i)) for i in range(taille)], [(data, str(i)) for i in range(taille)])
+        data2Physics = c3po.LocalExchanger(transformer, [], [], [(data, str(i)) for i in range(taille)], [(myPhysics, str(i)) for i in range(taille)])
+        coupler = c3po.JFNKCoupler([myPhysics], [physics2Data, data2Physics], [data])
+        coupler.setKrylovConvergenceParameters(1E-4, 6)
+        coupler.setKrylovRestart(2)
+        coupler.setGramSchmidt(gramSchmidt)
+        coupler.setPrintLevel(0)
+        coupler.init()
+        coupler.solve()
+        assert coupler.getSolveStatus()
+        assert pytest.approx(myPhysics.getOutputDoubleValue("valeur_propre"), abs=1.E-3) == 15.2654890812
+        coupler.term()
+
+
+if __name__ == "__main__":
+    test_gmres()
+    test_jfnkRestart()
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+
+import c3po
+from tests.unitests.couplers.PhysicsLinear import buildCoupler, runTransient
+
+
+def test_reuse():
+    size = 10
+    coupler, physics = buildCoupler(size, c3po.AndersonCoupler)
+    coupler.setOrder(size)
+    reference = runTransient(coupler, physics, 6)
+
+    for method in [c3po.IQNMethod.ILS, c3po.IQNMethod.IMVJ]:
+        coupler, physics = buildCoupler(size, c3po.IQNCoupler)
+        coupler.setMethod(method)
+        assert runTransient(coupler, physics, 6) == reference
+
+        coupler, physics = buildCoupler(size, c3po.IQNCoupler)
+        coupler.setMethod(method)
+        coupler.setReuseDepth(2)
+        nbSolves = runTransient(coupler, physics, 6)
+        assert nbSolves[0] == reference[0]
+        assert max(nbSolves[1:]) <= 3
+
+
+def test_notValidated():
+    size = 6
+    coupler, physics = buildCoupler(size, c3po.IQNCoupler)
+    coupler.setReuseDepth(1)
+    coupler.init()
+    coupler.initTimeStep(0.1)
+    coupler.solve()
+    coupler.validateTimeStep()
+    nbColumns = coupler.getNbReusedColumns()
+    assert nbColumns > 0
+    physics.x[:] = 0.
+    coupler.initTimeStep(0.1)
+    coupler.solve()
+    assert coupler.getNbReusedColumns() == nbColumns
+    coupler.abortTimeStep()
+    physics.x[:] = 0.
+    coupler.initTimeStep(0.1)
+    coupler.solve()
+    assert coupler.getNbReusedColumns() == nbColumns
+    coupler.validateTimeStep()
+    coupler.resetTime(0.)
+    assert coupler.getNbReusedColumns() == 0
+    coupler.term()
+
+
+def test_filter():
+    size = 6
+    coupler, physics = buildCoupler(size, c3po.IQNCoupler)
+    coupler.setReuseDepth(10)
+    coupler.setMaximumColumns(4)
+    nbSolves = runTransient(coupler, physics, 5)
+    assert max(nbSolves[2:]) < nbSolves[0]
+
+
+if __name__ == "__main__":
+    test_reuse()
+    test_notValidated()
+    test_filter()
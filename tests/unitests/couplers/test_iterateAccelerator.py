@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import pytest
+
+import c3po
+from c3po.services.IterateAccelerator import JacobiAcceleration, IterateAccelerator
+from tests.unitests.couplers.PhysicsLinear import buildCoupler, runTransient
+
+
+def buildScalar(value):
+    data = c3po.LocalDataManager()
+    data.setInputDoubleValue("x", value)
+    return data
+
+
+def runAitken(dampingFactorBounds):
+    # R^1 = 1 and R^2 = 0.9 give the Aitken damping factor -1 * 1 * (0.9 - 1) / (0.9 - 1)^2 = 10.
+    accelerator = IterateAccelerator(JacobiAcceleration.aitken, 1., dampingFactorBounds=dampingFactorBounds)
+    dampingFactors = []
+    for residual in [1., 0.9]:
+        data = buildScalar(2.)
+        accelerator.update(data, buildScalar(residual))
+        dampingFactors.append(accelerator.getDampingFactor())
+        assert data.getOutputDoubleValue("x") == pytest.approx(2. + (dampingFactors[-1] - 1.) * residual)
+    accelerator.release()
+    return dampingFactors
+
+
+def test_aitkenBounds():
+    assert runAitken((None, None)) == pytest.approx([1., 10.])
+    assert runAitken((None, 2.)) == pytest.approx([1., 2.])
+    assert runAitken((20., None)) == pytest.approx([1., 20.])
+
+
+def test_sharedAitken():
+    size = 8
+    for bounds in [(None, None), (0.5, 1.5)]:
+        nbSolves = []
+        for couplerClass in [c3po.AitkenCoupler, c3po.JacobiCoupler]:
+            coupler, physics = buildCoupler(size, couplerClass)
+            if couplerClass is c3po.JacobiCoupler:
+                coupler.setAcceleration(c3po.JacobiAcceleration.aitken)
+            coupler.setDampingFactorBounds(*bounds)
+            nbSolves.append(runTransient(coupler, physics, 2))
+        assert nbSolves[0] == nbSolves[1]
+    with pytest.raises(Exception):
+        coupler.setDampingFactorBounds(2., 1.)
+
+
+if __name__ == "__main__":
+    test_aitkenBounds()
+    test_sharedAitken()
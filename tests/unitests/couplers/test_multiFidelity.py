@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import pytest
+
+import c3po
+from tests.unitests.couplers.PhysicsLinear import PhysicsLinear, buildCoupler
+
+
+def runCoupler(couplerClass, physics, nbSteps, scheduler=None):
+    size = len(physics.getPhysicsDriver().x) if isinstance(physics, c3po.MultiFidelityDriver) else len(physics.x)
+    coupler, _ = buildCoupler(size, couplerClass, physics)
+    coupler.setAccuracyScheduler(scheduler)
+    coupler.init()
+    for _ in range(nbSteps):
+        coupler.initTimeStep(0.1)
+        coupler.solve()
+        assert coupler.getSolveStatus()
+        coupler.validateTimeStep()
+    coupler.term()
+
+
+def test_couplers():
+    size = 10
+    for couplerClass in [c3po.FixedPointCoupler, c3po.AndersonCoupler]:
+        reference = PhysicsLinear(size)
+        runCoupler(couplerClass, reference, 4)
+
+        full = PhysicsLinear(size)
+        surrogate = PhysicsLinear(size, perturbation=0.01)
+        runCoupler(couplerClass, c3po.MultiFidelityDriver(full, surrogate, 6), 4)
+        assert full.y == pytest.approx(full.solution(), abs=1.E-6)
+        assert full.y == pytest.approx(reference.y, abs=1.E-6)
+        assert surrogate.nbSolves == 4 * 6
+        assert full.nbSolves < reference.nbSolves
+
+
+def test_switchAccuracy():
+    size = 10
+    full = PhysicsLinear(size)
+    surrogate = PhysicsLinear(size, perturbation=0.05)
+    multiFidelity = c3po.MultiFidelityDriver(full, surrogate, 1000)
+    multiFidelity.setSwitchAccuracy(1.E-4)
+    scheduler = c3po.AccuracyScheduler(safetyFactor=1., maxAccuracy=1.)
+    runCoupler(c3po.FixedPointCoupler, multiFidelity, 2, scheduler)
+    assert full.y == pytest.approx(full.solution(), abs=1.E-6)
+    assert surrogate.accuracy == full.accuracy
+    assert 0 < surrogate.nbSolves < full.nbSolves
+
+
+class PhysicsIterate(PhysicsLinear):
+    def iterateTimeStep(self):
+        return self.solveTimeStep(), True
+
+
+class PhysicsFailing(PhysicsLinear):
+    def solveTimeStep(self):
+        PhysicsLinear.solveTimeStep(self)
+        return False
+
+
+def test_convergedSurrogate():
+    size = 10
+    reference = PhysicsLinear(size)
+    runCoupler(c3po.FixedPointCoupler, reference, 1)
+    nbSurrogateSolves = reference.nbSolves + 10
+
+    full = PhysicsIterate(size)
+    surrogate = PhysicsIterate(size)
+    coupler, _ = buildCoupler(size, c3po.FixedPointCoupler, c3po.MultiFidelityDriver(full, surrogate, nbSurrogateSolves))
+    coupler.setUseIterate(True)
+    coupler.init()
+    for _ in range(2):
+        coupler.initTimeStep(0.1)
+        coupler.solve()
+        assert coupler.getSolveStatus()
+        coupler.validateTimeStep()
+    coupler.term()
+    assert full.y == pytest.approx(full.solution(), abs=1.E-6)
+    assert 2 <= full.nbSolves < reference.nbSolves
+
+    for couplerClass in [c3po.FixedPointCoupler, c3po.AndersonCoupler]:
+        full = PhysicsLinear(size)
+        multiFidelity = c3po.MultiFidelityDriver(full, PhysicsLinear(size), nbSurrogateSolves)
+        coupler, _ = buildCoupler(size, couplerClass, multiFidelity)
+        coupler.init()
+        coupler.initTimeStep(0.1)
+        coupler.solve()
+        assert not coupler.getSolveStatus()
+        assert multiFidelity.isSurrogateInUse()
+        assert full.nbSolves == 0
+        coupler.abortTimeStep()
+        coupler.term()
+
+
+def test_failureHandling():
+    size = 10
+    for couplerClass in [c3po.FixedPointCoupler, c3po.AndersonCoupler]:
+        reference = PhysicsLinear(size)
+        runCoupler(couplerClass, reference, 1)
+        failing = PhysicsFailing(size)
+        coupler, _ = buildCoupler(size, couplerClass, failing)
+        coupler.init()
+        coupler.initTimeStep(0.1)
+        coupler.solve()
+        assert not coupler.getSolveStatus()
+        assert failing.nbSolves == reference.nbSolves
+        coupler.term()
+
+
+def test_validateWithSurrogate():
+    size = 10
+    full = PhysicsLinear(size)
+    surrogate = PhysicsLinear(size, perturbation=0.05)
+    multiFidelity = c3po.MultiFidelityDriver(full, surrogate, 2)
+    multiFidelity.init()
+    multiFidelity.initTimeStep(0.1)
+    multiFidelity.solve()
+    assert multiFidelity.isSurrogateInUse()
+    with pytest.raises(Exception):
+        multiFidelity.validateTimeStep()
+    multiFidelity.solve()
+    multiFidelity.solve()
+    assert not multiFidelity.isSurrogateInUse()
+    multiFidelity.validateTimeStep()
+    multiFidelity.initTimeStep(0.1)
+    multiFidelity.solve()
+    assert multiFidelity.isSurrogateInUse()
+    multiFidelity.term()
+
+
+if __name__ == "__main__":
+    test_couplers()
+    test_switchAccuracy()
+    test_convergedSurrogate()
+    test_failureHandling()
+    test_validateWithSurrogate()
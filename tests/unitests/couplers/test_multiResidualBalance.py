@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import pytest
+
+import c3po
+from c3po.PhysicsDriver import PhysicsDriver
+
+
+class PhysicsRelaxation(PhysicsDriver):
+    """ Solves y = a x + b by relaxation, up to the required accuracy. """
+
+    def __init__(self, a, b):
+        PhysicsDriver.__init__(self)
+        self.a = a
+        self.b = b
+        self.x = 0.
+        self.y = 0.
+        self.accuracy = 1.E-12
+        self.residual = 0.
+        self.nbRelaxations = 0
+
+    def initialize(self):
+        return True
+
+    def terminate(self):
+        pass
+
+    def presentTime(self):
+        return 0.
+
+    def computeTimeStep(self):
+        return (1., False)
+
+    def initTimeStep(self, dt):
+        return True
+
+    def _relax(self):
+        self.y += 0.5 * (self.a * self.x + self.b - self.y)
+        self.residual = abs(self.a * self.x + self.b - self.y)
+        self.nbRelaxations += 1
+
+    def iterateTimeStep(self):
+        self._relax()
+        return True, self.residual <= self.accuracy
+
+    def solveTimeStep(self):
+        self._relax()
+        while self.residual > self.accuracy:
+            self._relax()
+        return True
+
+    def validateTimeStep(self):
+        pass
+
+    def abortTimeStep(self):
+        pass
+
+    def resetTime(self, time_):
+        pass
+
+    def setStationaryMode(self, stationaryMode):
+        pass
+
+    def getStationaryMode(self):
+        return True
+
+    def getOutputDoubleValue(self, name):
+        if name == "Residual":
+            return self.residual
+        return self.y
+
+    def setInputDoubleValue(self, name, value):
+        if name == "Accuracy":
+            self.accuracy = value
+        else:
+            self.x = value
+
+
+def buildCoupler(nbSolvers):
+    solvers = [PhysicsRelaxation(0.5, 1.) for _ in range(nbSolvers)]
+    residuals = c3po.LocalDataManager()
+    exchangers = []
+    for solver, nextSolver in zip(solvers[:-1], solvers[1:]):
+        exchangers.append(c3po.LocalExchanger(c3po.DirectMatching(), [], [], [(solver, "y")], [(nextSolver, "x")]))
+    exchangers.append(c3po.LocalExchanger(c3po.DirectMatching(), [], []))  # The loop is closed by the FixedPointCoupler.
+    exchangers.append(c3po.LocalExchanger(c3po.DirectMatching(), [], [],
+                                          [(solver, "Residual") for solver in solvers],
+                                          [(residuals, "Residual{}".format(i + 1)) for i in range(nbSolvers)]))
+    coupler = c3po.MultiResidualBalanceCoupler(solvers, exchangers, [residuals])
+    coupler.setPrintLevel(0)
+
+    data = c3po.LocalDataManager()
+    physics2Data = c3po.LocalExchanger(c3po.DirectMatching(), [], [], [(solvers[-1], "y")], [(data, "y")])
+    data2Physics = c3po.LocalExchanger(c3po.DirectMatching(), [], [], [(data, "y")], [(solvers[0], "x")])
+    fixedPoint = c3po.FixedPointCoupler([coupler], [physics2Data, data2Physics], [data])
+    fixedPoint.setUseIterate(True)
+    fixedPoint.setConvergenceParameters(1.E-10, 100)
+    fixedPoint.setPrintLevel(0)
+    return fixedPoint, coupler, solvers, exchangers
+
+
+def test_threeSolvers():
+    fixedPoint, coupler, solvers, _ = buildCoupler(3)
+    coupler.setConvergenceParameters([1.E-10, 1.E-9, 1.E-10], 100)
+    fixedPoint.init()
+    fixedPoint.solve()
+    assert fixedPoint.getSolveStatus()
+    for solver in solvers:
+        assert solver.y == pytest.approx(2., abs=1.E-8)
+    balancedRelaxations = sum([solver.nbRelaxations for solver in solvers])
+    fixedPoint.term()
+
+    # Without residual balance, each solver is converged at each iteration.
+    _, _, solvers, exchangers = buildCoupler(3)
+    while abs(solvers[-1].y - 2.) > 1.E-8 or abs(solvers[-1].y - solvers[0].x) > 1.E-10:
+        for solver, exchanger in zip(solvers, exchangers):
+            solver.solve()
+            exchanger.exchange()
+        solvers[0].x = solvers[-1].y
+    assert balancedRelaxations < sum([solver.nbRelaxations for solver in solvers])
+
+
+def test_errors():
+    _, coupler, _, _ = buildCoupler(3)
+    with pytest.raises(Exception):
+        coupler.setConvergenceParameters([1.E-10, 1.E-10], 100)
+    solvers = [PhysicsRelaxation(0.5, 1.) for _ in range(3)]
+    with pytest.raises(Exception):
+        c3po.MultiResidualBalanceCoupler(solvers, [], [c3po.LocalDataManager()])
+    with pytest.raises(Exception):
+        c3po.MultiResidualBalanceCoupler(solvers[:1], [], [c3po.LocalDataManager()])
+
+
+if __name__ == "__main__":
+    test_threeSolvers()
+    test_errors()
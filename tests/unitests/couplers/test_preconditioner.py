@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import numpy as np
+import pytest
+
+import c3po
+from c3po.services.GMRES import GMRES
+from tests.matrix.PhysicsMatrix import PhysicsMatrix
+from tests.unitests.couplers.PhysicsLinear import buildCoupler, runTransient
+
+
+class CountingPhysics(PhysicsMatrix):
+    def __init__(self):
+        PhysicsMatrix.__init__(self)
+        self.nbSolves = 0
+
+    def solveTimeStep(self):
+        self.nbSolves += 1
+        return PhysicsMatrix.solveTimeStep(self)
+
+
+def exactJacobian(matrix, x):
+    y = np.dot(matrix, x)
+    norm = np.linalg.norm(y)
+    return np.dot(np.eye(len(x)) / norm - np.outer(y, y) / norm ** 3, matrix) - np.eye(len(x))
+
+
+def solveJFNK(preconditioner):
+    myPhysics = CountingPhysics()
+    myPhysics.init()
+    taille = int(myPhysics.getOutputDoubleValue("taille"))
+    myPhysics.term()
+    transformer = c3po.DirectMatching()
+    data = c3po.LocalDataManager()
+    data.setPackedStorage(True)
+    physics2Data = c3po.LocalExchanger(transformer, [], [], [(myPhysics, str(i)) for i in range(taille)], [(data, str(i)) for i in range(taille)])
+    data2Physics = c3po.LocalExchanger(transformer, [], [], [(data, str(i)) for i in range(taille)], [(myPhysics, str(i)) for i in range(taille)])
+    coupler = c3po.JFNKCoupler([myPhysics], [physics2Data, data2Physics], [data])
+    coupler.setConvergenceParameters(1E-8, 20)
+    coupler.setKrylovConvergenceParameters(1E-4, 10)
+    if preconditioner == "jacobian":
+        preconditioner = c3po.JacobianPreconditioner(lambda x: exactJacobian(myPhysics.A_, x))
+    coupler.setPreconditioner(preconditioner)
+    coupler.setPrintLevel(0)
+    coupler.init()
+    coupler.solve()
+    assert coupler.getSolveStatus()
+    assert pytest.approx(myPhysics.getOutputDoubleValue("valeur_propre"), abs=1.E-3) == 15.2654890812
+    coupler.term()
+    return myPhysics.nbSolves
+
+
+def test_preconditioners():
+    nbSolvesReference = solveJFNK(None)
+    assert solveJFNK(lambda vector, result: result.copy(vector)) == nbSolvesReference
+    solveJFNK(c3po.DiagonalPreconditioner())
+    solveJFNK(c3po.DiagonalPreconditioner([2.]))
+    solveJFNK(c3po.FixedPointPreconditioner(1))
+    assert solveJFNK("jacobian") < nbSolvesReference
+    for update in [c3po.SecantUpdate.goodBroyden, c3po.SecantUpdate.multiSecant]:
+        assert solveJFNK(c3po.SecantPreconditioner(update)) < nbSolvesReference
+
+
+def test_secantReuse():
+    def solveTransient(preconditioner):
+        coupler, physics = buildCoupler(10, c3po.JFNKCoupler)
+        coupler.setKrylovConvergenceParameters(1.E-6, 30)
+        coupler.setPreconditioner(preconditioner)
+        return runTransient(coupler, physics, 4)
+
+    reference = solveTransient(None)
+    for update in [c3po.SecantUpdate.goodBroyden, c3po.SecantUpdate.multiSecant]:
+        preconditioner = c3po.SecantPreconditioner(update)
+        nbSolves = solveTransient(preconditioner)
+        assert preconditioner.getRank() > 0
+        assert nbSolves[0] == reference[0]
+        assert max(nbSolves[1:]) < min(reference[1:])
+        # Restarted at each Newton iteration: no reuse.
+        assert solveTransient(c3po.SecantPreconditioner(update, refreshPeriod=1)) == reference
+
+
+def test_secantRestart():
+    """ H y = s after each update, also when the maximum rank is reached. """
+    np.random.seed(5)
+    size = 6
+    matrix = np.eye(size) + 0.3 * np.random.rand(size, size)
+
+    def toData(values):
+        data = c3po.LocalDataManager()
+        data.setPackedStorage(True)
+        for i, value in enumerate(values):
+            data.setInputDoubleValue(str(i), value)
+        return c3po.CollaborativeDataManager([data])
+
+    for update in [c3po.SecantUpdate.goodBroyden, c3po.SecantUpdate.multiSecant]:
+        for maxRank in [1, 2]:
+            preconditioner = c3po.SecantPreconditioner(update, maxRank=maxRank)
+            preconditioner.setup(None, [1.], None, None, None)
+            for _ in range(5):
+                step = np.random.rand(size)
+                vector = toData(step)
+                product = toData(np.dot(matrix, step))
+                preconditioner.update(vector, product)
+                assert preconditioner.getRank() <= maxRank
+                result = toData(np.zeros(size))
+                preconditioner.apply(product, result)
+                assert result.dataManagers[0].flatView() == pytest.approx(step, abs=1.E-10)
+            preconditioner.release()
+
+
+def test_flexibleGMRES():
+    np.random.seed(3)
+    size = 10
+    matrix = np.diag(np.arange(1., size + 1.)) + 0.1 * np.random.rand(size, size)
+    rhs = np.random.rand(size)
+    vectorRhs = c3po.LocalDataManager()
+    vectorRhs.setPackedStorage(True)
+    for i in range(size):
+        vectorRhs.setInputDoubleValue(str(i), rhs[i])
+    preconditioner = c3po.JacobianPreconditioner(np.diag(np.diag(matrix)))
+    preconditioner.setup(None, [1.], None, None, None)
+    gmres = GMRES(size, flexible=True)
+    rhsCollaborative = c3po.CollaborativeDataManager([vectorRhs])
+    gmres.start(rhsCollaborative)
+    error = 1.
+    nbIter = 0
+    while error > 1.E-10:
+        nbIter += 1
+        preconditioned = gmres.getPreconditionedVector(rhsCollaborative)
+        preconditioner.apply(gmres.getDirection(), preconditioned)
+        product = gmres.getProductVector(rhsCollaborative)
+        product.dataManagers[0].flatView()[:] = np.dot(matrix, preconditioned.dataManagers[0].flatView())
+        error = gmres.addProduct() / np.linalg.norm(rhs)
+    assert nbIter < size
+    coeffs, vectors = gmres.getSolution()
+    solution = rhsCollaborative.clone()
+    solution.linearCombination(coeffs, vectors)
+    assert solution.dataManagers[0].flatView() == pytest.approx(np.linalg.solve(matrix, rhs))
+    gmres.release()
+
+
+if __name__ == "__main__":
+    test_preconditioners()
+    test_secantReuse()
+    test_flexibleGMRES()
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import pytest
+
+import c3po
+from tests.unitests.couplers.PhysicsLinear import buildCoupler, runTransient
+
+
+def test_extrapolation():
+    values = c3po.LocalDataManager()
+    predictor = c3po.Predictor(2)
+    for time_ in [0., 0.5, 1.5, 2.]:
+        values.setInputDoubleValue("x", 1. + 2. * time_ - 3. * time_ * time_)
+        predictor.record(values, time_)
+    assert predictor.getNbStored() == 3
+    predictor.predict(values, 3.)
+    assert values.getOutputDoubleValue("x") == pytest.approx(1. + 2. * 3. - 3. * 9.)
+    predictor.clear()
+    assert not predictor.predict(values, 3.)
+
+
+def test_couplers():
+    size = 10
+    for couplerClass in [c3po.FixedPointCoupler, c3po.AndersonCoupler, c3po.JFNKCoupler, c3po.CrossedSecantCoupler]:
+        coupler, physics = buildCoupler(size, couplerClass)
+        reference = runTransient(coupler, physics, 6)
+        for order in [1, 2]:
+            coupler, physics = buildCoupler(size, couplerClass)
+            coupler.setPredictor(c3po.Predictor(order))
+            nbSolves = runTransient(coupler, physics, 6)
+            assert nbSolves[:2] == reference[:2]
+            if couplerClass is c3po.JFNKCoupler:
+                assert nbSolves == reference
+            else:
+                assert max(nbSolves[2:]) < min(reference[2:])
+
+
+def test_invalidation():
+    size = 10
+    coupler, physics = buildCoupler(size, c3po.AndersonCoupler)
+    predictor = c3po.Predictor(1)
+    coupler.setPredictor(predictor)
+    assert coupler.getPredictor() is predictor
+    coupler.init()
+    for _ in range(3):
+        coupler.initTimeStep(0.1)
+        coupler.solve()
+        coupler.validateTimeStep()
+    assert predictor.getNbStored() == 2
+    coupler.resetTime(0.)
+    assert predictor.getNbStored() == 0
+    coupler.initTimeStep(0.1)
+    coupler.solve()
+    coupler.validateTimeStep()
+    assert predictor.getNbStored() == 1
+    coupler.setStationaryMode(True)
+    assert predictor.getNbStored() == 0
+    coupler.initTimeStep(0.1)
+    coupler.solve()
+    coupler.validateTimeStep()
+    assert predictor.getNbStored() == 0
+    coupler.term()
+
+
+if __name__ == "__main__":
+    test_extrapolation()
+    test_couplers()
+    test_invalidation()
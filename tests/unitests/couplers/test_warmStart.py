@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+
+import c3po
+from tests.unitests.couplers.PhysicsLinear import buildCoupler, runTransient
+
+
+def test_anderson():
+    size = 10
+    coupler, physics = buildCoupler(size, c3po.AndersonCoupler)
+    coupler.setOrder(size)
+    reference = runTransient(coupler, physics, 6)
+
+    coupler, physics = buildCoupler(size, c3po.AndersonCoupler)
+    coupler.setOrder(size)
+    coupler.setWarmStart(size)
+    nbSolves = runTransient(coupler, physics, 6)
+    assert nbSolves[0] == reference[0]
+    assert max(nbSolves[1:]) < reference[0]
+
+
+def test_crossedSecant():
+    size = 10
+    coupler, physics = buildCoupler(size, c3po.CrossedSecantCoupler)
+    reference = runTransient(coupler, physics, 6)
+
+    coupler, physics = buildCoupler(size, c3po.CrossedSecantCoupler)
+    coupler.setWarmStart(True)
+    nbSolves = runTransient(coupler, physics, 6)
+    assert nbSolves[0] == reference[0]
+    assert sum(nbSolves[1:]) <= sum(reference[1:])
+
+
+def solveStep(coupler, physics, dt):
+    before = physics.nbSolves
+    coupler.initTimeStep(dt)
+    coupler.solve()
+    assert coupler.getSolveStatus()
+    coupler.validateTimeStep()
+    return physics.nbSolves - before
+
+
+def test_invalidation():
+    size = 10
+    coupler, physics = buildCoupler(size, c3po.AndersonCoupler)
+    coupler.setOrder(size)
+    coupler.setWarmStart(size)
+    coupler.init()
+    cold = solveStep(coupler, physics, 0.1)
+    assert solveStep(coupler, physics, 0.1) < cold
+    assert solveStep(coupler, physics, 0.05) == cold
+    assert solveStep(coupler, physics, 0.05) < cold
+    coupler.resetTime(0.)
+    physics.x[:] = 0.
+    assert solveStep(coupler, physics, 0.05) == cold
+    coupler.setStationaryMode(True)
+    coupler.setStationaryMode(False)
+    physics.x[:] = 0.
+    assert solveStep(coupler, physics, 0.05) == cold
+    coupler.clearHistory()
+    physics.x[:] = 0.
+    assert solveStep(coupler, physics, 0.05) == cold
+    coupler.term()
+
+
+def test_terminate():
+    size = 10
+    for couplerClass in [c3po.AndersonCoupler, c3po.CrossedSecantCoupler]:
+        coupler, physics = buildCoupler(size, couplerClass)
+        coupler.setWarmStart(size if couplerClass is c3po.AndersonCoupler else True)
+        coupler.init()
+        cold = solveStep(coupler, physics, 0.1)
+        for _ in range(2):
+            solveStep(coupler, physics, 0.1)
+        coupler.term()
+        physics.resetTime(0.)
+        physics.x[:] = 0.
+        coupler.init()
+        assert solveStep(coupler, physics, 0.1) == cold
+        coupler.term()
+
+
+if __name__ == "__main__":
+    test_anderson()
+    test_crossedSecant()
+    test_invalidation()
+    test_terminate()
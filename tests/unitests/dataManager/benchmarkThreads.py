@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+# Benchmark of CollaborativeDataManager.setNumberOfThreads: mean time of the main operations for several numbers of threads,
+# with packed (numpy) and MEDCoupling storage, and share of an operation left to another Python thread (about 0 if the GIL
+# is held during the whole operation, about 0.5 on a single core if it is released). It is not run by pytest.
+# Usage (from the root of the repository): PYTHONPATH=sources:. python tests/unitests/dataManager/benchmarkThreads.py [nbParts] [nbValuesPerPart] [nbRepeats]
+from __future__ import print_function, division
+import sys
+import threading
+import time
+
+import c3po
+import c3po.medcouplingCompat as mc
+
+
+def buildPart(packed, nbValues, shift):
+    import tests.medBuilder as medBuilder
+    data = c3po.LocalDataManager()
+    data.setPackedStorage(packed)
+    field = medBuilder.makeField2DCart([0., 1., 2.], [0., 1., 2.])
+    nbComponents = nbValues // 4
+    array = mc.DataArrayDouble(4 * nbComponents)
+    array.iota(shift)
+    array.rearrange(nbComponents)
+    field.setArray(array)
+    data.setInputMEDDoubleField("field", field)
+    return data
+
+
+def buildCollaborative(packed, nbParts, nbValues, nbThreads, shift):
+    collaborative = c3po.CollaborativeDataManager([buildPart(packed, nbValues, shift + i) for i in range(nbParts)])
+    collaborative.setNumberOfThreads(nbThreads)
+    return collaborative
+
+
+def meanTime(function, nbRepeats):
+    function()
+    start = time.time()
+    for _ in range(nbRepeats):
+        function()
+    return (time.time() - start) / nbRepeats
+
+
+def benchmark(packed, nbParts, nbValues, nbThreads, nbRepeats):
+    data1 = buildCollaborative(packed, nbParts, nbValues, nbThreads, 1.)
+    data2 = buildCollaborative(packed, nbParts, nbValues, nbThreads, -2.)
+    result = data1.clone()
+    return [meanTime(lambda: result.linearCombination([2., -1.], [data1, data2]), nbRepeats),
+            meanTime(lambda: data1.dotMany([data1, data2]), nbRepeats),
+            meanTime(lambda: data1 + data2, nbRepeats),
+            meanTime(data1.norm2, nbRepeats)]
+
+
+def countSpins(duration, state):
+    """ Count the iterations of a pure Python loop running in another thread while ``duration()`` is evaluated. """
+    def spin():
+        while not state["stop"]:
+            state["count"] += 1
+    thread = threading.Thread(target=spin)
+    thread.start()
+    time.sleep(0.05)
+    before = state["count"]
+    elapsed = duration()
+    count = state["count"] - before
+    state["stop"] = True
+    thread.join()
+    return count, elapsed
+
+
+def gilShare(function):
+    freeCount, freeTime = countSpins(lambda: time.sleep(0.2) or 0.2, {"count": 0, "stop": False})
+
+    def timed():
+        start = time.time()
+        function()
+        return time.time() - start
+    count, elapsed = countSpins(timed, {"count": 0, "stop": False})
+    return count / (freeCount / freeTime * elapsed)
+
+
+def main(nbParts=4, nbValues=4000000, nbRepeats=10):
+    print("{} parts of {} doubles, mean of {} calls in seconds".format(nbParts, nbValues, nbRepeats))
+    for packed in [True, False]:
+        print("packed storage" if packed else "MEDCoupling storage")
+        print("  threads  linearCombination  dotMany  add      norm2")
+        for nbThreads in [1, 2, 4]:
+            times = benchmark(packed, nbParts, nbValues, nbThreads, nbRepeats)
+            print("  {:<7d}  {:<17.4f}  {:<7.4f}  {:<7.4f}  {:.4f}".format(nbThreads, *times))
+        data1 = buildCollaborative(packed, nbParts, nbValues, 1, 1.)
+        data2 = data1.clone()
+        print("  share left to another thread during linearCombination: {:.2f}, during add: {:.2f}".format(
+            gilShare(lambda: data2.linearCombination([2., -1.], [data1, data1])), gilShare(lambda: data1 + data2)))
+
+
+if __name__ == "__main__":
+    main(*[int(argument) for argument in sys.argv[1:]])
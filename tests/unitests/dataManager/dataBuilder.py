@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+# Build the LocalDataManager (one scalar and one MED field) used by the DataManager unit tests.
+from __future__ import print_function, division
+
+import c3po
+import c3po.medcouplingCompat as mc
+
+
+def buildDataManager(packed, shift):
+    import tests.medBuilder as medBuilder
+    data = c3po.LocalDataManager()
+    data.setPackedStorage(packed)
+    data.setInputDoubleValue("scalar", 1. + shift)
+    field = medBuilder.makeField2DCart([0., 1., 2.], [0., 1., 2.])
+    field.setArray(mc.DataArrayDouble([[2. * shift, 1.], [0., 4. - shift], [-7., 1.], [1., shift]]))
+    data.setInputMEDDoubleField("field", field)
+    return data
+
+
+def getValues(data):
+    return [data.getOutputDoubleValue("scalar")] + data.getOutputMEDDoubleField("field").getArray().getValues()
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import pytest
+
+import c3po
+import c3po.medcouplingCompat as mc
+
+
+def test_bufferPool():
+    import tests.medBuilder as medBuilder
+    pool = c3po.BufferPool(maxFreeBuffers=2)
+    data = c3po.LocalDataManager()
+    data.setPackedStorage(True)
+    data.setBufferPool(pool)
+    data.setInputDoubleValue("scalar", 2.)
+    field = medBuilder.makeField2DCart([0., 1., 2.], [0., 1., 2.])
+    field.setArray(mc.DataArrayDouble([1., -2., 3., 0.5]))
+    data.setInputMEDDoubleField("field", field)
+
+    assert data.norm2() == pytest.approx((4. + 1. + 4. + 9. + 0.25) ** 0.5)
+    assert pool.getNbAllocations() == 1
+
+    temporary = data * 2.
+    assert temporary.getBufferPool() is pool
+    assert pool.getNbAllocations() == 2
+    temporary.release()
+    assert pool.getNbFreeBuffers() == 1
+
+    result = data + data
+    assert pool.getNbHits() == 1
+    assert pool.getNbAllocations() == 2
+    assert result.getOutputDoubleValue("scalar") == pytest.approx(4.)
+    assert result.getOutputMEDDoubleField("field").getArray().getValues() == pytest.approx([2., -4., 6., 1.])
+
+    temporaries = [data.clone() for _ in range(3)]
+    for temporary in temporaries:
+        temporary.release()
+    assert pool.getNbFreeBuffers() == 2
+    assert pool.getNbEvictions() == 1
+    pool.clear()
+    assert pool.getNbFreeBuffers() == 0
+
+
+def test_concurrentAccess():
+    from multiprocessing.pool import ThreadPool
+    pool = c3po.BufferPool(maxFreeBuffers=4)
+
+    def work(index):
+        for _ in range(2000):
+            buffer = pool.acquire(10 + index % 3)
+            pool.release(buffer)
+
+    threads = ThreadPool(8)
+    threads.map(work, range(8))
+    threads.close()
+    assert pool.getNbAllocations() + pool.getNbHits() == 8 * 2000
+    assert pool.getNbFreeBuffers() <= 4
+
+
+if __name__ == "__main__":
+    test_bufferPool()
+    test_concurrentAccess()
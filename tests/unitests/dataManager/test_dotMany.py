@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import pytest
+
+import c3po
+from tests.unitests.dataManager.dataBuilder import buildDataManager
+
+
+def test_dotMany():
+    for packed in [False, True]:
+        vectors = [buildDataManager(packed, shift) for shift in [1., 2., -3.]]
+        dots = vectors[0].dotMany(vectors)
+        gram = vectors[0].gram(vectors[1:])
+        assert dots.shape == (3,)
+        assert gram.shape == (2, 2)
+        for i in range(3):
+            assert dots[i] == pytest.approx(vectors[0].dot(vectors[i]))
+        for i in range(2):
+            for j in range(2):
+                assert gram[i, j] == pytest.approx(vectors[i + 1].dot(vectors[j + 1]))
+
+        collaboratives = [c3po.CollaborativeDataManager([vectors[i].clone(), vectors[(i + 1) % 3].clone()]) for i in range(3)]
+        dots = collaboratives[0].dotMany(collaboratives)
+        gram = collaboratives[0].gram(collaboratives)
+        for i in range(3):
+            assert dots[i] == pytest.approx(collaboratives[0].dot(collaboratives[i]))
+            for j in range(3):
+                assert gram[i, j] == pytest.approx(collaboratives[i].dot(collaboratives[j]))
+
+
+if __name__ == "__main__":
+    test_dotMany()
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import os
+import pytest
+
+import c3po
+from tests.unitests.dataManager.dataBuilder import buildDataManager, getValues
+
+
+def test_mapToFile(tmpdir):
+    data1 = buildDataManager(True, 1.)
+    data2 = buildDataManager(True, 2.)
+    mapped = data1.clone()
+    assert mapped.mapToFile(str(tmpdir))
+    assert len(os.listdir(str(tmpdir))) == 1
+    assert mapped.dot(data2) == pytest.approx(data1.dot(data2))
+    mapped.linearCombination([2., -1.], [mapped, data2])
+    assert getValues(mapped) == pytest.approx(getValues(data1 * 2. - data2))
+    assert getValues(mapped + data2) == pytest.approx(getValues(data1 * 2.))
+    mapped.release()
+    assert len(os.listdir(str(tmpdir))) == 0
+
+    unpacked = c3po.LocalDataManager()
+    unpacked.setInputDoubleValue("scalar", 1.)
+    assert not unpacked.mapToFile(str(tmpdir))
+
+
+def test_historyStore(tmpdir):
+    data = buildDataManager(True, 1.)
+    vectorSize = data.getMemorySize()
+    store = c3po.HistoryStore(2 * vectorSize, str(tmpdir))
+    vectors = [data * float(i) for i in range(4)]
+    for vector in vectors:
+        store.add(vector)
+    assert store.getRAMSize() == 2 * vectorSize
+    assert store.getMappedSize() == 2 * vectorSize
+    assert store.getNbMappings() == 2
+    assert len(os.listdir(str(tmpdir))) == 2
+    for i, vector in enumerate(vectors):
+        assert getValues(vector) == pytest.approx(getValues(data * float(i)))
+    store.add(vectors[0])
+    store.setRAMBudget(vectorSize)
+    assert store.getNbMappings() == 3
+    assert store.getRAMSize() == vectorSize
+    store.clear()
+    for vector in vectors:
+        vector.release()
+    assert len(os.listdir(str(tmpdir))) == 0
+
+
+def test_couplerHistoryStore(tmpdir):
+    from tests.matrix.PhysicsMatrix import PhysicsMatrix
+    for couplerType in ["Anderson", "JFNK"]:
+        myPhysics = PhysicsMatrix()
+        myPhysics.init()
+        taille = int(myPhysics.getOutputDoubleValue("taille"))
+        myPhysics.term()
+        transformer = c3po.DirectMatching()
+        data = c3po.LocalDataManager()
+        data.setPackedStorage(True)
+        physics2Data = c3po.LocalExchanger(transformer, [], [], [(myPhysics, str(i)) for i in range(taille)], [(data, str(i)) for i in range(taille)])
+        data2Physics = c3po.LocalExchanger(transformer, [], [], [(data, str(i)) for i in range(taille)], [(myPhysics, str(i)) for i in range(taille)])
+        store = c3po.HistoryStore(0, str(tmpdir))
+        if couplerType == "Anderson":
+            coupler = c3po.AndersonCoupler([myPhysics], [physics2Data, data2Physics], [data])
+            coupler.setOrder(3)
+            coupler.setHistoryStore(store)
+        else:
+            coupler = c3po.JFNKCoupler([myPhysics], [physics2Data, data2Physics], [data])
+            coupler.setKrylovConvergenceParameters(1E-4, 3)
+            coupler.setBasisStore(store)
+        coupler.setPrintLevel(0)
+        coupler.init()
+        coupler.solve()
+        assert coupler.getSolveStatus()
+        assert store.getNbMappings() > 0
+        assert pytest.approx(myPhysics.getOutputDoubleValue("valeur_propre"), abs=1.E-3) == 15.2654890812
+        coupler.term()
+        assert len(os.listdir(str(tmpdir))) == 0
+
+
+if __name__ == "__main__":
+    import tempfile
+    test_mapToFile(tempfile.mkdtemp())
+    test_historyStore(tempfile.mkdtemp())
+    test_couplerHistoryStore(tempfile.mkdtemp())
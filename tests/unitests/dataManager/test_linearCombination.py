@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import pytest
+
+import c3po
+from tests.unitests.dataManager.dataBuilder import buildDataManager, getValues
+
+
+def test_linearCombination():
+    for packed in [False, True]:
+        data1 = buildDataManager(packed, 1.)
+        data2 = buildDataManager(packed, 2.)
+        data3 = buildDataManager(packed, -3.)
+        reference = data1 * 2. + data2 * -0.5 + data3 * 3.
+
+        result = data1.clone()
+        result.linearCombination([2., -0.5, 3.], [data1, data2, data3])
+        assert getValues(result) == pytest.approx(getValues(reference))
+        result = data1.clone()
+        result.linearCombination([-0.5, 3., 2.], [data2, data3, result])
+        assert getValues(result) == pytest.approx(getValues(reference))
+
+        result = data1.clone()
+        result.axpy(-0.5, data2)
+        assert getValues(result) == pytest.approx(getValues(data1 - data2 * 0.5))
+        result.axpby(3., data3, 0.)
+        assert getValues(result) == pytest.approx(getValues(data3 * 3.))
+        result.axpby(2., data1, -1.)
+        assert getValues(result) == pytest.approx(getValues(data1 * 2. - data3 * 3.))
+        result.imuladd(4., data2)
+        assert getValues(result) == pytest.approx(getValues(data1 * 2. - data3 * 3. + data2 * 4.))
+
+        collaborative = c3po.CollaborativeDataManager([data1.clone(), data2.clone()])
+        other = c3po.CollaborativeDataManager([data3.clone(), data1.clone()])
+        collaborative.linearCombination([0.5, 2.], [collaborative, other])
+        assert getValues(collaborative.dataManagers[0]) == pytest.approx(getValues(data1 * 0.5 + data3 * 2.))
+        assert getValues(collaborative.dataManagers[1]) == pytest.approx(getValues(data2 * 0.5 + data1 * 2.))
+
+    with pytest.raises(Exception):
+        data1.linearCombination([1.], [data1, data2])
+
+
+if __name__ == "__main__":
+    test_linearCombination()
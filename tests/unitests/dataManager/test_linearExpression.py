@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import pytest
+
+import c3po
+from tests.unitests.dataManager.dataBuilder import buildDataManager, getValues
+
+
+def test_linearExpression():
+    for packed in [False, True]:
+        data1 = buildDataManager(packed, 1.)
+        data2 = buildDataManager(packed, 2.)
+        data3 = buildDataManager(packed, -3.)
+        reference = data1 * 2. + data2 * -0.5 + data3 * 3.
+
+        expression = 2. * data1.lazy() - 0.5 * data2.lazy() + data3 * 3.
+        assert len(expression.getTerms()) == 3
+        assert getValues(expression.evaluate()) == pytest.approx(getValues(reference))
+        evaluated = expression.evaluate()
+        evaluated *= 0.
+        assert getValues(evaluated) == pytest.approx([0.] * 9)
+        assert getValues(data1) == pytest.approx(getValues(buildDataManager(packed, 1.)))
+        assert expression.norm2() == pytest.approx(reference.norm2())
+        assert expression.normMax() == pytest.approx(reference.normMax())
+        assert expression.dot(data2) == pytest.approx(reference.dot(data2))
+        assert expression.dot(data2.lazy() - data1) == pytest.approx(reference.dot(data2 - data1))
+
+        merged = data1.lazy() + data1 - data1.lazy() / 2.
+        assert merged.getTerms() == [(1.5, data1)]
+
+        result = data3.clone()
+        (data1.lazy() * 2. - data2 * 0.5).addTo(result)
+        assert getValues(result) == pytest.approx(getValues(data1 * 2. - data2 * 0.5 + data3))
+        (-(result.lazy() - data3)).assignTo(result)
+        assert getValues(result) == pytest.approx(getValues(data2 * 0.5 - data1 * 2.))
+
+        collaborative = c3po.CollaborativeDataManager([data1.clone(), data2.clone()])
+        other = c3po.CollaborativeDataManager([data3.clone(), data1.clone()])
+        result = (collaborative.lazy() - other).evaluate()
+        assert result.norm2() == pytest.approx((collaborative - other).norm2())
+        assert (collaborative.lazy() - other).dot(collaborative) == pytest.approx((collaborative - other).dot(collaborative))
+
+
+if __name__ == "__main__":
+    test_linearExpression()
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import pytest
+
+import c3po
+from tests.unitests.dataManager.dataBuilder import buildDataManager, getValues
+
+
+def test_asNumpy():
+    for packed in [False, True]:
+        data = buildDataManager(packed, 1.)
+        reference = getValues(data)
+        view = data.asNumpy("field")
+        assert view.shape == (4, 2)
+        view *= 2.
+        assert getValues(data) == pytest.approx(reference[:1] + [2. * value for value in reference[1:]])
+        if packed:
+            data.asNumpy("scalar")[0] = 5.
+            assert data.getOutputDoubleValue("scalar") == 5.
+            assert data.norm2() == pytest.approx(data.clone().norm2())
+        else:
+            with pytest.raises(Exception):
+                data.asNumpy("scalar")
+        with pytest.raises(Exception):
+            data.asNumpy("unknown")
+
+
+def test_flatView():
+    data = buildDataManager(True, 1.)
+    other = buildDataManager(True, 2.)
+    view = data.flatView()
+    assert view.shape == (9,)
+    assert list(view) == pytest.approx(getValues(data))
+    view[:] = other.flatView()
+    data += other
+    assert list(view) == pytest.approx([2. * value for value in getValues(other)])
+    assert getValues(data) == pytest.approx([2. * value for value in getValues(other)])
+    with pytest.raises(Exception):
+        buildDataManager(False, 1.).flatView()
+
+
+def test_collaborativeViews():
+    data1 = buildDataManager(True, 1.)
+    data2 = c3po.LocalDataManager()
+    data2.setPackedStorage(True)
+    data2.setInputDoubleValue("other", 3.)
+    collaborative = c3po.CollaborativeDataManager([data1, data2])
+    assert collaborative.getDoubleDataNames() == ["scalar", "field", "other"]
+    views = collaborative.asNumpy("other")
+    assert list(views.keys()) == [1]
+    views[1][0] = 4.
+    assert data2.getOutputDoubleValue("other") == 4.
+    flatViews = collaborative.flatView()
+    assert sorted(flatViews.keys()) == [0, 1]
+    assert flatViews[0].size == 9
+
+
+if __name__ == "__main__":
+    test_asNumpy()
+    test_flatView()
+    test_collaborativeViews()
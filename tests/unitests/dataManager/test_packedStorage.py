@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import pytest
+
+import c3po
+import c3po.medcouplingCompat as mc
+
+
+def buildDataManager(packed, shift=0.):
+    import tests.medBuilder as medBuilder
+    data = c3po.LocalDataManager()
+    data.setPackedStorage(packed)
+    data.setInputDoubleValue("scalar1", 1. + shift)
+    data.setInputDoubleValue("scalar2", -3. + shift)
+    field1 = medBuilder.makeField2DCart([0., 1., 2.], [0., 1., 2.])
+    field1.setArray(mc.DataArrayDouble([1. + shift, -2., 3., 0.5]))
+    data.setInputMEDDoubleField("field1", field1)
+    field2 = medBuilder.makeField2DCart([0., 1., 2.], [0., 1., 2.])
+    field2.setArray(mc.DataArrayDouble([[2., 1. - shift], [0., 4.], [-7., 1.], [1., 1.]]))
+    data.setInputMEDDoubleField("field2", field2)
+    return data
+
+
+def getValues(data):
+    values = [data.getOutputDoubleValue("scalar1"), data.getOutputDoubleValue("scalar2")]
+    values += data.getOutputMEDDoubleField("field1").getArray().getValues()
+    values += data.getOutputMEDDoubleField("field2").getArray().getValues()
+    return values
+
+
+def test_packedStorage():
+    results = {}
+    for packed in [False, True]:
+        data1 = buildDataManager(packed)
+        data2 = buildDataManager(packed, shift=0.5)
+        resu = [data1.norm2(), data1.normMax(), data1.dot(data2)]
+        resu += getValues(data1 + data2) + getValues(data1 - data2) + getValues(data1 * 3.)
+        data1 += data2
+        data1 *= 2.
+        data1.imuladd(-0.5, data2)
+        data1 -= data2
+        resu += getValues(data1)
+        clone = data1.clone()
+        clone *= 2.
+        resu += getValues(clone) + getValues(data1)
+        data1.copy(data2)
+        resu += getValues(data1)
+        assert data1.isPackedStorage() == packed
+        assert clone.isPackedStorage() == packed
+        results[packed] = resu
+    assert results[True] == pytest.approx(results[False])
+
+
+def test_packedStorageUpdates():
+    data = buildDataManager(True)
+    data *= 1.
+    buffer = data.flatView()
+    field1 = data.getOutputMEDDoubleField("field1")
+    field1.getArray().setIJ(0, 0, 10.)
+    assert data.normMax() == pytest.approx(7.)
+    data.setInputMEDDoubleField("field1", field1)
+    assert data.normMax() == pytest.approx(10.)
+    data *= 1.
+    assert data.getOutputMEDDoubleField("field2").getArray().getIJ(1, 1) == pytest.approx(4.)
+    assert data.flatView() is buffer
+
+    import tests.medBuilder as medBuilder
+    newField = medBuilder.makeField2DCart([0., 1., 2.], [0., 1., 2.])
+    newField.setArray(mc.DataArrayDouble([20., 0., 0., 0.]))
+    data.setInputMEDDoubleField("field1", newField)
+    assert data.normMax() == pytest.approx(20.)
+    data.setInputDoubleValue("scalar1", -30.)
+    assert data.normMax() == pytest.approx(30.)
+    data.setInputDoubleValue("scalar3", 40.)
+    assert data.normMax() == pytest.approx(40.)
+    data *= 0.5
+    assert data.getOutputDoubleValue("scalar3") == pytest.approx(20.)
+    assert data.valuesDouble["scalar3"] == pytest.approx(20.)
+    assert data.getOutputMEDDoubleField("field1").getArray().getIJ(0, 0) == pytest.approx(10.)
+
+    unpacked = buildDataManager(False)
+    unpacked.setInputDoubleValue("scalar3", 1.)
+    data += unpacked
+    assert data.getOutputDoubleValue("scalar3") == pytest.approx(21.)
+    assert data.normMax() == pytest.approx(21.)
+
+    data.setPackedStorage(False)
+    assert data.getOutputDoubleValue("scalar3") == pytest.approx(21.)
+
+
+if __name__ == "__main__":
+    test_packedStorage()
+    test_packedStorageUpdates()
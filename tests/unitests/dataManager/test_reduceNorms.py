@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import pytest
+
+import c3po
+from tests.unitests.dataManager.dataBuilder import buildDataManager
+
+
+def checkReduceNorms(managers):
+    norms2, normsMax, dots = managers[0].reduceNorms(managers[1:], [(0, 1), (1, 2), (2, 2)])
+    for i, manager in enumerate(managers):
+        assert norms2[i] == pytest.approx(manager.norm2())
+        assert normsMax[i] == pytest.approx(manager.normMax())
+    assert dots[0] == pytest.approx(managers[0].dot(managers[1]))
+    assert dots[1] == pytest.approx(managers[1].dot(managers[2]))
+    assert dots[2] == pytest.approx(managers[2].dot(managers[2]))
+
+
+def test_reduceNorms():
+    for packed in [False, True]:
+        managers = [buildDataManager(packed, shift) for shift in [1., 12., -3.]]
+        checkReduceNorms(managers)
+        checkReduceNorms([c3po.CollaborativeDataManager([managers[i].clone(), managers[(i + 1) % 3].clone()]) for i in range(3)])
+
+    empty = c3po.LocalDataManager()
+    norms2, normsMax, dots = empty.reduceNorms([empty.clone()], [(0, 1)])
+    assert list(norms2) == [0., 0.]
+    assert list(normsMax) == [0., 0.]
+    assert list(dots) == [0.]
+
+
+if __name__ == "__main__":
+    test_reduceNorms()
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import numpy
+import pytest
+
+import c3po
+from tests.unitests.dataManager.dataBuilder import buildDataManager, getValues
+
+
+def test_storageType():
+    data1 = buildDataManager(True, 1.)
+    data2 = buildDataManager(True, 2.)
+    compact1 = data1.clone()
+    compact1.setStorageType(numpy.float32)
+    compact2 = data2.clone()
+    compact2.setStorageType(numpy.float32)
+    assert compact1.getStorageType() == numpy.float32
+    assert compact1.getMemorySize() * 2 == data1.getMemorySize()
+    assert c3po.CollaborativeDataManager([compact1, data2]).getMemorySize() == 3 * compact1.getMemorySize()
+
+    assert getValues(compact1) == pytest.approx(getValues(data1))
+    assert compact1.norm2() == pytest.approx(data1.norm2())
+    assert compact1.dot(compact2) == pytest.approx(data1.dot(data2))
+    assert list(data1.dotMany([compact1, compact2])) == pytest.approx(list(data1.dotMany([data1, data2])))
+    assert getValues(compact1 + compact2) == pytest.approx(getValues(data1 + data2))
+    assert (compact1 * 2.).getStorageType() == numpy.float32
+
+    result = data1.clone()
+    result.linearCombination([0.5, -3.], [compact1, compact2])
+    assert getValues(result) == pytest.approx(getValues(data1 * 0.5 - data2 * 3.))
+    compact1.linearCombination([1. / 3., 1.], [data1, data2])
+    assert getValues(compact1) == pytest.approx(getValues(data1 * (1. / 3.) + data2), rel=1.E-6)
+
+    pool = c3po.BufferPool()
+    data1.setBufferPool(pool)
+    compact = data1.clone()
+    compact.setStorageType(numpy.float32)
+    compact.release()
+    assert pool.getNbFreeBuffers() == 2
+    nbHits = pool.getNbHits()
+    assert data1.clone().getStorageType() == numpy.float64
+    assert pool.getNbHits() == nbHits + 1
+    assert pool.getFreeMemory() == compact1.getMemorySize()
+
+
+def test_historyStorageType():
+    from tests.matrix.PhysicsMatrix import PhysicsMatrix
+    for couplerType in ["Anderson", "JFNK"]:
+        myPhysics = PhysicsMatrix()
+        myPhysics.init()
+        taille = int(myPhysics.getOutputDoubleValue("taille"))
+        myPhysics.term()
+        transformer = c3po.DirectMatching()
+        data = c3po.LocalDataManager()
+        data.setPackedStorage(True)
+        physics2Data = c3po.LocalExchanger(transformer, [], [], [(myPhysics, str(i)) for i in range(taille)], [(data, str(i)) for i in range(taille)])
+        data2Physics = c3po.LocalExchanger(transformer, [], [], [(data, str(i)) for i in range(taille)], [(myPhysics, str(i)) for i in range(taille)])
+        if couplerType == "Anderson":
+            coupler = c3po.AndersonCoupler([myPhysics], [physics2Data, data2Physics], [data])
+            coupler.setOrder(3)
+            coupler.setHistoryStorageType(numpy.float32)
+        else:
+            coupler = c3po.JFNKCoupler([myPhysics], [physics2Data, data2Physics], [data])
+            coupler.setKrylovConvergenceParameters(1E-4, 3)
+            coupler.setBasisStorageType(numpy.float32)
+        coupler.setPrintLevel(0)
+        coupler.init()
+        coupler.solve()
+        assert coupler.getSolveStatus()
+        assert pytest.approx(myPhysics.getOutputDoubleValue("valeur_propre"), abs=1.E-3) == 15.2654890812
+        coupler.term()
+
+
+if __name__ == "__main__":
+    test_storageType()
+    test_historyStorageType()
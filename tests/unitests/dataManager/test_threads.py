@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import pytest
+
+import c3po
+from tests.unitests.dataManager.dataBuilder import buildDataManager, getValues
+
+
+def buildCollaborative(nbThreads, shift):
+    collaborative = c3po.CollaborativeDataManager([buildDataManager(i % 2 == 0, shift + 0.5 * i) for i in range(5)])
+    collaborative.setNumberOfThreads(nbThreads)
+    return collaborative
+
+
+def getCollaborativeValues(collaborative):
+    values = []
+    for data in collaborative.dataManagers:
+        values += getValues(data)
+    return values
+
+
+def computeAll(nbThreads):
+    data1 = buildCollaborative(nbThreads, 1.)
+    data2 = buildCollaborative(nbThreads, -2.)
+    results = []
+    sumData = data1 + data2
+    assert sumData.getNumberOfThreads() == nbThreads
+    sumData -= data1 * 0.5
+    sumData *= 3.
+    sumData.linearCombination([2., -1.], [sumData, data2])
+    results += getCollaborativeValues(sumData) + getCollaborativeValues(data1 - data2)
+    copied = data1.clone()
+    copied.copy(data2)
+    results += getCollaborativeValues(copied)
+    results += [sumData.norm2(), sumData.normMax(), sumData.dot(data1)]
+    results += list(sumData.dotMany([data1, data2])) + list(sumData.gram([data1, data2]).reshape(-1))
+    for array in sumData.reduceNorms([data1, data2], [(0, 1), (1, 2)]):
+        results += list(array)
+    return results
+
+
+def test_threads():
+    reference = computeAll(1)
+    assert computeAll(4) == reference
+    assert computeAll(2) == reference
+
+    nested = c3po.CollaborativeDataManager([buildCollaborative(3, 1.), buildCollaborative(3, 2.)])
+    nested.setNumberOfThreads(3)
+    assert (nested * 2.).norm2() == pytest.approx(2. * nested.norm2())
+
+    with pytest.raises(Exception):
+        buildCollaborative(0, 1.)
+    inconsistent = buildCollaborative(2, 1.)
+    inconsistent.dataManagers[3].setInputDoubleValue("other", 1.)
+    with pytest.raises(Exception):
+        inconsistent.dot(buildCollaborative(2, 1.))
+
+
+if __name__ == "__main__":
+    test_threads()